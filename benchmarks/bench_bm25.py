@@ -0,0 +1,114 @@
+"""
+Checks the segmented BM25 index (src/keyword_engine/bm25.py) against
+rank_bm25.BM25Okapi on a synthetic chunk corpus and times both.
+
+The corpus is indexed in several flushes so that searches run across segments
+and background merges; every run asserts that the dense scores match
+rank_bm25 and that the top-k chunk ids are the same (up to score ties). It
+then deletes a share of the chunks, merges everything into one segment and
+checks again against rank_bm25 built over the surviving chunks only.
+
+Usage:
+    python benchmarks/bench_bm25.py --docs 50000 --queries 200 -k 10
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from rank_bm25 import BM25Okapi
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.synthetic_corpus import WORDS
+from src.keyword_engine.bm25 import BM25Index, tokenize
+
+
+def synthetic_chunks(n: int, vocab: int, rng: random.Random):
+    # course words plus a Zipf-distributed tail, so df varies over orders of magnitude
+    terms = WORDS + [f"term{i}" for i in range(vocab)]
+    weights = [1.0 / (rank + 1) for rank in range(len(terms))]
+    return [" ".join(rng.choices(terms, weights, k=rng.randint(20, 120))) for _ in range(n)], terms
+
+
+def check(index: BM25Index, chunk_ids, texts, queries, k: int) -> float:
+    """Asserts index == rank_bm25 over (chunk_ids, texts); returns rank_bm25's ms/query."""
+    reference = BM25Okapi([tokenize(t) for t in texts])
+    position = {c: i for i, c in enumerate(chunk_ids)}
+    seg_order = [c for seg in index._snapshot.segments for c in seg.chunk_ids]
+    live = np.array([c in position for c in seg_order])
+    ref_ms = []
+    for query, hits in zip(queries, index.search(queries, k=k)):
+        t = time.perf_counter()
+        expected = reference.get_scores(tokenize(query))
+        ref_ms.append((time.perf_counter() - t) * 1000)
+        scores = index.get_scores(query)[live]
+        order = [position[c] for c, alive in zip(seg_order, live) if alive]
+        assert np.allclose(scores, expected[order]), f"scores differ for {query!r}"
+        top = np.sort(expected)[::-1][:len(hits)]
+        got = np.array([h["score"] for h in hits])
+        assert np.allclose(got, top), f"top-k differs for {query!r}"
+        for h in hits:  # same scores at each rank; ids can only differ within ties
+            assert np.isclose(expected[position[h["chunk_id"]]], h["score"])
+    return statistics.mean(ref_ms)
+
+
+def main():
+    parser = argparse.ArgumentParser("BM25 keyword index benchmark")
+    parser.add_argument("--docs", type=int, default=50000)
+    parser.add_argument("--vocab", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--flushes", type=int, default=12, help="segments written before merging")
+    parser.add_argument("--delete", type=float, default=0.2, help="share of chunks deleted before the final merge")
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    texts, terms = synthetic_chunks(args.docs, args.vocab, rng)
+    chunk_ids = [f"bench_chunk_{i}" for i in range(args.docs)]
+    queries = [" ".join(rng.choices(terms, k=rng.randint(1, 6))) for _ in range(args.queries)]
+    tmp = Path(tempfile.mkdtemp(prefix="bench_bm25_"))
+
+    try:
+        index = BM25Index(tmp, flush_docs=10 ** 9, max_segments=4)
+        start = time.perf_counter()
+        step = -(-args.docs // args.flushes)
+        for s in range(0, args.docs, step):
+            index.add_documents(chunk_ids[s:s + step], texts[s:s + step])
+            index.flush()
+        index.wait_for_merges()
+        build = time.perf_counter() - start
+        print(f"indexed {args.docs} chunks in {build:.2f}s -> {len(index._snapshot.segments)} segments")
+
+        latencies = []
+        for q in queries:
+            t = time.perf_counter()
+            index.search([q], k=args.k)
+            latencies.append((time.perf_counter() - t) * 1000)
+        latencies.sort()
+        ref = check(index, chunk_ids, texts, queries, args.k)
+        print(f"search p50 {latencies[len(latencies) // 2]:.2f} ms, p99 {latencies[int(len(latencies) * 0.99)]:.2f} ms; "
+              f"rank_bm25 get_scores {ref:.2f} ms/query; scores and top-{args.k} match")
+
+        reopened = BM25Index(tmp)
+        assert [h["chunk_id"] for h in reopened.search(queries[:20], k=args.k)[0]] == \
+               [h["chunk_id"] for h in index.search(queries[:20], k=args.k)[0]]
+
+        doomed = set(rng.sample(chunk_ids, int(args.docs * args.delete)))
+        index.delete(doomed)
+        index.merge(list(index._snapshot.segments))
+        keep = [i for i, c in enumerate(chunk_ids) if c not in doomed]
+        check(index, [chunk_ids[i] for i in keep], [texts[i] for i in keep], queries, args.k)
+        print(f"deleted {len(doomed)} chunks, merged to 1 segment; still matches rank_bm25")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
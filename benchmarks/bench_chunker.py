@@ -0,0 +1,102 @@
+"""
+Compares the prefix-sum chunker (cleaner.chunk_text_by_sentences) with the
+previous implementation, which re-split sentences and rebuilt the overlap on
+every chunk, on multi-megabyte synthetic texts. Every run checks that both
+return the same (start, end, text) tuples.
+
+Usage:
+    python benchmarks/bench_chunker.py --mb 1 4 16 --max-tokens 500 --overlap 100
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from typing import List, Tuple
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.synthetic_corpus import WORDS
+from src.ingest.processor import import_cleaner_module
+
+
+def legacy_chunk_text_by_sentences(
+    text: str,
+    max_tokens: int = 500,
+    overlap: int = 100
+) -> List[Tuple[int, int, str]]:
+    # chunk_text_by_sentences as it was before the prefix-sum engine
+    sentences = re.split(r"(?<=[.!?])\s+", text)
+
+    chunks = []
+    current = []
+    token_count = 0
+    start = 0
+
+    for i, sent in enumerate(sentences):
+        words = sent.split()
+        if token_count + len(words) > max_tokens:
+            chunks.append((start, i, " ".join(current)))
+
+            if overlap > 0:
+                overlap_words = []
+                count = 0
+                for s in reversed(current):
+                    count += len(s.split())
+                    overlap_words.insert(0, s)
+                    if count >= overlap:
+                        break
+                current = overlap_words
+                token_count = sum(len(s.split()) for s in current)
+                start = i - len(current)
+            else:
+                current = []
+                token_count = 0
+                start = i
+
+        current.append(sent)
+        token_count += len(words)
+
+    if current:
+        chunks.append((start, len(sentences), " ".join(current)))
+
+    return chunks
+
+
+def synthetic_text(size_bytes: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = []
+    total = 0
+    while total < size_bytes:
+        sent = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 30))) + rng.choice(".?!")
+        parts.append(sent)
+        total += len(sent) + 1
+    return " ".join(parts)
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser("Sentence chunker benchmark")
+    parser.add_argument("--mb", type=float, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--max-tokens", type=int, default=500)
+    parser.add_argument("--overlap", type=int, default=100)
+    args = parser.parse_args()
+
+    cleaner = import_cleaner_module()
+    print(f"{'MB':>6} {'chunks':>8} {'legacy s':>9} {'prefix s':>9} {'speedup':>8} {'same':>5}")
+    for mb in args.mb:
+        text = synthetic_text(int(mb * 1024 * 1024))
+        old, t_old = timed(legacy_chunk_text_by_sentences, text, args.max_tokens, args.overlap)
+        new, t_new = timed(cleaner.chunk_text_by_sentences, text, args.max_tokens, args.overlap)
+        same = "yes" if old == new else "no"
+        print(f"{mb:>6g} {len(new):>8} {t_old:>9.3f} {t_new:>9.3f} {t_old / t_new:>7.1f}x {same:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+End-to-end chunks/s of the graph ingest pipeline (src/graph_engine/pipeline.py)
+against the local fake LLM server and the in-process Neo4j stand-in, compared
+with the one-chunk-at-a-time path (extract, then write, per chunk) that
+GraphBuilder.process_text takes.
+
+A second pipeline run is stopped part-way through to check the graceful drain:
+every chunk that was read must still be written.
+
+--backend sqlite writes to the embedded SQLite graph store instead (round
+trips are not counted there).
+
+Usage:
+    python benchmarks/bench_graph_pipeline.py --chunks 200 --delay 0.05 --latency 0.002
+    python benchmarks/bench_graph_pipeline.py --backend sqlite
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from groq import Groq
+
+import config
+from benchmarks.fake_llm_server import start_fake_server
+from benchmarks.fake_neo4j import FakeNeo4jDriver
+from src.graph_engine.builder import GraphBuilder
+from src.graph_engine.extractor import GraphExtractor
+from src.graph_engine.neo4j_ops import Neo4jConnector
+from src.graph_engine.pipeline import GraphIngestPipeline
+from src.graph_engine.store import Neo4jGraphStore, SQLiteGraphStore
+from src.vector_engine.store import iter_chunk_records
+
+
+def write_chunks(processed_dir: Path, chunks: int, per_file: int = 50):
+    for f in range(0, chunks, per_file):
+        with open(processed_dir / f"bench_{f // per_file:03d}.chunks.jsonl", "w", encoding="utf-8") as out:
+            for i in range(f, min(chunks, f + per_file)):
+                text = f"Professor Name{i % 37} teaches Course{i % 11} at Edu Nexus University in Unit{i}."
+                out.write(json.dumps({"id": f"bench_{i}", "source": "bench.pdf", "text": text}) + "\n")
+
+
+def make_builder(base_url: str, latency: float, backend: str = "neo4j", db_dir: Path = None):
+    """(builder, driver); driver is the Neo4j stand-in counting round trips, None for SQLite."""
+    driver = None
+    if backend == "sqlite":
+        store = SQLiteGraphStore(db_dir / f"graph_{time.monotonic_ns()}.sqlite")
+    else:
+        driver = FakeNeo4jDriver(latency=latency)
+        connector = Neo4jConnector()
+        connector.close()  # drop sessions bound to a previous run's driver
+        connector._driver = driver
+        store = Neo4jGraphStore(connector)
+    extractor = GraphExtractor(client=Groq(api_key="fake", base_url=base_url, max_retries=0), use_cache=False)
+    return GraphBuilder(extractor=extractor, store=store), driver
+
+
+def round_trips(driver) -> str:
+    return str(driver.stats["round_trips"]) if driver else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser("Graph ingest pipeline benchmark")
+    parser.add_argument("--chunks", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=config.EXTRACT_MAX_IN_FLIGHT)
+    parser.add_argument("--queue-size", type=int, default=config.GRAPH_PIPELINE_QUEUE_SIZE)
+    parser.add_argument("--write-batch", type=int, default=config.GRAPH_PIPELINE_WRITE_BATCH)
+    parser.add_argument("--delay", type=float, default=0.05, help="fake LLM seconds per request")
+    parser.add_argument("--latency", type=float, default=0.002, help="simulated Neo4j seconds per round trip")
+    parser.add_argument("--backend", choices=["neo4j", "sqlite"], default="neo4j", help="graph store written to")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    processed = Path(tempfile.mkdtemp(prefix="bench_graph_pipeline_"))
+    write_chunks(processed, args.chunks)
+    server = start_fake_server(delay=args.delay, jitter=args.delay / 4, seed=0)
+    try:
+        builder, driver = make_builder(server.base_url, args.latency, args.backend, processed)
+        start = time.perf_counter()
+        for record in iter_chunk_records(processed):
+            data = builder.extractor.extract(record["text"])
+            builder.write_graph(data.get("nodes", []), data.get("relationships", []))
+        sequential = time.perf_counter() - start
+        sequential_trips = round_trips(driver)
+
+        builder, driver = make_builder(server.base_url, args.latency, args.backend, processed)
+        pipeline = GraphIngestPipeline(builder, extract_workers=args.workers,
+                                       queue_size=args.queue_size, write_batch=args.write_batch)
+        report = pipeline.run(iter_chunk_records(processed))
+        assert report["written"] == args.chunks, report
+
+        builder, _ = make_builder(server.base_url, args.latency, args.backend, processed)
+        pipeline = GraphIngestPipeline(builder, extract_workers=args.workers,
+                                       queue_size=args.queue_size, write_batch=args.write_batch)
+        threading.Timer(report["elapsed_seconds"] / 3, pipeline.stop).start()
+        drained = pipeline.run(iter_chunk_records(processed))
+        assert drained["interrupted"] and drained["written"] == drained["read"] - drained.get("extract_failed", 0), drained
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    store = f"{args.latency * 1000:.1f} ms Neo4j RTT" if args.backend == "neo4j" else "SQLite graph store"
+    print(f"{args.chunks} chunks, {args.delay * 1000:.0f} ms per LLM request, "
+          f"{store}, {args.workers} extract workers\n")
+    print(f"{'mode':<12} {'seconds':>8} {'chunks/s':>9} {'round trips':>12}")
+    print(f"{'sequential':<12} {sequential:>8.2f} {args.chunks / sequential:>9.1f} {sequential_trips:>12}")
+    print(f"{'pipeline':<12} {report['elapsed_seconds']:>8.2f} {report['chunks_per_second']:>9.1f} "
+          f"{round_trips(driver):>12}")
+    print(f"\nstage time: extract {report['extract_seconds']:.1f}s (summed over workers), "
+          f"write {report['write_seconds']:.2f}s in {report['write_batches']} batches; "
+          f"backpressure waits {report.get('backpressure_waits', 0)}")
+    print(f"stopped after {drained['read']} of {args.chunks} chunks: all {drained['written']} read chunks written")
+
+
+if __name__ == "__main__":
+    main()
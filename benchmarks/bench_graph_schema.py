@@ -0,0 +1,134 @@
+"""
+Shows how relationship write time scales with graph size, comparing the old
+label-less endpoint MATCH with the indexed lookup the builder uses now.
+
+Needs a live (scratch) Neo4j configured through NEO4J_URI / NEO4J_USERNAME /
+NEO4J_PASSWORD. All data is written under Bench* labels and removed afterwards.
+With --backend sqlite the same scaling runs against the embedded SQLite graph
+store in a temporary file (no legacy query there).
+
+Usage:
+    python benchmarks/bench_graph_schema.py --sizes 1000 10000 50000 --edges 500
+    python benchmarks/bench_graph_schema.py --backend sqlite --sizes 1000 10000 100000
+"""
+import argparse
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.graph_engine.builder import GraphBuilder
+from src.graph_engine.neo4j_ops import Neo4jConnector
+from src.graph_engine.schema import GraphSchema
+from src.graph_engine.store import Neo4jGraphStore, SQLiteGraphStore
+
+LABELS = ["BenchPerson", "BenchCourse", "BenchTopic"]
+
+LEGACY_REL_QUERY = (
+    "UNWIND $rows AS row "
+    "MATCH (a {name: row.source}), (b {name: row.target}) "
+    "MERGE (a)-[r:BENCH_LINK]->(b)"
+)
+
+
+class NoExtractor:
+    def extract(self, text_chunk: str) -> dict:
+        return {"nodes": [], "relationships": []}
+
+
+def populate(builder: GraphBuilder, total: int, already: int, rng: random.Random):
+    nodes = [
+        {"id": f"bench-{i}", "label": rng.choice(LABELS), "properties": {}}
+        for i in range(already, total)
+    ]
+    for start in range(0, len(nodes), 5000):
+        builder.write_graph(nodes[start:start + 5000], [])
+
+
+def sample_edges(total: int, count: int, rng: random.Random):
+    return [
+        {"source": f"bench-{rng.randrange(total)}", "target": f"bench-{rng.randrange(total)}",
+         "type": "BENCH_LINK", "properties": {}}
+        for _ in range(count)
+    ]
+
+
+def run_sqlite(args):
+    tmp = Path(tempfile.mkdtemp(prefix="bench_graph_schema_"))
+    store = SQLiteGraphStore(tmp / "graph.sqlite")
+    builder = GraphBuilder(extractor=NoExtractor(), store=store)
+    rng = random.Random(0)
+    print(f"{'nodes':>8} {'indexed ms/edge':>16}  (sqlite)")
+    populated = 0
+    try:
+        for size in sorted(args.sizes):
+            populate(builder, size, populated, rng)
+            populated = size
+            edges = sample_edges(size, args.edges, rng)
+            start = time.perf_counter()
+            builder.write_graph([], edges)
+            print(f"{size:>8} {(time.perf_counter() - start) * 1000 / len(edges):>16.3f}")
+    finally:
+        store.close()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser("Relationship write scaling benchmark (live Neo4j)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--edges", type=int, default=500, help="relationships written per measurement")
+    parser.add_argument("--skip-legacy-above", type=int, default=50000,
+                        help="skip the label-less MATCH beyond this many nodes (it scans every node per row)")
+    parser.add_argument("--backend", choices=["neo4j", "sqlite"], default="neo4j")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    if args.backend == "sqlite":
+        run_sqlite(args)
+        return
+    connector = Neo4jConnector()
+    if not connector.verify_connectivity():
+        print("Neo4j not reachable; set NEO4J_URI / NEO4J_USERNAME / NEO4J_PASSWORD to a scratch database.")
+        return
+
+    builder = GraphBuilder(extractor=NoExtractor(), store=Neo4jGraphStore(connector, GraphSchema(connector)))
+    rng = random.Random(0)
+
+    print(f"{'nodes':>8} {'legacy ms/edge':>15} {'indexed ms/edge':>16}")
+    populated = 0
+    try:
+        for size in sorted(args.sizes):
+            populate(builder, size, populated, rng)
+            populated = size
+            edges = sample_edges(size, args.edges, rng)
+
+            legacy = "skipped"
+            if size <= args.skip_legacy_above:
+                rows = [{"source": e["source"], "target": e["target"]} for e in edges]
+                start = time.perf_counter()
+                connector.write_batch([(LEGACY_REL_QUERY, {"rows": rows})])
+                legacy = f"{(time.perf_counter() - start) * 1000 / len(edges):.3f}"
+
+            start = time.perf_counter()
+            builder.write_graph([], edges)
+            indexed = (time.perf_counter() - start) * 1000 / len(edges)
+
+            print(f"{size:>8} {legacy:>15} {indexed:>16.3f}")
+    finally:
+        for label in LABELS:
+            connector.run_cypher(
+                f"MATCH (n:{label}) CALL {{ WITH n DETACH DELETE n }} IN TRANSACTIONS OF 10000 ROWS"
+            )
+            connector.run_cypher(f"DROP CONSTRAINT {label}_name_unique IF EXISTS")
+            connector.run_cypher(f"DROP INDEX {label}_name_index IF EXISTS")
+        connector.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+k-hop graph expansion from the memory-mapped CSR snapshot
+(src/graph_engine/snapshot.py) against the same expansion done in the graph
+store one hop per query (GraphStore.neighbors), on a synthetic power-law
+entity graph. With --backend neo4j no database runs: a fixture connector
+keeps the graph in memory behind Neo4jGraphStore, sleeps --latency-ms per
+round trip, and also serves the streamed export the snapshot is built from.
+With --backend sqlite the graph is loaded into the embedded SQLite store.
+
+Also checks that a snapshot refreshed from the change log (overlay) and one
+compacted from it match a snapshot exported from scratch, and that the
+expansion reaches exactly the breadth-first neighbourhood.
+
+Usage:
+    python benchmarks/bench_graph_snapshot.py --nodes 50000 --edges 200000 --queries 200
+    python benchmarks/bench_graph_snapshot.py --latency-ms 5 --hops 3
+    python benchmarks/bench_graph_snapshot.py --backend sqlite
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.bench_orchestrator import percentile
+from src.graph_engine.snapshot import GraphChangeLog, GraphSnapshot, export_snapshot
+from src.graph_engine.store import Neo4jGraphStore, SQLiteGraphStore
+
+REL_TYPES = ["RELATED_TO", "PART_OF", "USES", "PREREQUISITE_OF", "IMPLEMENTS"]
+
+
+def make_graph(n_nodes: int, n_edges: int, seed: int = 0):
+    """Names and (source, TYPE, target) edges; endpoints drawn Zipf-like so a few hubs dominate."""
+    rng = np.random.default_rng(seed)
+    names = [f"Entity {i}" for i in range(n_nodes)]
+    weights = 1.0 / np.arange(1, n_nodes + 1) ** 0.8
+    weights /= weights.sum()
+    src = rng.choice(n_nodes, n_edges, p=weights)
+    dst = rng.integers(0, n_nodes, n_edges)
+    types = rng.integers(0, len(REL_TYPES), n_edges)
+    edges = {(names[a], REL_TYPES[t], names[b]) for a, b, t in zip(src, dst, types) if a != b}
+    return names, sorted(edges)
+
+
+class FixtureConnector:
+    """Neo4jConnector stand-in over an in-memory graph: read() answers the neighbors query, stream() the export."""
+
+    def __init__(self, names, edges, latency_ms: float = 0.0):
+        self.names, self.edges = names, edges
+        self.latency = latency_ms / 1000
+        self.adjacency = defaultdict(list)
+        for source, rel_type, target in edges:
+            self.adjacency[source].append((source, rel_type, target))
+            self.adjacency[target].append((source, rel_type, target))
+        self.round_trips = 0
+
+    def read(self, query, params=None):
+        self.round_trips += 1
+        time.sleep(self.latency)
+        return [{"source": s, "type": t, "target": d, "matched": name}
+                for name in params["names"] for s, t, d in self.adjacency.get(name, ())]
+
+    def stream(self, query, params=None, fetch_size=None):
+        if "RETURN n.name" in query:
+            return ({"name": name} for name in self.names)
+        return ({"source": s, "type": t, "target": d} for s, t, d in self.edges)
+
+
+def make_store(backend, names, edges, latency_ms, path):
+    if backend == "neo4j":
+        return Neo4jGraphStore(FixtureConnector(names, edges, latency_ms))
+    store = SQLiteGraphStore(path)
+    rels = defaultdict(list)
+    for source, rel_type, target in edges:
+        rels[rel_type].append({"source": source, "target": target, "source_label": None, "target_label": None})
+    store.upsert({"Entity": [{"name": name, "props": {"name": name}} for name in names]}, rels)
+    return store
+
+
+def store_k_hop(store, seeds, hops):
+    """Baseline: one neighbors query per hop, frontier names sent as a parameter."""
+    seen, frontier, facts = set(seeds), list(seeds), set()
+    for _ in range(hops):
+        if not frontier:
+            break
+        rows = store.neighbors(frontier)
+        frontier = []
+        for row in rows:
+            facts.add((row["source"], row["type"], row["target"]))
+            neighbor = row["target"] if row["source"] == row["matched"] else row["source"]
+            if neighbor not in seen:
+                seen.add(neighbor)
+                frontier.append(neighbor)
+    return seen, facts
+
+
+def khop_names(snapshot, seeds, hops):
+    result = snapshot.k_hop([snapshot.lookup(s) for s in seeds], hops=hops, max_nodes=len(snapshot) + 1)
+    nodes = {snapshot.names[i] for i in result["nodes"].tolist()}
+    facts = {(snapshot.names[a], snapshot.rel_types[t], snapshot.names[b])
+             for a, t, b in zip(result["source"].tolist(), result["type"].tolist(), result["target"].tolist())}
+    scores = dict(zip((snapshot.names[i] for i in result["nodes"].tolist()), result["scores"].round(9).tolist()))
+    return nodes, facts, scores
+
+
+def main():
+    parser = argparse.ArgumentParser("Graph snapshot benchmark")
+    parser.add_argument("--nodes", type=int, default=50000)
+    parser.add_argument("--edges", type=int, default=200000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--hops", type=int, default=2)
+    parser.add_argument("--seeds", type=int, default=2, help="matched entities per query")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="simulated Neo4j round trip")
+    parser.add_argument("--backend", choices=["neo4j", "sqlite"], default="neo4j", help="graph store exported from")
+    parser.add_argument("--update-edges", type=int, default=5000, help="edges written after the export")
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="bench_graph_snapshot_"))
+    try:
+        names, edges = make_graph(args.nodes, args.edges)
+        random.Random(1).shuffle(edges)
+        base, updates = edges[:-args.update_edges], edges[-args.update_edges:]
+        # updates also introduce entities the export never saw
+        updates += [(f"New {i}", "RELATED_TO", names[i]) for i in range(0, args.nodes, max(1, args.nodes // 200))]
+        log = GraphChangeLog(tmp / "changes.jsonl")
+
+        start = time.perf_counter()
+        store = make_store(args.backend, names, base, args.latency_ms, tmp / "graph.sqlite")
+        load_s = time.perf_counter() - start
+        start = time.perf_counter()
+        export_snapshot(store, tmp / "snapshot", log)
+        export_s = time.perf_counter() - start
+        start = time.perf_counter()
+        snapshot = GraphSnapshot(tmp / "snapshot", log)
+        load_ms = (time.perf_counter() - start) * 1000
+        print(f"{len(names)} nodes, {len(edges)} edges in {args.backend} (filled in {load_s:.2f}s); "
+              f"export {export_s:.2f}s, load {load_ms:.1f}ms (mmap)\n")
+
+        # -------------------- latency --------------------
+        rng = random.Random(2)
+        queries = [rng.sample(names[:args.nodes // 10], args.seeds) for _ in range(args.queries)]
+        store_lat, snap_lat, facts_k = [], [], []
+        for seeds in queries:
+            t0 = time.perf_counter()
+            store_nodes, store_facts = store_k_hop(store, seeds, args.hops)
+            t1 = time.perf_counter()
+            hits = snapshot.facts(seeds, k=20, hops=args.hops, max_nodes=len(snapshot) + 1)
+            t2 = time.perf_counter()
+            store_lat.append((t1 - t0) * 1000)
+            snap_lat.append((t2 - t1) * 1000)
+            facts_k.append(len(hits))
+            nodes, facts, _ = khop_names(snapshot, seeds, args.hops)
+            assert nodes == store_nodes and facts == store_facts, f"k-hop differs from {args.backend} for {seeds}"
+
+        print(f"{args.hops}-hop expansion, {args.seeds} seeds, {args.queries} queries "
+              f"(neighbourhood identical to the per-hop {args.backend} queries)")
+        trips = store.connector.round_trips / len(queries) if args.backend == "neo4j" else 0
+        print(f"{'':<22} {'p50 ms':>8} {'p95 ms':>8} {'round trips':>12}")
+        print(f"{args.backend + ' per hop':<22} {percentile(store_lat, 0.5):>8.2f} {percentile(store_lat, 0.95):>8.2f} "
+              f"{trips:>12.1f}")
+        print(f"{'snapshot (in-process)':<22} {percentile(snap_lat, 0.5):>8.2f} {percentile(snap_lat, 0.95):>8.2f} "
+              f"{0:>12.1f}")
+        print(f"speedup p50 {percentile(store_lat, 0.5) / percentile(snap_lat, 0.5):.1f}x\n")
+
+        # -------------------- incremental update --------------------
+        for i in range(0, len(updates), 50):
+            batch = updates[i:i + 50]
+            log.append({s for s, _, _ in batch} | {d for _, _, d in batch}, batch)
+        start = time.perf_counter()
+        snapshot.refresh()
+        refresh_ms = (time.perf_counter() - start) * 1000
+
+        full_store = make_store(args.backend, names + [s for s, _, _ in updates if s.startswith("New")],
+                                base + updates, 0, tmp / "full.sqlite")
+        start = time.perf_counter()
+        export_snapshot(full_store, tmp / "full", GraphChangeLog(tmp / "none.jsonl"))
+        full_s = time.perf_counter() - start
+        full = GraphSnapshot(tmp / "full", GraphChangeLog(tmp / "none.jsonl"))
+
+        check = [rng.sample(names[:args.nodes // 10], args.seeds) for _ in range(50)]
+        check += [[f"New {i}"] for i in range(0, args.nodes, max(1, args.nodes // 20))]
+        overlay = [khop_names(snapshot, seeds, args.hops) for seeds in check]
+        expected = [khop_names(full, seeds, args.hops) for seeds in check]
+        assert overlay == expected, "overlay snapshot differs from a full rebuild"
+        start = time.perf_counter()
+        snapshot.compact()
+        compact_s = time.perf_counter() - start
+        assert [khop_names(snapshot, seeds, args.hops) for seeds in check] == expected, \
+            "compacted snapshot differs from a full rebuild"
+        assert snapshot.overlay_size == 0 and not snapshot.refresh()
+
+        print(f"{len(updates)} edges through the change log: refresh {refresh_ms:.1f}ms, "
+              f"compact {compact_s:.2f}s vs full re-export {full_s:.2f}s")
+        print("overlay and compacted snapshots match the full rebuild (nodes, facts, scores)")
+        if args.backend == "sqlite":
+            store.close()
+            full_store.close()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
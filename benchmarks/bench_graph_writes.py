@@ -0,0 +1,133 @@
+"""
+Compares GraphBuilder's per-item and batched write paths on each graph store
+backend: Neo4j through an in-process stand-in (reports the round trips each
+mode makes) and the embedded SQLite store (a real database file).
+
+Usage:
+    python benchmarks/bench_graph_writes.py --chunks 50 --entities 30 --latency 0.001
+    python benchmarks/bench_graph_writes.py --backend sqlite --chunks 500
+"""
+import argparse
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.fake_neo4j import FakeNeo4jDriver
+from src.graph_engine.builder import GraphBuilder
+from src.graph_engine.neo4j_ops import Neo4jConnector
+from src.graph_engine.store import Neo4jGraphStore, SQLiteGraphStore
+
+LABELS = ["Person", "Course", "Topic", "University", "Department"]
+REL_TYPES = ["TEACHES", "COVERS", "PART_OF", "PREREQUISITE_OF"]
+
+
+class StaticExtractor:
+    """Returns a pre-generated extraction so the benchmark never calls Groq."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def extract(self, text_chunk: str) -> dict:
+        return self.data
+
+
+def synthetic_extraction(entities: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    nodes = [
+        {"id": f"Entity {i}", "label": rng.choice(LABELS), "properties": {"rank": i}}
+        for i in range(entities)
+    ]
+    relationships = [
+        {
+            "source": f"Entity {rng.randrange(entities)}",
+            "target": f"Entity {rng.randrange(entities)}",
+            "type": rng.choice(REL_TYPES),
+            "properties": {},
+        }
+        for _ in range(entities)
+    ]
+    return {"nodes": nodes, "relationships": relationships}
+
+
+def make_store(backend: str, latency: float, tmp: Path):
+    """(store, driver); driver is the Neo4j stand-in counting round trips, None for SQLite."""
+    if backend == "sqlite":
+        return SQLiteGraphStore(tmp / f"graph_{time.monotonic_ns()}.sqlite"), None
+    driver = FakeNeo4jDriver(latency=latency)
+    connector = Neo4jConnector()
+    connector.close()  # drop sessions bound to a previous run's driver
+    connector._driver = driver
+    return Neo4jGraphStore(connector), driver
+
+
+def run_mode(backend: str, batched: bool, chunks: int, entities: int, batch_size: int, latency: float,
+             tmp: Path) -> dict:
+    store, driver = make_store(backend, latency, tmp)
+    builder = GraphBuilder(
+        batched=batched,
+        batch_size=batch_size,
+        extractor=StaticExtractor(synthetic_extraction(entities)),
+        store=store,
+    )
+
+    start = time.perf_counter()
+    for i in range(chunks):
+        builder.process_text(f"chunk {i}")
+    elapsed = time.perf_counter() - start
+    if backend == "sqlite":
+        store.close()
+
+    return {
+        "backend": backend,
+        "mode": "batched" if batched else "per-item",
+        "sessions": driver.stats["sessions"] if driver else "-",
+        "statements": driver.stats["statements"] if driver else "-",
+        "round_trips": driver.stats["round_trips"] if driver else None,
+        "seconds": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser("GraphBuilder write-path benchmark")
+    parser.add_argument("--chunks", type=int, default=50)
+    parser.add_argument("--entities", type=int, default=30, help="nodes (and edges) per chunk")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.001, help="simulated seconds per Neo4j round trip")
+    parser.add_argument("--backend", nargs="+", choices=["neo4j", "sqlite"], default=["neo4j", "sqlite"])
+    args = parser.parse_args()
+
+    # The builder logs and prints a summary per chunk; keep the table readable.
+    logging.disable(logging.CRITICAL)
+    sys.stdout, real_stdout = open(os.devnull, "w"), sys.stdout
+    tmp = Path(tempfile.mkdtemp(prefix="bench_graph_writes_"))
+    try:
+        rows = [
+            run_mode(backend, batched, args.chunks, args.entities, args.batch_size, args.latency, tmp)
+            for backend in args.backend
+            for batched in (False, True)
+        ]
+    finally:
+        sys.stdout.close()
+        sys.stdout = real_stdout
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print(f"{args.chunks} chunks x {args.entities} nodes + {args.entities} edges, "
+          f"{args.latency * 1000:.1f} ms simulated Neo4j RTT\n")
+    print(f"{'backend':<8} {'mode':<10} {'sessions':>9} {'statements':>11} {'round trips':>12} "
+          f"{'per chunk':>10} {'seconds':>9} {'ms/chunk':>9}")
+    for r in rows:
+        trips = "-" if r["round_trips"] is None else r["round_trips"]
+        per_chunk = "-" if r["round_trips"] is None else f"{r['round_trips'] / args.chunks:.1f}"
+        print(f"{r['backend']:<8} {r['mode']:<10} {r['sessions']:>9} {r['statements']:>11} {trips:>12} "
+              f"{per_chunk:>10} {r['seconds']:>9.3f} {r['seconds'] * 1000 / args.chunks:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
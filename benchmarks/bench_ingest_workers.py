@@ -0,0 +1,70 @@
+"""
+Ingestion throughput for 1, 4 and N worker processes on a synthetic PDF corpus
+(see synthetic_corpus.py), including one large PDF that gets split into page
+ranges. Every parallel run is checked against the serial output.
+
+Usage:
+    python benchmarks/bench_ingest_workers.py --files 40 --pages 20 --large-pages 600
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.synthetic_corpus import build_corpus, page_lines, write_pdf
+from src.ingest import processor
+
+
+def read_outputs(out_dir: Path) -> dict:
+    return {p.name: p.read_bytes() for p in sorted(out_dir.glob("*.*"))
+            if p.name.endswith((".cleaned.txt", ".chunks.jsonl"))}
+
+
+def main():
+    parser = argparse.ArgumentParser("Multi-process ingestion benchmark")
+    parser.add_argument("--files", type=int, default=40)
+    parser.add_argument("--pages", type=int, default=20, help="pages per regular PDF")
+    parser.add_argument("--large-pages", type=int, default=600, help="pages of the single large PDF (0 = none)")
+    parser.add_argument("--split-pages", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    tmp = Path(tempfile.mkdtemp(prefix="bench_ingest_"))
+    raw = tmp / "raw"
+    build_corpus(raw, args.files, args.pages)
+    total_pages = args.files * args.pages
+    if args.large_pages:
+        rng = random.Random(1)
+        write_pdf(raw / "cse_handbook_notes_2024.pdf",
+                  [page_lines(rng, p + 1, 45, "CSE Handbook") for p in range(args.large_pages)])
+        total_pages += args.large_pages
+    n_files = args.files + (1 if args.large_pages else 0)
+    print(f"corpus: {n_files} PDFs, {total_pages} pages in {raw}")
+
+    baseline = None
+    print(f"{'workers':>8} {'seconds':>9} {'files/s':>9} {'pages/s':>9} {'same output':>12}")
+    for workers in sorted(set(args.workers)):
+        out = tmp / f"out_{workers}"
+        start = time.perf_counter()
+        results = processor.main(str(raw), str(out), False, 500, 100,
+                                 workers=workers, split_pages=args.split_pages)
+        elapsed = time.perf_counter() - start
+        failed = [r for r in results if r["status"] != "ok"]
+        outputs = read_outputs(out)
+        if baseline is None:
+            baseline = outputs
+        same = "yes" if outputs == baseline and not failed else "NO"
+        for r in failed:
+            print("  failed:", r["file"], r.get("error"))
+        print(f"{workers:>8} {elapsed:>9.2f} {n_files / elapsed:>9.2f} {total_pages / elapsed:>9.1f} {same:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Latency of the tri-hybrid query fan-out (src/orchestrator/manager.py) with
+in-process fake retrievers, compared with calling the same backends one after
+another. Each fake sleeps for a random, long-tailed time drawn around
+its --*-ms median; a share of graph calls can hang past every timeout, so
+the benchmark shows partial answers coming back within the budget.
+
+Usage:
+    python benchmarks/bench_orchestrator.py --queries 200 --budget-ms 300
+    python benchmarks/bench_orchestrator.py --graph-ms 150 --graph-hang 0.1
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import zlib
+from collections import Counter
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.orchestrator.manager import QueryOrchestrator
+
+
+class FakeRetriever:
+    def __init__(self, name: str, median_ms: float, hang: float = 0.0, hang_ms: float = 2000, seed: int = 0):
+        self.name = name
+        self.median_ms = median_ms
+        self.hang = hang
+        self.hang_ms = hang_ms
+        self.rng = random.Random(seed)
+
+    def delay_ms(self) -> float:
+        if self.rng.random() < self.hang:
+            return self.hang_ms
+        return self.median_ms * self.rng.lognormvariate(0, 0.5)
+
+    def search(self, query: str, k: int):
+        time.sleep(self.delay_ms() / 1000)
+        # overlapping id spaces so fusion has something to merge
+        base = zlib.crc32(f"{self.name}|{query}".encode()) % 50
+        return [{"id": f"chunk_{(base + i * 3) % 100}", "score": 1.0 / (i + 1)} for i in range(k)]
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser("Query fan-out benchmark")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--budget-ms", type=float, default=300)
+    parser.add_argument("--vector-ms", type=float, default=40)
+    parser.add_argument("--keyword-ms", type=float, default=10)
+    parser.add_argument("--graph-ms", type=float, default=80)
+    parser.add_argument("--graph-hang", type=float, default=0.05, help="share of graph calls that hang")
+    args = parser.parse_args()
+
+    def retrievers(seed):
+        return [
+            FakeRetriever("vector", args.vector_ms, seed=seed),
+            FakeRetriever("keyword", args.keyword_ms, seed=seed + 1),
+            FakeRetriever("graph", args.graph_ms, hang=args.graph_hang, seed=seed + 2),
+        ]
+
+    sequential = []
+    for i in range(args.queries):
+        start = time.perf_counter()
+        for r in retrievers(i):
+            r.search(f"query {i}", 20)
+        sequential.append((time.perf_counter() - start) * 1000)
+
+    orchestrator = QueryOrchestrator(retrievers(0), budget_ms=args.budget_ms,
+                                     timeouts_ms={"vector": 250, "keyword": 100, "graph": 250})
+    fanned, statuses = [], Counter()
+    for i in range(args.queries):
+        response = orchestrator.query(f"query {i}", k=10)
+        fanned.append(response["ms"])
+        for name, b in response["backends"].items():
+            statuses[(name, b["status"])] += 1
+        assert response["ms"] <= args.budget_ms + 50, f"budget overrun: {response['ms']} ms"
+    orchestrator.close()
+
+    print(f"{'mode':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for mode, values in (("sequential", sequential), ("fan-out", fanned)):
+        print(f"{mode:>10} {percentile(values, 0.5):>8.1f} {percentile(values, 0.95):>8.1f} "
+              f"{percentile(values, 0.99):>8.1f} {max(values):>8.1f}")
+    print("\nbackend statuses: " + ", ".join(f"{n}/{s}={c}" for (n, s), c in sorted(statuses.items())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Query cache benchmark: replays a Zipf-distributed stream of repeated queries
+(the exam-week pattern) through the orchestrator with and without the
+QueryCache, using in-process fake retrievers with fixed latencies. It prints
+latency and the hit ratio of each cache layer.
+
+Halfway through, the keyword index is rebuilt for real (a BM25Index in a temp
+dir, written by a second instance as an ingest run would). The benchmark
+checks that the reader picks up the new generation and that answers after
+that point reflect the new data, not cached results.
+
+Usage:
+    python benchmarks/bench_query_cache.py --queries 2000 --distinct 300
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.bench_orchestrator import FakeRetriever, percentile
+from benchmarks.synthetic_corpus import WORDS
+from src.keyword_engine.bm25 import BM25Index
+from src.orchestrator.cache import QueryCache
+from src.orchestrator.manager import KeywordRetriever, QueryOrchestrator
+
+
+class FakeGenerationRetriever(FakeRetriever):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = 0
+
+    def generation(self) -> int:
+        return 0
+
+    def search(self, query: str, k: int):
+        self.calls += 1
+        return super().search(query, k)
+
+
+def run(queries, keyword_index, cache, refresh_s, vector_ms, graph_ms, rebuild):
+    retrievers = [
+        FakeGenerationRetriever("vector", vector_ms, seed=1),
+        KeywordRetriever(keyword_index, refresh_s=refresh_s),
+        FakeGenerationRetriever("graph", graph_ms, seed=2),
+    ]
+    orchestrator = QueryOrchestrator(retrievers, budget_ms=5000, cache=cache,
+                                     timeouts_ms={"vector": 5000, "keyword": 5000, "graph": 5000})
+    latencies = []
+    for i, query in enumerate(queries):
+        if i == len(queries) // 2:
+            rebuild()
+            time.sleep(refresh_s)
+        start = time.perf_counter()
+        orchestrator.query(query, k=10)
+        latencies.append((time.perf_counter() - start) * 1000)
+    # every backend hit is in a fused list this long, so the keyword hits can be checked
+    after = orchestrator.query("newtopic", k=orchestrator.backend_k * len(retrievers))
+    orchestrator.close()
+    return latencies, after, sum(r.calls for r in retrievers if hasattr(r, "calls"))
+
+
+def main():
+    parser = argparse.ArgumentParser("Query cache benchmark")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--distinct", type=int, default=300)
+    parser.add_argument("--zipf", type=float, default=1.1)
+    parser.add_argument("--vector-ms", type=float, default=15)
+    parser.add_argument("--graph-ms", type=float, default=25)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    distinct = [" ".join(rng.choices(WORDS, k=rng.randint(2, 5))) for _ in range(args.distinct)]
+    weights = [1 / (r + 1) ** args.zipf for r in range(args.distinct)]
+    # the same question in different spellings normalizes to one key
+    stream = [rng.choice([q, q.upper(), f"  {q}  "]) for q in rng.choices(distinct, weights, k=args.queries)]
+    docs = [" ".join(rng.choices(WORDS, k=40)) for _ in range(2000)]
+
+    for label, cache in (("no cache", None), ("cache", QueryCache())):
+        tmp = Path(tempfile.mkdtemp(prefix="bench_query_cache_"))
+        try:
+            seed = BM25Index(tmp)
+            seed.add_documents([f"c{i}" for i in range(len(docs))], docs)
+            seed.flush()
+            reader = BM25Index(tmp)
+            writer = BM25Index(tmp, background_merge=False)
+
+            def rebuild():
+                writer.add_documents(["new_chunk"], ["newtopic " * 5])
+                writer.flush()
+
+            latencies, after, calls = run(stream, reader, cache, 0.05, args.vector_ms, args.graph_ms, rebuild)
+            keyword_ids = [hit["id"] for hit in after["results"] if "keyword" in hit["ranks"]]
+            assert "new_chunk" in keyword_ids, "stale keyword result after new generation"
+            print(f"\n{label}: p50 {percentile(latencies, 0.5):.2f} ms, p95 {percentile(latencies, 0.95):.2f} ms, "
+                  f"mean {sum(latencies) / len(latencies):.2f} ms, fake backend calls {calls}")
+            if cache is not None:
+                for layer, stats in cache.stats().items():
+                    print(f"  {layer:>10}: hit ratio {stats['hit_ratio']:.2%} "
+                          f"({stats['hits']}/{stats['hits'] + stats['misses']}), "
+                          f"{stats['entries']} entries, {stats['bytes'] / 1024:.0f} KiB")
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
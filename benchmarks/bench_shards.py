@@ -0,0 +1,150 @@
+"""
+Filtered-query latency of the metadata-sharded indexes (src/orchestrator/shards.py)
+against one index searched and then filtered (scan-then-filter), on a synthetic
+corpus named by the <dept>_<subject>_<type>_<year> convention.
+
+Vector side: random clustered vectors added directly (no embedding model),
+flat indexes, so both layouts must return exactly the same hits. Keyword side:
+real BM25 indexes, sharded build in worker processes vs one index; each shard
+scores with its own idf, so overlap with the single index is reported.
+
+Usage:
+    python benchmarks/bench_shards.py --chunks-per-file 400 --queries 200 --workers 4
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.bench_orchestrator import percentile
+from benchmarks.synthetic_corpus import WORDS
+from src.ingest.metadata import parse_source_name
+from src.keyword_engine.bm25 import BM25Index
+from src.orchestrator.filters import MetadataFilter, filtered_search
+from src.orchestrator.shards import ShardedKeywordIndex, ShardedVectorStore
+from src.vector_engine.store import VectorStore, iter_chunk_records
+
+DEPTS = ["cse", "it", "aiml", "ece"]
+SUBJECTS = ["dsa", "os", "dbms", "cn", "ml"]
+TYPES = {"syllabus": [2024, 2025], "labmanual": [2024, 2025], "pyq": [2019, 2020, 2021, 2022, 2023, 2024]}
+FILTERS = ["cse pyq 2023+", "it syllabus", "aiml dbms pyq 2021-2022", "ece labmanual 2025"]
+
+
+def write_corpus(out: Path, chunks_per_file: int, seed: int = 0) -> int:
+    rng = random.Random(seed)
+    n = 0
+    for dept in DEPTS:
+        for subject in SUBJECTS:
+            for doc_type, years in TYPES.items():
+                for year in years:
+                    name = f"{dept}_{subject}_{doc_type}_{year}"
+                    with open(out / f"{name}.chunks.jsonl", "w", encoding="utf-8") as f:
+                        for i in range(chunks_per_file):
+                            text = " ".join([subject, doc_type] + rng.choices(WORDS, k=60))
+                            f.write(json.dumps({"id": f"{name}_chunk_{i}", "source": f"{name}.pdf",
+                                                "text": text}) + "\n")
+                            n += 1
+    return n
+
+
+def timed(fn, queries):
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(fn(query))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies, results
+
+
+def ids(results):
+    return [[hit["chunk_id"] for hit in hits] for hits in results]
+
+
+def main():
+    parser = argparse.ArgumentParser("Metadata shard benchmark")
+    parser.add_argument("--chunks-per-file", type=int, default=400)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    tmp = Path(tempfile.mkdtemp(prefix="bench_shards_"))
+    processed = tmp / "processed"
+    processed.mkdir()
+    try:
+        n = write_corpus(processed, args.chunks_per_file)
+        records = list(iter_chunk_records(processed))
+        centers = rng.standard_normal((32, args.dim)).astype(np.float32)
+        vectors = centers[rng.integers(0, 32, len(records))] + 0.5 * rng.standard_normal(
+            (len(records), args.dim)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        chunk_ids = [r["id"] for r in records]
+        files = [r["_file"] for r in records]
+        offsets = [r["_offset"] for r in records]
+        print(f"{n} chunks in {len(set(files))} files, k={args.k}, {args.queries} queries per filter\n")
+
+        single = VectorStore("flat", tmp / "vector", processed, use_embedding_cache=False)
+        single.add_vectors(chunk_ids, vectors, files, offsets)
+        sharded = ShardedVectorStore("flat", tmp / "vector_shards", processed, use_embedding_cache=False,
+                                     workers=args.workers)
+        start = time.perf_counter()
+        sharded.add_vectors(chunk_ids, vectors, files, offsets)
+        print(f"vector: {len(sharded.shards)} shards built in {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        single_bm25 = BM25Index(tmp / "bm25", processed_dir=processed, background_merge=False)
+        single_bm25.build()
+        single_s = time.perf_counter() - start
+        start = time.perf_counter()
+        sharded_bm25 = ShardedKeywordIndex(tmp / "bm25_shards", processed, workers=args.workers,
+                                           background_merge=False)
+        sharded_bm25.build()
+        print(f"keyword: one index {single_s:.2f}s, {len(sharded_bm25.shards)} shards on "
+              f"{args.workers} processes {time.perf_counter() - start:.2f}s\n")
+
+        qvecs = rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+        qvecs /= np.linalg.norm(qvecs, axis=1, keepdims=True)
+        qtexts = [" ".join(random.Random(i).choices(WORDS + SUBJECTS, k=4)) for i in range(args.queries)]
+
+        print(f"{'filter':<26} {'backend':<8} {'shards':>6} {'scan p50':>9} {'p95':>7} "
+              f"{'shard p50':>10} {'p95':>7} {'speedup':>8}  agreement")
+        for text in FILTERS:
+            flt = MetadataFilter.parse(text)
+            touched = len(sharded.select(flt))
+
+            scan_lat, scan_res = timed(
+                lambda v: filtered_search(lambda m: single.search_vectors(v[None, :], m)[0], args.k, flt), qvecs)
+            shard_lat, shard_res = timed(lambda v: sharded.search_vectors(v[None, :], args.k, flt)[0], qvecs)
+            assert ids(scan_res) == ids(shard_res), f"vector results differ for {text!r}"
+            assert all(flt.matches(parse_source_name(hit["file"])) for hits in shard_res for hit in hits)
+            print(f"{text:<26} {'vector':<8} {touched:>6} {percentile(scan_lat, 0.5):>9.2f} "
+                  f"{percentile(scan_lat, 0.95):>7.2f} {percentile(shard_lat, 0.5):>10.2f} "
+                  f"{percentile(shard_lat, 0.95):>7.2f} {percentile(scan_lat, 0.5) / percentile(shard_lat, 0.5):>7.1f}x"
+                  f"  identical")
+
+            scan_lat, scan_res = timed(
+                lambda q: filtered_search(lambda m: single_bm25.search([q], m)[0], args.k, flt), qtexts)
+            shard_lat, shard_res = timed(lambda q: sharded_bm25.search([q], args.k, flt)[0], qtexts)
+            overlap = np.mean([len(set(a) & set(b)) / max(1, len(a))
+                               for a, b in zip(ids(scan_res), ids(shard_res))])
+            print(f"{'':<26} {'keyword':<8} {touched:>6} {percentile(scan_lat, 0.5):>9.2f} "
+                  f"{percentile(scan_lat, 0.95):>7.2f} {percentile(shard_lat, 0.5):>10.2f} "
+                  f"{percentile(shard_lat, 0.95):>7.2f} {percentile(scan_lat, 0.5) / percentile(shard_lat, 0.5):>7.1f}x"
+                  f"  {overlap:.0%} overlap")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
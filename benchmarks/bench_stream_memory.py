@@ -0,0 +1,85 @@
+"""
+Peak memory and time of the in-memory cleaner path versus the streaming one
+(cleaner.stream_pdf_to_outputs) as PDF page count grows. Each measurement runs
+in a fresh interpreter so ru_maxrss is per run. Outputs are compared byte for
+byte; beyond --sample-pages the streaming path samples pages for header
+detection, so small differences there are expected.
+
+Usage:
+    python benchmarks/bench_stream_memory.py --pages 50 200 1000 2000
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+
+from benchmarks.synthetic_corpus import page_lines, write_pdf
+from src.ingest.processor import import_cleaner_module
+
+
+def run_once(mode: str, pdf: Path, out: Path, sample_pages: int):
+    cleaner = import_cleaner_module()
+    start = time.perf_counter()
+    if mode == "legacy":
+        pages = cleaner.extract_text_from_pdf(pdf)
+        text = cleaner.clean_pages(pages)
+        cleaner.write_cleaned_text(out, pdf.stem, text)
+        cleaner.write_chunks_jsonl(out, pdf.stem, pdf, cleaner.chunk_text_by_sentences(text))
+    else:
+        cleaner.stream_pdf_to_outputs(pdf, out, sample_pages=sample_pages)
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"seconds": elapsed, "peak_mb": peak_mb}))
+
+
+def measure(mode: str, pdf: Path, out: Path, sample_pages: int) -> dict:
+    proc = subprocess.run(
+        [sys.executable, __file__, "--run", mode, str(pdf), str(out), "--sample-pages", str(sample_pages)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def same_outputs(a: Path, b: Path) -> bool:
+    names = sorted(p.name for p in a.iterdir())
+    return names == sorted(p.name for p in b.iterdir()) and all(
+        (a / n).read_bytes() == (b / n).read_bytes() for n in names
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser("Streaming cleaner memory benchmark")
+    parser.add_argument("--pages", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--sample-pages", type=int, default=200)
+    parser.add_argument("--run", nargs=3, metavar=("MODE", "PDF", "OUT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        mode, pdf, out = args.run
+        run_once(mode, Path(pdf), Path(out), args.sample_pages)
+        return
+
+    tmp = Path(tempfile.mkdtemp(prefix="bench_stream_"))
+    rng = random.Random(0)
+    print(f"{'pages':>6} {'legacy MB':>10} {'stream MB':>10} {'legacy s':>9} {'stream s':>9} {'same output':>12}")
+    for n in args.pages:
+        pdf = tmp / f"cse_book{n}_notes_2024.pdf"
+        write_pdf(pdf, [page_lines(rng, p + 1, 45, "CSE Book") for p in range(n)])
+        legacy = measure("legacy", pdf, tmp / f"legacy_{n}", args.sample_pages)
+        stream = measure("stream", pdf, tmp / f"stream_{n}", args.sample_pages)
+        same = "yes" if same_outputs(tmp / f"legacy_{n}", tmp / f"stream_{n}") else "no"
+        print(f"{n:>6} {legacy['peak_mb']:>10.1f} {stream['peak_mb']:>10.1f} "
+              f"{legacy['seconds']:>9.2f} {stream['seconds']:>9.2f} {same:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Memory footprint, latency and recall@k of the compact vector store modes (sq8,
+pq) against the exact flat index, with and without the exact float16 re-rank
+from the embedding cache. Uses synthetic clustered embeddings, no model.
+
+"index MB" is the size of the FAISS index itself (what a serving process keeps
+in RAM); the float16 cache rows used for re-ranking stay on disk and are only
+paged in for the candidates that are re-scored.
+
+Usage:
+    python benchmarks/bench_vector_compact.py --vectors 100000 --dim 384 --queries 500 -k 10 --rerank 0 100
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.bench_vector_store import clustered_vectors, ids_of
+from src.vector_engine.cache import EmbeddingCache
+from src.vector_engine.store import VectorStore
+
+
+def main():
+    parser = argparse.ArgumentParser("Compact vector index benchmark")
+    parser.add_argument("--vectors", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--rerank", type=int, nargs="+", default=[0, 100], help="candidates re-ranked (0 = off)")
+    parser.add_argument("--pq-m", type=int, default=None, help="bytes per vector in pq mode (default: config)")
+    parser.add_argument("--nprobe", type=int, default=None)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    data = clustered_vectors(args.vectors, args.dim, args.clusters, rng)
+    queries = clustered_vectors(args.queries, args.dim, args.clusters, rng)
+    chunk_ids = [f"bench_chunk_{i}" for i in range(args.vectors)]
+    tmp = Path(tempfile.mkdtemp(prefix="bench_compact_"))
+
+    # the chunk id stands in for the chunk text as the cache key
+    cache = EmbeddingCache("bench-model", cache_dir=tmp / "cache")
+    for s in range(0, args.vectors, 10000):
+        cache.put_many(chunk_ids[s:s + 10000], data[s:s + 10000])
+    keys = [cache.key(c) for c in chunk_ids]
+    print(f"float16 cache file: {len(cache) * args.dim * 2 / 2**20:.1f} MB on disk")
+
+    truth = None
+    print(f"{'index':>6} {'rerank':>6} {'index MB':>9} {'B/vector':>9} {'recall@k':>9} {'p50 ms':>7} {'p99 ms':>7}")
+    for index_type in ("flat", "sq8", "pq"):
+        store = VectorStore(index_type, index_dir=tmp, embedding_cache=cache)
+        store.pq_m = args.pq_m or store.pq_m
+        store.nprobe = args.nprobe or store.nprobe
+        for s in range(0, args.vectors, 10000):
+            store.add_vectors(chunk_ids[s:s + 10000], data[s:s + 10000], keys=keys[s:s + 10000])
+        store.search_vectors(queries[:1], args.k)  # trains a still-buffered index
+        size = faiss.serialize_index(store.index).nbytes
+
+        for rerank in ([0] if index_type == "flat" else args.rerank):
+            store.rerank = rerank
+            single = []
+            for q in queries:
+                t = time.perf_counter()
+                store.search_vectors(q[None, :], args.k)
+                single.append((time.perf_counter() - t) * 1000)
+            results = ids_of(store.search_vectors(queries, args.k))
+            if truth is None:
+                truth = results
+            recall = statistics.mean(len(set(r) & set(g)) / len(g) for r, g in zip(results, truth) if g)
+            single.sort()
+            print(f"{index_type:>6} {rerank:>6} {size / 2**20:>9.1f} {size / args.vectors:>9.1f} {recall:>9.3f} "
+                  f"{single[len(single) // 2]:>7.2f} {single[int(len(single) * 0.99)]:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Recall and latency of the flat, IVF and HNSW vector store indexes on synthetic
+clustered embeddings (no model needed). Recall@k is measured against exact
+search; latency is reported per single query and per query in one batched
+search() call. Also times save() and a memory-mapped load().
+
+Usage:
+    python benchmarks/bench_vector_store.py --vectors 100000 --dim 384 --queries 1000 -k 10
+    python benchmarks/bench_vector_store.py --types hnsw --ef-search 256
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.vector_engine.store import INDEX_TYPES, VectorStore
+
+
+def clustered_vectors(n: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    # embeddings of real text are clustered by topic, not uniform on the sphere
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    x = centers[rng.integers(0, clusters, n)] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+def ids_of(results):
+    return [[hit["chunk_id"] for hit in hits] for hits in results]
+
+
+def main():
+    parser = argparse.ArgumentParser("Vector store recall / latency benchmark")
+    parser.add_argument("--vectors", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--types", nargs="+", choices=INDEX_TYPES, default=list(INDEX_TYPES))
+    parser.add_argument("--nprobe", type=int, default=None, help="IVF lists scanned (default: config)")
+    parser.add_argument("--ef-search", type=int, default=None, help="HNSW candidates (default: config)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    data = clustered_vectors(args.vectors, args.dim, args.clusters, rng)
+    queries = clustered_vectors(args.queries, args.dim, args.clusters, rng)
+    chunk_ids = [f"bench_chunk_{i}" for i in range(args.vectors)]
+    tmp = Path(tempfile.mkdtemp(prefix="bench_vectors_"))
+
+    truth = None
+    print(f"{'index':>6} {'build s':>8} {'recall@k':>9} {'p50 ms':>7} {'p99 ms':>7} "
+          f"{'batch ms/q':>11} {'save s':>7} {'load s':>7}")
+    for index_type in ["flat"] + [t for t in args.types if t != "flat"]:
+        store = VectorStore(index_type, index_dir=tmp)
+        store.nprobe = args.nprobe or store.nprobe
+        store.ef_search = args.ef_search or store.ef_search
+        start = time.perf_counter()
+        for s in range(0, args.vectors, 10000):
+            store.add_vectors(chunk_ids[s:s + 10000], data[s:s + 10000])
+        store.search_vectors(queries[:1], args.k)  # trains a still-buffered IVF index
+        build = time.perf_counter() - start
+
+        single = []
+        for q in queries[:200]:
+            t = time.perf_counter()
+            store.search_vectors(q[None, :], args.k)
+            single.append((time.perf_counter() - t) * 1000)
+        t = time.perf_counter()
+        results = ids_of(store.search_vectors(queries, args.k))
+        batch = (time.perf_counter() - t) * 1000 / len(queries)
+
+        if truth is None:
+            truth = results
+        recall = statistics.mean(len(set(r) & set(g)) / len(g) for r, g in zip(results, truth) if g)
+
+        t = time.perf_counter()
+        store.save()
+        save = time.perf_counter() - t
+        t = time.perf_counter()
+        loaded = VectorStore.load(index_type, index_dir=tmp, mmap=True)
+        load = time.perf_counter() - t
+        assert ids_of(loaded.search_vectors(queries[:50], args.k)) == results[:50]
+
+        single.sort()
+        if index_type in args.types:
+            print(f"{index_type:>6} {build:>8.2f} {recall:>9.3f} {single[len(single) // 2]:>7.2f} "
+                  f"{single[int(len(single) * 0.99)]:>7.2f} {batch:>11.3f} {save:>7.2f} {load:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
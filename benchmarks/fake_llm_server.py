@@ -0,0 +1,170 @@
+"""
+Local fake of an OpenAI-compatible chat completions endpoint (Groq layout:
+POST /openai/v1/chat/completions, plain /v1/chat/completions also accepted).
+
+Each request sleeps for a configurable delay, can fail with a 429 (carrying
+retry-after / x-ratelimit-* headers) or a 500, and otherwise answers with a
+graph JSON built from the capitalized words of the user message. Packed
+requests ("### CHUNK <id>" sections) get one graph per chunk id, and a
+configurable fraction of them come back as unparseable text.
+
+Usage:
+    python benchmarks/fake_llm_server.py --port 8089 --delay 0.2 --rate-limit 0.05
+    GraphExtractor(client=Groq(api_key="fake", base_url="http://127.0.0.1:8089", max_retries=0))
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_graph(text: str) -> dict:
+    names = list(dict.fromkeys(re.findall(r"\b[A-Z][a-z]+(?: [A-Z][a-z]+)*", text)))
+    nodes = [{"id": n, "label": "Entity", "properties": {}} for n in names]
+    relationships = [
+        {"source": a, "target": b, "type": "RELATED_TO", "properties": {}}
+        for a, b in zip(names, names[1:])
+    ]
+    return {"nodes": nodes, "relationships": relationships}
+
+
+def fake_packed_graph(text: str) -> dict:
+    sections = re.split(r"^### CHUNK (.+)$", text, flags=re.MULTILINE)
+    return {"chunks": {cid.strip(): fake_graph(body) for cid, body in zip(sections[1::2], sections[2::2])}}
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, delay=0.0, jitter=0.0, rate_limit=0.0, server_error=0.0,
+                 retry_after=0.5, malformed=0.0, responder=fake_graph, seed=None):
+        super().__init__(address, _Handler)
+        self.delay = delay
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.server_error = server_error
+        self.retry_after = retry_after
+        self.malformed = malformed
+        self.responder = responder
+        self.rng = random.Random(seed)
+        self.stats = Counter()
+        self.lock = threading.Lock()
+        self.in_flight = 0
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeLLMServer
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: dict, headers: dict = None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        srv = self.server
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send(404, {"error": {"message": f"unknown path {self.path}"}})
+            return
+
+        with srv.lock:
+            srv.stats["requests"] += 1
+            srv.in_flight += 1
+            srv.stats["max_in_flight"] = max(srv.stats["max_in_flight"], srv.in_flight)
+            roll = srv.rng.random()
+            pause = max(0.0, srv.delay + srv.rng.uniform(-srv.jitter, srv.jitter))
+        try:
+            time.sleep(pause)
+
+            if roll < srv.rate_limit:
+                with srv.lock:
+                    srv.stats["429"] += 1
+                self._send(429, {"error": {"message": "Rate limit reached", "type": "requests"}}, {
+                    "retry-after": f"{srv.retry_after:g}",
+                    "x-ratelimit-remaining-requests": "0",
+                    "x-ratelimit-reset-requests": f"{srv.retry_after:g}s",
+                })
+                return
+            if roll < srv.rate_limit + srv.server_error:
+                with srv.lock:
+                    srv.stats["500"] += 1
+                self._send(500, {"error": {"message": "Internal server error"}})
+                return
+
+            messages = request.get("messages", [])
+            user_text = "\n".join(m.get("content", "") for m in messages if m.get("role") == "user")
+            if "### CHUNK " in user_text:
+                with srv.lock:
+                    srv.stats["packed"] += 1
+                    broken = srv.rng.random() < srv.malformed
+                content = "Sorry, here you go: {chunks" if broken else json.dumps(fake_packed_graph(user_text))
+            else:
+                content = json.dumps(srv.responder(user_text))
+            with srv.lock:
+                srv.stats["200"] += 1
+            self._send(200, {
+                "id": f"chatcmpl-{srv.stats['requests']}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "fake"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": sum(len(m.get("content", "").split()) for m in messages),
+                    "completion_tokens": len(content.split()),
+                    "total_tokens": 0,
+                },
+            }, {"x-ratelimit-remaining-requests": "1000", "x-ratelimit-reset-requests": "1s"})
+        finally:
+            with srv.lock:
+                srv.in_flight -= 1
+
+
+def start_fake_server(port: int = 0, **kwargs) -> FakeLLMServer:
+    """Starts the server on a background thread and returns it; call .shutdown() when done."""
+    server = FakeLLMServer(("127.0.0.1", port), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("Fake OpenAI-compatible LLM server")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--delay", type=float, default=0.2, help="seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--server-error", type=float, default=0.0, help="fraction of requests answered with 500")
+    parser.add_argument("--retry-after", type=float, default=0.5)
+    parser.add_argument("--malformed", type=float, default=0.0, help="fraction of packed answers that fail to parse")
+    args = parser.parse_args()
+
+    server = FakeLLMServer(("127.0.0.1", args.port), delay=args.delay, jitter=args.jitter,
+                           rate_limit=args.rate_limit, server_error=args.server_error,
+                           retry_after=args.retry_after, malformed=args.malformed)
+    print(f"Fake LLM server listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,90 @@
+"""
+In-process stand-in for the neo4j Driver used by the benchmarks.
+
+It implements just enough of the driver surface (session / run / execute_write)
+for Neo4jConnector to talk to it, counts every network round trip the real
+driver would make, and optionally sleeps to simulate latency.
+"""
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+
+class FakeResult:
+    def __init__(self, records=None):
+        self._records = records or []
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def consume(self):
+        return None
+
+
+class FakeTransaction:
+    def __init__(self, driver: "FakeNeo4jDriver"):
+        self._driver = driver
+
+    def run(self, query: str, params: Optional[Dict[str, Any]] = None, **kwargs):
+        self._driver._round_trip()
+        self._driver.stats["statements"] += 1
+        self._driver.stats["rows"] += len((params or {}).get("rows", [None]))
+        return FakeResult()
+
+
+class FakeSession:
+    def __init__(self, driver: "FakeNeo4jDriver"):
+        self._driver = driver
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._closed = True
+
+    def closed(self):
+        return self._closed
+
+    def run(self, query: str, params: Optional[Dict[str, Any]] = None, **kwargs):
+        # Auto-commit query: BEGIN/RUN/PULL/COMMIT pipelined into one round trip.
+        self._driver.stats["auto_commit"] += 1
+        return FakeTransaction(self._driver).run(query, params)
+
+    def _execute(self, work, *args, **kwargs):
+        self._driver._round_trip()  # BEGIN
+        result = work(FakeTransaction(self._driver), *args, **kwargs)
+        self._driver._round_trip()  # COMMIT
+        self._driver.stats["transactions"] += 1
+        return result
+
+    def execute_write(self, work, *args, **kwargs):
+        return self._execute(work, *args, **kwargs)
+
+    def execute_read(self, work, *args, **kwargs):
+        return self._execute(work, *args, **kwargs)
+
+
+class FakeNeo4jDriver:
+    def __init__(self, latency: float = 0.0):
+        """latency: seconds slept for every simulated round trip."""
+        self.latency = latency
+        self.stats = Counter()
+
+    def _round_trip(self):
+        self.stats["round_trips"] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def session(self, **kwargs):
+        self.stats["sessions"] += 1
+        return FakeSession(self)
+
+    def verify_connectivity(self):
+        self._round_trip()
+
+    def close(self):
+        pass
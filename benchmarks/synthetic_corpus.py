@@ -0,0 +1,92 @@
+"""
+Writes synthetic text PDFs for ingestion benchmarks, without any PDF library.
+
+Every page gets a running header and footer (so the cleaner's repeated-line
+detection has work to do), numbered pages, and paragraphs of lorem-style course
+text with occasional hyphenated line breaks.
+"""
+import random
+from pathlib import Path
+from typing import List
+
+WORDS = (
+    "algorithm array binary complexity data graph hash heap index linked list "
+    "memory node pointer queue recursion search sort stack structure traversal "
+    "tree vertex edge matrix dynamic programming greedy divide conquer analysis "
+    "student course syllabus unit module lecture laboratory examination marks"
+).split()
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def page_lines(rng: random.Random, page_no: int, lines: int, title: str) -> List[str]:
+    out = [f"{title} - Department of Computer Science"]
+    for _ in range(lines):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(8, 14))]
+        line = " ".join(words)
+        if rng.random() < 0.3:
+            line += "."
+        if rng.random() < 0.05:
+            line += " inter-"
+        out.append(line)
+    out.append(f"Page {page_no}")
+    return out
+
+
+def write_pdf(path: Path, pages: List[List[str]]):
+    """Writes a PDF with one Helvetica text line per list entry."""
+    objects = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(b"")  # placeholder, filled once the page tree exists
+    pages_obj = add(b"")
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    kids = []
+    for lines in pages:
+        ops = ["BT", "/F1 10 Tf", "12 TL", "50 780 Td"]
+        for line in lines:
+            ops.append(f"({_escape(line)}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1", errors="replace")
+        content = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        kids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (pages_obj, font, content)
+        ))
+
+    objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages_obj
+    objects[pages_obj - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), len(kids)
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for off in offsets:
+        out += b"%010d 00000 n \n" % off
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(bytes(out))
+
+
+def build_corpus(out_dir: Path, files: int, pages: int, lines: int = 45, seed: int = 0) -> List[Path]:
+    """Writes `files` PDFs of `pages` pages each, named by the data naming convention."""
+    rng = random.Random(seed)
+    paths = []
+    for i in range(files):
+        title = f"CSE DSA Unit {i}"
+        path = Path(out_dir) / f"cse_dsa{i}_syllabus_{2020 + i % 6}.pdf"
+        write_pdf(path, [page_lines(rng, p + 1, lines, title) for p in range(pages)])
+        paths.append(path)
+    return paths
@@ -11,4 +11,114 @@ PROCESSED_DATA_DIR = DATA_DIR / "processed"
 VECTOR_DB_DIR = DATA_DIR / "artifacts"
 
 # Model Configs
-EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
\ No newline at end of file
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+EMBEDDING_MAX_SEQ_LENGTH = int(os.getenv("EMBEDDING_MAX_SEQ_LENGTH", 256))  # wordpieces the embedder keeps, incl. special tokens
+
+# Vector Store (FAISS)
+VECTOR_INDEX_TYPE = os.getenv("VECTOR_INDEX_TYPE", "flat")  # "flat" (exact), "ivf" or "hnsw"
+VECTOR_EMBED_BATCH_SIZE = int(os.getenv("VECTOR_EMBED_BATCH_SIZE", 256))  # texts per model forward pass
+VECTOR_EMBED_THREADS = int(os.getenv("VECTOR_EMBED_THREADS", 4))  # batches encoded concurrently
+VECTOR_IVF_NLIST = int(os.getenv("VECTOR_IVF_NLIST", 1024))  # upper bound; small corpora use fewer lists
+VECTOR_IVF_NPROBE = int(os.getenv("VECTOR_IVF_NPROBE", 16))  # lists scanned per query
+VECTOR_HNSW_M = int(os.getenv("VECTOR_HNSW_M", 32))  # graph neighbours per node
+VECTOR_HNSW_EF_CONSTRUCTION = int(os.getenv("VECTOR_HNSW_EF_CONSTRUCTION", 200))
+VECTOR_HNSW_EF_SEARCH = int(os.getenv("VECTOR_HNSW_EF_SEARCH", 64))  # candidate list size per query
+VECTOR_PQ_M = int(os.getenv("VECTOR_PQ_M", 48))  # "pq" mode: bytes per vector (sub-quantizers)
+VECTOR_RERANK_CANDIDATES = int(os.getenv("VECTOR_RERANK_CANDIDATES", 100))  # "sq8"/"pq": exact re-rank of top N (0 = off)
+
+# Embedding Cache (float16 memmap per model, keyed by chunk text hash)
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_DIR = VECTOR_DB_DIR / "embedding_cache"
+
+# Keyword Index (BM25, NumPy CSR segments)
+BM25_INDEX_DIR = VECTOR_DB_DIR / "bm25"
+BM25_K1 = float(os.getenv("BM25_K1", 1.5))
+BM25_B = float(os.getenv("BM25_B", 0.75))
+BM25_EPSILON = float(os.getenv("BM25_EPSILON", 0.25))  # floor for negative idf, as a fraction of the mean idf
+BM25_FLUSH_DOCS = int(os.getenv("BM25_FLUSH_DOCS", 50000))  # buffered documents per new segment
+BM25_MAX_SEGMENTS = int(os.getenv("BM25_MAX_SEGMENTS", 8))  # merge in the background above this
+
+# Query Orchestrator (vector + keyword + graph)
+QUERY_BUDGET_MS = float(os.getenv("QUERY_BUDGET_MS", 800))  # whole fan-out; slower backends are dropped
+QUERY_VECTOR_TIMEOUT_MS = float(os.getenv("QUERY_VECTOR_TIMEOUT_MS", 500))
+QUERY_KEYWORD_TIMEOUT_MS = float(os.getenv("QUERY_KEYWORD_TIMEOUT_MS", 300))
+QUERY_GRAPH_TIMEOUT_MS = float(os.getenv("QUERY_GRAPH_TIMEOUT_MS", 600))
+QUERY_BACKEND_K = int(os.getenv("QUERY_BACKEND_K", 20))  # candidates fetched from each backend
+QUERY_RRF_K = int(os.getenv("QUERY_RRF_K", 60))  # reciprocal rank fusion constant
+QUERY_CONCURRENCY = int(os.getenv("QUERY_CONCURRENCY", 16))  # concurrent queries the retriever pool is sized for
+QUERY_MAX_ABANDONED = int(os.getenv("QUERY_MAX_ABANDONED", 2))  # timed-out calls still running before a backend is "busy"
+
+# Query Cache (orchestrator; LRU + TTL per layer, keyed on index generations)
+QUERY_CACHE_ENABLED = os.getenv("QUERY_CACHE_ENABLED", "true").lower() == "true"
+QUERY_CACHE_TTL_S = float(os.getenv("QUERY_CACHE_TTL_S", 3600))
+QUERY_CACHE_EMBEDDING_BYTES = int(os.getenv("QUERY_CACHE_EMBEDDING_BYTES", 32 * 1024 * 1024))
+QUERY_CACHE_BACKEND_BYTES = int(os.getenv("QUERY_CACHE_BACKEND_BYTES", 64 * 1024 * 1024))
+QUERY_CACHE_RESULT_BYTES = int(os.getenv("QUERY_CACHE_RESULT_BYTES", 32 * 1024 * 1024))
+QUERY_CACHE_REFRESH_S = float(os.getenv("QUERY_CACHE_REFRESH_S", 5))  # how often indexes are checked for new generations
+
+# Near-duplicate chunks (MinHash LSH at ingest; duplicates are not embedded or extracted)
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+DEDUP_INDEX_PATH = VECTOR_DB_DIR / "dedup.sqlite"
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", 0.8))  # estimated Jaccard similarity of word shingles
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", 128))  # MinHash permutations per signature
+DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", 16))  # LSH bands (num_perm / bands rows each)
+DEDUP_SHINGLE = int(os.getenv("DEDUP_SHINGLE", 3))  # words per shingle
+
+# Metadata shards (vector / keyword indexes split by <dept>_<type> of the source name)
+SHARDED_INDEXES = os.getenv("SHARDED_INDEXES", "false").lower() == "true"  # query the sharded indexes
+SHARD_INDEX_DIR = VECTOR_DB_DIR / "shards"
+SHARD_BUILD_WORKERS = int(os.getenv("SHARD_BUILD_WORKERS", 0))  # shards built at once (0 = one per CPU core)
+METADATA_DEPTS = os.getenv("METADATA_DEPTS", "cse,it,aiml,ece,eee,mech,civil").split(",")  # words read as a dept in filters
+METADATA_TYPES = os.getenv("METADATA_TYPES", "syllabus,labmanual,pyq").split(",")  # words read as a document type
+
+# Neo4j Driver
+NEO4J_MAX_CONNECTION_POOL_SIZE = int(os.getenv("NEO4J_MAX_CONNECTION_POOL_SIZE", 100))
+NEO4J_CONNECTION_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_CONNECTION_ACQUISITION_TIMEOUT", 60.0))  # seconds
+NEO4J_MAX_CONNECTION_LIFETIME = float(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", 3600.0))  # seconds
+NEO4J_MAX_TRANSACTION_RETRY_TIME = float(os.getenv("NEO4J_MAX_TRANSACTION_RETRY_TIME", 30.0))  # driver-side retry of managed tx
+NEO4J_MAX_RETRIES = int(os.getenv("NEO4J_MAX_RETRIES", 3))  # run_cypher (auto-commit) replays after a lost session or transient error
+NEO4J_FETCH_SIZE = int(os.getenv("NEO4J_FETCH_SIZE", 1000))  # records pulled per batch when streaming
+
+# Graph Engine
+GRAPH_BACKEND = os.getenv("GRAPH_BACKEND", "neo4j")  # "neo4j" (server) or "sqlite" (embedded, no server needed)
+GRAPH_SQLITE_PATH = VECTOR_DB_DIR / "graph.sqlite"
+GRAPH_WRITE_BATCH_SIZE = int(os.getenv("GRAPH_WRITE_BATCH_SIZE", 500))  # Rows per UNWIND statement
+GRAPH_SCHEMA_MODE = os.getenv("GRAPH_SCHEMA_MODE", "constraint")  # "constraint" (unique name per label) or "index"
+GRAPH_PIPELINE_QUEUE_SIZE = int(os.getenv("GRAPH_PIPELINE_QUEUE_SIZE", 64))  # chunks buffered between pipeline stages
+GRAPH_PIPELINE_WRITE_BATCH = int(os.getenv("GRAPH_PIPELINE_WRITE_BATCH", 32))  # chunks resolved + written per transaction
+GRAPH_PIPELINE_FLUSH_S = float(os.getenv("GRAPH_PIPELINE_FLUSH_S", 2.0))  # max wait before writing a partial batch
+GRAPH_QUEUE_ENABLED = os.getenv("GRAPH_QUEUE_ENABLED", "true").lower() == "true"  # pipeline CLI checkpoints in the work queue
+GRAPH_QUEUE_PATH = VECTOR_DB_DIR / "graph_queue.sqlite"
+GRAPH_QUEUE_LEASE_S = float(os.getenv("GRAPH_QUEUE_LEASE_S", 900))  # leased chunks are retried after this (crashed run)
+GRAPH_QUEUE_MAX_ATTEMPTS = int(os.getenv("GRAPH_QUEUE_MAX_ATTEMPTS", 3))  # failed attempts per stage before dead-letter
+GRAPH_QUEUE_RETRY_DELAY_S = float(os.getenv("GRAPH_QUEUE_RETRY_DELAY_S", 60))  # wait before a failed chunk is leased again
+
+# Graph Snapshot (CSR export of the entity graph for in-process k-hop retrieval)
+GRAPH_CHANGELOG_ENABLED = os.getenv("GRAPH_CHANGELOG_ENABLED", "false").lower() == "true"  # GraphBuilder logs what it writes
+GRAPH_CHANGELOG_PATH = VECTOR_DB_DIR / "graph_changes.jsonl"
+GRAPH_SNAPSHOT_ENABLED = os.getenv("GRAPH_SNAPSHOT_ENABLED", "false").lower() == "true"  # graph queries read the snapshot
+GRAPH_SNAPSHOT_DIR = VECTOR_DB_DIR / "graph_snapshot"
+GRAPH_SNAPSHOT_HOPS = int(os.getenv("GRAPH_SNAPSHOT_HOPS", 2))  # expansion depth around matched entities
+GRAPH_SNAPSHOT_DECAY = float(os.getenv("GRAPH_SNAPSHOT_DECAY", 0.5))  # score multiplier per hop (before degree damping)
+GRAPH_SNAPSHOT_MAX_NODES = int(os.getenv("GRAPH_SNAPSHOT_MAX_NODES", 5000))  # expansion stops growing past this many nodes
+GRAPH_SNAPSHOT_COMPACT_EDGES = int(os.getenv("GRAPH_SNAPSHOT_COMPACT_EDGES", 100000))  # change-log edges before `snapshot.py update` compacts
+
+# Graph Extraction (Groq)
+EXTRACT_MAX_IN_FLIGHT = int(os.getenv("EXTRACT_MAX_IN_FLIGHT", 8))  # concurrent LLM requests in extract_many
+EXTRACT_MAX_RETRIES = int(os.getenv("EXTRACT_MAX_RETRIES", 5))  # retries per chunk on 429 / 5xx / connection errors
+EXTRACT_RETRY_BASE_DELAY = float(os.getenv("EXTRACT_RETRY_BASE_DELAY", 1.0))  # seconds, doubled per attempt
+EXTRACT_RETRY_MAX_DELAY = float(os.getenv("EXTRACT_RETRY_MAX_DELAY", 60.0))  # seconds
+EXTRACT_PACK_TOKEN_BUDGET = int(os.getenv("EXTRACT_PACK_TOKEN_BUDGET", 6000))  # estimated prompt tokens per packed request
+EXTRACT_PACK_MAX_CHUNKS = int(os.getenv("EXTRACT_PACK_MAX_CHUNKS", 12))  # keeps packed JSON answers within output limits
+
+# Extraction Cache
+EXTRACTION_CACHE_ENABLED = os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() == "true"
+EXTRACTION_CACHE_PATH = VECTOR_DB_DIR / "extraction_cache.sqlite"
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+# OCR (scanned PDF pages, --ocr)
+OCR_MIN_CHARS = int(os.getenv("OCR_MIN_CHARS", 25))  # pages with a thinner text layer are OCR'd
+OCR_RESOLUTION = int(os.getenv("OCR_RESOLUTION", 300))  # dpi used to rasterize pages
+OCR_LANG = os.getenv("OCR_LANG", "eng")  # Tesseract language(s), e.g. "eng+hin"
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", 0))  # OCR processes per file when ingesting serially (0 = one per core)
+OCR_CACHE_PATH = VECTOR_DB_DIR / "ocr_cache.sqlite"
@@ -1,29 +1,92 @@
 import json
 import logging
-from typing import Dict, Any
+from collections import defaultdict
+from typing import Dict, Any, List, Tuple
 
 # Import local modules
 # Assuming running from root as python src/graph_engine/builder.py
 # Adjust imports if necessary based on execution context
 try:
+    import config
     from src.graph_engine.extractor import GraphExtractor
     from src.graph_engine.neo4j_ops import Neo4jConnector
+    from src.graph_engine.schema import GraphSchema, ENTITY_LABEL
+    from src.graph_engine.store import GraphStore, Neo4jGraphStore, get_graph_store
+    from src.graph_engine.resolver import EntityResolver
+    from src.graph_engine.snapshot import GraphChangeLog
 except ImportError:
     # Fallback for running script directly from subfolder
     import sys
     import os
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+    import config
     from src.graph_engine.extractor import GraphExtractor
     from src.graph_engine.neo4j_ops import Neo4jConnector
+    from src.graph_engine.schema import GraphSchema, ENTITY_LABEL
+    from src.graph_engine.store import GraphStore, Neo4jGraphStore, get_graph_store
+    from src.graph_engine.resolver import EntityResolver
+    from src.graph_engine.snapshot import GraphChangeLog
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("GraphBuilder")
 
+def sanitize_label(label: str) -> str:
+    """Strips everything except alphanumerics and underscores from a node label."""
+    return "".join(c for c in label if c.isalnum() or c == "_")
+
+
+def sanitize_rel_type(rel_type: str) -> str:
+    """Strips a relationship type down to an upper-case Cypher identifier."""
+    return "".join(c for c in rel_type if c.isalnum() or c == "_").upper()
+
+
+def node_label(node: Dict[str, Any]) -> str:
+    return sanitize_label(node.get("label", ENTITY_LABEL)) or ENTITY_LABEL
+
+
+def endpoint_labels(nodes: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Maps each extracted node name to its sanitized label (first occurrence wins)."""
+    labels = {}
+    for node in nodes:
+        node_id = node.get("id")
+        if node_id and node_id not in labels:
+            labels[node_id] = node_label(node)
+    return labels
+
+
 class GraphBuilder:
-    def __init__(self):
-        self.extractor = GraphExtractor()
-        self.connector = Neo4jConnector()
+    def __init__(
+        self,
+        batched: bool = True,
+        batch_size: int = config.GRAPH_WRITE_BATCH_SIZE,
+        extractor: GraphExtractor = None,
+        connector: Neo4jConnector = None,
+        schema: GraphSchema = None,
+        resolver: EntityResolver = None,
+        change_log: GraphChangeLog = None,
+        store: GraphStore = None,
+    ):
+        """
+        batched: write each chunk with grouped UNWIND statements in one transaction
+                 instead of one auto-commit query per node / relationship.
+        batch_size: maximum rows sent in a single UNWIND statement.
+        change_log: records every write for the graph snapshot (src/graph_engine/snapshot.py);
+                    defaults to config.GRAPH_CHANGELOG_PATH when GRAPH_CHANGELOG_ENABLED.
+        store: where the graph is written (src/graph_engine/store.py). Defaults to a
+               Neo4j store over `connector` / `schema` when either is given, else to
+               the GRAPH_BACKEND store.
+        """
+        self.extractor = extractor or GraphExtractor()
+        if store is None:
+            store = Neo4jGraphStore(connector, schema) if connector or schema else get_graph_store()
+        self.store = store
+        self.resolver = resolver or EntityResolver()
+        self.batched = batched
+        self.batch_size = max(1, batch_size)
+        if change_log is None and config.GRAPH_CHANGELOG_ENABLED:
+            change_log = GraphChangeLog()
+        self.change_log = change_log
         
     def process_text(self, text: str):
         """
@@ -54,76 +117,169 @@ class GraphBuilder:
 
         logger.info(f"Extracted {len(nodes)} nodes and {len(relationships)} relationships.")
         
-        # 2. Node Creation
+        # 2. Write
+        nodes_created, rels_created = self.write_graph(nodes, relationships)
+
+        summary = f"Created {nodes_created} Nodes, {rels_created} Edges"
+        logger.info(summary)
+        print(summary)
+
+    def process_batch(self, texts: List[str]) -> Dict[str, Any]:
+        """
+        Extracts every chunk of a document (or any batch of chunks) concurrently,
+        merges entity aliases across all of them, and writes each distinct
+        entity and edge once. Returns the resolver report plus write counts.
+        """
+        texts = [t for t in texts if t and t.strip()]
+        if not texts:
+            logger.warning("Empty batch provided.")
+            return {}
+
+        results = self.extractor.extract_many(texts)
+        failed = [r for r in results if r["status"] != "ok"]
+        for r in failed:
+            logger.error(f"Extraction failed for chunk {r['index']}: {r['error']}")
+
+        data, report = self.resolver.resolve(r["data"] for r in results if r["status"] == "ok")
+        report["failed_chunks"] = len(failed)
+        if not data["nodes"] and not data["relationships"]:
+            logger.info("No entities or relationships found in batch.")
+            return report
+
+        nodes_created, rels_created = self.write_graph(data["nodes"], data["relationships"])
+        report.update(nodes_created=nodes_created, rels_created=rels_created)
+
+        logger.info(
+            f"Resolved {report['nodes_in']} -> {report['nodes_out']} nodes and "
+            f"{report['relationships_in']} -> {report['relationships_out']} edges "
+            f"({report['writes_removed']} writes removed, {report['write_reduction']:.0%})."
+        )
+        logger.info(f"Created {nodes_created} Nodes, {rels_created} Edges")
+        return report
+
+    def write_graph(self, nodes: List[Dict[str, Any]], relationships: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        Pushes extracted nodes and relationships to the graph store.
+        Returns (nodes_created, rels_created).
+
+        Every node also gets the :Entity super-label. Relationship endpoints are
+        resolved through a `name` index, restricted to the label the extractor
+        gave them in the same chunk, or through :Entity alone when the endpoint
+        was not extracted as a node. No lookup scans every node.
+        """
+        try:
+            self.store.ensure_labels(endpoint_labels(nodes).values())
+        except Exception as e:
+            logger.error(f"Schema setup failed: {e}")
+
+        if self.batched:
+            written = self._write_batched(nodes, relationships)
+        else:
+            written = self._write_per_item(nodes, relationships)
+        if self.change_log is not None:
+            self._log_changes(nodes, relationships)
+        return written
+
+    def _log_changes(self, nodes: List[Dict[str, Any]], relationships: List[Dict[str, Any]]):
+        """Appends the names and edges just merged to the snapshot change log."""
+        names = [node["id"] for node in nodes if node.get("id")]
+        edges = [
+            (rel["source"], sanitize_rel_type(rel.get("type", "RELATED_TO")) or "RELATED_TO", rel["target"])
+            for rel in relationships if rel.get("source") and rel.get("target")
+        ]
+        if not names and not edges:
+            return
+        try:
+            self.change_log.append(names, edges)
+        except OSError as e:
+            logger.error(f"Could not append to the graph change log: {e}")
+
+    def _write_batched(self, nodes: List[Dict[str, Any]], relationships: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        Groups nodes by label and relationships by type, and writes every group
+        in a single store transaction (UNWIND statements on Neo4j).
+        """
+        node_rows = defaultdict(list)
+        for node in nodes:
+            node_id = node.get("id")
+            if not node_id:
+                continue
+            props = {"name": node_id}
+            props.update(node.get("properties") or {})
+            node_rows[node_label(node)].append({"name": node_id, "props": props})
+
+        labels = endpoint_labels(nodes)
+        rel_rows = defaultdict(list)
+        for rel in relationships:
+            source = rel.get("source")
+            target = rel.get("target")
+            if not source or not target:
+                continue
+            rel_type = sanitize_rel_type(rel.get("type", "RELATED_TO")) or "RELATED_TO"
+            rel_rows[rel_type].append({
+                "source": source,
+                "target": target,
+                "source_label": labels.get(source),
+                "target_label": labels.get(target),
+                "props": rel.get("properties") or {},
+            })
+
+        try:
+            self.store.upsert(node_rows, rel_rows, self.batch_size)
+        except Exception as e:
+            # One bad row rolls back the whole transaction; retry item by item
+            # so the rest of the chunk still lands.
+            logger.error(f"Batched write failed, falling back to per-item writes: {e}")
+            return self._write_per_item(nodes, relationships)
+
+        nodes_created = sum(len(rows) for rows in node_rows.values())
+        rels_created = sum(len(rows) for rows in rel_rows.values())
+        return nodes_created, rels_created
+
+    def _write_per_item(self, nodes: List[Dict[str, Any]], relationships: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Writes each node and relationship with its own auto-commit write."""
+        labels = endpoint_labels(nodes)
+
         nodes_created = 0
         for node in nodes:
             try:
-                # Construct MERGE query for Node
-                # MERGE (n:Label {name: 'ID'})
                 node_id = node.get("id")
-                label = node.get("label", "Entity")
-                properties = node.get("properties", {})
-                
-                # Sanitize label (basic)
-                label = "".join(c for c in label if c.isalnum() or c == "_")
-                
                 if not node_id:
                     continue
-
-                # Prepare properties
-                # We use name as primary key as requested
-                query_props = {"name": node_id}
-                query_props.update(properties)
-                
-                # We construct the MERGE query dynamically. 
-                # Note: Passing parameters is safer.
-                query = f"MERGE (n:{label} {{name: $name}}) SET n += $props"
-                
-                # Separate name from other props for SET if needed, but SET n += $props works well to add others
-                # Actually, $props should contain everything we want to set.
-                
-                self.connector.run_cypher(query, {"name": node_id, "props": query_props})
+                # name is the merge key; the remaining properties are merged in
+                props = {"name": node_id}
+                props.update(node.get("properties") or {})
+                self.store.upsert_node(node_label(node), node_id, props)
                 nodes_created += 1
             except Exception as e:
                 logger.error(f"Failed to create node {node}: {e}")
 
-        # 3. Relationship Creation
         rels_created = 0
         for rel in relationships:
             try:
-                # MATCH (a {name: 'Source'}), (b {name: 'Target'}) MERGE (a)-[:TYPE]->(b)
                 source = rel.get("source")
                 target = rel.get("target")
-                rel_type = rel.get("type", "RELATED_TO")
-                properties = rel.get("properties", {})
-                
                 if not source or not target:
                     continue
-                
-                # Sanitize rel_type
-                rel_type = "".join(c for c in rel_type if c.isalnum() or c == "_").upper()
-                
-                query = (
-                    f"MATCH (a {{name: $source}}), (b {{name: $target}}) "
-                    f"MERGE (a)-[r:{rel_type}]->(b) "
-                    f"SET r += $props"
+                self.store.upsert_edge(
+                    sanitize_rel_type(rel.get("type", "RELATED_TO")),
+                    source,
+                    target,
+                    labels.get(source, ENTITY_LABEL),
+                    labels.get(target, ENTITY_LABEL),
+                    rel.get("properties", {}),
                 )
-                
-                self.connector.run_cypher(query, {"source": source, "target": target, "props": properties})
                 rels_created += 1
             except Exception as e:
                 logger.error(f"Failed to create relationship {rel}: {e}")
 
-        summary = f"Created {nodes_created} Nodes, {rels_created} Edges"
-        logger.info(summary)
-        print(summary)
-
+        return nodes_created, rels_created
 
 if __name__ == "__main__":
     builder = GraphBuilder()
     
-    # Check if Neo4j is connected
-    if not builder.connector.verify_connectivity():
+    # Check if the graph store is reachable
+    if not builder.store.verify_connectivity():
         print("❌ Neoj4 not connected. Please check env vars.")
     else:
         test_text = "Professor Sarvesh teaches Advanced Python at Edu Nexus University."
@@ -0,0 +1,175 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+try:
+    import config
+except ImportError:
+    # Fallback for running script directly from subfolder
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+    import config
+
+logger = logging.getLogger("ExtractionCache")
+
+
+def prompt_version(prompt: str) -> str:
+    """Short, stable identifier for a system prompt."""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+class ExtractionCache:
+    """
+    Content-addressed SQLite cache of LLM graph extractions.
+
+    Entries are keyed on sha256(model, prompt version, chunk text), so a changed
+    chunk, model or prompt is always a miss. The file is opened in WAL mode with
+    one connection per thread, which makes it safe to share between concurrent
+    extractor workers (threads or processes). When the stored payload grows past
+    `max_bytes`, least recently used entries are evicted.
+    """
+
+    # Eviction is checked every N writes rather than on each put.
+    EVICT_EVERY = 100
+    # Evict down to this fraction of max_bytes so we don't evict again on the next put.
+    EVICT_TARGET = 0.9
+
+    def __init__(self, path: Path = config.EXTRACTION_CACHE_PATH, max_bytes: int = config.EXTRACTION_CACHE_MAX_BYTES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+
+        conn = self._conn()
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS extractions (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_extractions_model_prompt ON extractions(model, prompt_version);
+            CREATE INDEX IF NOT EXISTS idx_extractions_last_access ON extractions(last_access);
+            """
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(text: str, model: str, prompt: str) -> str:
+        h = hashlib.sha256()
+        for part in (model, prompt_version(prompt), text):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def get(self, text: str, model: str, prompt: str) -> Optional[Dict[str, Any]]:
+        """Returns the cached extraction, or None on a miss."""
+        key = self.make_key(text, model, prompt)
+        conn = self._conn()
+        row = conn.execute("SELECT value FROM extractions WHERE key = ?", (key,)).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        conn.execute("UPDATE extractions SET last_access = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, text: str, model: str, prompt: str, data: Dict[str, Any]):
+        value = json.dumps(data, ensure_ascii=False)
+        self._conn().execute(
+            "INSERT OR REPLACE INTO extractions (key, model, prompt_version, value, size, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (self.make_key(text, model, prompt), model, prompt_version(prompt), value, len(value), time.time()),
+        )
+        with self._lock:
+            self._puts += 1
+            check = self._puts % self.EVICT_EVERY == 0
+        if check:
+            self.evict()
+
+    def evict(self) -> int:
+        """Drops least recently used entries until the payload fits the size budget."""
+        conn = self._conn()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM extractions").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+
+        excess = total - int(self.max_bytes * self.EVICT_TARGET)
+        removed = 0
+        freed = 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for key, size in conn.execute("SELECT key, size FROM extractions ORDER BY last_access").fetchall():
+                if freed >= excess:
+                    break
+                conn.execute("DELETE FROM extractions WHERE key = ?", (key,))
+                freed += size
+                removed += 1
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        logger.info(f"Evicted {removed} cached extractions ({freed} bytes).")
+        return removed
+
+    def invalidate(self, model: Optional[str] = None, prompt: Optional[str] = None, version: Optional[str] = None) -> int:
+        """
+        Deletes entries for one model and/or prompt version (pass the prompt text
+        or its `prompt_version`). With no arguments, clears the whole cache.
+        """
+        clauses, params = [], []
+        if model is not None:
+            clauses.append("model = ?")
+            params.append(model)
+        if prompt is not None:
+            version = prompt_version(prompt)
+        if version is not None:
+            clauses.append("prompt_version = ?")
+            params.append(version)
+
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        cur = self._conn().execute(f"DELETE FROM extractions{where}", params)
+        return cur.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        entries, size = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM extractions"
+        ).fetchone()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "entries": entries,
+                "bytes": size,
+            }
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
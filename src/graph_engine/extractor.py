@@ -1,74 +1,523 @@
 import os
+import sys
 import json
 import re
+import time
+import random
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from dotenv import load_dotenv
-from groq import Groq
+from groq import Groq, AsyncGroq, APIConnectionError, InternalServerError, RateLimitError
+
+try:
+    import config
+    from src.graph_engine.cache import ExtractionCache
+except ImportError:
+    # Fallback for running script directly from subfolder
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+    import config
+    from src.graph_engine.cache import ExtractionCache
 
 # Load environment variables
 load_dotenv()
 
+SYSTEM_PROMPT = (
+    "You are a precise Knowledge Graph Entity Extractor. "
+    "Your task is to analyze the input text and extract entities (nodes) and "
+    "relationships specific to the domain of the text.\n\n"
+    "Output MUST be strict JSON only. No conversational text, no markdown code blocks.\n"
+    "The JSON structure must be exactly:\n"
+    "{\n"
+    '  "nodes": [{"id": "Name", "label": "Type", "properties": {}}],\n'
+    '  "relationships": [{"source": "Name", "target": "Name", "type": "RELATION_TYPE", "properties": {}}]\n'
+    "}\n\n"
+    "Rules:\n"
+    "1. Nodes: 'id' should be the entity name. 'label' is the entity type (e.g., Person, Course, University).\n"
+    "2. Relationships: 'type' defines the link (e.g., TEACHES, LOCATED_AT).\n"
+    "3. Do not include duplicate nodes or relationships.\n"
+    "4. If no entities are found, return empty lists for nodes and relationships.\n"
+    "5. Ensure the JSON is valid."
+)
+
+PACKED_SYSTEM_PROMPT = (
+    "You are a precise Knowledge Graph Entity Extractor. "
+    "The input contains several independent text chunks. Each chunk starts with a header line "
+    "'### CHUNK <chunk_id>'. Analyze every chunk on its own and extract its entities (nodes) and "
+    "relationships specific to the domain of the text.\n\n"
+    "Output MUST be strict JSON only. No conversational text, no markdown code blocks.\n"
+    "The JSON structure must be exactly:\n"
+    "{\n"
+    '  "chunks": {\n'
+    '    "<chunk_id>": {\n'
+    '      "nodes": [{"id": "Name", "label": "Type", "properties": {}}],\n'
+    '      "relationships": [{"source": "Name", "target": "Name", "type": "RELATION_TYPE", "properties": {}}]\n'
+    "    }\n"
+    "  }\n"
+    "}\n\n"
+    "Rules:\n"
+    "1. Nodes: 'id' should be the entity name. 'label' is the entity type (e.g., Person, Course, University).\n"
+    "2. Relationships: 'type' defines the link (e.g., TEACHES, LOCATED_AT).\n"
+    "3. Do not include duplicate nodes or relationships within a chunk.\n"
+    "4. Include every chunk_id from the input exactly once; use empty lists if a chunk has no entities.\n"
+    "5. Ensure the JSON is valid."
+)
+
+CHUNK_HEADER = "### CHUNK {id}\n"
+
+# Errors worth retrying: rate limits, provider-side 5xx and network/timeouts.
+RETRYABLE_ERRORS = (RateLimitError, InternalServerError, APIConnectionError)
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """Parses Groq style reset durations ("7.66s", "2m59.56s", "250ms", "1h2m") into seconds."""
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value.strip())
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+    return sum(float(num) * scale[unit] for num, unit in parts)
+
+
+def rate_limit_delay(headers) -> Optional[float]:
+    """
+    Returns how long the provider asked us to wait, in seconds, or None if the
+    response carries no usable rate-limit header.
+    """
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000.0
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+    resets = [
+        _parse_duration(headers.get(name, ""))
+        for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+        if headers.get(name)
+    ]
+    resets = [r for r in resets if r is not None]
+    return max(resets) if resets else None
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap prompt-size estimate (~4 characters per token), good enough for packing budgets."""
+    return max(1, len(text) // 4)
+
+
+def parse_graph_json(response_content: str) -> dict:
+    """
+    Parses the model output into a graph dict.
+    Raises ValueError if no JSON object can be recovered.
+    """
+    # Helper to parse JSON even if there's minor noise (though system prompt forbids it)
+    # The model usually respects the system prompt well.
+    try:
+        return json.loads(response_content)
+    except json.JSONDecodeError:
+        # Fallback: try to find the JSON block if wrapped in markdown
+        match = re.search(r'\{.*\}', response_content, re.DOTALL)
+        if match:
+            try:
+                return json.loads(match.group(0))
+            except json.JSONDecodeError:
+                pass
+        raise ValueError(f"Error parsing JSON. Raw output: {response_content}")
+
+
 class GraphExtractor:
-    def __init__(self):
+    def __init__(
+        self,
+        client: Groq = None,
+        async_client: AsyncGroq = None,
+        model: str = "openai/gpt-oss-120b",
+        cache: ExtractionCache = None,
+        use_cache: bool = config.EXTRACTION_CACHE_ENABLED,
+    ):
+        """
+        client / async_client: optional pre-built (Async)Groq clients, e.g. pointed at a
+        local OpenAI-compatible server. Default clients are built from GROQ_API_KEY.
+        cache: extraction cache consulted before every request; when omitted and
+        use_cache is set, the shared on-disk cache under config.VECTOR_DB_DIR is used.
+        """
         self.api_key = os.getenv("GROQ_API_KEY")
-        if not self.api_key:
+        if client is None and not self.api_key:
             raise ValueError("GROQ_API_KEY environment variable not set.")
-        self.client = Groq(api_key=self.api_key)
-        self.model = "openai/gpt-oss-120b"
+        # SDK-level retries are disabled: 429/5xx backoff is handled here so that
+        # concurrent workers can share the provider's rate-limit window.
+        self.client = client or Groq(api_key=self.api_key, max_retries=0)
+        self._async_client = async_client
+        self.model = model
+        self.system_prompt = SYSTEM_PROMPT
+        self.cache = cache if cache is not None else (ExtractionCache() if use_cache else None)
+
+        # Shared across worker threads: nobody sends before this monotonic time.
+        self._cooldown_until = 0.0
+        self._cooldown_lock = threading.Lock()
+
+    @property
+    def async_client(self) -> AsyncGroq:
+        if self._async_client is None:
+            if not self.api_key:
+                raise ValueError("GROQ_API_KEY environment variable not set.")
+            self._async_client = AsyncGroq(api_key=self.api_key, max_retries=0)
+        return self._async_client
+
+    def _request_kwargs(self, text_chunk: str, system_prompt: str = None) -> Dict[str, Any]:
+        return dict(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt or self.system_prompt},
+                {"role": "user", "content": text_chunk}
+            ],
+            temperature=0,  # Low temperature for deterministic output
+            stream=False,
+            response_format={"type": "json_object"} # Enforce JSON mode if supported, but prompt handles it too.
+        )
+
+    # -------------------- rate limiting --------------------
+
+    def _cooldown_remaining(self) -> float:
+        return self._cooldown_until - time.monotonic()
+
+    def _extend_cooldown(self, delay: float):
+        with self._cooldown_lock:
+            self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+
+    def _backoff(self, error: Exception, attempt: int) -> float:
+        """Seconds to wait before retrying `error`; a 429 also pauses every other worker."""
+        ceiling = min(config.EXTRACT_RETRY_MAX_DELAY, config.EXTRACT_RETRY_BASE_DELAY * 2 ** (attempt - 1))
+        response = getattr(error, "response", None)
+        hinted = rate_limit_delay(getattr(response, "headers", None))
+
+        if isinstance(error, RateLimitError):
+            wait = hinted if hinted is not None else ceiling
+            self._extend_cooldown(wait)
+            # Spread the restart so workers don't hit the window edge together.
+            return wait + random.uniform(0, min(ceiling, max(wait, config.EXTRACT_RETRY_BASE_DELAY)))
+
+        if hinted is not None:
+            return hinted + random.uniform(0, ceiling)
+        return random.uniform(0, ceiling)  # full jitter
+
+    def _note_rate_limits(self, headers):
+        """Pauses proactively when a successful response says the window is used up."""
+        if not headers:
+            return
+        for remaining, reset in (
+            ("x-ratelimit-remaining-requests", "x-ratelimit-reset-requests"),
+            ("x-ratelimit-remaining-tokens", "x-ratelimit-reset-tokens"),
+        ):
+            if headers.get(remaining) == "0" and headers.get(reset):
+                delay = _parse_duration(headers[reset])
+                if delay:
+                    self._extend_cooldown(delay)
+
+    # -------------------- results --------------------
+
+    @staticmethod
+    def _result(index: int, status: str, data: dict = None, error: str = None, attempts: int = 0, cached: bool = False) -> Dict[str, Any]:
+        return {
+            "index": index,
+            "status": status,
+            "data": data if data is not None else {"nodes": [], "relationships": []},
+            "error": error,
+            "attempts": attempts,
+            "cached": cached,
+        }
+
+    def _cached_result(self, index: int, text_chunk: str) -> Optional[Dict[str, Any]]:
+        if self.cache is None:
+            return None
+        data = self.cache.get(text_chunk, self.model, self.system_prompt)
+        if data is None:
+            return None
+        return self._result(index, "ok", data, cached=True)
+
+    def _parse_result(self, index: int, text_chunk: str, content: str, attempts: int) -> Dict[str, Any]:
+        try:
+            data = parse_graph_json(content.strip())
+        except ValueError as e:
+            return self._result(index, "parse_error", error=str(e), attempts=attempts)
+        # Only successful extractions are cached; failures are retried on the next run.
+        if self.cache is not None:
+            self.cache.put(text_chunk, self.model, self.system_prompt, data)
+        return self._result(index, "ok", data, attempts=attempts)
+
+    # -------------------- single chunk --------------------
+
+    def _request(self, text_chunk: str, system_prompt: str = None) -> Tuple[str, Any]:
+        raw = self.client.chat.completions.with_raw_response.create(**self._request_kwargs(text_chunk, system_prompt))
+        completion = raw.parse()
+        return completion.choices[0].message.content or "", raw.headers
+
+    def _complete(self, text: str, max_retries: int, system_prompt: str = None) -> Tuple[Optional[str], Optional[str], int]:
+        """
+        Sends one request, retrying rate limits and transient failures.
+        Returns (content, error, attempts); exactly one of content / error is set.
+        """
+        attempts = 0
+        while True:
+            wait = self._cooldown_remaining()
+            if wait > 0:
+                time.sleep(wait)
+
+            attempts += 1
+            try:
+                content, headers = self._request(text, system_prompt)
+            except RETRYABLE_ERRORS as e:
+                if attempts > max_retries:
+                    return None, str(e), attempts
+                time.sleep(self._backoff(e, attempts))
+                continue
+            except Exception as e:
+                return None, str(e), attempts
+
+            self._note_rate_limits(headers)
+            return content, None, attempts
+
+    def _extract_one(self, index: int, text_chunk: str, max_retries: int) -> Dict[str, Any]:
+        cached = self._cached_result(index, text_chunk)
+        if cached is not None:
+            return cached
+
+        content, error, attempts = self._complete(text_chunk, max_retries)
+        if error is not None:
+            return self._result(index, "error", error=error, attempts=attempts)
+        return self._parse_result(index, text_chunk, content, attempts)
 
     def extract(self, text_chunk: str) -> dict:
         """
         Extracts entities and relationships from the given text chunk using Groq (openai/gpt-oss-120b).
         Returns a Python dictionary with 'nodes' and 'relationships'.
         """
-        system_prompt = (
-            "You are a precise Knowledge Graph Entity Extractor. "
-            "Your task is to analyze the input text and extract entities (nodes) and "
-            "relationships specific to the domain of the text.\n\n"
-            "Output MUST be strict JSON only. No conversational text, no markdown code blocks.\n"
-            "The JSON structure must be exactly:\n"
-            "{\n"
-            '  "nodes": [{"id": "Name", "label": "Type", "properties": {}}],\n'
-            '  "relationships": [{"source": "Name", "target": "Name", "type": "RELATION_TYPE", "properties": {}}]\n'
-            "}\n\n"
-            "Rules:\n"
-            "1. Nodes: 'id' should be the entity name. 'label' is the entity type (e.g., Person, Course, University).\n"
-            "2. Relationships: 'type' defines the link (e.g., TEACHES, LOCATED_AT).\n"
-            "3. Do not include duplicate nodes or relationships.\n"
-            "4. If no entities are found, return empty lists for nodes and relationships.\n"
-            "5. Ensure the JSON is valid."
-        )
+        result = self._extract_one(0, text_chunk, config.EXTRACT_MAX_RETRIES)
+        if result["status"] == "parse_error":
+            print(result["error"])
+        elif result["status"] == "error":
+            print(f"Error during extraction: {result['error']}")
+        return result["data"]
+
+    def extract_result(self, text_chunk: str, index: int = 0, max_retries: int = config.EXTRACT_MAX_RETRIES) -> Dict[str, Any]:
+        """Like extract(), but returns the full extract_many result dict (status, error, attempts, cached)."""
+        return self._extract_one(index, text_chunk, max_retries)
+
+    # -------------------- many chunks --------------------
+
+    def extract_many(
+        self,
+        chunks: Sequence[str],
+        max_in_flight: int = config.EXTRACT_MAX_IN_FLIGHT,
+        max_retries: int = config.EXTRACT_MAX_RETRIES,
+    ) -> List[Dict[str, Any]]:
+        """
+        Extracts every chunk with up to `max_in_flight` concurrent requests.
+        Returns one result per chunk, in input order:
+            {"index", "status": "ok" | "parse_error" | "error", "data", "error", "attempts", "cached"}
+        """
+        if not chunks:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_in_flight, len(chunks)))) as pool:
+            futures = [
+                pool.submit(self._extract_one, i, chunk, max_retries)
+                for i, chunk in enumerate(chunks)
+            ]
+            return [f.result() for f in futures]
+
+    async def _aextract_one(self, index: int, text_chunk: str, max_retries: int, slots: asyncio.Semaphore) -> Dict[str, Any]:
+        cached = self._cached_result(index, text_chunk)
+        if cached is not None:
+            return cached
+
+        attempts = 0
+        async with slots:
+            while True:
+                wait = self._cooldown_remaining()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+                attempts += 1
+                try:
+                    raw = await self.async_client.chat.completions.with_raw_response.create(
+                        **self._request_kwargs(text_chunk)
+                    )
+                    completion = await raw.parse()
+                    content, headers = completion.choices[0].message.content or "", raw.headers
+                except RETRYABLE_ERRORS as e:
+                    if attempts > max_retries:
+                        return self._result(index, "error", error=str(e), attempts=attempts)
+                    await asyncio.sleep(self._backoff(e, attempts))
+                    continue
+                except Exception as e:
+                    return self._result(index, "error", error=str(e), attempts=attempts)
+
+                self._note_rate_limits(headers)
+                return self._parse_result(index, text_chunk, content, attempts)
+
+    async def aextract_many(
+        self,
+        chunks: Sequence[str],
+        max_in_flight: int = config.EXTRACT_MAX_IN_FLIGHT,
+        max_retries: int = config.EXTRACT_MAX_RETRIES,
+    ) -> List[Dict[str, Any]]:
+        """Async variant of extract_many; same result format and ordering."""
+        slots = asyncio.Semaphore(max(1, max_in_flight))
+        return await asyncio.gather(*(
+            self._aextract_one(i, chunk, max_retries, slots)
+            for i, chunk in enumerate(chunks)
+        ))
+
+    # -------------------- packed requests --------------------
+
+    def _cached_packed_result(self, index: int, text_chunk: str) -> Optional[Dict[str, Any]]:
+        cached = self._cached_result(index, text_chunk)
+        if cached is not None or self.cache is None:
+            return cached
+        data = self.cache.get(text_chunk, self.model, PACKED_SYSTEM_PROMPT)
+        if data is None:
+            return None
+        return self._result(index, "ok", data, cached=True)
+
+    def _pack(self, ids: List[str], texts: List[str], pending: List[int], token_budget: int,
+              max_chunks: int) -> List[List[int]]:
+        """Greedily groups pending chunks, in input order, into packs that fit the prompt budget."""
+        packs, current = [], []
+        used = estimate_tokens(PACKED_SYSTEM_PROMPT)
+        for i in pending:
+            cost = estimate_tokens(texts[i]) + estimate_tokens(CHUNK_HEADER.format(id=ids[i]))
+            if current and (used + cost > token_budget or len(current) >= max_chunks):
+                packs.append(current)
+                current, used = [], estimate_tokens(PACKED_SYSTEM_PROMPT)
+            current.append(i)
+            used += cost
+        if current:
+            packs.append(current)
+        return packs
+
+    def _extract_pack(self, ids: List[str], texts: List[str], pack: List[int], max_retries: int):
+        """
+        Extracts one pack. Returns (results, requests, prompt_tokens, fallbacks) where
+        results is a list of (index, result). Chunks missing from the packed answer,
+        or every chunk if the answer cannot be parsed, are retried one by one. A
+        request that still fails after its retries (network, rate limit, 5xx) fails
+        every chunk of the pack instead, so an outage is not multiplied by the pack size.
+        """
+        single_cost = estimate_tokens(self.system_prompt)
+        if len(pack) == 1:
+            i = pack[0]
+            return [(i, self._extract_one(i, texts[i], max_retries))], 1, single_cost + estimate_tokens(texts[i]), 0
+
+        body = "\n".join(CHUNK_HEADER.format(id=ids[i]) + texts[i] for i in pack)
+        requests = 1
+        prompt_tokens = estimate_tokens(PACKED_SYSTEM_PROMPT) + estimate_tokens(body)
+        content, error, attempts = self._complete(body, max_retries, PACKED_SYSTEM_PROMPT)
+        if error is not None:
+            return [(i, self._result(i, "error", error=error, attempts=attempts)) for i in pack], \
+                requests, prompt_tokens, 0
 
         try:
-            completion = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": text_chunk}
-                ],
-                temperature=0,  # Low temperature for deterministic output
-                stream=False,
-                response_format={"type": "json_object"} # Enforce JSON mode if supported, but prompt handles it too.
-            )
-            
-            response_content = completion.choices[0].message.content.strip()
-            
-            # Helper to parse JSON even if there's minor noise (though system prompt forbids it)
-            # The model usually respects the system prompt well.
-            try:
-                data = json.loads(response_content)
-                return data
-            except json.JSONDecodeError:
-                # Fallback: try to find the JSON block if wrapped in markdown
-                match = re.search(r'\{.*\}', response_content, re.DOTALL)
-                if match:
-                    return json.loads(match.group(0))
-                else:
-                    print(f"Error parsing JSON. Raw output: {response_content}")
-                    return {"nodes": [], "relationships": []}
-
-        except Exception as e:
-            print(f"Error during extraction: {e}")
-            return {"nodes": [], "relationships": []}
+            per_chunk = parse_graph_json(content.strip()).get("chunks") or {}
+        except (ValueError, AttributeError):
+            per_chunk = {}
+        if isinstance(per_chunk, list):
+            # Tolerate [{"id": ..., "nodes": ..., "relationships": ...}] answers.
+            per_chunk = {str(c.get("id")): c for c in per_chunk if isinstance(c, dict)}
+        if not isinstance(per_chunk, dict):
+            per_chunk = {}
+
+        results, fallbacks = [], 0
+        for i in pack:
+            entry = per_chunk.get(ids[i])
+            if isinstance(entry, dict) and isinstance(entry.get("nodes", []), list) \
+                    and isinstance(entry.get("relationships", []), list):
+                data = {"nodes": entry.get("nodes", []), "relationships": entry.get("relationships", [])}
+                if self.cache is not None:
+                    self.cache.put(texts[i], self.model, PACKED_SYSTEM_PROMPT, data)
+                results.append((i, self._result(i, "ok", data, attempts=attempts)))
+            else:
+                fallbacks += 1
+                requests += 1
+                prompt_tokens += single_cost + estimate_tokens(texts[i])
+                results.append((i, self._extract_one(i, texts[i], max_retries)))
+        return results, requests, prompt_tokens, fallbacks
+
+    def extract_packed(
+        self,
+        records: Sequence[Dict[str, Any]],
+        token_budget: int = config.EXTRACT_PACK_TOKEN_BUDGET,
+        max_chunks: int = config.EXTRACT_PACK_MAX_CHUNKS,
+        max_in_flight: int = config.EXTRACT_MAX_IN_FLIGHT,
+        max_retries: int = config.EXTRACT_MAX_RETRIES,
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Extracts chunk records ({"id", "text", ...} as written to *.chunks.jsonl) by
+        packing several chunks into each request, up to `token_budget` estimated
+        prompt tokens and `max_chunks` chunks.
+
+        Returns (results, report): results follow the extract_many format, in input
+        order, with the record's "chunk_id" added; report compares the requests and
+        estimated prompt tokens spent against one request per chunk. Chunks of a pack
+        whose request failed come back with status "error", for the caller to retry.
+        """
+        records = list(records)
+        ids = [str(r.get("id") or f"chunk_{i}") for i, r in enumerate(records)]
+        texts = [r.get("text") or "" for r in records]
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(records)
+        pending = []
+        for i, text in enumerate(texts):
+            cached = self._cached_packed_result(i, text)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.append(i)
+
+        packs = self._pack(ids, texts, pending, token_budget, max_chunks)
+        requests = prompt_tokens = fallbacks = 0
+        if packs:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_in_flight, len(packs)))) as pool:
+                futures = [pool.submit(self._extract_pack, ids, texts, pack, max_retries) for pack in packs]
+                for future in futures:
+                    pack_results, pack_requests, pack_tokens, pack_fallbacks = future.result()
+                    for i, result in pack_results:
+                        results[i] = result
+                    requests += pack_requests
+                    prompt_tokens += pack_tokens
+                    fallbacks += pack_fallbacks
+
+        for i, result in enumerate(results):
+            result["chunk_id"] = ids[i]
+
+        single_cost = estimate_tokens(self.system_prompt)
+        unpacked_tokens = sum(single_cost + estimate_tokens(texts[i]) for i in pending)
+        report = {
+            "chunks": len(records),
+            "cached": len(records) - len(pending),
+            "packs": len(packs),
+            "fallback_chunks": fallbacks,
+            "failed_chunks": sum(1 for r in results if r["status"] == "error"),
+            "requests": requests,
+            "requests_unpacked": len(pending),
+            "requests_saved": len(pending) - requests,
+            "prompt_tokens": prompt_tokens,
+            "prompt_tokens_unpacked": unpacked_tokens,
+            "prompt_tokens_saved": unpacked_tokens - prompt_tokens,
+        }
+        return results, report
 
 if __name__ == "__main__":
     extractor = GraphExtractor()
@@ -1,9 +1,21 @@
 import os
+import sys
+import time
+import random
 import logging
-from typing import Any, Dict, List, Optional
-from neo4j import GraphDatabase, Driver
-from neo4j.exceptions import ServiceUnavailable
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from neo4j import GraphDatabase, Driver, Record, Session, READ_ACCESS
+from neo4j.exceptions import ServiceUnavailable, SessionExpired, TransientError
 from dotenv import load_dotenv
+
+try:
+    import config
+except ImportError:
+    # Fallback for running script directly from subfolder
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+    import config
+
 load_dotenv() 
 # Configure logging
 logging.basicConfig(
@@ -12,25 +24,42 @@ logging.basicConfig(
 )
 logger = logging.getLogger("Neo4jConnector")
 
+# Errors after which the session is thrown away and an auto-commit query replayed.
+RETRYABLE_ERRORS = (ServiceUnavailable, SessionExpired, TransientError)
+
+
 class Neo4jConnector:
     _instance = None
     _driver: Optional[Driver] = None
+    _lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(Neo4jConnector, cls).__new__(cls)
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(Neo4jConnector, cls).__new__(cls)
         return cls._instance
 
     def __init__(self):
-        if hasattr(self, '_initialized') and self._initialized:
+        if getattr(self, '_initialized', False):
             return
-            
-        self._uri = os.getenv("NEO4J_URI")
-        self._username = os.getenv("NEO4J_USERNAME")
-        self._password = os.getenv("NEO4J_PASSWORD")
-        
-        self.connect()
-        self._initialized = True
+
+        with self._lock:
+            if getattr(self, '_initialized', False):
+                return
+
+            self._uri = os.getenv("NEO4J_URI")
+            self._username = os.getenv("NEO4J_USERNAME")
+            self._password = os.getenv("NEO4J_PASSWORD")
+
+            # Sessions are not thread-safe, so each worker thread keeps its own
+            # long-lived session. All of them are tracked so close() can release them.
+            self._local = threading.local()
+            self._sessions: List[Session] = []
+            self._sessions_lock = threading.Lock()
+
+            self.connect()
+            self._initialized = True
 
     def connect(self):
         """Initializes the Neo4j driver."""
@@ -41,13 +70,53 @@ class Neo4jConnector:
 
             self._driver = GraphDatabase.driver(
                 self._uri, 
-                auth=(self._username, self._password)
+                auth=(self._username, self._password),
+                max_connection_pool_size=config.NEO4J_MAX_CONNECTION_POOL_SIZE,
+                connection_acquisition_timeout=config.NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+                max_connection_lifetime=config.NEO4J_MAX_CONNECTION_LIFETIME,
+                max_transaction_retry_time=config.NEO4J_MAX_TRANSACTION_RETRY_TIME,
             )
             logger.info("Neo4j driver initialized.")
         except Exception as e:
             logger.error(f"Failed to initialize Neo4j driver: {e}")
             self._driver = None
 
+    def _session(self) -> Session:
+        """Returns the calling thread's session, opening one if needed."""
+        session = getattr(self._local, "session", None)
+        if session is None or session.closed():
+            session = self._driver.session(fetch_size=config.NEO4J_FETCH_SIZE)
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions = [s for s in self._sessions if not s.closed()]
+                self._sessions.append(session)
+        return session
+
+    def _discard_session(self):
+        """Drops the calling thread's session after an error so the next call starts clean."""
+        session = getattr(self._local, "session", None)
+        self._local.session = None
+        if session is not None:
+            try:
+                session.close()
+            except Exception:
+                pass
+
+    def _execute(self, write: bool, work: Callable, *args) -> Any:
+        """
+        Runs `work(tx, *args)` as a managed transaction on the thread's session.
+        The driver retries transient errors itself, within NEO4J_MAX_TRANSACTION_RETRY_TIME,
+        so nothing is retried here; after an error the session is replaced for the next call.
+        """
+        session = self._session()
+        try:
+            if write:
+                return session.execute_write(work, *args)
+            return session.execute_read(work, *args)
+        except Exception:
+            self._discard_session()
+            raise
+
     def verify_connectivity(self) -> bool:
         """Checks if the Neo4j database is reachable."""
         if not self._driver:
@@ -66,7 +135,12 @@ class Neo4jConnector:
             return False
 
     def run_cypher(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        """Executes a Cypher query safely."""
+        """
+        Executes a Cypher query safely, as an auto-commit transaction. The driver
+        does not retry those, so after a lost session or transient error it is
+        replayed on a fresh session up to NEO4J_MAX_RETRIES times with jittered
+        backoff (callers send idempotent MERGE / IF NOT EXISTS statements).
+        """
         if not self._driver:
             logger.error("Driver not authorized or initialized.")
             return []
@@ -74,21 +148,97 @@ class Neo4jConnector:
         if params is None:
             params = {}
 
-        results = []
+        attempt = 0
+        while True:
+            try:
+                result = self._session().run(query, params)
+                return [record.data() for record in result]
+            except RETRYABLE_ERRORS as e:
+                self._discard_session()
+                attempt += 1
+                if attempt > config.NEO4J_MAX_RETRIES:
+                    logger.error(f"Service unavailable during query: {e}")
+                    raise
+                delay = random.uniform(0, min(5.0, 0.2 * 2 ** attempt))
+                logger.warning(f"Transient Neo4j error ({e}); retry {attempt}/{config.NEO4J_MAX_RETRIES} in {delay:.2f}s")
+                time.sleep(delay)
+            except Exception as e:
+                self._discard_session()
+                logger.error(f"Query execution error: {e}")
+                raise
+
+    def write_batch(self, statements: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """
+        Executes several (query, params) statements inside a single managed
+        write transaction. Either every statement is committed or none is,
+        and the driver retries the whole batch on transient errors.
+        """
+        if not self._driver:
+            logger.error("Driver not authorized or initialized.")
+            return
+
+        if not statements:
+            return
+
+        def _work(tx):
+            for query, params in statements:
+                tx.run(query, params or {}).consume()
+
         try:
-            with self._driver.session() as session:
-                result = session.run(query, params)
-                results = [record.data() for record in result]
-            return results
+            self._execute(True, _work)
         except ServiceUnavailable as e:
-            logger.error(f"Service unavailable during query: {e}")
+            logger.error(f"Service unavailable during batch write: {e}")
             raise
         except Exception as e:
-            logger.error(f"Query execution error: {e}")
+            logger.error(f"Batch write error: {e}")
             raise
 
+    def read(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Executes a read query in a managed read transaction (retried by the driver on transient errors)."""
+        if not self._driver:
+            logger.error("Driver not authorized or initialized.")
+            return []
+
+        def _work(tx):
+            return [record.data() for record in tx.run(query, params or {})]
+
+        try:
+            return self._execute(False, _work)
+        except Exception as e:
+            logger.error(f"Read query error: {e}")
+            raise
+
+    def stream(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        fetch_size: int = config.NEO4J_FETCH_SIZE,
+    ) -> Iterator[Record]:
+        """
+        Lazily yields records of a large read, pulling `fetch_size` records per round trip.
+        Records are yielded as-is (no dict conversion). Uses its own session that stays
+        open until the generator is exhausted or closed; not retried, since a partially
+        consumed stream cannot be replayed transparently.
+        """
+        if not self._driver:
+            logger.error("Driver not authorized or initialized.")
+            return
+
+        with self._driver.session(default_access_mode=READ_ACCESS, fetch_size=fetch_size) as session:
+            for record in session.run(query, params or {}):
+                yield record
+
     def close(self):
-        """Closes the driver connection."""
+        """Closes all open sessions and the driver connection."""
+        with self._sessions_lock:
+            for session in self._sessions:
+                try:
+                    session.close()
+                except Exception:
+                    pass
+            self._sessions = []
+        self._local = threading.local()
+
         if self._driver:
             self._driver.close()
             logger.info("Neo4j driver closed.")
@@ -0,0 +1,340 @@
+import os
+import sys
+import json
+import time
+import queue
+import signal
+import logging
+import argparse
+import threading
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import config
+    from src.graph_engine.builder import GraphBuilder
+    from src.graph_engine.work_queue import ExtractionQueue, PENDING, EXTRACTED
+    from src.vector_engine.store import iter_chunk_records
+except ImportError:
+    # Fallback for running script directly from subfolder
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+    import config
+    from src.graph_engine.builder import GraphBuilder
+    from src.graph_engine.work_queue import ExtractionQueue, PENDING, EXTRACTED
+    from src.vector_engine.store import iter_chunk_records
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("GraphPipeline")
+
+# Marks the end of a queue's input; every consumer passes it on to the next one.
+_DONE = object()
+
+
+class GraphIngestPipeline:
+    """
+    Streams chunk records (*.chunks.jsonl) into the graph in three stages
+    joined by bounded queues:
+
+        reader --records--> extract workers (Groq) --results--> writer (Neo4j)
+
+    `extract_workers` threads run LLM extraction concurrently while a single
+    writer resolves aliases across up to `write_batch` chunks (EntityResolver)
+    and writes them with GraphBuilder.write_graph, so Groq and Neo4j waits
+    overlap. Full queues block the stage before them (backpressure), which
+    keeps at most ~2 * queue_size chunks in memory whatever the corpus size.
+
+    stop() stops reading new records; everything already read is still
+    extracted and written (drain). stop(drain=False) drops queued records.
+
+    With a `work_queue` (ExtractionQueue) every chunk is checkpointed: records
+    are enqueued first, the reader then leases chunks from the queue, each
+    extraction is stored before its graph write and written chunks are marked
+    done. A run that crashed or was stopped resumes where it left off: the
+    leases of a crashed run on this host are reclaimed, stored extractions are
+    written without new LLM calls, and only chunks that never finished
+    extraction are extracted again. Chunks that keep failing end up in the
+    queue's dead-letter state.
+    """
+
+    def __init__(
+        self,
+        builder: Optional[GraphBuilder] = None,
+        extract_workers: int = config.EXTRACT_MAX_IN_FLIGHT,
+        queue_size: int = config.GRAPH_PIPELINE_QUEUE_SIZE,
+        write_batch: int = config.GRAPH_PIPELINE_WRITE_BATCH,
+        flush_interval: float = config.GRAPH_PIPELINE_FLUSH_S,
+        work_queue: Optional[ExtractionQueue] = None,
+    ):
+        self.builder = builder or GraphBuilder()
+        self.work_queue = work_queue
+        self.extract_workers = max(1, extract_workers)
+        self.queue_size = max(1, queue_size)
+        self.write_batch = max(1, write_batch)
+        self.flush_interval = flush_interval
+        self._stopping = threading.Event()
+        self._abort = threading.Event()
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, Any] = {}
+        self._in_flight = 0
+
+    def stop(self, drain: bool = True):
+        """Stops intake; with drain=False also discards records not yet extracted."""
+        self._stopping.set()
+        if not drain:
+            self._abort.set()
+
+    @property
+    def stopping(self) -> bool:
+        return self._stopping.is_set()
+
+    def _count(self, **deltas):
+        with self._stats_lock:
+            for key, value in deltas.items():
+                self.stats[key] = self.stats.get(key, 0) + value
+
+    # -------------------- stages --------------------
+
+    def _read(self, records: Optional[Iterable[Dict[str, Any]]], out: queue.Queue, to_write: queue.Queue):
+        try:
+            if self.work_queue is not None:
+                self._read_queue(records, out, to_write)
+                return
+            for record in records:
+                if self._stopping.is_set():
+                    break
+                self._count(read=1)
+                self._put(out, record)
+        except Exception as e:
+            logger.error(f"Reading chunk records failed: {e}")
+            self._count(read_errors=1)
+        finally:
+            for _ in range(self.extract_workers):
+                out.put(_DONE)
+
+    def _read_queue(self, records: Optional[Iterable[Dict[str, Any]]], out: queue.Queue, to_write: queue.Queue):
+        """
+        Enqueues `records`, then feeds leased chunks to the stages: stored
+        extractions straight to the writer, pending chunks to the extract
+        workers. Keeps leasing until nothing is leasable and every chunk handed
+        out has settled, so chunks that failed earlier in the run (and whose
+        retry delay has passed) are retried. Leases of runs that exited are
+        reclaimed; while other runs still hold leases, it waits for them to be
+        completed or to expire. Leases not handed on are released.
+        """
+        if records is not None:
+            self._count(enqueued=self.work_queue.enqueue(records))
+        self._count(reclaimed=self.work_queue.reclaim_orphaned())
+        waiting = False
+        while not self._stopping.is_set():
+            leased = 0
+            for state, target in ((EXTRACTED, to_write), (PENDING, out)):
+                items = self.work_queue.lease(state, self.queue_size)
+                leased += len(items)
+                for i, item in enumerate(items):
+                    if self._stopping.is_set() or self._abort.is_set():
+                        self.work_queue.release([it["id"] for it in items[i:]])
+                        break
+                    self._count(read=1, resumed=int(state == EXTRACTED))
+                    self._settle(-1)
+                    if state == EXTRACTED:
+                        self._put(target, (item["id"], item["data"]))
+                    else:
+                        self._put(target, {"id": item["id"], "text": item["text"]})
+            if not leased:
+                with self._stats_lock:
+                    idle = self._in_flight <= 0
+                if idle:
+                    self._count(reclaimed=self.work_queue.reclaim_orphaned())
+                    held = self.work_queue.leased_elsewhere()
+                    if not held:
+                        return
+                    if not waiting:
+                        logger.warning(f"Waiting for {held} chunk(s) leased by another run "
+                                       f"(until written or their {self.work_queue.lease_s:.0f}s lease expires)")
+                        waiting = True
+                time.sleep(0.2)
+
+    def _settle(self, n: int = 1):
+        """A chunk handed out by the queue reader is done with (written, failed or dropped); -1 hands one out."""
+        if self.work_queue is not None:
+            with self._stats_lock:
+                self._in_flight -= n
+
+    def _put(self, q: queue.Queue, item: Any):
+        # blocks while the next stage is behind, but wakes up to notice an abort
+        while not self._abort.is_set():
+            try:
+                q.put(item, timeout=0.2)
+                return
+            except queue.Full:
+                self._count(backpressure_waits=1)
+
+    def _extract(self, inbox: queue.Queue, out: queue.Queue):
+        extractor = self.builder.extractor
+        while True:
+            record = inbox.get()
+            if record is _DONE:
+                out.put(_DONE)
+                return
+            if self._abort.is_set():
+                self._count(dropped=1)
+                if self.work_queue is not None:
+                    self.work_queue.release([record.get("id")])
+                    self._settle()
+                continue
+            text = record.get("text") or ""
+            start = time.perf_counter()
+            try:
+                result = extractor.extract_result(text)
+            except Exception as e:
+                result = {"status": "error", "error": str(e), "data": {"nodes": [], "relationships": []},
+                          "cached": False}
+            self._count(extract_seconds=time.perf_counter() - start)
+            if result["status"] != "ok":
+                logger.error(f"Extraction failed for chunk {record.get('id')}: {result['error']}")
+                self._count(extract_failed=1)
+                if self.work_queue is not None:
+                    self._count(dead=self.work_queue.fail([record.get("id")], str(result["error"])))
+                    self._settle()
+                continue
+            self._count(extracted=1, extract_cached=int(bool(result.get("cached"))))
+            if self.work_queue is not None and not self.work_queue.mark_extracted(record.get("id"), result["data"]):
+                # the lease expired and the chunk went to another run; it writes it
+                self._count(lease_lost=1)
+                self._settle()
+                continue
+            self._put(out, (record.get("id"), result["data"]))
+
+    def _write(self, inbox: queue.Queue):
+        finished = 0
+        batch: List[Dict[str, Any]] = []
+        deadline = 0.0
+        while finished < self.extract_workers:
+            # a partial batch is flushed after flush_interval so a slow trickle still lands
+            timeout = max(0.0, deadline - time.monotonic()) if batch else None
+            try:
+                item = inbox.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is _DONE:
+                finished += 1
+            elif item is not None:
+                if not batch:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.append(item)
+            if batch and (len(batch) >= self.write_batch or item is None):
+                self._write_batch(batch)
+                batch = []
+        if batch:
+            self._write_batch(batch)
+
+    def _write_batch(self, batch: List[tuple]):
+        """Writes a batch of (chunk id, extraction) pairs."""
+        start = time.perf_counter()
+        chunk_ids = [chunk_id for chunk_id, _ in batch]
+        try:
+            data, _ = self.builder.resolver.resolve(extraction for _, extraction in batch)
+            nodes, rels = 0, 0
+            if data["nodes"] or data["relationships"]:
+                nodes, rels = self.builder.write_graph(data["nodes"], data["relationships"])
+            if self.work_queue is not None:
+                self.work_queue.mark_written(chunk_ids)
+            self._count(written=len(batch), nodes_written=nodes, rels_written=rels, write_batches=1)
+        except Exception as e:
+            logger.error(f"Graph write of {len(batch)} chunks failed: {e}")
+            self._count(write_failed=len(batch))
+            if self.work_queue is not None:
+                self._count(dead=self.work_queue.fail(chunk_ids, str(e)))
+        self._settle(len(batch))
+        self._count(write_seconds=time.perf_counter() - start)
+
+    # -------------------- run --------------------
+
+    def run(self, records: Optional[Iterable[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Pushes records through all stages and returns once everything is written.
+        With a work queue, records may be None to just resume what it holds.
+        """
+        if records is None and self.work_queue is None:
+            raise ValueError("records are required without a work queue")
+        self.stats = {}
+        self._in_flight = 0
+        self._stopping.clear()
+        self._abort.clear()
+        to_extract: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        to_write: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=self._read, args=(records, to_extract, to_write), name="graph-read",
+                                    daemon=True)]
+        threads += [
+            threading.Thread(target=self._extract, args=(to_extract, to_write), name=f"graph-extract-{i}", daemon=True)
+            for i in range(self.extract_workers)
+        ]
+        writer = threading.Thread(target=self._write, args=(to_write,), name="graph-write", daemon=True)
+        for thread in threads + [writer]:
+            thread.start()
+        # join with a timeout so the main thread stays responsive to signals
+        while writer.is_alive():
+            writer.join(0.5)
+        for thread in threads:
+            thread.join()
+
+        elapsed = time.perf_counter() - start
+        report = dict(self.stats)
+        report.update(
+            elapsed_seconds=round(elapsed, 3),
+            chunks_per_second=round(report.get("written", 0) / elapsed, 2) if elapsed else 0.0,
+            interrupted=self._stopping.is_set(),
+        )
+        for key in ("extract_seconds", "write_seconds"):
+            report[key] = round(report.get(key, 0.0), 3)
+        if self.work_queue is not None:
+            report["queue"] = self.work_queue.stats()
+        return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("Graph ingest pipeline: *.chunks.jsonl -> Groq extraction -> graph store")
+    parser.add_argument("--processed-dir", default=str(config.PROCESSED_DATA_DIR))
+    parser.add_argument("--workers", type=int, default=config.EXTRACT_MAX_IN_FLIGHT, help="concurrent extractions")
+    parser.add_argument("--queue-size", type=int, default=config.GRAPH_PIPELINE_QUEUE_SIZE)
+    parser.add_argument("--write-batch", type=int, default=config.GRAPH_PIPELINE_WRITE_BATCH,
+                        help="chunks resolved and written per Neo4j transaction")
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many chunks")
+    parser.add_argument("--no-queue", action="store_true",
+                        help="don't checkpoint chunks in the work queue (config.GRAPH_QUEUE_PATH)")
+    parser.add_argument("--resume", action="store_true",
+                        help="only finish what the work queue holds; don't read the processed dir")
+    args = parser.parse_args()
+
+    work_queue = ExtractionQueue() if config.GRAPH_QUEUE_ENABLED and not args.no_queue else None
+    if args.resume and work_queue is None:
+        parser.error("--resume needs the work queue")
+    pipeline = GraphIngestPipeline(
+        extract_workers=args.workers, queue_size=args.queue_size, write_batch=args.write_batch,
+        work_queue=work_queue,
+    )
+
+    def _on_signal(signum, frame):
+        if pipeline.stopping:
+            logger.warning("Second interrupt: dropping queued chunks.")
+            pipeline.stop(drain=False)
+        else:
+            logger.warning("Interrupted: finishing chunks already read (interrupt again to drop them).")
+            pipeline.stop()
+
+    signal.signal(signal.SIGINT, _on_signal)
+    signal.signal(signal.SIGTERM, _on_signal)
+
+    records = None
+    if not args.resume:
+        records = iter_chunk_records(Path(args.processed_dir))
+        if args.limit:
+            records = islice(records, args.limit)
+    report = pipeline.run(records)
+    print(json.dumps(report, indent=2))
+    pipeline.builder.store.close()
+    if work_queue is not None:
+        work_queue.close()
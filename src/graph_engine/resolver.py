@@ -0,0 +1,246 @@
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Titles dropped before comparing names ("Prof. Sarvesh" == "Sarvesh").
+HONORIFICS = {
+    "prof", "professor", "dr", "doctor", "mr", "mrs", "ms", "miss", "sir", "madam",
+    "shri", "smt", "er", "hod", "dean",
+}
+
+# Labels whose members are commonly referred to by a partial name, so that a
+# single-token name ("Sarvesh") may merge into a longer one ("Sarvesh Kumar").
+PERSON_LABELS = {"Person", "Professor", "Teacher", "Faculty", "Student", "Author", "Instructor", "Lecturer"}
+
+GENERIC_LABEL = "Entity"
+
+# Roman numerals up to xxxix ("Mathematics II"); names differing in one are distinct entities.
+_ROMAN = re.compile(r"x{0,3}(ix|iv|v?i{0,3})")
+
+
+def normalize_name(name: str) -> str:
+    """Case-folds, strips punctuation and honorifics: 'Prof. Sarvesh' -> 'sarvesh'."""
+    text = unicodedata.normalize("NFKC", name).casefold()
+    tokens = re.findall(r"\w+", text)
+    kept = [t for t in tokens if t not in HONORIFICS]
+    return " ".join(kept or tokens)
+
+
+def _label_key(label: str) -> str:
+    return re.sub(r"\W", "", label).casefold()
+
+
+def _trigrams(norm: str) -> set:
+    compact = f"  {norm.replace(' ', '')} "
+    return {compact[i:i + 3] for i in range(len(compact) - 2)}
+
+
+def _is_identifier(token: str) -> bool:
+    """Numbers, years, course codes (any token with a digit) and roman numerals."""
+    return any(c.isdigit() for c in token) or bool(_ROMAN.fullmatch(token))
+
+
+def _spelling_variants(a: str, b: str) -> bool:
+    """
+    True if two normalized names may differ only in spelling: the tokens they
+    don't share are present on both sides and none of them is an identifier.
+    "engineering mathematics i" / "ii", "syllabus 2023" / "2024" and
+    "algorithms" / "algorithms lab" stay apart.
+    """
+    tokens_a, tokens_b = Counter(a.split()), Counter(b.split())
+    only_a, only_b = tokens_a - tokens_b, tokens_b - tokens_a
+    if not only_a or not only_b:
+        return not only_a and not only_b
+    return not any(_is_identifier(t) for t in (only_a + only_b))
+
+
+def _merge_props(into: Dict[str, Any], other: Dict[str, Any]):
+    """Fills missing keys from `other`; lists are unioned, other conflicts keep the first value."""
+    for key, value in (other or {}).items():
+        if key not in into or into[key] in (None, "", []):
+            into[key] = value
+        elif isinstance(into[key], list) and isinstance(value, list):
+            into[key] = into[key] + [v for v in value if v not in into[key]]
+
+
+class _DisjointSet:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> bool:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return False
+        self.parent[max(ra, rb)] = min(ra, rb)
+        return True
+
+
+class EntityResolver:
+    """
+    Merges entity aliases across every extraction of a document or batch before
+    anything is written to the graph.
+
+    Names are normalized first; entries with the same normalized name and label
+    are one entity. Remaining aliases are found through a blocking index (shared
+    name tokens and a compact-name prefix), so only entities in the same block
+    are compared:
+      - character-trigram Jaccard >= `similarity` (spelling variants), unless
+        the names differ in a number, year, course code or roman numeral, or
+        one only adds words to the other, and
+      - for person-like labels, a single-token name contained in exactly one
+        longer name of its block ("Sarvesh" -> "Sarvesh Kumar").
+    Blocks larger than `max_block_size` (very common tokens) are skipped.
+    """
+
+    def __init__(self, similarity: float = 0.85, max_block_size: int = 200):
+        self.similarity = similarity
+        self.max_block_size = max_block_size
+
+    def resolve(self, extractions: Iterable[Dict[str, Any]]) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, Any]]:
+        """
+        extractions: extractor outputs ({"nodes": [...], "relationships": [...]}), one per chunk.
+        Returns (graph, report) where graph holds each distinct entity and edge once.
+        """
+        extractions = [e for e in extractions if e]
+
+        # 1. Units: one per (normalized name, label).
+        unit_index: Dict[Tuple[str, str], int] = {}
+        units: List[Dict[str, Any]] = []
+        nodes_in = 0
+        chunk_maps: List[Dict[str, int]] = []
+
+        def unit_for(norm: str, label: str) -> int:
+            key = (norm, _label_key(label))
+            if key not in unit_index:
+                unit_index[key] = len(units)
+                units.append({"norm": norm, "label": label, "names": Counter(), "props": {}})
+            return unit_index[key]
+
+        for data in extractions:
+            names = {}
+            for node in data.get("nodes", []):
+                raw = node.get("id")
+                if not raw:
+                    continue
+                nodes_in += 1
+                name = " ".join(str(raw).split())
+                u = unit_for(normalize_name(name), node.get("label") or GENERIC_LABEL)
+                units[u]["names"][name] += 1
+                _merge_props(units[u]["props"], node.get("properties") or {})
+                names.setdefault(raw, u)
+            chunk_maps.append(names)
+
+        # Relationship endpoints that were never extracted as nodes.
+        by_norm: Dict[str, List[int]] = defaultdict(list)
+        for (norm, _), u in unit_index.items():
+            by_norm[norm].append(u)
+
+        # 2. Alias detection through the blocking index.
+        dsu = _DisjointSet(len(units))
+        blocks: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        for u, unit in enumerate(units):
+            for token in set(unit["norm"].split()):
+                blocks[(_label_key(unit["label"]), "t:" + token)].append(u)
+            blocks[(_label_key(unit["label"]), "p:" + unit["norm"].replace(" ", "")[:4])].append(u)
+
+        grams = {}
+        compared = set()
+        for members in blocks.values():
+            if len(members) < 2 or len(members) > self.max_block_size:
+                continue
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    pair = (a, b) if a < b else (b, a)
+                    if pair in compared:
+                        continue
+                    compared.add(pair)
+                    ga = grams.setdefault(a, _trigrams(units[a]["norm"]))
+                    gb = grams.setdefault(b, _trigrams(units[b]["norm"]))
+                    if (len(ga & gb) / len(ga | gb) >= self.similarity
+                            and _spelling_variants(units[a]["norm"], units[b]["norm"])):
+                        dsu.union(a, b)
+
+        for u, unit in enumerate(units):
+            tokens = unit["norm"].split()
+            if len(tokens) != 1 or unit["label"] not in PERSON_LABELS:
+                continue
+            block = blocks.get((_label_key(unit["label"]), "t:" + tokens[0]), [])
+            if len(block) > self.max_block_size:
+                continue
+            longer = {dsu.find(v) for v in block if v != u and len(units[v]["norm"].split()) > 1}
+            if len(longer) == 1:
+                dsu.union(u, longer.pop())
+
+        # 3. One canonical entity per cluster.
+        clusters: Dict[int, List[int]] = defaultdict(list)
+        for u in range(len(units)):
+            clusters[dsu.find(u)].append(u)
+
+        canonical: Dict[int, Dict[str, Any]] = {}
+        aliases_merged = 0
+        for root, members in clusters.items():
+            names = Counter()
+            labels = Counter()
+            props: Dict[str, Any] = {}
+            for u in members:
+                names.update(units[u]["names"])
+                labels[units[u]["label"]] += sum(units[u]["names"].values())
+                _merge_props(props, units[u]["props"])
+            name = max(names.items(), key=lambda kv: (kv[1], len(kv[0])))[0]
+            specific = [(c, l) for l, c in labels.items() if l != GENERIC_LABEL]
+            label = max(specific)[1] if specific else GENERIC_LABEL
+            aliases = sorted(n for n in names if n != name)
+            aliases_merged += len(aliases)
+            if aliases:
+                props.setdefault("aliases", aliases)
+            canonical[root] = {"id": name, "label": label, "properties": props}
+
+        def resolve_endpoint(name: str, chunk_map: Dict[str, int]) -> str:
+            u = chunk_map.get(name)
+            if u is None:
+                candidates = by_norm.get(normalize_name(str(name)), [])
+                u = candidates[0] if len(candidates) == 1 else None
+            return name if u is None else canonical[dsu.find(u)]["id"]
+
+        # 4. Edges, deduplicated on (source, TYPE, target) after remapping.
+        edges: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        rels_in = 0
+        for data, chunk_map in zip(extractions, chunk_maps):
+            for rel in data.get("relationships", []):
+                source, target = rel.get("source"), rel.get("target")
+                if not source or not target:
+                    continue
+                rels_in += 1
+                src = resolve_endpoint(source, chunk_map)
+                dst = resolve_endpoint(target, chunk_map)
+                if src == dst and source != target:
+                    continue  # two aliases of one entity linked to each other
+                rel_type = rel.get("type", "RELATED_TO")
+                key = (src, re.sub(r"\W", "", str(rel_type)).upper(), dst)
+                if key in edges:
+                    _merge_props(edges[key]["properties"], rel.get("properties") or {})
+                else:
+                    edges[key] = {"source": src, "target": dst, "type": rel_type,
+                                  "properties": dict(rel.get("properties") or {})}
+
+        graph = {"nodes": list(canonical.values()), "relationships": list(edges.values())}
+        writes_in = nodes_in + rels_in
+        writes_out = len(graph["nodes"]) + len(graph["relationships"])
+        report = {
+            "chunks": len(extractions),
+            "nodes_in": nodes_in,
+            "nodes_out": len(graph["nodes"]),
+            "relationships_in": rels_in,
+            "relationships_out": len(graph["relationships"]),
+            "aliases_merged": aliases_merged,
+            "writes_removed": writes_in - writes_out,
+            "write_reduction": (writes_in - writes_out) / writes_in if writes_in else 0.0,
+        }
+        return graph, report
@@ -0,0 +1,118 @@
+import os
+import sys
+import logging
+import threading
+from typing import Iterable, Set
+
+try:
+    import config
+    from src.graph_engine.neo4j_ops import Neo4jConnector
+except ImportError:
+    # Fallback for running script directly from subfolder
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+    import config
+    from src.graph_engine.neo4j_ops import Neo4jConnector
+
+logger = logging.getLogger("GraphSchema")
+
+# Super-label carried by every node the builder writes. Its `name` index lets
+# relationship endpoints be resolved without a label-less full scan.
+ENTITY_LABEL = "Entity"
+
+
+class GraphSchema:
+    """
+    Creates the `name` constraints / indexes for every label the builder writes
+    and remembers which labels are already covered, so the DDL only runs the
+    first time a label is seen.
+
+    Labels are expected to be sanitized by the builder (`sanitize_label`) before
+    they get here.
+
+    mode: "constraint" creates a uniqueness constraint on (label, name), which also
+          backs MERGE with an index; "index" creates a plain range index. If a
+          constraint cannot be created (e.g. existing duplicates), a range index
+          is created instead.
+    """
+
+    def __init__(self, connector: Neo4jConnector = None, mode: str = config.GRAPH_SCHEMA_MODE):
+        if mode not in ("constraint", "index"):
+            raise ValueError(f"Unknown schema mode: {mode}")
+        self.connector = connector or Neo4jConnector()
+        self.mode = mode
+        self._ready: Set[str] = set()
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load_existing(self):
+        """Seeds the cache with labels that already have a `name` index in the database."""
+        try:
+            rows = self.connector.run_cypher(
+                "SHOW INDEXES YIELD entityType, labelsOrTypes, properties "
+                "WHERE entityType = 'NODE' RETURN labelsOrTypes, properties"
+            )
+        except Exception as e:
+            logger.warning(f"Could not list existing indexes: {e}")
+            rows = []
+        for row in rows:
+            if row.get("properties") == ["name"] and len(row.get("labelsOrTypes") or []) == 1:
+                self._ready.add(row["labelsOrTypes"][0])
+
+    def ensure_labels(self, labels: Iterable[str]):
+        """Makes sure `name` lookups are indexed for each label (and for :Entity)."""
+        with self._lock:
+            if not self._loaded:
+                self._load_existing()
+                self._loaded = True
+                if ENTITY_LABEL not in self._ready:
+                    self._create_entity_index()
+
+            for label in set(labels) - self._ready:
+                if not label:
+                    continue
+                self._create_label_index(label)
+                self._ready.add(label)
+
+    def _create_label_index(self, label: str):
+        if label == ENTITY_LABEL:
+            return
+        if self.mode == "constraint":
+            try:
+                self.connector.run_cypher(
+                    f"CREATE CONSTRAINT {label}_name_unique IF NOT EXISTS "
+                    f"FOR (n:{label}) REQUIRE n.name IS UNIQUE"
+                )
+                logger.info(f"Created uniqueness constraint on :{label}(name)")
+                return
+            except Exception as e:
+                logger.warning(f"Constraint on :{label}(name) failed, falling back to index: {e}")
+
+        self.connector.run_cypher(
+            f"CREATE INDEX {label}_name_index IF NOT EXISTS FOR (n:{label}) ON (n.name)"
+        )
+        logger.info(f"Created index on :{label}(name)")
+
+    def _create_entity_index(self):
+        """
+        Indexes the shared :Entity label. The same name may exist under several
+        labels, so this is always a plain index, never a uniqueness constraint.
+        Runs once per database: nodes written before the super-label existed are
+        tagged so endpoint lookups can find them.
+        """
+        self.connector.run_cypher(
+            f"CREATE INDEX entity_name_index IF NOT EXISTS FOR (n:{ENTITY_LABEL}) ON (n.name)"
+        )
+        self.backfill_entity_label()
+        self._ready.add(ENTITY_LABEL)
+        logger.info(f"Created index on :{ENTITY_LABEL}(name)")
+
+    def backfill_entity_label(self):
+        """Adds :Entity to every node that does not carry it yet."""
+        self.connector.run_cypher(
+            f"MATCH (n) WHERE NOT n:{ENTITY_LABEL} "
+            f"CALL {{ WITH n SET n:{ENTITY_LABEL} }} IN TRANSACTIONS OF 10000 ROWS"
+        )
+
+    def is_ready(self, label: str) -> bool:
+        with self._lock:
+            return label in self._ready
@@ -0,0 +1,611 @@
+import os
+import sys
+import json
+import time
+import fcntl
+import shutil
+import logging
+import argparse
+import tempfile
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import config
+except ImportError:
+    # Fallback for running script directly from subfolder
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+    import config
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("GraphSnapshot")
+
+POINTER_NAME = "snapshot.json"
+LOCK_NAME = ".lock"
+SNAPSHOT_VERSION = 1
+
+
+def _clean_name(name: Any) -> str:
+    # names are stored one per line
+    return str(name).replace("\r", " ").replace("\n", " ")
+
+
+# -------------------- change log --------------------
+
+class GraphChangeLog:
+    """
+    Append-only JSON-lines log of what GraphBuilder wrote: one line per
+    write_graph call, {"t", "nodes": [name, ...], "edges": [[source, TYPE, target], ...]}.
+    Snapshots remember the offset they have applied, so refreshing one only
+    reads the lines written since. The builder only MERGEs, so replaying a
+    line twice is harmless.
+
+    Offsets are logical: once a snapshot has folded the log in, truncate()
+    drops the lines before its offset and the file starts with a
+    {"base": offset} line, so later offsets keep counting from there.
+    Appends and truncation take an exclusive flock on the file; an append
+    that waited on a file truncate() has since replaced reopens the path.
+    """
+
+    def __init__(self, path: Path = config.GRAPH_CHANGELOG_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        while True:
+            f = open(self.path, "ab")
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    current = os.stat(self.path).st_ino
+                except FileNotFoundError:
+                    current = None
+                if current == os.fstat(f.fileno()).st_ino:
+                    yield f
+                    return
+            finally:
+                f.close()  # also releases the flock
+
+    @staticmethod
+    def _header(f) -> Tuple[int, int]:
+        """(logical offset of the first entry, its byte position) of an open log."""
+        f.seek(0)
+        first = f.readline()
+        if first.startswith(b'{"base"') and first.endswith(b"\n"):
+            return json.loads(first)["base"], len(first)
+        return 0, 0
+
+    def append(self, nodes: Iterable[str], edges: Iterable[Tuple[str, str, str]]):
+        line = json.dumps({
+            "t": round(time.time(), 3),
+            "nodes": [_clean_name(n) for n in nodes],
+            "edges": [[_clean_name(s), t, _clean_name(d)] for s, t, d in edges],
+        }, ensure_ascii=False) + "\n"
+        with self._lock, self._locked() as f:
+            f.write(line.encode("utf-8"))
+
+    def size(self) -> int:
+        """Logical offset of the end of the log."""
+        try:
+            with open(self.path, "rb") as f:
+                base, start = self._header(f)
+                return base + os.fstat(f.fileno()).st_size - start
+        except FileNotFoundError:
+            return 0
+
+    def read(self, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """Complete entries written after `offset`, and the offset after the last one."""
+        try:
+            with open(self.path, "rb") as f:
+                base, start = self._header(f)
+                size = base + os.fstat(f.fileno()).st_size - start
+                if offset < base:
+                    # truncated past us by a compaction, whose snapshot version is already current
+                    logger.warning(f"{self.path} was truncated past offset {offset}; reload the snapshot")
+                    return [], offset
+                if size < offset:
+                    logger.warning(f"{self.path} is shorter than the applied offset (rotated?); replaying it all")
+                    offset = base
+                f.seek(start + offset - base)
+                data = f.read()
+        except FileNotFoundError:
+            return [], offset
+        end = data.rfind(b"\n") + 1  # a line still being written is left for next time
+        entries = [json.loads(line) for line in data[:end].splitlines() if line.strip()]
+        return entries, offset + end
+
+    def truncate(self, offset: int) -> int:
+        """
+        Drops the entries before `offset` (a line boundary a snapshot has
+        applied up to), keeping the offsets of the rest. Returns the bytes dropped.
+        """
+        with self._lock, self._locked(), open(self.path, "rb") as r:
+            base, start = self._header(r)
+            if offset <= base:
+                return 0
+            r.seek(start + offset - base)
+            rest = r.read()
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp, "wb") as out:
+                out.write(json.dumps({"base": offset}).encode("utf-8") + b"\n")
+                out.write(rest)
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp, self.path)
+        logger.info(f"Truncated {self.path} to offset {offset} ({offset - base} bytes dropped)")
+        return offset - base
+
+
+# -------------------- CSR build --------------------
+
+def _csr(n: int, src: np.ndarray, dst: np.ndarray, types: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Undirected CSR adjacency of the directed edges (src -> dst): every edge is
+    listed under both endpoints, with direction 1 (outgoing) or -1 (incoming).
+    """
+    both_src = np.concatenate([src, dst])
+    order = np.argsort(both_src, kind="stable")
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(both_src, minlength=n), out=indptr[1:])
+    return {
+        "indptr": indptr,
+        "neighbors": np.concatenate([dst, src])[order].astype(np.int32),
+        "types": np.concatenate([types, types])[order].astype(np.int16),
+        "direction": np.concatenate([np.ones(len(src), np.int8), -np.ones(len(src), np.int8)])[order],
+    }
+
+
+class _Builder:
+    """Collects names and (source, type, target) edges, deduplicated, into arrays."""
+
+    def __init__(self, names: Sequence[str] = (), rel_types: Sequence[str] = ()):
+        self.names = list(names)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        self.rel_types = list(rel_types)
+        self.type_ids = {t: i for i, t in enumerate(self.rel_types)}
+        self.src: List[int] = []
+        self.dst: List[int] = []
+        self.types: List[int] = []
+
+    def node(self, name: str) -> int:
+        name = _clean_name(name)
+        node_id = self.ids.get(name)
+        if node_id is None:
+            node_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return node_id
+
+    def edge(self, source: str, rel_type: str, target: str):
+        type_id = self.type_ids.get(rel_type)
+        if type_id is None:
+            type_id = self.type_ids[rel_type] = len(self.rel_types)
+            self.rel_types.append(rel_type)
+        self.src.append(self.node(source))
+        self.dst.append(self.node(target))
+        self.types.append(type_id)
+
+    def edges(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if not self.src:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty
+        rows = np.unique(np.stack([self.src, self.dst, self.types], axis=1).astype(np.int64), axis=0)
+        return rows[:, 0], rows[:, 1], rows[:, 2]
+
+
+@contextmanager
+def _writer_lock(snapshot_dir: Path):
+    """Exclusive flock on snapshot_dir/.lock: one snapshot writer at a time, across processes."""
+    snapshot_dir = Path(snapshot_dir)
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    with open(snapshot_dir / LOCK_NAME, "a+") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+def write_snapshot(
+    snapshot_dir: Path,
+    names: Sequence[str],
+    rel_types: Sequence[str],
+    src: np.ndarray,
+    dst: np.ndarray,
+    types: np.ndarray,
+    log_offset: int,
+    generation: int,
+) -> Path:
+    """
+    Writes a new snapshot version into a temporary directory, renames it to
+    snapshot_dir/v<generation> and then swaps snapshot.json to it (readers
+    keep their memory maps of the old one). The generation is raised above
+    the current version's if needed. Versions older than the previous one,
+    and temporary directories left by a crashed writer, are removed.
+    The caller holds _writer_lock(snapshot_dir).
+    """
+    snapshot_dir = Path(snapshot_dir)
+    tmp = Path(tempfile.mkdtemp(prefix=".tmp-", dir=snapshot_dir))
+    try:
+        for key, array in _csr(len(names), src, dst, types).items():
+            np.save(tmp / f"{key}.npy", array)
+        (tmp / "names.txt").write_text("".join(f"{n}\n" for n in names), encoding="utf-8")
+
+        previous = _read_pointer(snapshot_dir)
+        if previous:
+            generation = max(generation, previous["generation"] + 1)
+        name = f"v{generation}"
+        path = snapshot_dir / name
+        shutil.rmtree(path, ignore_errors=True)  # left by a writer that died before swapping the pointer
+        os.rename(tmp, path)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    pointer = {
+        "version": SNAPSHOT_VERSION,
+        "current": name,
+        "generation": generation,
+        "log_offset": log_offset,
+        "rel_types": list(rel_types),
+        "nodes": len(names),
+        "edges": int(len(src)),
+    }
+    pointer_tmp = snapshot_dir / (POINTER_NAME + ".tmp")
+    pointer_tmp.write_text(json.dumps(pointer), encoding="utf-8")
+    os.replace(pointer_tmp, snapshot_dir / POINTER_NAME)
+
+    keep = {name, previous["current"]} if previous else {name}
+    for old in snapshot_dir.glob("*"):
+        if old.is_dir() and (old.name.startswith(".tmp-") or old.name.startswith("v") and old.name not in keep):
+            shutil.rmtree(old, ignore_errors=True)
+    logger.info(f"Wrote graph snapshot {name}: {len(names)} nodes, {len(src)} edges")
+    return path
+
+
+def _read_pointer(snapshot_dir: Path) -> Optional[Dict[str, Any]]:
+    path = Path(snapshot_dir) / POINTER_NAME
+    if not path.exists():
+        return None
+    pointer = json.loads(path.read_text(encoding="utf-8"))
+    if pointer.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported graph snapshot version: {pointer.get('version')}")
+    return pointer
+
+
+def build_snapshot(
+    nodes: Iterable[str],
+    edges: Iterable[Tuple[str, str, str]],
+    snapshot_dir: Path = config.GRAPH_SNAPSHOT_DIR,
+    log_offset: int = 0,
+) -> Path:
+    """Builds a snapshot from plain node names and (source, TYPE, target) edges (e.g. a fixture graph)."""
+    builder = _Builder()
+    for name in nodes:
+        builder.node(name)
+    for source, rel_type, target in edges:
+        builder.edge(source, rel_type, target)
+    with _writer_lock(snapshot_dir):
+        return write_snapshot(snapshot_dir, builder.names, builder.rel_types, *builder.edges(), log_offset, 1)
+
+
+def export_snapshot(
+    store=None,
+    snapshot_dir: Path = config.GRAPH_SNAPSHOT_DIR,
+    change_log: Optional[GraphChangeLog] = None,
+) -> Path:
+    """
+    Streams every node and relationship out of the graph store (GraphStore.iter_nodes /
+    iter_edges; NEO4J_FETCH_SIZE records per round trip on Neo4j) into a new snapshot.
+    The change log offset is taken first, so writes that race with the export are
+    replayed on refresh; the lines before it are then truncated from the log.
+    """
+    if store is None:
+        from src.graph_engine.store import get_graph_store
+        store = get_graph_store()
+    change_log = change_log or GraphChangeLog()
+    log_offset = change_log.size()
+    start = time.perf_counter()
+    snapshot = build_snapshot(store.iter_nodes(), store.iter_edges(), snapshot_dir, log_offset)
+    logger.info(f"Exported the graph from {store.backend} in {time.perf_counter() - start:.1f}s")
+    change_log.truncate(log_offset)
+    return snapshot
+
+
+# -------------------- snapshot --------------------
+
+class GraphSnapshot:
+    """
+    In-process, read-only view of the entity graph for query-time expansion.
+
+    The CSR arrays (indptr / neighbors / types / direction) are memory-mapped
+    from the current snapshot version; names map to ids through a dict built
+    at load. refresh() applies change-log lines written since the snapshot as
+    an in-memory overlay (new names and edges) and switches to a newer version
+    when one has been written. Serving processes only refresh; compact() folds
+    the overlay into a new version and is run by the writer (`snapshot.py update`).
+
+    k_hop() expands seeds breadth-first with vectorized CSR gathers. A path's
+    score is the product over its edges of decay / sqrt(degree of the node it
+    leaves), so paths through hubs fade fastest; each node and edge keeps its
+    best path's score.
+    """
+
+    def __init__(
+        self,
+        snapshot_dir: Path = config.GRAPH_SNAPSHOT_DIR,
+        change_log: Optional[GraphChangeLog] = None,
+        mmap: bool = True,
+    ):
+        self.snapshot_dir = Path(snapshot_dir)
+        self.change_log = change_log or GraphChangeLog()
+        self.mmap = mmap
+        # refresh / compact swap the arrays and grow the overlay; expansions hold it too
+        self._lock = threading.RLock()
+        pointer = _read_pointer(self.snapshot_dir)
+        if pointer is None:
+            raise FileNotFoundError(f"No graph snapshot in {self.snapshot_dir}")
+        self._load(pointer)
+
+    def _load(self, pointer: Dict[str, Any]):
+        path = self.snapshot_dir / pointer["current"]
+        mode = "r" if self.mmap else None
+        arrays = {key: np.load(path / f"{key}.npy", mmap_mode=mode)
+                  for key in ("indptr", "neighbors", "types", "direction")}
+        names = (path / "names.txt").read_text(encoding="utf-8").split("\n")[:-1]
+        self.pointer = pointer
+        self.indptr, self.neighbors = arrays["indptr"], arrays["neighbors"]
+        self.types, self.direction = arrays["types"], arrays["direction"]
+        self.base_nodes = len(names)
+        self.names = names
+        self.ids = {name: i for i, name in enumerate(names)}
+        self._lower: Optional[Dict[str, int]] = None
+        self.rel_types = list(pointer["rel_types"])
+        self._type_ids = {t: i for i, t in enumerate(self.rel_types)}
+        self.log_offset = pointer["log_offset"]
+        # strictly increasing in this process, so cache keys never come back to an older state
+        self.generation = max(pointer["generation"], getattr(self, "generation", 0) + 1)
+        self.base_degree = np.diff(self.indptr)
+        # overlay: edges from the change log, both directions, as (neighbor, type, direction)
+        self._overlay: Dict[int, List[Tuple[int, int, int]]] = defaultdict(list)
+        self._overlay_edges: set = set()
+        self.overlay_size = 0
+        self.refresh()
+
+    # ---------- names ----------
+
+    def lookup(self, name: str) -> Optional[int]:
+        """Node id of an exact name, else of a case-insensitive match."""
+        node_id = self.ids.get(name)
+        if node_id is None:
+            if self._lower is None:
+                self._lower = {}
+                for n, i in self.ids.items():
+                    self._lower.setdefault(n.casefold(), i)
+            node_id = self._lower.get(name.casefold())
+        return node_id
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    # ---------- incremental refresh ----------
+
+    def _add_name(self, name: str) -> int:
+        name = _clean_name(name)
+        node_id = self.ids.get(name)
+        if node_id is None:
+            node_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+            if self._lower is not None:
+                self._lower.setdefault(name.casefold(), node_id)
+        return node_id
+
+    def _has_base_edge(self, a: int, b: int, type_id: int) -> bool:
+        if a >= self.base_nodes:
+            return False
+        lo, hi = self.indptr[a], self.indptr[a + 1]
+        hit = (self.neighbors[lo:hi] == b) & (self.types[lo:hi] == type_id) & (self.direction[lo:hi] == 1)
+        return bool(hit.any())
+
+    def _apply(self, entry: Dict[str, Any]):
+        for name in entry.get("nodes", []):
+            self._add_name(name)
+        for source, rel_type, target in entry.get("edges", []):
+            a, b = self._add_name(source), self._add_name(target)
+            type_id = self._type_ids.get(rel_type)
+            if type_id is None:
+                type_id = self._type_ids[rel_type] = len(self.rel_types)
+                self.rel_types.append(rel_type)
+            key = (a, b, type_id)
+            if key in self._overlay_edges or self._has_base_edge(a, b, type_id):
+                continue
+            self._overlay_edges.add(key)
+            self._overlay[a].append((b, type_id, 1))
+            self._overlay[b].append((a, type_id, -1))
+            self.overlay_size += 1
+
+    def refresh(self) -> bool:
+        """
+        Switches to a newer snapshot version if one was written, then applies
+        change-log lines past the applied offset. True if anything changed.
+        """
+        with self._lock:
+            pointer = _read_pointer(self.snapshot_dir)
+            if pointer is not None and pointer["current"] != self.pointer["current"]:
+                self._load(pointer)
+                return True
+            entries, offset = self.change_log.read(self.log_offset)
+            for entry in entries:
+                self._apply(entry)
+            self.log_offset = offset
+            self.generation += len(entries)
+            return bool(entries)
+
+    def compact(self) -> Path:
+        """
+        Writes base + overlay as a new snapshot version, switches to it and
+        truncates the change log up to the folded-in offset. A full O(E)
+        rewrite: run it from the writer or the CLI, not on the query path.
+        """
+        with _writer_lock(self.snapshot_dir), self._lock:
+            self.refresh()  # another writer may have compacted since
+            base = self.pointer["edges"]
+            out = self.direction == 1
+            src = np.repeat(np.arange(self.base_nodes), self.base_degree)[out]
+            dst, types = np.asarray(self.neighbors)[out], np.asarray(self.types)[out]
+            extra = np.array(sorted(self._overlay_edges), dtype=np.int64).reshape(-1, 3)
+            path = write_snapshot(
+                self.snapshot_dir, self.names, self.rel_types,
+                np.concatenate([src, extra[:, 0]]), np.concatenate([dst, extra[:, 1]]),
+                np.concatenate([types, extra[:, 2]]), self.log_offset, self.generation + 1,
+            )
+            logger.info(f"Compacted {len(extra)} change-log edges into {base} snapshot edges")
+            self._load(_read_pointer(self.snapshot_dir))
+            self.change_log.truncate(self.pointer["log_offset"])
+        return path
+
+    # ---------- expansion ----------
+
+    def degree(self, ids: np.ndarray) -> np.ndarray:
+        deg = np.zeros(len(ids), dtype=np.int64)
+        base = ids < self.base_nodes
+        deg[base] = self.base_degree[ids[base]]
+        if self._overlay:
+            deg += np.fromiter((len(self._overlay.get(i, ())) for i in ids.tolist()), dtype=np.int64, count=len(ids))
+        return deg
+
+    def _gather(self, frontier: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """
+        All adjacency entries of the frontier nodes: (position in frontier,
+        neighbor, type, direction). Snapshot rows are sliced out of the CSR
+        arrays in one gather; overlay rows are appended.
+        """
+        pos = np.flatnonzero(frontier < self.base_nodes)
+        starts = self.indptr[frontier[pos]]
+        lens = self.indptr[frontier[pos] + 1] - starts
+        idx = np.repeat(starts - np.cumsum(lens) + lens, lens) + np.arange(lens.sum())
+        parts = [(np.repeat(pos, lens), np.asarray(self.neighbors[idx], dtype=np.int64),
+                  np.asarray(self.types[idx], dtype=np.int64), np.asarray(self.direction[idx], dtype=np.int64))]
+        if self._overlay:
+            rows = [(i, v, t, d) for i, u in enumerate(frontier.tolist()) for v, t, d in self._overlay.get(u, ())]
+            if rows:
+                parts.append(tuple(np.array(col, dtype=np.int64) for col in zip(*rows)))
+        return tuple(np.concatenate(col) for col in zip(*parts))
+
+    def k_hop(
+        self,
+        seeds: Iterable[int],
+        hops: int = config.GRAPH_SNAPSHOT_HOPS,
+        decay: float = config.GRAPH_SNAPSHOT_DECAY,
+        max_nodes: int = config.GRAPH_SNAPSHOT_MAX_NODES,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Expands up to `hops` hops from the seed ids (score 1.0), stopping early
+        once `max_nodes` nodes are reached (the best-scored new nodes are
+        kept). Returns the reached "nodes" and their "scores", plus every
+        traversed edge as "source" / "type" / "target" (original direction)
+        with its best path score in "edge_scores".
+        """
+        with self._lock:
+            return self._k_hop(np.unique(np.fromiter(seeds, dtype=np.int64)), hops, decay, max_nodes)
+
+    def _k_hop(self, seeds: np.ndarray, hops: int, decay: float, max_nodes: int) -> Dict[str, np.ndarray]:
+        nodes, scores = [seeds], [np.ones(len(seeds))]
+        frontier, frontier_scores = seeds, scores[0]
+        edge_parts = []
+        reached = len(seeds)
+        for _ in range(hops):
+            if not len(frontier):
+                break
+            pos, v, t, d = self._gather(frontier)
+            if not len(pos):
+                break
+            leave = frontier_scores * decay / np.sqrt(np.maximum(self.degree(frontier), 1))
+            w = leave[pos]
+            u = frontier[pos]
+            outgoing = d == 1
+            edge_parts.append((np.where(outgoing, u, v), t, np.where(outgoing, v, u), w))
+
+            # best-scored path into each node not reached yet
+            seen = np.concatenate(nodes)
+            new = ~np.isin(v, seen)
+            cand, cand_w = v[new], w[new]
+            order = np.lexsort((-cand_w, cand))
+            cand, cand_w = cand[order], cand_w[order]
+            first = np.ones(len(cand), dtype=bool)
+            first[1:] = cand[1:] != cand[:-1]
+            cand, cand_w = cand[first], cand_w[first]
+            room = max(0, max_nodes - reached)
+            if len(cand) > room:
+                keep = np.argsort(-cand_w, kind="stable")[:room]
+                cand, cand_w = cand[keep], cand_w[keep]
+            nodes.append(cand)
+            scores.append(cand_w)
+            reached += len(cand)
+            frontier, frontier_scores = cand, cand_w
+
+        if edge_parts:
+            a, t, b, w = (np.concatenate(col) for col in zip(*edge_parts))
+            # keep each edge once, with its best score
+            order = np.lexsort((-w, b, t, a))
+            a, t, b, w = a[order], t[order], b[order], w[order]
+            first = np.ones(len(a), dtype=bool)
+            first[1:] = (a[1:] != a[:-1]) | (t[1:] != t[:-1]) | (b[1:] != b[:-1])
+            a, t, b, w = a[first], t[first], b[first], w[first]
+        else:
+            a = t = b = np.zeros(0, dtype=np.int64)
+            w = np.zeros(0)
+        return {
+            "nodes": np.concatenate(nodes),
+            "scores": np.concatenate(scores),
+            "source": a,
+            "type": t,
+            "target": b,
+            "edge_scores": w,
+        }
+
+    def facts(self, names: Iterable[str], k: int = 20, **kwargs) -> List[Dict[str, Any]]:
+        """Top-k traversed edges around the named entities, as facts "source -[TYPE]-> target"."""
+        with self._lock:
+            seeds = {i for i in (self.lookup(n) for n in names) if i is not None}
+            if not seeds:
+                return []
+            result = self.k_hop(seeds, **kwargs)
+            order = np.argsort(-result["edge_scores"], kind="stable")[:k]
+            hits = []
+            for i in order.tolist():
+                source = self.names[result["source"][i]]
+                target = self.names[result["target"][i]]
+                fact = f"{source} -[{self.rel_types[result['type'][i]]}]-> {target}"
+                hits.append({"id": fact, "kind": "fact", "text": fact, "score": float(result["edge_scores"][i])})
+            return hits
+
+
+# -------------------- CLI --------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("Graph snapshot (CSR) for in-process k-hop retrieval")
+    parser.add_argument("command", choices=["export", "update", "query"])
+    parser.add_argument("--snapshot-dir", default=str(config.GRAPH_SNAPSHOT_DIR))
+    parser.add_argument("--name", action="append", default=[], help="seed entity name (repeatable)")
+    parser.add_argument("--hops", type=int, default=config.GRAPH_SNAPSHOT_HOPS)
+    parser.add_argument("-k", type=int, default=20)
+    parser.add_argument("--min-edges", type=int, default=config.GRAPH_SNAPSHOT_COMPACT_EDGES,
+                        help="update: change-log edges needed before compacting")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_snapshot(snapshot_dir=Path(args.snapshot_dir))
+    elif args.command == "update":
+        snapshot = GraphSnapshot(Path(args.snapshot_dir), mmap=False)
+        if snapshot.overlay_size and snapshot.overlay_size >= args.min_edges:
+            snapshot.compact()
+        else:
+            logger.info(f"{snapshot.overlay_size} new change-log edges (compacting from {args.min_edges}).")
+    else:
+        snapshot = GraphSnapshot(Path(args.snapshot_dir))
+        for hit in snapshot.facts(args.name, k=args.k, hops=args.hops):
+            print(f"{hit['score']:.4f}  {hit['text']}")
@@ -0,0 +1,366 @@
+import os
+import sys
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import config
+    from src.graph_engine.neo4j_ops import Neo4jConnector
+    from src.graph_engine.schema import GraphSchema, ENTITY_LABEL
+except ImportError:
+    # Fallback for running script directly from subfolder
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+    import config
+    from src.graph_engine.neo4j_ops import Neo4jConnector
+    from src.graph_engine.schema import GraphSchema, ENTITY_LABEL
+
+logger = logging.getLogger("GraphStore")
+
+# Rows handed to GraphStore.upsert, grouped the way the builder groups them:
+#   nodes: {label: [{"name", "props"}, ...]}
+#   rels:  {TYPE: [{"source", "target", "source_label", "target_label", "props"}, ...]}
+# Labels and types are already sanitized. An endpoint label of None matches
+# any node with that name (the :Entity lookup).
+NodeRows = Dict[str, List[Dict[str, Any]]]
+RelRows = Dict[str, List[Dict[str, Any]]]
+
+
+def _batches(rows: List[Dict[str, Any]], size: int):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+class GraphStore:
+    """
+    Where the entity graph lives. GraphBuilder writes through upsert (one
+    transaction per call) or upsert_node / upsert_edge (one write each); the
+    graph retriever reads through neighbors; the graph snapshot exports
+    through iter_nodes / iter_edges.
+
+    Nodes are unique per (label, name) and every node also counts as :Entity,
+    so a name may belong to several nodes. Edges are unique per
+    (source node, TYPE, target node). Properties are merged on upsert.
+    """
+
+    backend = ""
+
+    def ensure_labels(self, labels: Iterable[str]):
+        """Prepares name lookups for these labels (no-op where indexes are fixed)."""
+
+    def upsert(self, nodes: NodeRows, rels: RelRows, batch_size: int = config.GRAPH_WRITE_BATCH_SIZE):
+        """Merges every node, then every edge, in a single transaction."""
+        raise NotImplementedError
+
+    def upsert_node(self, label: str, name: str, props: Dict[str, Any]):
+        raise NotImplementedError
+
+    def upsert_edge(self, rel_type: str, source: str, target: str, source_label: Optional[str] = None,
+                    target_label: Optional[str] = None, props: Optional[Dict[str, Any]] = None):
+        raise NotImplementedError
+
+    def get_nodes(self, names: Iterable[str]) -> List[Dict[str, Any]]:
+        """Nodes with these exact names: {"name", "labels", "properties"}."""
+        raise NotImplementedError
+
+    def neighbors(self, names: Iterable[str], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Edges touching the named nodes, either direction, as {"source", "type",
+        "target", "matched"} (matched: the name they were found through).
+        Longer matched names come first; `limit` caps the rows.
+        """
+        raise NotImplementedError
+
+    def iter_nodes(self) -> Iterator[str]:
+        """Every node name."""
+        raise NotImplementedError
+
+    def iter_edges(self) -> Iterator[Tuple[str, str, str]]:
+        """Every edge as (source name, TYPE, target name)."""
+        raise NotImplementedError
+
+    def verify_connectivity(self) -> bool:
+        return True
+
+    def close(self):
+        pass
+
+
+# -------------------- Neo4j --------------------
+
+class Neo4jGraphStore(GraphStore):
+    """
+    The graph in Neo4j through Neo4jConnector. upsert sends one parameterized
+    UNWIND statement per label / relationship type (at most batch_size rows
+    each) inside one managed write transaction; upsert_node / upsert_edge are
+    single auto-commit queries. Endpoints are found through the :Entity(name)
+    index that GraphSchema maintains.
+    """
+
+    backend = "neo4j"
+
+    NEIGHBORS = (
+        f"MATCH (e:{ENTITY_LABEL}) WHERE e.name IN $names "
+        f"MATCH (e)-[r]-(n:{ENTITY_LABEL}) "
+        "RETURN startNode(r).name AS source, type(r) AS type, endNode(r).name AS target, e.name AS matched "
+        "ORDER BY size(e.name) DESC"
+    )
+    GET_NODES = (
+        f"MATCH (n:{ENTITY_LABEL}) WHERE n.name IN $names "
+        "RETURN n.name AS name, labels(n) AS labels, properties(n) AS properties"
+    )
+    EXPORT_NODES = f"MATCH (n:{ENTITY_LABEL}) RETURN n.name AS name"
+    EXPORT_EDGES = (
+        f"MATCH (a:{ENTITY_LABEL})-[r]->(b:{ENTITY_LABEL}) "
+        "RETURN a.name AS source, type(r) AS type, b.name AS target"
+    )
+
+    def __init__(self, connector: Neo4jConnector = None, schema: GraphSchema = None):
+        self.connector = connector or Neo4jConnector()
+        self.schema = schema or GraphSchema(self.connector)
+
+    def ensure_labels(self, labels: Iterable[str]):
+        self.schema.ensure_labels(labels)
+
+    def upsert(self, nodes: NodeRows, rels: RelRows, batch_size: int = config.GRAPH_WRITE_BATCH_SIZE):
+        statements = []
+        for label, rows in nodes.items():
+            query = (
+                f"UNWIND $rows AS row "
+                f"MERGE (n:{label} {{name: row.name}}) "
+                f"SET n += row.props, n:{ENTITY_LABEL}"
+            )
+            statements.extend((query, {"rows": batch}) for batch in _batches(rows, batch_size))
+
+        # Relationships go after all nodes so both endpoints already exist in the transaction.
+        # Labels cannot be parameterized, so endpoints are looked up through the
+        # :Entity(name) index and narrowed to the extracted label when known. This
+        # keeps one statement per relationship type.
+        for rel_type, rows in rels.items():
+            query = (
+                f"UNWIND $rows AS row "
+                f"MATCH (a:{ENTITY_LABEL} {{name: row.source}}) "
+                f"WHERE row.source_label IS NULL OR row.source_label IN labels(a) "
+                f"MATCH (b:{ENTITY_LABEL} {{name: row.target}}) "
+                f"WHERE row.target_label IS NULL OR row.target_label IN labels(b) "
+                f"MERGE (a)-[r:{rel_type}]->(b) "
+                f"SET r += row.props"
+            )
+            statements.extend((query, {"rows": batch}) for batch in _batches(rows, batch_size))
+
+        self.connector.write_batch(statements)
+
+    def upsert_node(self, label: str, name: str, props: Dict[str, Any]):
+        query = f"MERGE (n:{label} {{name: $name}}) SET n += $props, n:{ENTITY_LABEL}"
+        self.connector.run_cypher(query, {"name": name, "props": props})
+
+    def upsert_edge(self, rel_type: str, source: str, target: str, source_label: Optional[str] = None,
+                    target_label: Optional[str] = None, props: Optional[Dict[str, Any]] = None):
+        query = (
+            f"MATCH (a:{source_label or ENTITY_LABEL} {{name: $source}}) "
+            f"MATCH (b:{target_label or ENTITY_LABEL} {{name: $target}}) "
+            f"MERGE (a)-[r:{rel_type}]->(b) "
+            f"SET r += $props"
+        )
+        self.connector.run_cypher(query, {"source": source, "target": target, "props": props or {}})
+
+    def get_nodes(self, names: Iterable[str]) -> List[Dict[str, Any]]:
+        return self.connector.read(self.GET_NODES, {"names": list(names)})
+
+    def neighbors(self, names: Iterable[str], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        if limit is None:
+            return self.connector.read(self.NEIGHBORS, {"names": list(names)})
+        return self.connector.read(self.NEIGHBORS + " LIMIT $k", {"names": list(names), "k": limit})
+
+    def iter_nodes(self) -> Iterator[str]:
+        for record in self.connector.stream(self.EXPORT_NODES):
+            if record["name"] is not None:
+                yield record["name"]
+
+    def iter_edges(self) -> Iterator[Tuple[str, str, str]]:
+        for record in self.connector.stream(self.EXPORT_EDGES):
+            if record["source"] is not None and record["target"] is not None:
+                yield record["source"], record["type"], record["target"]
+
+    def verify_connectivity(self) -> bool:
+        return self.connector.verify_connectivity()
+
+    def close(self):
+        self.connector.close()
+
+
+# -------------------- SQLite --------------------
+
+class SQLiteGraphStore(GraphStore):
+    """
+    Embedded graph in a SQLite file, for development, tests and benchmarks
+    without a Neo4j server. Same model as the Neo4j store:
+
+        nodes(id, label, name, props)   unique (label, name), indexed on name
+        edges(source, type, target, props)   primary key (source, type, target),
+                                              indexed on (target, type)
+
+    so name lookups, MERGE-style upserts and neighbor queries in either
+    direction are index seeks. Properties are JSON, merged with json_patch
+    (like SET n += props). WAL mode with one connection per thread, as in
+    ExtractionCache; upsert is one BEGIN IMMEDIATE transaction.
+    """
+
+    backend = "sqlite"
+
+    UPSERT_NODE = (
+        "INSERT INTO nodes (label, name, props) VALUES (?, ?, ?) "
+        "ON CONFLICT (label, name) DO UPDATE SET props = json_patch(nodes.props, excluded.props)"
+    )
+    # every (source, target) node pair with the names, narrowed to the labels when given
+    UPSERT_EDGE = (
+        "INSERT INTO edges (source, type, target, props) "
+        "SELECT a.id, ?, b.id, ? FROM nodes a JOIN nodes b "
+        "WHERE a.name = ? AND (? IS NULL OR a.label = ?) AND b.name = ? AND (? IS NULL OR b.label = ?) "
+        "ON CONFLICT (source, type, target) DO UPDATE SET props = json_patch(edges.props, excluded.props)"
+    )
+
+    def __init__(self, path: Path = config.GRAPH_SQLITE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conns: List[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
+        self._conn().executescript(
+            """
+            CREATE TABLE IF NOT EXISTS nodes (
+                id INTEGER PRIMARY KEY,
+                label TEXT NOT NULL,
+                name TEXT NOT NULL,
+                props TEXT NOT NULL DEFAULT '{}',
+                UNIQUE (label, name)
+            );
+            CREATE INDEX IF NOT EXISTS idx_nodes_name ON nodes(name);
+            CREATE TABLE IF NOT EXISTS edges (
+                source INTEGER NOT NULL REFERENCES nodes(id),
+                type TEXT NOT NULL,
+                target INTEGER NOT NULL REFERENCES nodes(id),
+                props TEXT NOT NULL DEFAULT '{}',
+                PRIMARY KEY (source, type, target)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_edges_target ON edges(target, type);
+            """
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    @staticmethod
+    def _edge_params(rel_type: str, row: Dict[str, Any]) -> tuple:
+        source_label, target_label = row.get("source_label"), row.get("target_label")
+        return (rel_type, json.dumps(row.get("props") or {}, ensure_ascii=False), row["source"],
+                source_label, source_label, row["target"], target_label, target_label)
+
+    def upsert(self, nodes: NodeRows, rels: RelRows, batch_size: int = config.GRAPH_WRITE_BATCH_SIZE):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for label, rows in nodes.items():
+                conn.executemany(self.UPSERT_NODE, (
+                    (label, row["name"], json.dumps(row.get("props") or {}, ensure_ascii=False)) for row in rows
+                ))
+            for rel_type, rows in rels.items():
+                conn.executemany(self.UPSERT_EDGE, (self._edge_params(rel_type, row) for row in rows))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def upsert_node(self, label: str, name: str, props: Dict[str, Any]):
+        self._conn().execute(self.UPSERT_NODE, (label, name, json.dumps(props or {}, ensure_ascii=False)))
+
+    def upsert_edge(self, rel_type: str, source: str, target: str, source_label: Optional[str] = None,
+                    target_label: Optional[str] = None, props: Optional[Dict[str, Any]] = None):
+        # the per-item path always names a label; :Entity means any label here
+        row = {
+            "source": source, "target": target, "props": props,
+            "source_label": None if source_label == ENTITY_LABEL else source_label,
+            "target_label": None if target_label == ENTITY_LABEL else target_label,
+        }
+        self._conn().execute(self.UPSERT_EDGE, self._edge_params(rel_type, row))
+
+    def get_nodes(self, names: Iterable[str]) -> List[Dict[str, Any]]:
+        names = list(dict.fromkeys(names))
+        if not names:
+            return []
+        rows = self._conn().execute(
+            f"SELECT name, label, props FROM nodes WHERE name IN ({','.join('?' * len(names))})", names
+        ).fetchall()
+        nodes = []
+        for name, label, props in rows:
+            labels = [label] if label == ENTITY_LABEL else [label, ENTITY_LABEL]
+            nodes.append({"name": name, "labels": labels, "properties": json.loads(props)})
+        return nodes
+
+    def neighbors(self, names: Iterable[str], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        names = list(dict.fromkeys(names))
+        if not names:
+            return []
+        query = (
+            "WITH seeds AS (SELECT id, name FROM nodes WHERE name IN ({})) "
+            "SELECT * FROM ("
+            "SELECT seeds.name AS source, e.type, t.name AS target, seeds.name AS matched FROM seeds "
+            "JOIN edges e ON e.source = seeds.id JOIN nodes t ON t.id = e.target "
+            "UNION ALL "
+            "SELECT s.name, e.type, seeds.name, seeds.name FROM seeds "
+            "JOIN edges e ON e.target = seeds.id JOIN nodes s ON s.id = e.source"
+            ") ORDER BY length(matched) DESC"
+        ).format(",".join("?" * len(names)))
+        params = list(names)
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [{"source": s, "type": t, "target": d, "matched": m}
+                for s, t, d, m in self._conn().execute(query, params)]
+
+    def iter_nodes(self) -> Iterator[str]:
+        for (name,) in self._conn().execute("SELECT DISTINCT name FROM nodes"):
+            yield name
+
+    def iter_edges(self) -> Iterator[Tuple[str, str, str]]:
+        yield from self._conn().execute(
+            "SELECT s.name, e.type, t.name FROM edges e "
+            "JOIN nodes s ON s.id = e.source JOIN nodes t ON t.id = e.target"
+        )
+
+    def stats(self) -> Dict[str, int]:
+        conn = self._conn()
+        return {
+            "nodes": conn.execute("SELECT COUNT(*) FROM nodes").fetchone()[0],
+            "edges": conn.execute("SELECT COUNT(*) FROM edges").fetchone()[0],
+        }
+
+    def close(self):
+        with self._conns_lock:
+            for conn in self._conns:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._conns = []
+        self._local = threading.local()
+
+
+def get_graph_store(backend: str = config.GRAPH_BACKEND, **kwargs) -> GraphStore:
+    """The configured graph store: "neo4j" (server) or "sqlite" (embedded file)."""
+    if backend == "neo4j":
+        return Neo4jGraphStore(**kwargs)
+    if backend == "sqlite":
+        return SQLiteGraphStore(**kwargs)
+    raise ValueError(f"Unknown graph backend: {backend}")
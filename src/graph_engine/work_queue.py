@@ -0,0 +1,369 @@
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import logging
+import argparse
+import sqlite3
+import threading
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import config
+except ImportError:
+    # Fallback for running script directly from subfolder
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+    import config
+
+logger = logging.getLogger("ExtractionQueue")
+
+PENDING = "pending"      # waiting for LLM extraction
+EXTRACTED = "extracted"  # extraction stored, waiting for the graph write
+WRITTEN = "written"      # in the graph
+DEAD = "dead"            # failed GRAPH_QUEUE_MAX_ATTEMPTS times; left out until requeued
+STATES = (PENDING, EXTRACTED, WRITTEN, DEAD)
+
+
+def make_owner() -> str:
+    """Lease owner id of this process / run."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def owner_gone(owner: str) -> bool:
+    """True if a lease owner (see make_owner) is a process on this host that no longer runs."""
+    try:
+        host, pid, _ = owner.rsplit(":", 2)
+        pid = int(pid)
+    except ValueError:
+        return False
+    if host != socket.gethostname():
+        return False  # can't tell; its leases expire after lease_s
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        pass  # running, as another user
+    return False
+
+
+class ExtractionQueue:
+    """
+    Durable work queue of chunks for graph ingestion, in SQLite (WAL mode,
+    one connection per thread, like ExtractionCache).
+
+    Every chunk id moves pending -> extracted -> written. A worker leases a
+    batch of chunks in one state for `lease_s` seconds; a lease that is not
+    completed in time (crashed or killed run) simply expires and the chunks
+    become leasable again. Leases of a run on this host whose process is gone
+    can be taken back right away with reclaim_orphaned(). Completions are fenced on the lease owner, so a
+    worker whose lease expired cannot overwrite someone else's progress.
+
+    The extraction result is stored with the `extracted` state, before the
+    graph write, so a run that dies between the two resumes with the write
+    and never pays for the LLM call again. Each lease counts as an attempt;
+    a chunk that fails (or whose lease expires) `max_attempts` times in a
+    stage goes to `dead` with its last error, until requeue_dead().
+    """
+
+    def __init__(
+        self,
+        path: Path = config.GRAPH_QUEUE_PATH,
+        lease_s: float = config.GRAPH_QUEUE_LEASE_S,
+        max_attempts: int = config.GRAPH_QUEUE_MAX_ATTEMPTS,
+        retry_delay_s: float = config.GRAPH_QUEUE_RETRY_DELAY_S,
+        owner: Optional[str] = None,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_s = lease_s
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay_s = retry_delay_s
+        self.owner = owner or make_owner()
+        self._local = threading.local()
+        self._conns: List[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
+
+        self._conn().executescript(
+            """
+            CREATE TABLE IF NOT EXISTS chunks (
+                seq INTEGER PRIMARY KEY,
+                chunk_id TEXT NOT NULL UNIQUE,
+                source TEXT,
+                text TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                result TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_owner TEXT,
+                lease_until REAL,
+                last_error TEXT,
+                updated REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_chunks_state_lease ON chunks(state, lease_until);
+            """
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    def _transaction(self, work):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = work(conn)
+            conn.execute("COMMIT")
+            return result
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    # -------------------- producers --------------------
+
+    def enqueue(self, records: Iterable[Dict[str, Any]], batch_size: int = 1000) -> int:
+        """
+        Adds chunk records ({"id", "text", optional "_file"}) as pending.
+        Known chunks keep their state unless their text changed, in which case
+        they start over. Returns the number of chunks added or reset.
+        """
+        query = (
+            "INSERT INTO chunks (chunk_id, source, text, updated) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (chunk_id) DO UPDATE SET source = excluded.source, text = excluded.text, "
+            "state = 'pending', result = NULL, attempts = 0, lease_owner = NULL, lease_until = NULL, "
+            "last_error = NULL, updated = excluded.updated "
+            "WHERE chunks.text <> excluded.text"
+        )
+        records = iter(records)
+        changed = 0
+        while True:
+            rows = [(r["id"], r.get("_file"), r.get("text") or "", time.time())
+                    for r in islice(records, batch_size) if r.get("id")]
+            if not rows:
+                break
+
+            def _work(conn):
+                before = conn.total_changes
+                conn.executemany(query, rows)
+                return conn.total_changes - before
+
+            changed += self._transaction(_work)
+        return changed
+
+    # -------------------- workers --------------------
+
+    def lease(self, state: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Leases up to `limit` chunks in `state` (PENDING to extract, EXTRACTED to
+        write) that nobody holds, oldest first: [{"id", "text", "data"}], data
+        being the stored extraction for EXTRACTED chunks. Chunks out of attempts
+        are moved to DEAD first.
+        """
+        if state not in (PENDING, EXTRACTED):
+            raise ValueError(f"Cannot lease chunks in state {state!r}")
+        now = time.time()
+
+        def _work(conn):
+            conn.execute(
+                "UPDATE chunks SET state = 'dead', lease_owner = NULL, lease_until = NULL, updated = ?, "
+                "last_error = COALESCE(last_error, 'lease expired') "
+                "WHERE state = ? AND attempts >= ? AND (lease_until IS NULL OR lease_until <= ?)",
+                (now, state, self.max_attempts, now),
+            )
+            return conn.execute(
+                "UPDATE chunks SET lease_owner = ?, lease_until = ?, attempts = attempts + 1, updated = ? "
+                "WHERE seq IN (SELECT seq FROM chunks WHERE state = ? AND attempts < ? "
+                "AND (lease_until IS NULL OR lease_until <= ?) ORDER BY seq LIMIT ?) "
+                "RETURNING chunk_id, text, result",
+                (self.owner, now + self.lease_s, now, state, self.max_attempts, now, limit),
+            ).fetchall()
+
+        rows = self._transaction(_work)
+        return [{"id": chunk_id, "text": text, "data": json.loads(result) if result else None}
+                for chunk_id, text, result in rows]
+
+    def mark_extracted(self, chunk_id: str, data: Dict[str, Any]) -> bool:
+        """
+        Stores the extraction and moves the chunk to EXTRACTED, still leased to
+        this owner for the write. False if the lease was lost meanwhile.
+        """
+        now = time.time()
+        cur = self._conn().execute(
+            "UPDATE chunks SET state = 'extracted', result = ?, attempts = 0, lease_until = ?, "
+            "last_error = NULL, updated = ? "
+            "WHERE chunk_id = ? AND state = 'pending' AND lease_owner = ?",
+            (json.dumps(data, ensure_ascii=False), now + self.lease_s, now, chunk_id, self.owner),
+        )
+        return cur.rowcount == 1
+
+    def mark_written(self, chunk_ids: List[str]) -> int:
+        """Moves this owner's EXTRACTED chunks to WRITTEN; returns how many were still leased."""
+        now = time.time()
+
+        def _work(conn):
+            before = conn.total_changes
+            conn.executemany(
+                "UPDATE chunks SET state = 'written', lease_owner = NULL, lease_until = NULL, updated = ? "
+                "WHERE chunk_id = ? AND state = 'extracted' AND lease_owner = ?",
+                [(now, chunk_id, self.owner) for chunk_id in chunk_ids],
+            )
+            return conn.total_changes - before
+
+        return self._transaction(_work)
+
+    def fail(self, chunk_ids: List[str], error: str) -> int:
+        """
+        Records a failed attempt: the chunks stay in their state and become
+        leasable again after retry_delay_s, or go to DEAD when out of attempts.
+        Returns how many went to DEAD.
+        """
+        now = time.time()
+
+        def _work(conn):
+            dead = 0
+            for chunk_id in chunk_ids:
+                row = conn.execute(
+                    "SELECT attempts FROM chunks WHERE chunk_id = ? AND lease_owner = ? AND state IN ('pending', 'extracted')",
+                    (chunk_id, self.owner),
+                ).fetchone()
+                if row is None:
+                    continue
+                if row[0] >= self.max_attempts:
+                    conn.execute(
+                        "UPDATE chunks SET state = 'dead', lease_owner = NULL, lease_until = NULL, "
+                        "last_error = ?, updated = ? WHERE chunk_id = ?",
+                        (error, now, chunk_id),
+                    )
+                    dead += 1
+                else:
+                    conn.execute(
+                        "UPDATE chunks SET lease_owner = NULL, lease_until = ?, last_error = ?, updated = ? "
+                        "WHERE chunk_id = ?",
+                        (now + self.retry_delay_s, error, now, chunk_id),
+                    )
+            return dead
+
+        dead = self._transaction(_work)
+        if dead:
+            logger.warning(f"{dead} chunk(s) moved to the dead-letter state: {error}")
+        return dead
+
+    def release(self, chunk_ids: List[str]) -> int:
+        """Gives back leased chunks that were not worked on (stop / abort); the attempt is not counted."""
+        def _work(conn):
+            before = conn.total_changes
+            conn.executemany(
+                "UPDATE chunks SET lease_owner = NULL, lease_until = NULL, attempts = MAX(attempts - 1, 0) "
+                "WHERE chunk_id = ? AND lease_owner = ? AND state IN ('pending', 'extracted')",
+                [(chunk_id, self.owner) for chunk_id in chunk_ids],
+            )
+            return conn.total_changes - before
+
+        return self._transaction(_work)
+
+    def reclaim_orphaned(self) -> int:
+        """
+        Releases the leases of owners on this host whose process has exited
+        (a crashed or killed run), without waiting for lease_s. The dead run's
+        attempt still counts. Returns the number of chunks released.
+        """
+        now = time.time()
+
+        def _work(conn):
+            owners = [owner for (owner,) in conn.execute(
+                "SELECT DISTINCT lease_owner FROM chunks WHERE lease_owner IS NOT NULL AND lease_owner <> ? "
+                "AND state IN ('pending', 'extracted') AND lease_until > ?", (self.owner, now),
+            ).fetchall()]
+            released = 0
+            for owner in filter(owner_gone, owners):
+                released += conn.execute(
+                    "UPDATE chunks SET lease_owner = NULL, lease_until = NULL, updated = ? "
+                    "WHERE lease_owner = ? AND state IN ('pending', 'extracted')", (now, owner),
+                ).rowcount
+            return released
+
+        released = self._transaction(_work)
+        if released:
+            logger.warning(f"Reclaimed {released} chunk(s) leased by runs that are no longer running")
+        return released
+
+    def leased_elsewhere(self) -> int:
+        """Chunks currently leased by other owners (other runs, live or not yet expired)."""
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM chunks WHERE state IN ('pending', 'extracted') AND lease_owner <> ? "
+            "AND lease_until > ?", (self.owner, time.time()),
+        ).fetchone()[0]
+
+    # -------------------- operations --------------------
+
+    def requeue_dead(self, chunk_ids: Optional[List[str]] = None) -> int:
+        """Gives dead chunks a fresh set of attempts in the stage they died in (all of them by default)."""
+        query = (
+            "UPDATE chunks SET state = CASE WHEN result IS NULL THEN 'pending' ELSE 'extracted' END, "
+            "attempts = 0, lease_owner = NULL, lease_until = NULL, updated = ? WHERE state = 'dead'"
+        )
+        now = time.time()
+        if chunk_ids is None:
+            return self._transaction(lambda conn: conn.execute(query, (now,)).rowcount)
+
+        def _work(conn):
+            before = conn.total_changes
+            conn.executemany(query + " AND chunk_id = ?", [(now, chunk_id) for chunk_id in chunk_ids])
+            return conn.total_changes - before
+
+        return self._transaction(_work)
+
+    def dead(self, limit: int = 100) -> List[Dict[str, Any]]:
+        rows = self._conn().execute(
+            "SELECT chunk_id, source, CASE WHEN result IS NULL THEN 'pending' ELSE 'extracted' END, last_error "
+            "FROM chunks WHERE state = 'dead' ORDER BY seq LIMIT ?", (limit,)
+        ).fetchall()
+        return [{"id": i, "source": s, "stage": stage, "error": e} for i, s, stage, e in rows]
+
+    def stats(self) -> Dict[str, int]:
+        """Chunks per state, plus how many are leased or waiting out a retry delay right now."""
+        conn = self._conn()
+        counts = dict.fromkeys(STATES, 0)
+        counts.update(conn.execute("SELECT state, COUNT(*) FROM chunks GROUP BY state").fetchall())
+        counts["leased"] = conn.execute(
+            "SELECT COUNT(*) FROM chunks WHERE state IN ('pending', 'extracted') AND lease_until > ?", (time.time(),)
+        ).fetchone()[0]
+        return counts
+
+    def close(self):
+        with self._conns_lock:
+            for conn in self._conns:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._conns = []
+        self._local = threading.local()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("Graph extraction work queue")
+    parser.add_argument("command", choices=["stats", "dead", "requeue-dead"])
+    parser.add_argument("--path", default=str(config.GRAPH_QUEUE_PATH))
+    parser.add_argument("--id", action="append", default=None, help="chunk id (repeatable; default: all)")
+    args = parser.parse_args()
+
+    work_queue = ExtractionQueue(Path(args.path))
+    if args.command == "stats":
+        print(json.dumps(work_queue.stats(), indent=2))
+    elif args.command == "dead":
+        for item in work_queue.dead(limit=1000):
+            print(f"{item['id']}  [{item['stage']}]  {item['error']}")
+    else:
+        print(f"Requeued {work_queue.requeue_dead(args.id)} dead chunk(s).")
+    work_queue.close()
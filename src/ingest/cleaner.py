@@ -2,23 +2,250 @@ from __future__ import annotations
 
 import re
 import json
+import hashlib
+import sqlite3
+import time
 from pathlib import Path
-from typing import List, Tuple
+from bisect import bisect_right
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
 
 import pdfplumber
+from pdfminer.pdftypes import resolve1
 
 
 # -------------------- PDF extraction --------------------
 
-def extract_text_from_pdf(path: Path, use_ocr: bool = False) -> List[str]:
+def count_pdf_pages(path: Path) -> int:
+    with pdfplumber.open(path) as pdf:
+        return len(pdf.pages)
+
+
+def extract_text_from_pdf(
+    path: Path,
+    use_ocr: bool = False,
+    page_range: Optional[Tuple[int, int]] = None,
+    ocr: Optional[PageOcr] = None
+) -> List[str]:
+    # page_range = (start, end) extracts pages[start:end] only, so one large PDF
+    # can be split across worker processes
+    # use_ocr: pages with no (or a very thin) text layer are OCR'd afterwards,
+    # with `ocr` settings/cache/stats (defaults to an uncached PageOcr)
     pages = []
     with pdfplumber.open(path) as pdf:
-        for page in pdf.pages:
+        selected = pdf.pages if page_range is None else pdf.pages[page_range[0]:page_range[1]]
+        for page in selected:
             pages.append(page.extract_text() or "")
+            # drop the parsed layout objects, otherwise memory grows with page count
+            page.close()
+
+    if use_ocr:
+        ocr = ocr or PageOcr()
+        offset = 0 if page_range is None else page_range[0]
+        thin = [offset + i for i, text in enumerate(pages) if ocr.needs_ocr(text)]
+        ocr.pages_checked += len(pages)
+        for i, text in ocr.run(path, thin).items():
+            pages[i - offset] = text
     return pages
 
 
+def iter_pdf_pages(
+    path: Path,
+    use_ocr: bool = False,
+    indices: Optional[Iterable[int]] = None,
+    ocr: Optional[PageOcr] = None
+) -> Iterator[str]:
+    # yields page texts one at a time (only `indices`, if given); nothing is kept.
+    # Thin pages are OCR'd inline, one at a time
+    if use_ocr:
+        ocr = ocr or PageOcr()
+    with pdfplumber.open(path) as pdf:
+        pages = pdf.pages
+        for i in (range(len(pages)) if indices is None else indices):
+            page = pages[i]
+            text = page.extract_text() or ""
+            if use_ocr:
+                ocr.pages_checked += 1
+                if ocr.needs_ocr(text):
+                    text = ocr.ocr_loaded_page(page)
+            yield text
+            page.close()
+
+
+# -------------------- OCR for text-less pages --------------------
+#
+# Scanned pages have an empty or near-empty text layer. Only those pages are
+# rasterized and run through Tesseract; results are cached on disk by a hash
+# of the page's content and image streams, so re-runs skip the OCR entirely.
+
+class OcrCache:
+    """SQLite page-hash -> OCR text store, safe to share between processes (WAL)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS ocr_pages (key TEXT PRIMARY KEY, text TEXT NOT NULL)")
+
+    def get(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT text FROM ocr_pages WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, text: str):
+        self.conn.execute("INSERT OR REPLACE INTO ocr_pages (key, text) VALUES (?, ?)", (key, text))
+
+    def close(self):
+        self.conn.close()
+
+
+def page_content_hash(page, resolution: int, lang: str) -> Optional[str]:
+    # content streams alone are identical on most scanned pages ("draw image
+    # Im0"), so the image streams are hashed too. None = page can't be hashed
+    h = hashlib.sha256(f"{resolution}|{lang}|{page.width}x{page.height}".encode())
+    try:
+        for ref in page.page_obj.contents:
+            h.update(resolve1(ref).get_data())
+        for img in page.images:
+            h.update(img["stream"].get_data())
+    except Exception:
+        return None
+    return h.hexdigest()
+
+
+def ocr_page_image(page, resolution: int, lang: str) -> str:
+    import pytesseract
+
+    image = page.to_image(resolution=resolution).original
+    return pytesseract.image_to_string(image, lang=lang)
+
+
+def _ocr_pages_worker(
+    path: Path,
+    indices: List[int],
+    resolution: int,
+    lang: str,
+    cache_path: Optional[Path]
+) -> List[Tuple[int, str, bool, float]]:
+    # runs in a pool process: (page index, text, cache hit, OCR seconds) per page
+    cache = OcrCache(cache_path) if cache_path else None
+    out = []
+    try:
+        with pdfplumber.open(path) as pdf:
+            for i in indices:
+                page = pdf.pages[i]
+                out.append((i, *_ocr_one(page, resolution, lang, cache)))
+                page.close()
+    finally:
+        if cache is not None:
+            cache.close()
+    return out
+
+
+def _ocr_one(page, resolution: int, lang: str, cache: Optional[OcrCache]) -> Tuple[str, bool, float]:
+    key = page_content_hash(page, resolution, lang) if cache is not None else None
+    if key is not None:
+        text = cache.get(key)
+        if text is not None:
+            return text, True, 0.0
+    start = time.perf_counter()
+    text = ocr_page_image(page, resolution, lang)
+    elapsed = time.perf_counter() - start
+    if key is not None:
+        cache.put(key, text)
+    return text, False, elapsed
+
+
+class PageOcr:
+    """
+    OCR settings, cache location and counters for one ingestion run (or file).
+    Pages with fewer than `min_chars` extracted characters are OCR'd at
+    `resolution` dpi; `workers` > 1 spreads them over a process pool, `pool`
+    if given (shared across files), else one created per run() call.
+    """
+
+    def __init__(self, cache_path: Optional[Path] = None, min_chars: int = 25, resolution: int = 300,
+                 lang: str = "eng", workers: int = 1, pool: Optional[Executor] = None):
+        self.cache_path = cache_path
+        self.min_chars = min_chars
+        self.resolution = resolution
+        self.lang = lang
+        self.workers = workers
+        self.pool = pool
+        self._cache = None
+
+        self.pages_checked = 0
+        self.ocr_pages = 0
+        self.cache_hits = 0
+        self.ocr_seconds = 0.0
+
+    def needs_ocr(self, text: str) -> bool:
+        return len(text.strip()) < self.min_chars
+
+    def _record(self, cached: bool, seconds: float):
+        self.ocr_pages += 1
+        self.cache_hits += cached
+        self.ocr_seconds += seconds
+
+    def run(self, path: Path, indices: List[int]) -> Dict[int, str]:
+        """OCRs pages `indices` of `path`; returns {page index: text}."""
+        if not indices:
+            return {}
+        n = min(self.workers, len(indices))
+        if n <= 1:
+            results = _ocr_pages_worker(path, indices, self.resolution, self.lang, self.cache_path)
+        else:
+            # round-robin so each worker gets a mix of pages
+            groups = [indices[k::n] for k in range(n)]
+            pool = self.pool or ProcessPoolExecutor(max_workers=n)
+            try:
+                futures = [
+                    pool.submit(_ocr_pages_worker, path, g, self.resolution, self.lang, self.cache_path)
+                    for g in groups
+                ]
+                results = [r for fut in futures for r in fut.result()]
+            finally:
+                if pool is not self.pool:
+                    pool.shutdown()
+
+        texts = {}
+        for i, text, cached, seconds in results:
+            texts[i] = text
+            self._record(cached, seconds)
+        return texts
+
+    def ocr_loaded_page(self, page) -> str:
+        # in-process OCR of an already open page (streaming path)
+        if self.cache_path and self._cache is None:
+            self._cache = OcrCache(self.cache_path)
+        text, cached, seconds = _ocr_one(page, self.resolution, self.lang, self._cache)
+        self._record(cached, seconds)
+        return text
+
+    def report(self) -> dict:
+        ocr_run = self.ocr_pages - self.cache_hits
+        return {
+            "pages_checked": self.pages_checked,
+            "ocr_pages": self.ocr_pages,
+            "cache_hits": self.cache_hits,
+            "ocr_seconds": round(self.ocr_seconds, 3),
+            "seconds_per_page": round(self.ocr_seconds / ocr_run, 3) if ocr_run else 0.0,
+        }
+
+
+def merge_ocr_reports(reports: Iterable[dict]) -> dict:
+    total = {"pages_checked": 0, "ocr_pages": 0, "cache_hits": 0, "ocr_seconds": 0.0}
+    for r in reports:
+        for k in total:
+            total[k] += r.get(k, 0)
+    ocr_run = total["ocr_pages"] - total["cache_hits"]
+    total["ocr_seconds"] = round(total["ocr_seconds"], 3)
+    total["seconds_per_page"] = round(total["ocr_seconds"] / ocr_run, 3) if ocr_run else 0.0
+    return total
+
+
 # -------------------- Header / footer helpers --------------------
 
 def detect_repeated_lines(pages: List[str], min_count: int = 3) -> set:
@@ -63,30 +290,30 @@ def fix_hyphenation(text: str) -> str:
 
 
 def merge_broken_lines(text: str) -> str:
-    lines = text.splitlines()
-    merged = []
+    return "\n\n".join(iter_merge_broken_lines(text.splitlines()))
+
+
+def iter_merge_broken_lines(lines: Iterable[str]) -> Iterator[str]:
     buf = ""
 
     for line in lines:
         line = line.strip()
         if not line:
             if buf:
-                merged.append(buf)
+                yield buf
                 buf = ""
             continue
 
         if not buf:
             buf = line
         elif buf.endswith((".", "?", "!", ":", ";")):
-            merged.append(buf)
+            yield buf
             buf = line
         else:
             buf += " " + line
 
     if buf:
-        merged.append(buf)
-
-    return "\n\n".join(merged)
+        yield buf
 
 
 # -------------------- Main cleaner --------------------
@@ -120,41 +347,417 @@ def chunk_text_by_sentences(
     max_tokens: int = 500,
     overlap: int = 100
 ) -> List[Tuple[int, int, str]]:
-    sentences = split_sentences_fast(text)
+    return chunk_sentences(split_sentences_fast(text), max_tokens=max_tokens, overlap=overlap)
+
+
+# -------------------- Chunking engine --------------------
+#
+# A chunk is always a contiguous run of sentences[start:end]. With token counts
+# kept as prefix sums (prefix[i] = tokens in sentences[:i]) the window size is
+# prefix[end] - prefix[start], so chunk ends and overlap starts are found by
+# binary search instead of re-splitting sentences.
+
+def sentence_token_counts(sentences: Iterable[str]) -> List[int]:
+    return [len(s.split()) for s in sentences]
+
+
+def prefix_sums(counts: Iterable[int]) -> List[int]:
+    prefix = [0]
+    for c in counts:
+        prefix.append(prefix[-1] + c)
+    return prefix
+
+
+def overlap_start(prefix: List[int], start: int, end: int, overlap: int) -> int:
+    """
+    First sentence of the overlap carried over from sentences[start:end]: the
+    shortest tail holding at least `overlap` tokens, or the whole window if
+    there are not that many.
+    """
+    if overlap <= 0 or start == end:
+        return end
+    j = bisect_right(prefix, prefix[end] - overlap, start, end) - 1
+    return max(j, start)
+
+
+def chunk_sentences(
+    sentences: Sequence[str],
+    max_tokens: int = 500,
+    overlap: int = 100,
+    counts: Optional[Sequence[int]] = None,
+    fit: bool = False
+) -> List[Tuple[int, int, str]]:
+    """
+    Packs sentences into (start, end, text) chunks of at most `max_tokens`
+    tokens, each starting with about `overlap` tokens of the previous one.
+    `counts` are per-sentence token counts (whitespace words by default).
+    With `fit` (model-token budgets), the overlap is dropped when the next
+    sentence does not fit behind it, so only a single sentence longer than
+    `max_tokens` can make a chunk run over.
+    """
+    if counts is None:
+        counts = sentence_token_counts(sentences)
+    prefix = prefix_sums(counts)
+    n = len(sentences)
 
     chunks = []
+    start = 0
+    if not fit:
+        pos = 0
+        while pos < n:
+            # first sentence that no longer fits behind sentences[start:pos]
+            i = bisect_right(prefix, prefix[start] + max_tokens, pos + 1) - 1
+            if i >= n:
+                break
+            chunks.append((start, i, " ".join(sentences[start:i])))
+            start = overlap_start(prefix, start, i, overlap) if overlap > 0 else i
+            pos = i + 1
+
+        if start < n:
+            chunks.append((start, n, " ".join(sentences[start:])))
+        return chunks
+
+    end = 0
+    while end < n:
+        # furthest end whose window still fits, at least end (nothing new)
+        i = bisect_right(prefix, prefix[start] + max_tokens, end + 1) - 1
+        if i == end:
+            if start < end:
+                start = end  # drop the overlap
+                continue
+            i = end + 1
+        chunks.append((start, i, " ".join(sentences[start:i])))
+        start = overlap_start(prefix, start, i, overlap) if overlap > 0 else i
+        end = i
+
+    return chunks
+
+
+def iter_chunks(
+    sentences: Iterable[str],
+    max_tokens: int = 500,
+    overlap: int = 100,
+    count_tokens: Optional[Callable[[str], int]] = None,
+    fit: bool = False
+) -> Iterator[Tuple[int, int, str]]:
+    # streaming form of chunk_sentences: only the current window is kept, with
+    # its prefix sums relative to the window start
     current = []
-    token_count = 0
+    prefix = [0]
     start = 0
+    n_sentences = 0
 
     for i, sent in enumerate(sentences):
-        words = sent.split()
-        if token_count + len(words) > max_tokens:
-            chunks.append((start, i, " ".join(current)))
-
-            if overlap > 0:
-                overlap_words = []
-                count = 0
-                for s in reversed(current):
-                    count += len(s.split())
-                    overlap_words.insert(0, s)
-                    if count >= overlap:
-                        break
-                current = overlap_words
-                token_count = sum(len(s.split()) for s in current)
-                start = i - len(current)
-            else:
-                current = []
-                token_count = 0
-                start = i
+        n_sentences = i + 1
+        count = len(sent.split()) if count_tokens is None else count_tokens(sent)
+        if prefix[-1] + count > max_tokens and (current or not fit):
+            yield (start, i, " ".join(current))
+
+            keep = overlap_start(prefix, 0, len(current), overlap) if overlap > 0 else len(current)
+            if fit and prefix[-1] - prefix[keep] + count > max_tokens:
+                keep = len(current)  # the overlap leaves no room for this sentence
+            base = prefix[keep]
+            current = current[keep:]
+            prefix = [p - base for p in prefix[keep:]]
+            start = i - len(current)
 
         current.append(sent)
-        token_count += len(words)
+        prefix.append(prefix[-1] + count)
 
     if current:
-        chunks.append((start, len(sentences), " ".join(current)))
+        yield (start, n_sentences, " ".join(current))
+
+
+# -------------------- Model-token chunking --------------------
+#
+# Word counts undershoot wordpieces, so chunks packed to a word budget can run
+# past the embedder's max sequence length and lose their tail. These helpers
+# count with the embedding model's own (fast, local) tokenizer instead.
+
+class TokenCounter:
+    """
+    Per-sentence wordpiece counts from a Hugging Face fast tokenizer, computed
+    in batches and cached by sentence hash (sentences repeat a lot across
+    overlapping chunks and re-runs). `limit` is the number of tokens a chunk
+    may hold once the model's special tokens are added.
+    """
+
+    def __init__(self, model_name: str, max_seq_length: int = 256, batch_size: int = 1024,
+                 cache_size: int = 500_000):
+        from transformers import AutoTokenizer
+
+        repo = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+        self.tokenizer = AutoTokenizer.from_pretrained(repo, use_fast=True)
+        self.model_name = model_name
+        self.max_seq_length = max_seq_length
+        self.limit = max_seq_length - self.tokenizer.num_special_tokens_to_add(pair=False)
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self._cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(sentence: str) -> bytes:
+        return hashlib.blake2b(sentence.encode("utf-8"), digest_size=16).digest()
+
+    def counts(self, sentences: Sequence[str]) -> List[int]:
+        keys = [self._key(s) for s in sentences]
+        todo = {}
+        for k, s in zip(keys, sentences):
+            if k not in self._cache and k not in todo:
+                todo[k] = s
+        self.misses += len(todo)
+        self.hits += len(keys) - len(todo)
+
+        if len(self._cache) + len(todo) > self.cache_size:
+            self._cache.clear()
+        items = list(todo.items())
+        for b in range(0, len(items), self.batch_size):
+            batch = items[b:b + self.batch_size]
+            enc = self.tokenizer(
+                [s for _, s in batch], add_special_tokens=False, verbose=False,
+                return_attention_mask=False, return_token_type_ids=False
+            )
+            for (k, _), ids in zip(batch, enc["input_ids"]):
+                self._cache[k] = len(ids)
+
+        return [self._cache[k] for k in keys]
+
+    def count(self, sentence: str) -> int:
+        return self.counts([sentence])[0]
+
+    def split(self, sentence: str, limit: Optional[int] = None) -> List[str]:
+        """
+        Splits a sentence of more than `limit` tokens (default: self.limit) into
+        pieces of at most `limit` tokens, cut between words where there is one
+        inside the window, so the chunker never has to emit an oversized chunk.
+        """
+        limit = limit or self.limit
+        offsets = self.tokenizer(
+            sentence, add_special_tokens=False, return_offsets_mapping=True, verbose=False,
+            return_attention_mask=False, return_token_type_ids=False
+        )["offset_mapping"]
+        if len(offsets) <= limit:
+            return [sentence]
+
+        pieces = []
+        first = 0
+        while len(offsets) - first > limit:
+            cut = first + limit
+            k = cut
+            while k > first + 1 and offsets[k][0] == offsets[k - 1][1]:
+                k -= 1  # token glued to the previous one: inside a word
+            if offsets[k][0] == offsets[k - 1][1]:
+                k = cut
+            pieces.append(sentence[offsets[first][0]:offsets[k][0]].strip())
+            first = k
+        pieces.append(sentence[offsets[first][0]:].strip())
+        return [p for p in pieces if p]
+
+
+_TOKEN_COUNTERS = {}
+
+
+def get_token_counter(model_name: str, max_seq_length: int = 256) -> TokenCounter:
+    # one tokenizer (and cache) per model per process
+    key = (model_name, max_seq_length)
+    if key not in _TOKEN_COUNTERS:
+        _TOKEN_COUNTERS[key] = TokenCounter(model_name, max_seq_length)
+    return _TOKEN_COUNTERS[key]
+
+
+def iter_fitted_sentences(sentences: Iterable[str], counter: TokenCounter, limit: int) -> Iterator[str]:
+    # sentences longer than `limit` model tokens, split into pieces that fit
+    for sent in sentences:
+        if counter.count(sent) > limit:
+            yield from counter.split(sent, limit)
+        else:
+            yield sent
 
-    return chunks
+
+def chunk_text_by_model_tokens(
+    text: str,
+    counter: TokenCounter,
+    max_tokens: int = 500,
+    overlap: int = 100
+) -> Tuple[List[Tuple[int, int, str]], dict]:
+    """
+    Chunks like chunk_text_by_sentences, but `max_tokens` and `overlap` are
+    model tokens and `max_tokens` is capped at counter.limit. Sentences longer
+    than that are split on token boundaries first (start/end then index the
+    split sentences). Also returns a report of how many chunks the word-count
+    budget (same numbers, counted in words) would have produced, how many of
+    those the model would truncate, and how many model-token chunks still run
+    over the limit.
+    """
+    sentences = split_sentences_fast(text)
+    counts = counter.counts(sentences)
+    limit = min(max_tokens, counter.limit)
+
+    pieces = []
+    for sent, count in zip(sentences, counts):
+        pieces.extend(counter.split(sent, limit) if count > limit else [sent])
+    piece_counts = counter.counts(pieces)
+    chunks = chunk_sentences(pieces, max_tokens=limit, overlap=min(overlap, limit), counts=piece_counts,
+                             fit=True)
+    piece_prefix = prefix_sums(piece_counts)
+    over_limit = sum(1 for s, e, _ in chunks if piece_prefix[e] - piece_prefix[s] > counter.limit)
+
+    prefix = prefix_sums(counts)
+    word_chunks = chunk_sentences(sentences, max_tokens=max_tokens, overlap=overlap)
+    truncated = sum(1 for s, e, _ in word_chunks if prefix[e] - prefix[s] > counter.limit)
+
+    report = {
+        "model": counter.model_name,
+        "max_seq_length": counter.max_seq_length,
+        "chunks": len(chunks),
+        "over_limit": over_limit,
+        "word_budget_chunks": len(word_chunks),
+        "word_budget_truncated": truncated,
+    }
+    return chunks, report
+
+
+# -------------------- Streaming pipeline (bounded memory) --------------------
+#
+# Same output as extract_text_from_pdf -> clean_pages -> chunk_text_by_sentences
+# -> write_*, but page by page: only the current page, paragraph, sentence and
+# chunk window are held in memory, and outputs are written as they are produced.
+
+_WORD_CHAR = re.compile(r"\w")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def sample_repeated_lines(
+    path: Path,
+    n_pages: int,
+    sample_pages: int = 200,
+    min_count: int = 3,
+    use_ocr: bool = False,
+    ocr: Optional[PageOcr] = None
+) -> Tuple[set, Optional[List[str]]]:
+    """
+    First pass of the streaming cleaner. Up to `sample_pages` pages every page is
+    counted (exactly what clean_pages does) and the page texts are returned so
+    they are not extracted twice. Longer files count `sample_pages` evenly spaced
+    pages instead and return None.
+    """
+    if n_pages <= sample_pages:
+        pages = list(iter_pdf_pages(path, use_ocr=use_ocr, ocr=ocr))
+        repeated = detect_repeated_lines(pages, min_count) if len(pages) >= 5 else set()
+        return repeated, pages
+
+    step = n_pages / sample_pages
+    indices = sorted({int(k * step) for k in range(sample_pages)})
+    sample = iter_pdf_pages(path, use_ocr=use_ocr, indices=indices, ocr=ocr)
+    return detect_repeated_lines(sample, min_count), None
+
+
+def iter_page_lines(pages: Iterable[str], repeated_lines: set) -> Iterator[str]:
+    # lines of "\n".join(cleaned pages); a page left empty contributes one ""
+    for page in pages:
+        yield from remove_headers_and_footers_from_page(page, repeated_lines).split("\n")
+
+
+def iter_fix_hyphenation(lines: Iterable[str]) -> Iterator[str]:
+    """fix_hyphenation across line (and page) boundaries, one line of state."""
+    cur = None
+    consumed = 0  # re.sub does not reuse the first letter of a joined line for the next match
+    for line in lines:
+        if cur is None:
+            cur = line
+            continue
+        n = len(cur)
+        if (n >= 2 and cur[-1] == "-" and n - 2 >= consumed and _WORD_CHAR.match(cur[-2])
+                and line and _WORD_CHAR.match(line[0])):
+            cur = cur[:-1] + line
+            consumed = n
+        else:
+            yield cur
+            cur = line
+            consumed = 0
+    if cur is not None:
+        yield cur
+
+
+def iter_clean_paragraphs(pages: Iterable[str], repeated_lines: set) -> Iterator[str]:
+    # "\n\n".join(...) of the result equals clean_pages(pages)
+    lines = iter_fix_hyphenation(iter_page_lines(pages, repeated_lines))
+    for para in iter_merge_broken_lines(lines):
+        yield re.sub(r"[ \t]{2,}", " ", para)
+
+
+def iter_sentences(paragraphs: Iterable[str]) -> Iterator[str]:
+    # split_sentences_fast("\n\n".join(paragraphs)) without building the joined text
+    tail = None
+    for para in paragraphs:
+        parts = _SENTENCE_END.split(para)
+        if tail is not None:
+            if tail[-1] in ".!?":
+                yield tail
+            else:
+                parts[0] = tail + "\n\n" + parts[0]
+        yield from parts[:-1]
+        tail = parts[-1]
+    yield "" if tail is None else tail
+
+
+def stream_pdf_to_outputs(
+    path: Path,
+    out_dir: Path,
+    use_ocr: bool = False,
+    max_tokens: int = 500,
+    overlap: int = 100,
+    sample_pages: int = 200,
+    counter: Optional[TokenCounter] = None,
+    ocr: Optional[PageOcr] = None,
+    metadata: Optional[Dict] = None
+) -> Tuple[Path, Path, int]:
+    """
+    Cleans and chunks a PDF page by page, writing <stem>.cleaned.txt and
+    <stem>.chunks.jsonl as it goes. With a `counter`, chunks are packed to model
+    tokens as in chunk_text_by_model_tokens (without the report), splitting
+    over-long sentences the same way.
+    `metadata` is stored with every chunk (see write_chunks_jsonl).
+    Returns (cleaned_path, chunks_path, n_chunks).
+    """
+    count_tokens = None
+    if counter is not None:
+        max_tokens = min(max_tokens, counter.limit)
+        overlap = min(overlap, max_tokens)
+        count_tokens = counter.count
+    out_dir.mkdir(parents=True, exist_ok=True)
+    basename = path.stem
+    if use_ocr:
+        ocr = ocr or PageOcr()
+    repeated, pages = sample_repeated_lines(path, count_pdf_pages(path), sample_pages, use_ocr=use_ocr, ocr=ocr)
+    if pages is None:
+        pages = iter_pdf_pages(path, use_ocr=use_ocr, ocr=ocr)
+
+    cleaned_path = out_dir / f"{basename}.cleaned.txt"
+    n_chunks = 0
+    with open(cleaned_path, "w", encoding="utf-8") as cleaned:
+
+        def paragraphs():
+            for k, para in enumerate(iter_clean_paragraphs(pages, repeated)):
+                cleaned.write("\n\n" + para if k else para)
+                yield para
+
+        def counted(chunks):
+            nonlocal n_chunks
+            for chunk in chunks:
+                n_chunks += 1
+                yield chunk
+
+        sentences = iter_sentences(paragraphs())
+        if counter is not None:
+            sentences = iter_fitted_sentences(sentences, counter, max_tokens)
+        chunks = iter_chunks(sentences, max_tokens=max_tokens, overlap=overlap, count_tokens=count_tokens,
+                             fit=counter is not None)
+        chunks_path = write_chunks_jsonl(out_dir, basename, path, counted(chunks), metadata=metadata)
+
+    return cleaned_path, chunks_path, n_chunks
 
 
 # -------------------- Output helpers --------------------
@@ -170,19 +773,25 @@ def write_chunks_jsonl(
     out_dir: Path,
     basename: str,
     source_path: Path,
-    chunks: List[Tuple[int, int, str]]
+    chunks: Iterable[Tuple[int, int, str]],
+    metadata: Optional[Dict] = None
 ) -> Path:
+    # metadata: fields parsed from the source name (dept, subject, type, year),
+    # stored with every chunk so indexes can be partitioned and filtered on them
     out_dir.mkdir(parents=True, exist_ok=True)
     path = out_dir / f"{basename}.chunks.jsonl"
 
     with open(path, "w", encoding="utf-8") as f:
         for i, (s, e, txt) in enumerate(chunks):
-            f.write(json.dumps({
+            record = {
                 "id": f"{basename}_chunk_{i}",
                 "source": str(source_path),
                 "start_sentence": s,
                 "end_sentence": e,
                 "text": txt
-            }, ensure_ascii=False) + "\n")
+            }
+            if metadata is not None:
+                record["metadata"] = metadata
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
 
     return path
@@ -0,0 +1,431 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+try:
+    import config
+except ImportError:
+    # Fallback for running script directly from subfolder
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+    import config
+
+logger = logging.getLogger(__name__)
+
+# MinHash over word shingles: h_i(x) = (a_i * x + b_i) mod p, kept to 32 bits
+_MERSENNE_61 = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+# shingle hashes per numpy block when signing a batch (bounds the num_perm x n temp array)
+_BLOCK_SHINGLES = 1 << 16
+
+_WORD = re.compile(r"\w+")
+
+DUPLICATE_SOURCES_NAME = "duplicate_sources.json"
+
+
+def shingle_hashes(text: str, size: int) -> np.ndarray:
+    """crc32 of every `size`-word shingle of the lower-cased text (the whole text if shorter)."""
+    words = _WORD.findall(text.lower())
+    if not words:
+        return np.zeros(0, dtype=np.uint64)
+    if len(words) <= size:
+        grams = [" ".join(words)]
+    else:
+        grams = [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in set(grams)), dtype=np.uint64, count=len(set(grams)))
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = config.DEDUP_NUM_PERM, shingle: int = config.DEDUP_SHINGLE, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.shingle = shingle
+        self.a = rng.randint(1, (1 << 61) - 1, size=num_perm, dtype=np.uint64)[:, None]
+        self.b = rng.randint(0, (1 << 61) - 1, size=num_perm, dtype=np.uint64)[:, None]
+
+    def signatures(self, texts: Sequence[str]) -> np.ndarray:
+        """uint32 [len(texts), num_perm] MinHash signatures, computed a block of shingles at a time."""
+        out = np.full((len(texts), self.num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+        hashes = [shingle_hashes(t, self.shingle) for t in texts]
+        owners = np.repeat(np.arange(len(texts)), [len(h) for h in hashes])
+        flat = np.concatenate(hashes) if hashes else np.zeros(0, dtype=np.uint64)
+        for s in range(0, len(flat), _BLOCK_SHINGLES):
+            block, who = flat[s:s + _BLOCK_SHINGLES], owners[s:s + _BLOCK_SHINGLES]
+            # uint64 products wrap mod 2^64 before the mod p, as in datasketch
+            with np.errstate(over="ignore"):
+                values = ((self.a * block + self.b) % _MERSENNE_61) & _MAX_HASH
+            starts = np.flatnonzero(np.r_[True, who[1:] != who[:-1]])
+            mins = np.minimum.reduceat(values, starts, axis=1).astype(np.uint32)
+            docs = who[starts]
+            out[docs] = np.minimum(out[docs], mins.T)
+        return out
+
+
+def band_keys(signatures: np.ndarray, bands: int) -> np.ndarray:
+    """int64 [n, bands]: one hash per LSH band of `rows = num_perm // bands` signature values."""
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    sig = signatures[:, :bands * rows].astype(np.uint64).reshape(n, bands, rows)
+    keys = np.zeros((n, bands), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for r in range(rows):
+            keys = keys * np.uint64(0x100000001B3) ^ sig[:, :, r]
+    return keys.view(np.int64)
+
+
+# -------------------- persistent LSH index --------------------
+
+class NearDupIndex:
+    """
+    Persistent MinHash LSH index of chunk signatures (SQLite, WAL).
+
+    Only canonical chunks are bucketed; a new chunk whose estimated Jaccard
+    similarity with a bucketed candidate is >= threshold becomes a duplicate
+    of it. Candidates come from the LSH bands (banding puts chunks above
+    ~(1/bands)^(1/rows) similarity in a shared bucket with high probability),
+    so a lookup never scans the whole corpus.
+    """
+
+    def __init__(
+        self,
+        path: Path = config.DEDUP_INDEX_PATH,
+        threshold: float = config.DEDUP_THRESHOLD,
+        num_perm: int = config.DEDUP_NUM_PERM,
+        bands: int = config.DEDUP_BANDS,
+        shingle: int = config.DEDUP_SHINGLE,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.threshold = threshold
+        self.bands = bands
+        self.hasher = MinHasher(num_perm, shingle)
+        self.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "chunk_id TEXT PRIMARY KEY, file TEXT NOT NULL, signature BLOB NOT NULL, duplicate_of TEXT)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS chunks_file ON chunks (file)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS chunks_duplicate_of ON chunks (duplicate_of)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (band INTEGER NOT NULL, key INTEGER NOT NULL, chunk_id TEXT NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS buckets_key ON buckets (band, key)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS buckets_chunk ON buckets (chunk_id)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        self._check_params(num_perm, bands, shingle)
+
+    def _check_params(self, num_perm: int, bands: int, shingle: int):
+        params = json.dumps({"num_perm": num_perm, "bands": bands, "shingle": shingle})
+        row = self.conn.execute("SELECT value FROM meta WHERE name = 'params'").fetchone()
+        if row is not None and row[0] != params:
+            # signatures made with other settings can't be compared; start over
+            logger.warning(f"Dedup settings changed; clearing {self.path}")
+            self.conn.execute("DELETE FROM chunks")
+            self.conn.execute("DELETE FROM buckets")
+        self.conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('params', ?)", (params,))
+
+    def _candidates(self, keys: np.ndarray) -> Set[str]:
+        found: Set[str] = set()
+        for band, key in enumerate(keys.tolist()):
+            found.update(r[0] for r in self.conn.execute(
+                "SELECT chunk_id FROM buckets WHERE band = ? AND key = ?", (band, key)))
+        return found
+
+    def _signature(self, chunk_id: str) -> Optional[np.ndarray]:
+        row = self.conn.execute("SELECT signature FROM chunks WHERE chunk_id = ?", (chunk_id,)).fetchone()
+        return np.frombuffer(row[0], dtype=np.uint32) if row else None
+
+    def add(self, file: str, chunk_ids: Sequence[str], texts: Sequence[str]) -> List[Optional[str]]:
+        """
+        Signs and indexes chunks in order; returns each chunk's canonical chunk
+        id, or None when it is new content (and becomes canonical itself).
+        Chunks earlier in the same call count, so copies within one file are found too.
+        """
+        signatures = self.hasher.signatures(texts)
+        keys = band_keys(signatures, self.bands)
+        empty = np.array([not _WORD.search(t) for t in texts])
+        result: List[Optional[str]] = []
+        self.conn.execute("BEGIN")
+        try:
+            for chunk_id, sig, key, is_empty in zip(chunk_ids, signatures, keys, empty):
+                canonical = None
+                if not is_empty:
+                    best = self.threshold
+                    for candidate in self._candidates(key):
+                        if candidate == chunk_id:
+                            continue
+                        other = self._signature(candidate)
+                        similarity = float(np.mean(other == sig)) if other is not None else 0.0
+                        if similarity >= best:
+                            canonical, best = candidate, similarity
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO chunks (chunk_id, file, signature, duplicate_of) VALUES (?, ?, ?, ?)",
+                    (chunk_id, file, sig.tobytes(), canonical),
+                )
+                self.conn.execute("DELETE FROM buckets WHERE chunk_id = ?", (chunk_id,))
+                if canonical is None and not is_empty:
+                    self.conn.executemany(
+                        "INSERT INTO buckets (band, key, chunk_id) VALUES (?, ?, ?)",
+                        [(band, k, chunk_id) for band, k in enumerate(key.tolist())],
+                    )
+                result.append(canonical)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return result
+
+    def remove_file(self, file: str) -> Set[str]:
+        """
+        Drops every chunk of one *.chunks.jsonl file. Returns the other files
+        holding duplicates of the removed chunks: their pointers are now
+        dangling, so they need to be deduplicated again (see dedup_chunk_file).
+        """
+        ids = [r[0] for r in self.conn.execute("SELECT chunk_id FROM chunks WHERE file = ?", (file,))]
+        orphaned: Set[str] = set()
+        self.conn.execute("BEGIN")
+        try:
+            for s in range(0, len(ids), 500):
+                part = ids[s:s + 500]
+                marks = ",".join("?" * len(part))
+                orphaned.update(r[0] for r in self.conn.execute(
+                    f"SELECT DISTINCT file FROM chunks WHERE duplicate_of IN ({marks})", part))
+                self.conn.execute(f"DELETE FROM buckets WHERE chunk_id IN ({marks})", part)
+            self.conn.execute("DELETE FROM chunks WHERE file = ?", (file,))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        orphaned.discard(file)
+        return orphaned
+
+    def files(self, chunk_ids: Iterable[str]) -> Dict[str, str]:
+        """Chunks file of each of `chunk_ids` that is indexed."""
+        ids = list(set(chunk_ids))
+        found = {}
+        for s in range(0, len(ids), 500):
+            part = ids[s:s + 500]
+            found.update(self.conn.execute(
+                f"SELECT chunk_id, file FROM chunks WHERE chunk_id IN ({','.join('?' * len(part))})", part))
+        return found
+
+    def stats(self) -> Dict[str, int]:
+        chunks, dups = self.conn.execute("SELECT COUNT(*), COUNT(duplicate_of) FROM chunks").fetchone()
+        return {"chunks": chunks, "duplicates": dups, "canonical": chunks - dups}
+
+    def close(self):
+        self.conn.close()
+
+
+# -------------------- duplicate sources --------------------
+
+class DuplicateSources:
+    """
+    Where the near-duplicate copies of each canonical chunk live, kept next to
+    the chunk files as duplicate_sources.json:
+    {canonical id: {"file": its chunks file, "copies": [{"chunk_id", "file", "offset"}, ...]}}.
+
+    Copies are not indexed, so a search filtered on source metadata reaches
+    them through their canonical chunk (src/orchestrator/filters.py), and
+    shard selection follows `links` (copy file -> canonical chunks files).
+    dedup_outputs keeps the file current; readers call refresh().
+    """
+
+    def __init__(self, processed_dir: Path):
+        self.processed_dir = Path(processed_dir)
+        self.path = self.processed_dir / DUPLICATE_SOURCES_NAME
+        self.canonical: Dict[str, Dict[str, Any]] = {}
+        self.links: Dict[str, Set[str]] = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def _mtime_ns(self) -> Optional[int]:
+        try:
+            return self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def refresh(self) -> bool:
+        """Reloads the file if it changed since it was read; True if so."""
+        with self._lock:
+            mtime = self._mtime_ns()
+            if mtime == self._mtime:
+                return False
+            canonical = json.loads(self.path.read_text(encoding="utf-8"))["canonical"] if mtime else {}
+            self._set(canonical)
+            self._mtime = mtime
+            return True
+
+    def _set(self, canonical: Dict[str, Dict[str, Any]]):
+        links = defaultdict(set)
+        for entry in canonical.values():
+            for copy in entry["copies"]:
+                if entry["file"]:
+                    links[copy["file"]].add(entry["file"])
+        self.canonical, self.links = canonical, dict(links)
+
+    def copies(self, chunk_id: str) -> List[Dict[str, Any]]:
+        entry = self.canonical.get(chunk_id)
+        return entry["copies"] if entry else []
+
+    def drop_files(self, names: Iterable[str]):
+        """Forgets the copies held in these chunks files."""
+        names = set(names)
+        canonical = {}
+        for chunk_id, entry in self.canonical.items():
+            copies = [c for c in entry["copies"] if c["file"] not in names]
+            if copies:
+                canonical[chunk_id] = {"file": entry["file"], "copies": copies}
+        self._set(canonical)
+
+    def add_copies(self, file: str, copies: Iterable[Tuple[str, int, str]], canonical_files: Dict[str, str]):
+        """Records the (chunk id, byte offset, canonical id) copies of one chunks file."""
+        canonical = dict(self.canonical)
+        for chunk_id, offset, canonical_id in copies:
+            entry = canonical.get(canonical_id)
+            entry = {"file": canonical_files.get(canonical_id, entry and entry["file"]),
+                     "copies": list(entry["copies"]) if entry else []}
+            entry["copies"].append({"chunk_id": chunk_id, "file": file, "offset": offset})
+            canonical[canonical_id] = entry
+        self._set(canonical)
+
+    def save(self):
+        with self._lock:
+            tmp = self.path.with_suffix(".json.tmp")
+            tmp.write_text(json.dumps({"canonical": self.canonical}, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.path)
+            self._mtime = self._mtime_ns()
+
+
+def read_copies(chunks_path: Path) -> List[Tuple[str, int, str]]:
+    """(chunk id, byte offset, canonical id) of every record marked "duplicate_of" in a chunks file."""
+    copies = []
+    with open(chunks_path, "rb") as f:
+        offset = 0
+        for line in f:
+            if b'"duplicate_of"' in line:
+                record = json.loads(line)
+                if record.get("duplicate_of"):
+                    copies.append((record["id"], offset, record["duplicate_of"]))
+            offset += len(line)
+    return copies
+
+
+def rebuild_duplicate_sources(index: NearDupIndex, out_dir: Path) -> DuplicateSources:
+    """Writes duplicate_sources.json from every chunks file under out_dir (e.g. one deduplicated before it existed)."""
+    sources = DuplicateSources(out_dir)
+    sources.drop_files(list(sources.links))
+    for path in sorted(Path(out_dir).glob("*.chunks.jsonl")):
+        copies = read_copies(path)
+        if copies:
+            sources.add_copies(path.name, copies, index.files(c for _, _, c in copies))
+    sources.save()
+    return sources
+
+
+# -------------------- chunk files --------------------
+
+def dedup_chunk_file(index: NearDupIndex, chunks_path: Path) -> Dict[str, object]:
+    """
+    Marks near-duplicate chunks of one *.chunks.jsonl file in place: each
+    duplicate record gets "duplicate_of": <canonical chunk id>, which
+    iter_chunk_records skips, so it is neither embedded nor sent to the LLM.
+    Returns counts, the (chunk id, byte offset, canonical id) of each
+    duplicate, and the other files that pointed at this file's old chunks.
+    """
+    chunks_path = Path(chunks_path)
+    with open(chunks_path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    orphaned = index.remove_file(chunks_path.name)
+    canonical = index.add(chunks_path.name, [r["id"] for r in records], [r.get("text") or "" for r in records])
+
+    copies = []
+    tmp = chunks_path.with_suffix(".jsonl.tmp")
+    with open(tmp, "wb") as f:
+        offset = 0
+        for record, dup_of in zip(records, canonical):
+            record.pop("duplicate_of", None)
+            if dup_of is not None:
+                record["duplicate_of"] = dup_of
+                copies.append((record["id"], offset, dup_of))
+            line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+            f.write(line)
+            offset += len(line)
+    os.replace(tmp, chunks_path)
+    return {"chunks": len(records), "duplicates": len(copies), "copies": copies, "orphaned": orphaned}
+
+
+def dedup_outputs(
+    index: NearDupIndex,
+    out_dir: Path,
+    chunk_files: Iterable[Path],
+    removed_files: Iterable[str] = (),
+    sources: Optional[DuplicateSources] = None,
+) -> Tuple[Dict[str, float], List[Path]]:
+    """
+    Deduplicates freshly written chunk files (in order: earlier files stay
+    canonical) after dropping the chunks of removed files. Other files whose
+    duplicates pointed into removed or rewritten chunks are deduplicated again
+    and returned, since their records changed. `sources`, if given, is updated
+    with where the copies now are and saved.
+
+    Each duplicate avoids one embedding and one extraction request.
+    """
+    start = time.perf_counter()
+    out_dir = Path(out_dir)
+    work = [Path(p) for p in chunk_files]
+    fresh = {p.name for p in work}
+    removed = set(removed_files)
+
+    orphaned: Set[str] = set()
+    for name in sorted(removed):
+        orphaned |= index.remove_file(name)
+    if sources is not None:
+        sources.drop_files(removed)
+
+    report = {"files": 0, "chunks": 0, "duplicates": 0}
+    done: Set[str] = set()
+    redone: List[Path] = []
+    while work or orphaned:
+        if not work:
+            work = [out_dir / name for name in sorted(orphaned - done - removed)]
+            orphaned = set()
+            continue
+        path = work.pop(0)
+        if path.name in done or not path.exists():
+            continue
+        done.add(path.name)
+        counts = dedup_chunk_file(index, path)
+        orphaned |= counts["orphaned"]
+        if sources is not None:
+            sources.drop_files([path.name])
+            sources.add_copies(path.name, counts["copies"], index.files(c for _, _, c in counts["copies"]))
+        report["files"] += 1
+        report["chunks"] += counts["chunks"]
+        report["duplicates"] += counts["duplicates"]
+        if path.name not in fresh:
+            redone.append(path)
+
+    if sources is not None:
+        sources.save()
+    report.update(
+        embeddings_avoided=report["duplicates"],
+        llm_calls_avoided=report["duplicates"],
+        seconds=round(time.perf_counter() - start, 3),
+    )
+    return report, redone
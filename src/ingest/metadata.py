@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+# <dept>_<subject>_<type>_<year>.pdf (docs/data_naming_convention.md); the
+# subject may itself contain underscores
+_YEAR = re.compile(r"(19|20)\d\d")
+
+# shard of chunks whose source name doesn't follow the convention
+UNSORTED_SHARD = "unsorted"
+
+
+def parse_source_name(name: Union[str, Path]) -> Dict[str, Any]:
+    """
+    {"dept", "subject", "type", "year"} from a source or output file name such as
+    cse_dsa_pyq_2023.pdf or cse_dsa_pyq_2023.chunks.jsonl. Fields are None when
+    the name doesn't follow the naming convention.
+    """
+    stem = Path(name).name.split(".", 1)[0].lower()
+    parts = stem.split("_")
+    if len(parts) < 4 or not _YEAR.fullmatch(parts[-1]) or not all(parts):
+        return {"dept": None, "subject": None, "type": None, "year": None}
+    return {
+        "dept": parts[0],
+        "subject": "_".join(parts[1:-2]),
+        "type": parts[-2],
+        "year": int(parts[-1]),
+    }
+
+
+def shard_key(metadata: Optional[Dict[str, Any]]) -> str:
+    """Index shard of a chunk: "<dept>_<type>", or UNSORTED_SHARD."""
+    if not metadata or not metadata.get("dept") or not metadata.get("type"):
+        return UNSORTED_SHARD
+    return f"{metadata['dept']}_{metadata['type']}"
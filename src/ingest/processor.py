@@ -1,13 +1,26 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
 import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
-from typing import List
-import importlib.util
+from typing import Dict, List, Optional, Tuple
 
 from tqdm import tqdm
 
+# the repo-level config.py; when this file is run as a script, the placeholder
+# src/ingest/config.py would otherwise be found first
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+import config
+from src.ingest.dedup import (DUPLICATE_SOURCES_NAME, DuplicateSources, NearDupIndex, dedup_outputs,
+                              rebuild_duplicate_sources)
+from src.ingest.metadata import parse_source_name
+
 # logging
 logging.basicConfig(
     level=logging.INFO,
@@ -16,13 +29,12 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-# -------------------- import cleaner.py dynamically --------------------
+# -------------------- import cleaner.py --------------------
 
 def import_cleaner_module():
-    cleaner_path = Path(__file__).parent / "cleaner.py"
-    spec = importlib.util.spec_from_file_location("cleaner", cleaner_path)
-    cleaner = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(cleaner)
+    # a regular package import, so functions from cleaner are pickled by their
+    # importable name when sent to process pools (OCR), under any start method
+    from src.ingest import cleaner
     return cleaner
 
 
@@ -49,6 +61,19 @@ def extract_text_from_docx(path: Path) -> List[str]:
     return [text]
 
 
+# -------------------- OCR --------------------
+
+def make_page_ocr(cleaner, workers: int = 1, pool: Optional[ProcessPoolExecutor] = None):
+    return cleaner.PageOcr(
+        cache_path=config.OCR_CACHE_PATH,
+        min_chars=config.OCR_MIN_CHARS,
+        resolution=config.OCR_RESOLUTION,
+        lang=config.OCR_LANG,
+        workers=workers,
+        pool=pool,
+    )
+
+
 # -------------------- file discovery --------------------
 
 def discover_files(raw_dir: Path) -> List[Path]:
@@ -67,13 +92,44 @@ def process_file(
     cleaner,
     use_ocr: bool,
     max_tokens: int,
-    overlap: int
+    overlap: int,
+    pages: Optional[List[str]] = None,
+    stream: bool = False,
+    model_tokens: Optional[str] = None,
+    ocr_workers: int = 1,
+    ocr_pool: Optional[ProcessPoolExecutor] = None
 ):
+    # pages: already extracted PDF pages (large PDFs extracted in page ranges)
+    # stream: clean and chunk PDFs page by page with bounded memory
+    # model_tokens: embedding model whose tokenizer counts max_tokens / overlap
+    # ocr_workers: processes used to OCR this file's text-less pages (use_ocr)
+    # ocr_pool: process pool for that OCR, shared across files by the caller
     ext = file_path.suffix.lower()
+    counter = None
+    if model_tokens:
+        counter = cleaner.get_token_counter(model_tokens, config.EMBEDDING_MAX_SEQ_LENGTH)
+    ocr = make_page_ocr(cleaner, ocr_workers, ocr_pool) if use_ocr and ext == ".pdf" and pages is None else None
+    metadata = parse_source_name(file_path)
+
+    if ext == ".pdf" and stream and pages is None:
+        cleaned_path, _, n_chunks = cleaner.stream_pdf_to_outputs(
+            file_path, out_dir, use_ocr=use_ocr, max_tokens=max_tokens, overlap=overlap,
+            counter=counter, ocr=ocr, metadata=metadata
+        )
+        result = {
+            "file": str(file_path),
+            "status": "ok",
+            "cleaned": str(cleaned_path),
+            "chunks": n_chunks,
+        }
+        if ocr is not None:
+            result["ocr"] = ocr.report()
+        return result
 
     # -------- extract --------
     if ext == ".pdf":
-        pages = cleaner.extract_text_from_pdf(file_path, use_ocr=use_ocr)
+        if pages is None:
+            pages = cleaner.extract_text_from_pdf(file_path, use_ocr=use_ocr, ocr=ocr)
         source_type = "pdf"
 
     elif ext == ".docx":
@@ -96,25 +152,272 @@ def process_file(
     cleaned_path = cleaner.write_cleaned_text(out_dir, basename, cleaned_text)
 
     # -------- chunk --------
-    chunks = cleaner.chunk_text_by_sentences(
-        cleaned_text,
-        max_tokens=max_tokens,
-        overlap=overlap
-    )
+    token_report = None
+    if counter is not None:
+        chunks, token_report = cleaner.chunk_text_by_model_tokens(
+            cleaned_text,
+            counter,
+            max_tokens=max_tokens,
+            overlap=overlap
+        )
+    else:
+        chunks = cleaner.chunk_text_by_sentences(
+            cleaned_text,
+            max_tokens=max_tokens,
+            overlap=overlap
+        )
 
     chunks_path = cleaner.write_chunks_jsonl(
         out_dir,
         basename,
         file_path,
-        chunks
+        chunks,
+        metadata=metadata
     )
 
-    return {
+    result = {
         "file": str(file_path),
         "status": "ok",
         "cleaned": str(cleaned_path),
         "chunks": len(chunks),
     }
+    if token_report is not None:
+        result["tokens"] = token_report
+    if ocr is not None:
+        result["ocr"] = ocr.report()
+    return result
+
+
+# -------------------- worker processes --------------------
+
+# each worker process imports cleaner.py once, in the pool initializer
+_WORKER_CLEANER = None
+
+
+def _init_worker():
+    global _WORKER_CLEANER
+    _WORKER_CLEANER = import_cleaner_module()
+
+
+def _worker_process_file(
+    file_path: Path,
+    out_dir: Path,
+    use_ocr: bool,
+    max_tokens: int,
+    overlap: int,
+    pages: Optional[List[str]] = None,
+    stream: bool = False,
+    model_tokens: Optional[str] = None
+):
+    try:
+        return process_file(file_path, out_dir, _WORKER_CLEANER, use_ocr, max_tokens, overlap,
+                            pages=pages, stream=stream, model_tokens=model_tokens)
+    except Exception as e:
+        return {"file": str(file_path), "status": "error", "error": str(e)}
+
+
+def _worker_extract_pages(
+    file_path: Path,
+    use_ocr: bool,
+    page_range: Tuple[int, int]
+) -> Tuple[List[str], Optional[dict]]:
+    # OCR runs in this worker (no nested pool); its report is merged per file
+    ocr = make_page_ocr(_WORKER_CLEANER) if use_ocr else None
+    pages = _WORKER_CLEANER.extract_text_from_pdf(file_path, use_ocr=use_ocr, page_range=page_range, ocr=ocr)
+    return pages, ocr.report() if ocr is not None else None
+
+
+def page_ranges(n_pages: int, split_pages: int) -> List[Tuple[int, int]]:
+    return [(s, min(s + split_pages, n_pages)) for s in range(0, n_pages, split_pages)]
+
+
+def process_files_parallel(
+    files: List[Path],
+    out: Path,
+    cleaner,
+    use_ocr: bool,
+    max_tokens: int,
+    overlap: int,
+    workers: int,
+    split_pages: int,
+    stream: bool = False,
+    model_tokens: Optional[str] = None,
+) -> List[dict]:
+    """
+    Runs files on a process pool. PDFs with more than `split_pages` pages are
+    extracted in page ranges on several workers, then cleaned and chunked as one
+    file. With `stream`, PDFs are not split: each one is streamed by a single
+    worker, which keeps memory bounded. Results come back in the order of `files`.
+    """
+    results: List[Optional[dict]] = [None] * len(files)
+    parts: Dict[int, List[Optional[List[str]]]] = {}
+    ocr_parts: Dict[int, List[dict]] = {}
+    pending = {}
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool, \
+            tqdm(total=len(files), desc="Processing files") as bar:
+
+        for idx, f in enumerate(files):
+            n_pages = 0
+            if f.suffix.lower() == ".pdf" and not stream:
+                try:
+                    n_pages = cleaner.count_pdf_pages(f)
+                except Exception as e:
+                    logger.error(f"Failed processing {f}: {e}")
+                    results[idx] = {"file": str(f), "status": "error", "error": str(e)}
+                    bar.update(1)
+                    continue
+
+            if n_pages > split_pages:
+                ranges = page_ranges(n_pages, split_pages)
+                parts[idx] = [None] * len(ranges)
+                for k, rng in enumerate(ranges):
+                    pending[pool.submit(_worker_extract_pages, f, use_ocr, rng)] = ("pages", idx, k)
+            else:
+                fut = pool.submit(_worker_process_file, f, out, use_ocr, max_tokens, overlap,
+                                  None, stream, model_tokens)
+                pending[fut] = ("file", idx, None)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                kind, idx, k = pending.pop(fut)
+                f = files[idx]
+
+                if kind == "file":
+                    results[idx] = fut.result()
+                    if idx in ocr_parts and results[idx]["status"] == "ok":
+                        results[idx]["ocr"] = cleaner.merge_ocr_reports(ocr_parts.pop(idx))
+                    if results[idx]["status"] == "error":
+                        logger.error(f"Failed processing {f}: {results[idx]['error']}")
+                    bar.update(1)
+                    continue
+
+                if results[idx] is not None:
+                    continue  # another range of this file already failed
+                try:
+                    parts[idx][k], ocr_report = fut.result()
+                    if ocr_report is not None:
+                        ocr_parts.setdefault(idx, []).append(ocr_report)
+                except Exception as e:
+                    logger.error(f"Failed processing {f}: {e}")
+                    results[idx] = {"file": str(f), "status": "error", "error": str(e)}
+                    bar.update(1)
+                    continue
+
+                if all(p is not None for p in parts[idx]):
+                    pages = [page for part in parts.pop(idx) for page in part]
+                    fut = pool.submit(_worker_process_file, f, out, use_ocr, max_tokens, overlap,
+                                      pages, False, model_tokens)
+                    pending[fut] = ("file", idx, None)
+
+    return results
+
+
+# -------------------- incremental manifest --------------------
+
+MANIFEST_NAME = "ingest_manifest.json"
+CHANGES_NAME = "ingest_changes.json"
+MANIFEST_VERSION = 1
+
+
+def file_sha256(path: Path, block_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def ingest_params(use_ocr: bool, max_tokens: int, overlap: int, stream: bool = False,
+                  model_tokens: Optional[str] = None) -> dict:
+    # the cleaner's own source is part of the key, so edits to the cleaning
+    # rules (thresholds, regexes) re-process everything on the next run
+    cleaner_src = (Path(__file__).parent / "cleaner.py").read_bytes()
+    return {
+        "cleaner": hashlib.sha256(cleaner_src).hexdigest()[:16],
+        "use_ocr": use_ocr,
+        "max_tokens": max_tokens,
+        "overlap": overlap,
+        "stream": stream,
+        "model_tokens": model_tokens,
+    }
+
+
+def output_paths(out_dir: Path, file_path: Path) -> Tuple[Path, Path]:
+    return out_dir / f"{file_path.stem}.cleaned.txt", out_dir / f"{file_path.stem}.chunks.jsonl"
+
+
+def load_manifest(out_dir: Path) -> dict:
+    path = out_dir / MANIFEST_NAME
+    if path.exists():
+        try:
+            manifest = json.loads(path.read_text(encoding="utf-8"))
+            if manifest.get("version") == MANIFEST_VERSION:
+                return manifest
+            logger.warning(f"Ignoring manifest with unknown version: {path}")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable manifest {path}: {e}")
+    return {"version": MANIFEST_VERSION, "files": {}}
+
+
+def _write_json_atomic(path: Path, data: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def save_manifest(out_dir: Path, manifest: dict):
+    _write_json_atomic(out_dir / MANIFEST_NAME, manifest)
+
+
+def plan_changes(raw: Path, files: List[Path], out: Path, manifest: dict, params: dict, force: bool = False) -> dict:
+    """
+    Compares discovered files with the manifest.
+
+    A file is unchanged when its parameters match and its outputs still exist,
+    and either size and mtime are the same, or the content hash is (a touched
+    file is not re-processed); `force` treats every known file as modified.
+    Returns {"added", "modified", "unchanged"} lists of
+    (key, path, stat, sha256 or None) and "removed" manifest keys.
+    """
+    entries = manifest["files"]
+    plan = {"added": [], "modified": [], "unchanged": [], "removed": []}
+
+    for f in files:
+        key = f.relative_to(raw).as_posix()
+        st = f.stat()
+        entry = entries.get(key)
+        if entry is None:
+            plan["added"].append((key, f, st, None))
+            continue
+
+        outputs_exist = all(p.exists() for p in output_paths(out, f))
+        if force or entry.get("params") != params or not outputs_exist:
+            plan["modified"].append((key, f, st, None))
+        elif entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            plan["unchanged"].append((key, f, st, entry["sha256"]))
+        else:
+            digest = file_sha256(f)
+            bucket = "unchanged" if digest == entry["sha256"] else "modified"
+            plan[bucket].append((key, f, st, digest))
+
+    seen = {f.relative_to(raw).as_posix() for f in files}
+    plan["removed"] = sorted(k for k in entries if k not in seen)
+    return plan
+
+
+def remove_stale_outputs(out: Path, entry: dict, live_outputs: set) -> List[str]:
+    """Deletes the outputs of a deleted source, unless a live source writes to the same name."""
+    deleted = []
+    for name in entry.get("outputs", []):
+        path = out / name
+        if name in live_outputs or not path.exists():
+            continue
+        path.unlink()
+        deleted.append(str(path))
+    return deleted
 
 
 # -------------------- main --------------------
@@ -125,7 +428,20 @@ def main(
     use_ocr: bool,
     max_tokens: int,
     overlap: int,
+    workers: int = 1,
+    split_pages: int = 200,
+    incremental: bool = True,
+    stream: bool = False,
+    model_tokens: Optional[str] = None,
+    dedup: bool = config.DEDUP_ENABLED,
 ):
+    # incremental: only process files that are new or changed since the last
+    # run (see ingest_manifest.json in out_dir); otherwise re-process all of
+    # them. Outputs of deleted sources are removed either way, and the change
+    # list is written to ingest_changes.json. With dedup, near-duplicate chunks
+    # are marked "duplicate_of" their canonical chunk (see dedup.py) so that
+    # embedding and graph extraction skip them; duplicate_sources.json records
+    # where the copies are, for metadata filters
     raw = Path(raw_dir)
     out = Path(out_dir)
 
@@ -134,28 +450,159 @@ def main(
     files = discover_files(raw)
     logger.info(f"Discovered {len(files)} files in {raw}")
 
+    params = ingest_params(use_ocr, max_tokens, overlap, stream, model_tokens)
+    manifest = load_manifest(out)
+    plan = plan_changes(raw, files, out, manifest, params, force=not incremental)
+    todo = plan["added"] + plan["modified"]
+    todo.sort(key=lambda item: item[1])
+    logger.info(
+        f"Manifest: {len(plan['added'])} new, {len(plan['modified'])} changed, "
+        f"{len(plan['unchanged'])} unchanged, {len(plan['removed'])} removed"
+    )
+
     results = []
+    todo_files = [f for _, f, _, _ in todo]
 
-    for f in tqdm(files, desc="Processing files"):
+    if workers > 1:
+        results = process_files_parallel(
+            todo_files, out, cleaner, use_ocr, max_tokens, overlap, workers, split_pages, stream, model_tokens
+        )
+    else:
+        # one OCR pool for the whole run; its processes start on first use
+        ocr_workers = config.OCR_WORKERS or os.cpu_count() or 1
+        ocr_pool = ProcessPoolExecutor(max_workers=ocr_workers) if use_ocr and ocr_workers > 1 else None
         try:
-            res = process_file(
-                f,
-                out,
-                cleaner,
-                use_ocr,
-                max_tokens,
-                overlap
-            )
-            results.append(res)
-        except Exception as e:
-            logger.error(f"Failed processing {f}: {e}")
-            results.append({"file": str(f), "status": "error", "error": str(e)})
+            for f in tqdm(todo_files, desc="Processing files"):
+                try:
+                    res = process_file(
+                        f,
+                        out,
+                        cleaner,
+                        use_ocr,
+                        max_tokens,
+                        overlap,
+                        stream=stream,
+                        model_tokens=model_tokens,
+                        ocr_workers=ocr_workers,
+                        ocr_pool=ocr_pool
+                    )
+                    results.append(res)
+                except Exception as e:
+                    logger.error(f"Failed processing {f}: {e}")
+                    results.append({"file": str(f), "status": "error", "error": str(e)})
+        finally:
+            if ocr_pool is not None:
+                ocr_pool.shutdown()
 
     ok = [r for r in results if r["status"] == "ok"]
     err = [r for r in results if r["status"] == "error"]
 
     logger.info(f"Processing complete: {len(ok)} succeeded, {len(err)} failed")
 
+    ocr_reports = [r["ocr"] for r in ok if "ocr" in r]
+    if ocr_reports:
+        total = cleaner.merge_ocr_reports(ocr_reports)
+        logger.info(
+            f"OCR: {total['ocr_pages']} of {total['pages_checked']} PDF pages had no usable text layer; "
+            f"{total['cache_hits']} from cache, {total['ocr_seconds']:.1f}s OCR "
+            f"({total['seconds_per_page']:.2f}s/page)"
+        )
+
+    reports = [r["tokens"] for r in ok if "tokens" in r]
+    if reports:
+        word_chunks = sum(t["word_budget_chunks"] for t in reports)
+        truncated = sum(t["word_budget_truncated"] for t in reports)
+        over_limit = sum(t.get("over_limit", 0) for t in reports)
+        logger.info(
+            f"Model-token chunking ({model_tokens}): {sum(t['chunks'] for t in reports)} chunks, "
+            f"{over_limit} still over the limit; "
+            f"the word-count budget would have made {word_chunks}, {truncated} of them truncated "
+            f"at {config.EMBEDDING_MAX_SEQ_LENGTH} tokens"
+        )
+
+    # -------- update manifest --------
+    entries = manifest["files"]
+    changes = {"added": [], "modified": [], "removed": [], "failed": [], "unchanged": len(plan["unchanged"])}
+    added = {key for key, _, _, _ in plan["added"]}
+
+    for (key, f, st, digest), res in zip(todo, results):
+        cleaned_path, chunks_path = output_paths(out, f)
+        change = {"source": key, "cleaned": str(cleaned_path), "chunks": str(chunks_path)}
+        if res["status"] != "ok":
+            # keep the old entry (if any) so the file is retried next run
+            changes["failed"].append({**change, "error": res.get("error", res["status"])})
+            continue
+        if key in entries:
+            # downstream stages drop the old chunk ids ({stem}_chunk_{i}) before adding the new ones
+            change["previous_chunks_count"] = entries[key].get("chunks", 0)
+        entries[key] = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": digest or file_sha256(f),
+            "params": params,
+            "outputs": [cleaned_path.name, chunks_path.name],
+            "chunks": res["chunks"],
+        }
+        changes["added" if key in added else "modified"].append({**change, "chunks_count": res["chunks"]})
+
+    for key, f, st, digest in plan["unchanged"]:
+        entries[key].update(size=st.st_size, mtime_ns=st.st_mtime_ns)
+
+    removed = {key: entries.pop(key) for key in plan["removed"]}
+    live_outputs = {name for e in entries.values() for name in e.get("outputs", [])}
+    for key, entry in removed.items():
+        changes["removed"].append({
+            "source": key,
+            "previous_chunks_count": entry.get("chunks", 0),
+            "deleted": remove_stale_outputs(out, entry, live_outputs),
+        })
+
+    fresh = [output_paths(out, f)[1] for (_, f, _, _), res in zip(todo, results) if res["status"] == "ok"]
+    gone = [name for entry in removed.values() for name in entry.get("outputs", []) if name.endswith(".chunks.jsonl")]
+    if dedup:
+        index = NearDupIndex()
+        try:
+            if not (out / DUPLICATE_SOURCES_NAME).exists():
+                rebuild_duplicate_sources(index, out)  # chunk files deduplicated before it was kept
+            report, redone = dedup_outputs(index, out, fresh, gone, DuplicateSources(out))
+        finally:
+            index.close()
+        # files whose duplicates pointed at dropped chunks were rewritten: re-index them downstream
+        owners = {entry["outputs"][-1]: key for key, entry in entries.items() if entry.get("outputs")}
+        for path in redone:
+            key = owners.get(path.name)
+            if key is None:
+                continue
+            entry = entries[key]
+            changes["modified"].append({
+                "source": key,
+                "cleaned": str(out / entry["outputs"][0]),
+                "chunks": str(path),
+                "chunks_count": entry.get("chunks", 0),
+            })
+        changes["dedup"] = report
+        logger.info(
+            f"Dedup: {report['duplicates']} of {report['chunks']} chunks are near-duplicates "
+            f"({report['embeddings_avoided']} embeddings and {report['llm_calls_avoided']} LLM extractions avoided), "
+            f"{len(redone)} other files re-checked, {report['seconds']:.2f}s"
+        )
+    elif (out / DUPLICATE_SOURCES_NAME).exists():
+        # re-processed files carry no duplicate marks any more
+        sources = DuplicateSources(out)
+        sources.drop_files([p.name for p in fresh] + gone)
+        sources.save()
+
+    manifest["updated_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    save_manifest(out, manifest)
+    changes["generated_at"] = manifest["updated_at"]
+    _write_json_atomic(out / CHANGES_NAME, changes)
+    logger.info(
+        f"Change list: {len(changes['added'])} added, {len(changes['modified'])} modified, "
+        f"{len(changes['removed'])} removed -> {out / CHANGES_NAME}"
+    )
+
+    return results
+
 
 # -------------------- entrypoint --------------------
 
@@ -163,9 +610,24 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser("PDF / DOCX cleaner for RAG")
     parser.add_argument("--raw-dir", default="data/raw")
     parser.add_argument("--out-dir", default="data/processed")
-    parser.add_argument("--ocr", action="store_true")
+    parser.add_argument("--ocr", action="store_true",
+                        help="OCR PDF pages whose text layer is empty or very thin (cached on disk)")
     parser.add_argument("--max-tokens", type=int, default=500)
     parser.add_argument("--overlap", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes (0 = one per CPU core)")
+    parser.add_argument("--split-pages", type=int, default=200,
+                        help="PDFs with more pages are extracted in ranges of this size across workers")
+    parser.add_argument("--full", action="store_true",
+                        help="ignore the ingest manifest and re-process every file")
+    parser.add_argument("--stream", action="store_true",
+                        help="clean and chunk PDFs page by page (bounded memory, for very large files)")
+    parser.add_argument("--model-tokens", nargs="?", const=config.EMBEDDING_MODEL_NAME, default=None,
+                        metavar="MODEL",
+                        help="count --max-tokens/--overlap with this embedding model's tokenizer "
+                             f"(default {config.EMBEDDING_MODEL_NAME}), capped at its max sequence length")
+    parser.add_argument("--no-dedup", action="store_true",
+                        help="don't mark near-duplicate chunks (they are then embedded and extracted too)")
     args = parser.parse_args()
 
     main(
@@ -174,4 +636,10 @@ if __name__ == "__main__":
         args.ocr,
         args.max_tokens,
         args.overlap,
+        workers=args.workers or os.cpu_count() or 1,
+        split_pages=args.split_pages,
+        incremental=not args.full,
+        stream=args.stream,
+        model_tokens=args.model_tokens,
+        dedup=config.DEDUP_ENABLED and not args.no_dedup,
     )
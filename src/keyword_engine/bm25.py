@@ -0,0 +1,592 @@
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import config
+    from src.vector_engine.store import iter_chunk_file, iter_chunk_records
+except ImportError:
+    # Fallback for running script directly from subfolder
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+    import config
+    from src.vector_engine.store import iter_chunk_file, iter_chunk_records
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("BM25Index")
+
+MANIFEST_NAME = "segments.json"
+MANIFEST_VERSION = 1
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+# -------------------- Segments --------------------
+
+class Segment:
+    """
+    One immutable, on-disk slice of the index in CSR form:
+
+      terms.txt     sorted vocabulary, one term per line (term id = line number)
+      indptr.npy    int64 [V + 1]; postings of term t are [indptr[t], indptr[t+1])
+      docs.npy      int32 [nnz]  local doc ids, ascending within each term
+      tfs.npy       int32 [nnz]  term frequencies
+      doc_len.npy   int32 [n]    tokens per document
+      chunk_ids.txt / files.txt / file_idx.npy / offsets.npy  doc -> chunk record
+
+    Arrays are opened with np.load(mmap_mode="r"); only the vocabulary is
+    read into a dict.
+    """
+
+    def __init__(self, path: Path, mmap: bool = True):
+        self.path = Path(path)
+        self.name = self.path.name
+        mode = "r" if mmap else None
+        self.indptr = np.load(self.path / "indptr.npy", mmap_mode=mode)
+        self.docs = np.load(self.path / "docs.npy", mmap_mode=mode)
+        self.tfs = np.load(self.path / "tfs.npy", mmap_mode=mode)
+        self.doc_len = np.load(self.path / "doc_len.npy", mmap_mode=mode)
+        self.file_idx = np.load(self.path / "file_idx.npy", mmap_mode=mode)
+        self.offsets = np.load(self.path / "offsets.npy", mmap_mode=mode)
+        self.terms = _read_lines(self.path / "terms.txt")
+        self.term_ids = {t: i for i, t in enumerate(self.terms)}
+        self.chunk_ids = _read_lines(self.path / "chunk_ids.txt")
+        self.files = _read_lines(self.path / "files.txt")
+        self.n_docs = len(self.doc_len)
+        self.total_len = int(self.doc_len.sum())
+
+    def postings(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        t = self.term_ids.get(term)
+        if t is None:
+            return None
+        s, e = self.indptr[t], self.indptr[t + 1]
+        return self.docs[s:e], self.tfs[s:e]
+
+    def doc_freqs(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    @staticmethod
+    def write(path: Path, docs: Sequence[Tuple[str, str, int, Sequence[str]]]) -> "Segment":
+        """Writes (chunk_id, chunks file, byte offset, tokens) documents as a new segment."""
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        if tmp.exists():
+            shutil.rmtree(tmp)
+        tmp.mkdir(parents=True)
+
+        files: List[str] = []
+        file_pos: Dict[str, int] = {}
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        doc_len = np.zeros(len(docs), dtype=np.int32)
+        file_idx = np.zeros(len(docs), dtype=np.int32)
+        offsets = np.zeros(len(docs), dtype=np.int64)
+        for d, (_, file, offset, tokens) in enumerate(docs):
+            doc_len[d] = len(tokens)
+            if file not in file_pos:
+                file_pos[file] = len(files)
+                files.append(file)
+            file_idx[d] = file_pos[file]
+            offsets[d] = offset
+            for term, tf in Counter(tokens).items():
+                postings.setdefault(term, []).append((d, tf))
+
+        terms = sorted(postings)
+        indptr = np.zeros(len(terms) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(postings[t]) for t in terms])
+        flat = [p for t in terms for p in postings[t]]
+        pairs = np.array(flat, dtype=np.int32).reshape(-1, 2)
+
+        np.save(tmp / "indptr.npy", indptr)
+        np.save(tmp / "docs.npy", np.ascontiguousarray(pairs[:, 0]))
+        np.save(tmp / "tfs.npy", np.ascontiguousarray(pairs[:, 1]))
+        np.save(tmp / "doc_len.npy", doc_len)
+        np.save(tmp / "file_idx.npy", file_idx)
+        np.save(tmp / "offsets.npy", offsets)
+        _write_lines(tmp / "terms.txt", terms)
+        _write_lines(tmp / "chunk_ids.txt", [d[0] for d in docs])
+        _write_lines(tmp / "files.txt", files)
+        os.replace(tmp, path)
+        return Segment(path)
+
+    def iter_docs(self, skip: Iterable[int] = ()) -> Iterable[Tuple[str, str, int, List[str]]]:
+        """Rebuilds (chunk_id, file, offset, tokens) per document, for merging."""
+        skip = set(skip)
+        bags: List[List[str]] = [[] for _ in range(self.n_docs)]
+        indptr = np.asarray(self.indptr)
+        docs = np.asarray(self.docs)
+        tfs = np.asarray(self.tfs)
+        for t, term in enumerate(self.terms):
+            for d, tf in zip(docs[indptr[t]:indptr[t + 1]].tolist(), tfs[indptr[t]:indptr[t + 1]].tolist()):
+                if d not in skip:
+                    bags[d].extend([term] * tf)
+        for d in range(self.n_docs):
+            if d not in skip:
+                yield self.chunk_ids[d], self.files[self.file_idx[d]], int(self.offsets[d]), bags[d]
+
+
+def _read_lines(path: Path) -> List[str]:
+    # every line is newline-terminated, so empty entries survive the round trip
+    return path.read_text(encoding="utf-8").split("\n")[:-1]
+
+
+def _write_lines(path: Path, lines: Sequence[str]):
+    path.write_text("".join(f"{line}\n" for line in lines), encoding="utf-8")
+
+
+class _Snapshot:
+    """Segments + deletions + corpus statistics, as seen by one search."""
+
+    def __init__(self, segments: List[Segment], deleted: Dict[str, set], epsilon: float,
+                 previous: Optional["_Snapshot"] = None):
+        self.segments = segments
+        self.deleted = deleted
+        self.bases = np.cumsum([0] + [s.n_docs for s in segments]).tolist()
+        if previous is not None and previous.segments == segments:
+            # deletes alone don't change the statistics
+            self.n_docs, self.avgdl, self.df, self.eps = previous.n_docs, previous.avgdl, previous.df, previous.eps
+            return
+        self.n_docs = self.bases[-1]
+        total_len = sum(s.total_len for s in segments)
+        self.avgdl = total_len / self.n_docs if self.n_docs else 0.0
+
+        # Okapi idf with rank_bm25's floor: negative idfs become epsilon * mean idf
+        # over the whole vocabulary. Deleted documents count until their segment
+        # is merged away, as in Lucene.
+        df = Counter()
+        for seg in segments:
+            for term, f in zip(seg.terms, seg.doc_freqs().tolist()):
+                df[term] += f
+        self.df = df
+        if df:
+            freqs = np.fromiter(df.values(), dtype=np.float64, count=len(df))
+            idf = np.log(self.n_docs - freqs + 0.5) - np.log(freqs + 0.5)
+            self.eps = epsilon * float(idf.sum() / len(idf))
+        else:
+            self.eps = 0.0
+
+    def idf(self, term: str) -> float:
+        f = self.df.get(term)
+        if not f:
+            return 0.0
+        idf = np.log(self.n_docs - f + 0.5) - np.log(f + 0.5)
+        return float(idf) if idf >= 0 else self.eps
+
+
+# -------------------- Index --------------------
+
+class BM25Index:
+    """
+    Segmented BM25 (Okapi) keyword index over processed chunks.
+
+    New documents are buffered and written as a new segment on flush();
+    nothing is rewritten. When there are more than `max_segments`, the
+    smallest ones are merged into one on a background thread, which also
+    drops deleted documents; searches keep using the previous segment list
+    until the merged one is swapped in. Scores match rank_bm25.BM25Okapi over
+    the same tokens (see benchmarks/bench_bm25.py).
+    """
+
+    # segments merged together at once
+    MERGE_FACTOR = 4
+
+    def __init__(
+        self,
+        index_dir: Path = config.BM25_INDEX_DIR,
+        k1: float = config.BM25_K1,
+        b: float = config.BM25_B,
+        epsilon: float = config.BM25_EPSILON,
+        max_segments: int = config.BM25_MAX_SEGMENTS,
+        flush_docs: int = config.BM25_FLUSH_DOCS,
+        background_merge: bool = True,
+        processed_dir: Path = config.PROCESSED_DATA_DIR,
+    ):
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.processed_dir = Path(processed_dir)
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+        self.max_segments = max(1, max_segments)
+        self.flush_docs = flush_docs
+        self.background_merge = background_merge
+
+        self._lock = threading.RLock()
+        self._merge_lock = threading.Lock()
+        self._merge_thread: Optional[threading.Thread] = None
+        self._buffer: List[Tuple[str, str, int, List[str]]] = []
+        self._next_segment = 0
+        self.generation = 0  # bumped on every published change (see refresh())
+        self._segments: List[Segment] = []
+        self._deleted: Dict[str, set] = {}  # segment name -> deleted local doc ids
+        self._where: Dict[str, Tuple[str, int]] = {}  # live chunk id -> (segment, local doc id)
+        self._snapshot: Optional[_Snapshot] = None
+        self._load()
+        self._snapshot = _Snapshot(list(self._segments), self._deleted, self.epsilon)
+
+    # ---------- manifest ----------
+
+    def _read_manifest(self) -> Optional[Dict[str, Any]]:
+        path = self.index_dir / MANIFEST_NAME
+        if not path.exists():
+            return None
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+        if manifest.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported BM25 manifest version: {manifest.get('version')}")
+        return manifest
+
+    def _load(self, manifest: Optional[Dict[str, Any]] = None):
+        manifest = manifest or self._read_manifest()
+        if manifest is None:
+            return
+        # segments are immutable, so ones already open are reused as-is
+        opened = {seg.name: seg for seg in self._segments}
+        segments = [opened.get(e["name"]) or Segment(self.index_dir / e["name"]) for e in manifest["segments"]]
+        deleted = {seg.name: set(e.get("deleted", [])) for seg, e in zip(segments, manifest["segments"])}
+        where = {}
+        for seg in segments:
+            dead = deleted[seg.name]
+            for d, chunk_id in enumerate(seg.chunk_ids):
+                if d not in dead:
+                    where[chunk_id] = (seg.name, d)
+        self._segments, self._deleted, self._where = segments, deleted, where
+        self._next_segment = manifest["next_segment"]
+        self.generation = manifest.get("generation", 0)
+
+    def _save_manifest(self):
+        path = self.index_dir / MANIFEST_NAME
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps({
+            "version": MANIFEST_VERSION,
+            "next_segment": self._next_segment,
+            "generation": self.generation,
+            "segments": [
+                {"name": s.name, "docs": s.n_docs, "deleted": sorted(self._deleted.get(s.name, ()))}
+                for s in self._segments
+            ],
+        }), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def _publish(self):
+        # callers hold self._lock
+        self.generation += 1
+        self._save_manifest()
+        self._snapshot = _Snapshot(
+            list(self._segments), {k: set(v) for k, v in self._deleted.items()}, self.epsilon, self._snapshot
+        )
+
+    def refresh(self) -> bool:
+        """
+        Picks up changes another process (e.g. an ingest run) published to
+        index_dir since this index was opened. For read-only users; returns
+        True when the index changed.
+        """
+        for attempt in range(3):
+            manifest = self._read_manifest()
+            if manifest is None or manifest.get("generation", 0) == self.generation:
+                return False
+            try:
+                with self._lock:
+                    self._load(manifest)
+                    self._snapshot = _Snapshot(
+                        list(self._segments), {k: set(v) for k, v in self._deleted.items()}, self.epsilon, self._snapshot
+                    )
+                return True
+            except FileNotFoundError:
+                time.sleep(0.05 * (attempt + 1))  # a merge removed a segment between the two reads
+        return False
+
+    def _new_segment_path(self) -> Path:
+        path = self.index_dir / f"seg_{self._next_segment:06d}"
+        self._next_segment += 1
+        return path
+
+    def __len__(self) -> int:
+        return len(self._where) + len(self._buffer)
+
+    # ---------- writes ----------
+
+    def add_documents(
+        self,
+        chunk_ids: Sequence[str],
+        texts: Sequence[str],
+        files: Optional[Sequence[str]] = None,
+        offsets: Optional[Sequence[int]] = None,
+    ):
+        """
+        Buffers documents (replacing existing chunk ids); flushes every `flush_docs`.
+        A chunk id repeated within one call keeps its last document.
+        """
+        last = {chunk_id: k for k, chunk_id in enumerate(chunk_ids)}
+        with self._lock:
+            self.delete(chunk_ids)
+            for k, (chunk_id, text) in enumerate(zip(chunk_ids, texts)):
+                if last[chunk_id] != k:
+                    continue
+                file = files[k] if files is not None else ""
+                offset = int(offsets[k]) if offsets is not None else -1
+                self._buffer.append((chunk_id, file, offset, tokenize(text)))
+            if len(self._buffer) >= self.flush_docs:
+                self.flush()
+
+    def add_records(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Indexes chunk records (dicts with "id" and "text", as in *.chunks.jsonl) and flushes."""
+        n = 0
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= 1000:
+                n += self._add_batch(batch)
+                batch = []
+        n += self._add_batch(batch)
+        self.flush()
+        return n
+
+    def _add_batch(self, records: List[Dict[str, Any]]) -> int:
+        if records:
+            self.add_documents(
+                [r["id"] for r in records],
+                [r["text"] for r in records],
+                files=[r.get("_file", "") for r in records],
+                offsets=[r.get("_offset", -1) for r in records],
+            )
+        return len(records)
+
+    def delete(self, chunk_ids: Iterable[str]) -> int:
+        with self._lock:
+            chunk_ids = set(chunk_ids)
+            before = len(self._buffer)
+            self._buffer = [d for d in self._buffer if d[0] not in chunk_ids]
+            removed = before - len(self._buffer)
+            changed = False
+            for chunk_id in chunk_ids:
+                where = self._where.pop(chunk_id, None)
+                if where is not None:
+                    self._deleted.setdefault(where[0], set()).add(where[1])
+                    removed += 1
+                    changed = True
+            if changed:
+                self._publish()
+            return removed
+
+    def delete_file(self, chunks_file: str) -> int:
+        """Removes every chunk that was read from one *.chunks.jsonl file."""
+        with self._lock:
+            doomed = [d[0] for d in self._buffer if d[1] == chunks_file]
+            for seg in self._segments:
+                if chunks_file in seg.files:
+                    f = seg.files.index(chunks_file)
+                    deleted = self._deleted.get(seg.name, set())
+                    doomed += [seg.chunk_ids[d] for d in np.flatnonzero(np.asarray(seg.file_idx) == f).tolist()
+                               if d not in deleted]
+            return self.delete(doomed)
+
+    def flush(self):
+        """Writes buffered documents as a new segment and makes them searchable."""
+        with self._lock:
+            if not self._buffer:
+                return
+            docs, self._buffer = self._buffer, []
+            seg = Segment.write(self._new_segment_path(), docs)
+            self._segments.append(seg)
+            self._deleted[seg.name] = set()
+            for d, (chunk_id, _, _, _) in enumerate(docs):
+                self._where[chunk_id] = (seg.name, d)
+            self._publish()
+            logger.info(f"Flushed segment {seg.name} ({seg.n_docs} docs, {len(self._segments)} segments)")
+            if len(self._segments) > self.max_segments:
+                self._start_merge()
+
+    # ---------- merging ----------
+
+    def _start_merge(self):
+        if not self.background_merge:
+            self.merge()
+            return
+        if self._merge_thread is not None and self._merge_thread.is_alive():
+            return
+        self._merge_thread = threading.Thread(target=self.merge, name="bm25-merge", daemon=True)
+        self._merge_thread.start()
+
+    def wait_for_merges(self):
+        thread = self._merge_thread
+        if thread is not None:
+            thread.join()
+
+    def merge(self, segments: Optional[List[Segment]] = None) -> Optional[Segment]:
+        """
+        Merges `segments` (default: the MERGE_FACTOR smallest) into one,
+        dropping deleted documents. Searches and writes continue meanwhile;
+        deletes that land during the merge are carried over to the new segment.
+        """
+        with self._merge_lock:
+            with self._lock:
+                if segments is None:
+                    if len(self._segments) <= 1:
+                        return None
+                    segments = sorted(self._segments, key=lambda s: s.n_docs)[:self.MERGE_FACTOR]
+                if len(segments) < 2:
+                    return None
+                deleted_at_start = {s.name: set(self._deleted.get(s.name, ())) for s in segments}
+                path = self._new_segment_path()
+
+            start = time.perf_counter()
+            docs = []
+            new_ids: Dict[Tuple[str, int], int] = {}
+            for seg in segments:
+                skip = deleted_at_start[seg.name]
+                live = [d for d in range(seg.n_docs) if d not in skip]
+                for d, doc in zip(live, seg.iter_docs(skip)):
+                    new_ids[(seg.name, d)] = len(docs)
+                    docs.append(doc)
+            merged = Segment.write(path, docs)
+
+            with self._lock:
+                names = {s.name for s in segments}
+                late = set()
+                for seg in segments:
+                    for d in self._deleted.get(seg.name, set()) - deleted_at_start[seg.name]:
+                        late.add(new_ids[(seg.name, d)])
+                    self._deleted.pop(seg.name, None)
+                first = min(i for i, s in enumerate(self._segments) if s.name in names)
+                self._segments = [s for s in self._segments if s.name not in names]
+                self._segments.insert(first, merged)
+                self._deleted[merged.name] = late
+                for d, chunk_id in enumerate(merged.chunk_ids):
+                    if d not in late:
+                        self._where[chunk_id] = (merged.name, d)
+                self._publish()
+
+            for seg in segments:
+                shutil.rmtree(seg.path, ignore_errors=True)
+            logger.info(
+                f"Merged {len(segments)} segments into {merged.name} "
+                f"({merged.n_docs} docs) in {time.perf_counter() - start:.2f}s"
+            )
+            return merged
+
+    # ---------- build / incremental update ----------
+
+    def build(self, processed_dir: Optional[Path] = None, records: Optional[Iterable[Dict[str, Any]]] = None) -> int:
+        """
+        Re-indexes every *.chunks.jsonl under processed_dir from scratch, or
+        just `records` when given (one shard's files, see src/orchestrator/shards.py).
+        """
+        self.processed_dir = Path(processed_dir or self.processed_dir)
+        self.wait_for_merges()
+        with self._lock:
+            for seg in self._segments:
+                shutil.rmtree(seg.path, ignore_errors=True)
+            self._segments, self._deleted, self._where, self._buffer = [], {}, {}, []
+            self._publish()
+        n = self.add_records(iter_chunk_records(self.processed_dir) if records is None else records)
+        logger.info(f"Indexed {n} chunks into {len(self._segments)} segments")
+        return n
+
+    def apply_changes(self, changes_path: Optional[Path] = None) -> Dict[str, int]:
+        """Applies ingest_changes.json from src/ingest/processor.py (see VectorStore.apply_changes)."""
+        changes_path = Path(changes_path or self.processed_dir / "ingest_changes.json")
+        changes = json.loads(changes_path.read_text(encoding="utf-8"))
+        stats = {"deleted": 0, "added": 0}
+        for entry in changes.get("removed", []):
+            stats["deleted"] += self.delete_file(f"{Path(entry['source']).stem}.chunks.jsonl")
+        for entry in changes.get("modified", []):
+            stats["deleted"] += self.delete_file(Path(entry["chunks"]).name)
+        for entry in changes.get("added", []) + changes.get("modified", []):
+            stats["added"] += self.add_records(iter_chunk_file(self.processed_dir / Path(entry["chunks"]).name))
+        return stats
+
+    # ---------- search ----------
+
+    def _score(self, snap: _Snapshot, tokens: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Dense scores over snap's documents, plus the ids of live documents that matched any term."""
+        scores = np.zeros(snap.n_docs, dtype=np.float64)
+        touched = []
+        if not snap.n_docs:
+            return scores, np.zeros(0, dtype=np.int64)
+        for term in tokens:  # repeated query terms count again, as in rank_bm25
+            idf = snap.idf(term)
+            if idf == 0.0:
+                continue
+            for seg, base in zip(snap.segments, snap.bases):
+                hit = seg.postings(term)
+                if hit is None:
+                    continue
+                docs, tfs = hit
+                tf = tfs.astype(np.float64)
+                norm = self.k1 * (1 - self.b + self.b * seg.doc_len[docs] / snap.avgdl)
+                idx = docs.astype(np.int64) + base
+                scores[idx] += idf * (tf * (self.k1 + 1)) / (tf + norm)
+                touched.append(idx)
+        matched = np.unique(np.concatenate(touched)) if touched else np.zeros(0, dtype=np.int64)
+        dead = [np.fromiter(d, dtype=np.int64, count=len(d)) + base
+                for seg, base in zip(snap.segments, snap.bases)
+                for d in [snap.deleted.get(seg.name)] if d]
+        if dead:
+            dead = np.concatenate(dead)
+            scores[dead] = 0.0
+            matched = matched[~np.isin(matched, dead)]
+        return scores, matched
+
+    def get_scores(self, query: str) -> np.ndarray:
+        """BM25 score of every document (segment order), like rank_bm25's get_scores."""
+        scores, _ = self._score(self._snapshot, tokenize(query))
+        return scores
+
+    def search(self, queries: Sequence[str], k: int = 10) -> List[List[Dict[str, Any]]]:
+        """Top-k chunks per query: [{"chunk_id", "score", "file", "offset"}, ...]."""
+        snap = self._snapshot
+        results = []
+        for query in queries:
+            scores, matched = self._score(snap, tokenize(query))
+            if len(matched) > k:
+                matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+            matched = matched[np.argsort(-scores[matched], kind="stable")]
+            hits = []
+            for doc in matched.tolist():
+                s = int(np.searchsorted(snap.bases, doc, side="right")) - 1
+                seg, d = snap.segments[s], doc - snap.bases[s]
+                hits.append({
+                    "chunk_id": seg.chunk_ids[d],
+                    "score": float(scores[doc]),
+                    "file": seg.files[seg.file_idx[d]] or None,
+                    "offset": int(seg.offsets[d]),
+                })
+            results.append(hits)
+        return results
+
+
+# -------------------- CLI --------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("BM25 keyword index")
+    parser.add_argument("command", choices=["build", "update", "search"])
+    parser.add_argument("--processed-dir", default=str(config.PROCESSED_DATA_DIR))
+    parser.add_argument("--index-dir", default=str(config.BM25_INDEX_DIR))
+    parser.add_argument("--query", action="append", default=[], help="query text (repeatable)")
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+
+    index = BM25Index(Path(args.index_dir), processed_dir=Path(args.processed_dir), background_merge=False)
+    if args.command == "build":
+        index.build()
+    elif args.command == "update":
+        index.apply_changes()
+    else:
+        for query, hits in zip(args.query, index.search(args.query, k=args.k)):
+            print(f"\n# {query}")
+            for hit in hits:
+                print(f"{hit['score']:.3f}  {hit['chunk_id']}")
@@ -0,0 +1,146 @@
+import os
+import sys
+import time
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+
+import numpy as np
+
+try:
+    import config
+except ImportError:
+    # Fallback for running script directly from subfolder
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+    import config
+
+logger = logging.getLogger("QueryCache")
+
+_MISSING = object()
+
+
+def normalize_query(query: str) -> str:
+    """Cache key form of a query: NFKC, case-folded, whitespace collapsed."""
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
+def approx_size(value: Any) -> int:
+    """Rough in-memory size in bytes of cached values (arrays, hit lists, responses)."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes + 112
+    if isinstance(value, str):
+        return len(value) + 49
+    if isinstance(value, (bytes, bytearray)):
+        return len(value) + 33
+    if isinstance(value, dict):
+        return 64 + sum(approx_size(k) + approx_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return 56 + 8 * len(value) + sum(approx_size(v) for v in value)
+    return 32
+
+
+class LRUCache:
+    """
+    Thread-safe LRU map with a time-to-live and a byte budget. Entries older
+    than `ttl_s` are misses; least recently used entries are evicted once the
+    estimated size of all values exceeds `max_bytes`.
+    """
+
+    def __init__(self, name: str, max_bytes: int, ttl_s: float = config.QUERY_CACHE_TTL_S):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, size, stored_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING and time.monotonic() - entry[2] > self.ttl_s:
+                self._drop(key)
+                entry = _MISSING
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any):
+        size = approx_size(key) + approx_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, size, time.monotonic())
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _drop(self, key: Hashable):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "evictions": self.evictions,
+        }
+
+
+class QueryCache:
+    """
+    The orchestrator's three cache layers:
+
+      embeddings  query vectors, keyed on (model, normalized query)
+      backends    one backend's hit list, keyed on (backend, normalized query, k, that index's generation)
+      results     fused responses, keyed on (normalized query, k, options, every index's generation)
+
+    Generations come from the indexes themselves (VectorStore.generation,
+    BM25Index.generation), so once ingestion publishes new data, new keys
+    are used and old entries simply age out. A backend without a
+    generation (None) relies on the TTL alone.
+    """
+
+    def __init__(
+        self,
+        ttl_s: float = config.QUERY_CACHE_TTL_S,
+        embedding_bytes: int = config.QUERY_CACHE_EMBEDDING_BYTES,
+        backend_bytes: int = config.QUERY_CACHE_BACKEND_BYTES,
+        result_bytes: int = config.QUERY_CACHE_RESULT_BYTES,
+    ):
+        self.embeddings = LRUCache("embeddings", embedding_bytes, ttl_s)
+        self.backends = LRUCache("backends", backend_bytes, ttl_s)
+        self.results = LRUCache("results", result_bytes, ttl_s)
+
+    def layers(self):
+        return (self.embeddings, self.backends, self.results)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {layer.name: layer.stats() for layer in self.layers()}
+
+    def clear(self):
+        for layer in self.layers():
+            layer.clear()
+
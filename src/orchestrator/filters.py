@@ -0,0 +1,182 @@
+import os
+import re
+import sys
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+try:
+    import config
+    from src.ingest.dedup import DuplicateSources
+    from src.ingest.metadata import UNSORTED_SHARD, parse_source_name
+except ImportError:
+    # Fallback for running script directly from subfolder
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+    import config
+    from src.ingest.dedup import DuplicateSources
+    from src.ingest.metadata import UNSORTED_SHARD, parse_source_name
+
+_YEAR_RANGE = re.compile(r"((?:19|20)\d\d)(?:(\+)|-((?:19|20)\d\d))?")
+
+
+@lru_cache(maxsize=4096)
+def file_metadata(chunks_file: Optional[str]) -> Dict[str, Any]:
+    """parse_source_name for the chunk file names hits carry (cached: few distinct files)."""
+    return parse_source_name(chunks_file or "")
+
+
+class MetadataFilter:
+    """
+    Restricts a search to chunks whose source metadata (dept, subject, type,
+    year; see src/ingest/metadata.py) matches. Every given field must match;
+    within a field any listed value does.
+
+    parse() reads the short form users type: "cse pyq 2023+", "it dsa 2021-2023",
+    "aiml syllabus 2024". Words in config.METADATA_DEPTS / METADATA_TYPES are a
+    dept / type, years are "2023" (exact), "2023+" (from) or "2021-2023"
+    (range), and any other word is a subject. "field:value" sets a field
+    explicitly (e.g. "subject:os"). Chunks of sources that don't follow the
+    naming convention never match a non-empty filter.
+    """
+
+    def __init__(
+        self,
+        depts: Iterable[str] = (),
+        subjects: Iterable[str] = (),
+        types: Iterable[str] = (),
+        year_min: Optional[int] = None,
+        year_max: Optional[int] = None,
+    ):
+        self.depts = frozenset(d.lower() for d in depts)
+        self.subjects = frozenset(s.lower() for s in subjects)
+        self.types = frozenset(t.lower() for t in types)
+        self.year_min = year_min
+        self.year_max = year_max
+
+    @classmethod
+    def parse(cls, text: Union[str, "MetadataFilter", None]) -> "MetadataFilter":
+        if isinstance(text, MetadataFilter):
+            return text
+        fields = {"dept": [], "subject": [], "type": []}
+        year_min = year_max = None
+        depts = {d.strip().lower() for d in config.METADATA_DEPTS}
+        types = {t.strip().lower() for t in config.METADATA_TYPES}
+        for word in re.split(r"[\s,]+", (text or "").strip().lower()):
+            if not word:
+                continue
+            field, _, value = word.rpartition(":")
+            years = _YEAR_RANGE.fullmatch(value)
+            if field in ("", "year") and years:
+                year_min = int(years.group(1))
+                year_max = None if years.group(2) else int(years.group(3) or years.group(1))
+            elif field in fields:
+                fields[field].append(value)
+            elif field:
+                raise ValueError(f"Unknown filter field {field!r} (use dept, subject, type or year)")
+            elif value in depts:
+                fields["dept"].append(value)
+            elif value in types:
+                fields["type"].append(value)
+            else:
+                fields["subject"].append(value)
+        return cls(fields["dept"], fields["subject"], fields["type"], year_min, year_max)
+
+    def __bool__(self) -> bool:
+        return bool(self.depts or self.subjects or self.types or self.year_min or self.year_max)
+
+    def __str__(self) -> str:
+        words = sorted(self.depts) + sorted(f"subject:{s}" for s in self.subjects) + sorted(self.types)
+        if self.year_min is not None:
+            words.append(f"{self.year_min}+" if self.year_max is None
+                         else str(self.year_min) if self.year_max == self.year_min
+                         else f"{self.year_min}-{self.year_max}")
+        return " ".join(words)
+
+    def matches_shard(self, key: str) -> bool:
+        """Whether shard "<dept>_<type>" can hold matching chunks (decided without opening it)."""
+        if key == UNSORTED_SHARD:
+            return not self
+        dept, _, doc_type = key.partition("_")
+        return (not self.depts or dept in self.depts) and (not self.types or doc_type in self.types)
+
+    @property
+    def per_chunk(self) -> bool:
+        """True when shard selection alone isn't enough (subject / year are checked per hit)."""
+        return bool(self.subjects) or self.year_min is not None
+
+    def matches(self, metadata: Dict[str, Any]) -> bool:
+        if not self:
+            return True
+        if self.depts and metadata.get("dept") not in self.depts:
+            return False
+        if self.types and metadata.get("type") not in self.types:
+            return False
+        if self.subjects and metadata.get("subject") not in self.subjects:
+            return False
+        year = metadata.get("year")
+        if self.year_min is not None and (year is None or year < self.year_min):
+            return False
+        if self.year_max is not None and (year is None or year > self.year_max):
+            return False
+        return True
+
+
+_SOURCES: Dict[Path, DuplicateSources] = {}
+_SOURCES_LOCK = threading.Lock()
+
+
+def duplicate_sources(processed_dir: Path) -> DuplicateSources:
+    """The DuplicateSources of a processed dir, shared per process and refreshed when the ingest rewrites it."""
+    processed_dir = Path(processed_dir)
+    with _SOURCES_LOCK:
+        sources = _SOURCES.get(processed_dir)
+        if sources is None:
+            sources = _SOURCES[processed_dir] = DuplicateSources(processed_dir)
+            return sources
+    sources.refresh()
+    return sources
+
+
+def match_hit(hit: Dict[str, Any], filters: MetadataFilter,
+              duplicates: Optional[DuplicateSources] = None) -> Optional[Dict[str, Any]]:
+    """
+    The hit if its chunk file matches `filters`. Otherwise, for a canonical
+    chunk, its first near-duplicate copy (see src/ingest/dedup.py) whose file
+    matches, reported as that copy (chunk id, file, offset) with
+    "duplicate_of"; None if nothing matches.
+    """
+    if filters.matches(file_metadata(hit.get("file"))):
+        return hit
+    if duplicates is not None:
+        for copy in duplicates.copies(hit.get("chunk_id")):
+            if filters.matches(file_metadata(copy["file"])):
+                return dict(hit, chunk_id=copy["chunk_id"], file=copy["file"], offset=copy["offset"],
+                            duplicate_of=hit["chunk_id"])
+    return None
+
+
+def filtered_search(
+    search: Callable[[int], List[Dict[str, Any]]],
+    k: int,
+    filters: Optional[MetadataFilter],
+    check: bool = True,
+    fetch_factor: int = 4,
+    duplicates: Optional[DuplicateSources] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Top-k hits of search(n) that match `filters` (see match_hit: directly or
+    through a near-duplicate copy in `duplicates`). When hits are dropped,
+    the search is repeated with fetch_factor times more candidates until k
+    are left or the index has no more. With check=False the hits are known
+    to match already (the filter was resolved by shard selection).
+    """
+    if not filters or not check:
+        return search(k)
+    fetch = k
+    while True:
+        hits = search(fetch)
+        kept = [m for m in (match_hit(hit, filters, duplicates) for hit in hits) if m is not None]
+        if len(kept) >= k or len(hits) < fetch:
+            return kept[:k]
+        fetch *= fetch_factor
@@ -0,0 +1,514 @@
+import os
+import re
+import sys
+import json
+import time
+import logging
+import copy
+import argparse
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+try:
+    import config
+    from src.orchestrator.cache import LRUCache, QueryCache, normalize_query
+    from src.orchestrator.filters import MetadataFilter, duplicate_sources, filtered_search
+except ImportError:
+    # Fallback for running script directly from subfolder
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+    import config
+    from src.orchestrator.cache import LRUCache, QueryCache, normalize_query
+    from src.orchestrator.filters import MetadataFilter, duplicate_sources, filtered_search
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("QueryOrchestrator")
+
+
+# -------------------- Retrievers --------------------
+#
+# A retriever is any object with a `name` and `search(query, k)` returning a
+# ranked list of hits, each a dict with a unique "id" (chunk id, or a fact key
+# for the graph) plus whatever fields the backend has. The orchestrator only
+# relies on that, so tests and benchmarks can plug in-process fakes.
+#
+# Optionally, `generation()` returns a number that changes whenever the
+# backend's data does; the query cache keys results on it.
+#
+# Metadata filters (MetadataFilter, e.g. "cse pyq 2023+") are passed as
+# search(query, k, filters=...) only when a query has one. Sharded indexes
+# (src/orchestrator/shards.py) search just the matching shards; over a single
+# index the hits are filtered after the search. Either way a canonical chunk
+# also matches through its near-duplicate copies (duplicate_sources.json).
+
+class VectorRetriever:
+    """
+    Dense retrieval through src/vector_engine/store.py. generation() checks
+    at most every `refresh_s` seconds whether a newer index was saved; if so
+    it is loaded on a background thread and swapped in once complete, so
+    queries keep using the current index meanwhile.
+    """
+
+    name = "vector"
+
+    def __init__(self, store, embedding_cache: Optional[LRUCache] = None,
+                 refresh_s: float = config.QUERY_CACHE_REFRESH_S):
+        self.store = store
+        self.embedding_cache = embedding_cache
+        self.refresh_s = refresh_s
+        self._checked = time.monotonic()
+        self._reload: Optional[threading.Thread] = None
+        self._reload_lock = threading.Lock()
+
+    def embed(self, query: str):
+        if self.embedding_cache is None:
+            return self.store.embedder.encode([query])
+        key = (self.store.model_name, normalize_query(query))
+        vector = self.embedding_cache.get(key)
+        if vector is None:
+            vector = self.store.embedder.encode([query])
+            vector.setflags(write=False)
+            self.embedding_cache.put(key, vector)
+        return vector
+
+    def generation(self) -> int:
+        now = time.monotonic()
+        with self._reload_lock:
+            if now - self._checked >= self.refresh_s and not (self._reload and self._reload.is_alive()):
+                self._checked = now
+                if self.store.saved_generation() > self.store.generation:
+                    self._reload = threading.Thread(target=self._load, name="vector-reload", daemon=True)
+                    self._reload.start()
+        return self.store.generation
+
+    def _load(self):
+        store = self.store
+        try:
+            fresh = type(store).load(store.index_type, store.index_dir, embedder=store.embedder)
+        except Exception as e:
+            logger.warning(f"Could not reload the vector index: {e}")
+            return
+        self.store = fresh  # a single assignment: searches see the old index or the new one
+        logger.info(f"Reloaded vector index at generation {fresh.generation}")
+
+    def search(self, query: str, k: int, filters: Optional[MetadataFilter] = None) -> List[Dict[str, Any]]:
+        store = self.store
+        vector = self.embed(query)
+        if getattr(store, "sharded", False):
+            hits = store.search_vectors(vector, k, filters)[0]
+        else:
+            duplicates = duplicate_sources(store.processed_dir) if filters else None
+            hits = filtered_search(lambda n: store.search_vectors(vector, n)[0], k, filters, duplicates=duplicates)
+        return [dict(hit, id=hit["chunk_id"], kind="chunk") for hit in hits]
+
+
+class KeywordRetriever:
+    """BM25 retrieval through src/keyword_engine/bm25.py."""
+
+    name = "keyword"
+
+    def __init__(self, index, refresh_s: float = config.QUERY_CACHE_REFRESH_S):
+        self.index = index
+        self.refresh_s = refresh_s
+        self._checked = time.monotonic()
+
+    def generation(self) -> int:
+        now = time.monotonic()
+        if now - self._checked >= self.refresh_s:
+            self._checked = now
+            self.index.refresh()
+        return self.index.generation
+
+    def search(self, query: str, k: int, filters: Optional[MetadataFilter] = None) -> List[Dict[str, Any]]:
+        if getattr(self.index, "sharded", False):
+            hits = self.index.search([query], k=k, filters=filters)[0]
+        else:
+            duplicates = duplicate_sources(self.index.processed_dir) if filters else None
+            hits = filtered_search(lambda n: self.index.search([query], k=n)[0], k, filters, duplicates=duplicates)
+        return [dict(hit, id=hit["chunk_id"], kind="chunk") for hit in hits]
+
+
+_WORD = re.compile(r"[\w+#.-]+")
+
+
+def query_phrases(query: str, max_words: int = 4) -> List[str]:
+    """Word n-grams of the query in the casings entity names are usually stored in."""
+    words = [w.strip(".-") for w in _WORD.findall(query)]
+    words = [w for w in words if w]
+    phrases = set()
+    for n in range(1, max_words + 1):
+        for i in range(len(words) - n + 1):
+            phrase = " ".join(words[i:i + n])
+            phrases.update((phrase, phrase.lower(), phrase.title()))
+    return sorted(phrases)
+
+
+class GraphRetriever:
+    """
+    Entity retrieval from the graph store (Neo4j or the embedded SQLite graph,
+    see src/graph_engine/store.py): entities whose name appears in the query
+    (looked up through the name index) and their direct relationships,
+    returned as facts "source -[TYPE]-> target". Longer (more specific) entity
+    names rank first. Facts carry no source metadata, so filters don't apply.
+    """
+
+    name = "graph"
+
+    def __init__(self, store=None, max_words: int = 4):
+        if store is None:
+            from src.graph_engine.store import get_graph_store
+            store = get_graph_store()
+        self.store = store
+        self.max_words = max_words
+
+    def search(self, query: str, k: int, filters: Optional[MetadataFilter] = None) -> List[Dict[str, Any]]:
+        names = query_phrases(query, self.max_words)
+        if not names:
+            return []
+        rows = self.store.neighbors(names, limit=k)
+        hits, seen = [], set()
+        for row in rows:
+            fact = f"{row['source']} -[{row['type']}]-> {row['target']}"
+            if fact in seen:
+                continue
+            seen.add(fact)
+            hits.append({"id": fact, "kind": "fact", "text": fact, "matched": row["matched"]})
+        return hits
+
+
+class SnapshotGraphRetriever:
+    """
+    Graph retrieval from the in-process CSR snapshot (src/graph_engine/snapshot.py)
+    instead of the graph store: entities named in the query seed a k-hop expansion and the
+    traversed relationships come back as facts, best path score first.
+    generation() applies new change-log lines (and picks up new snapshot versions)
+    at most every refresh_s seconds; compacting them into a new version is left to
+    the writer (`python src/graph_engine/snapshot.py update`).
+    """
+
+    name = "graph"
+
+    def __init__(self, snapshot=None, max_words: int = 4, refresh_s: float = config.QUERY_CACHE_REFRESH_S):
+        if snapshot is None:
+            from src.graph_engine.snapshot import GraphSnapshot
+            snapshot = GraphSnapshot()
+        self.snapshot = snapshot
+        self.max_words = max_words
+        self.refresh_s = refresh_s
+        self._checked = time.monotonic()
+
+    def generation(self) -> int:
+        now = time.monotonic()
+        if now - self._checked >= self.refresh_s:
+            self._checked = now
+            self.snapshot.refresh()
+        return self.snapshot.generation
+
+    def search(self, query: str, k: int, filters: Optional[MetadataFilter] = None) -> List[Dict[str, Any]]:
+        return self.snapshot.facts(query_phrases(query, self.max_words), k=k)
+
+
+# -------------------- Fusion --------------------
+
+def reciprocal_rank_fusion(
+    ranked: Dict[str, List[Dict[str, Any]]],
+    k: int,
+    rrf_k: int = config.QUERY_RRF_K,
+    weights: Optional[Dict[str, float]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Merges per-backend rankings: score(id) = sum over backends of w / (rrf_k + rank),
+    rank starting at 1. Each fused hit keeps the fields of its first occurrence and
+    records its rank in every backend that returned it under "ranks".
+    """
+    fused: Dict[str, Dict[str, Any]] = {}
+    for backend, hits in ranked.items():
+        weight = (weights or {}).get(backend, 1.0)
+        for rank, hit in enumerate(hits, start=1):
+            entry = fused.get(hit["id"])
+            if entry is None:
+                entry = fused[hit["id"]] = {k_: v for k_, v in hit.items() if k_ != "score"}
+                entry["rrf"] = 0.0
+                entry["ranks"] = {}
+            if backend in entry["ranks"]:
+                continue  # a backend returning the same id twice counts once
+            entry["ranks"][backend] = rank
+            entry["rrf"] += weight / (rrf_k + rank)
+    return sorted(fused.values(), key=lambda e: -e["rrf"])[:k]
+
+
+# -------------------- Orchestrator --------------------
+
+class QueryOrchestrator:
+    """
+    Sends every query to all retrievers at once on a thread pool and fuses
+    what comes back within the latency budget with reciprocal rank fusion.
+
+    Each backend has its own timeout, capped by the overall budget; a backend
+    that misses it is reported as "timeout" and the answer is built from the
+    others (partial=True). Its call keeps running in the background (threads
+    cannot be cancelled), so a backend with `max_abandoned` such calls still
+    running is skipped as "busy" instead of piling up more work. Calls that
+    have not timed out never count towards that limit; the pool has room for
+    `concurrency` of them per backend, and more wait for a thread.
+
+    With a QueryCache, query embeddings, each backend's hits and the fused
+    response are cached separately (see src/orchestrator/cache.py); partial
+    responses are never cached.
+    """
+
+    def __init__(
+        self,
+        retrievers: Sequence[Any],
+        timeouts_ms: Optional[Dict[str, float]] = None,
+        budget_ms: float = config.QUERY_BUDGET_MS,
+        backend_k: int = config.QUERY_BACKEND_K,
+        rrf_k: int = config.QUERY_RRF_K,
+        weights: Optional[Dict[str, float]] = None,
+        concurrency: int = config.QUERY_CONCURRENCY,
+        max_abandoned: int = config.QUERY_MAX_ABANDONED,
+        processed_dir: Path = config.PROCESSED_DATA_DIR,
+        cache: Optional[QueryCache] = None,
+    ):
+        self.retrievers = {r.name: r for r in retrievers}
+        self.cache = cache
+        if cache is not None:
+            for retriever in self.retrievers.values():
+                if getattr(retriever, "embedding_cache", False) is None:
+                    retriever.embedding_cache = cache.embeddings
+        self.timeouts_ms = {
+            "vector": config.QUERY_VECTOR_TIMEOUT_MS,
+            "keyword": config.QUERY_KEYWORD_TIMEOUT_MS,
+            "graph": config.QUERY_GRAPH_TIMEOUT_MS,
+        }
+        self.timeouts_ms.update(timeouts_ms or {})
+        self.budget_ms = budget_ms
+        self.backend_k = backend_k
+        self.rrf_k = rrf_k
+        self.weights = weights
+        self.max_abandoned = max(1, max_abandoned)
+        self.processed_dir = Path(processed_dir)
+
+        # abandoned calls hold at most max_abandoned threads per backend, so
+        # they cannot starve the `concurrency` threads left for live queries
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, len(self.retrievers) * (max(1, concurrency) + self.max_abandoned)),
+            thread_name_prefix="retriever",
+        )
+        self._abandoned = {name: 0 for name in self.retrievers}
+        self._lock = threading.Lock()
+
+    def _generations(self) -> Dict[str, Optional[int]]:
+        generations = {}
+        for name, retriever in self.retrievers.items():
+            try:
+                generations[name] = retriever.generation() if hasattr(retriever, "generation") else None
+            except Exception as e:
+                logger.warning(f"Could not read the {name} index generation: {e}")
+                generations[name] = None
+        return generations
+
+    def _call(self, name: str, query: str, k: int, cache_key: Optional[tuple],
+              filters: Optional[MetadataFilter] = None):
+        start = time.perf_counter()
+        retriever = self.retrievers[name]
+        hits = retriever.search(query, k, filters=filters) if filters else retriever.search(query, k)
+        if cache_key is not None:
+            self.cache.backends.put(cache_key, hits)
+        return hits, (time.perf_counter() - start) * 1000
+
+    def _abandon(self, name: str, future):
+        # a call still queued is just dropped; a running one is counted until
+        # it actually returns (at once if it already has)
+        if future.cancel():
+            return
+        with self._lock:
+            self._abandoned[name] += 1
+        future.add_done_callback(lambda _: self._release(name))
+
+    def _release(self, name: str):
+        with self._lock:
+            self._abandoned[name] -= 1
+
+    def _fan_out(self, query: str, k: int, generations: Dict[str, Optional[int]],
+                 filters: Optional[MetadataFilter] = None) -> Dict[str, Dict[str, Any]]:
+        """Runs every retriever in parallel; returns {backend: {"status", "ms", "hits", ...}}."""
+        start = time.perf_counter()
+        budget = self.budget_ms / 1000
+        report: Dict[str, Dict[str, Any]] = {}
+        futures, deadlines = {}, {}
+        normalized = normalize_query(query)
+        for name in self.retrievers:
+            cache_key = None
+            if self.cache is not None:
+                cache_key = (name, normalized, k, str(filters or ""), generations[name])
+                hits = self.cache.backends.get(cache_key)
+                if hits is not None:
+                    report[name] = {"status": "ok", "ms": 0.0, "hits": hits, "cached": True}
+                    continue
+            with self._lock:
+                busy = self._abandoned[name] >= self.max_abandoned
+            if busy:
+                report[name] = {"status": "busy", "ms": 0.0, "hits": []}
+                continue
+            futures[self._pool.submit(self._call, name, query, k, cache_key, filters)] = name
+            timeout = self.timeouts_ms.get(name, self.budget_ms) / 1000
+            deadlines[name] = start + min(timeout, budget)
+
+        pending = set(futures)
+        while pending:
+            now = time.perf_counter()
+            for future in [f for f in pending if deadlines[futures[f]] <= now]:
+                pending.discard(future)
+                name = futures[future]
+                report[name] = {"status": "timeout", "ms": (now - start) * 1000, "hits": []}
+                self._abandon(name, future)
+            if not pending:
+                break
+            done, _ = wait(pending, timeout=min(deadlines[futures[f]] for f in pending) - now,
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                name = futures[future]
+                try:
+                    hits, ms = future.result()
+                    report[name] = {"status": "ok", "ms": ms, "hits": hits}
+                except Exception as e:
+                    logger.error(f"{name} retriever failed: {e}")
+                    report[name] = {"status": "error", "ms": (time.perf_counter() - start) * 1000,
+                                    "hits": [], "error": str(e)}
+        return report
+
+    def query(self, query: str, k: int = 10, with_text: bool = False,
+              filters: Union[str, MetadataFilter, None] = None) -> Dict[str, Any]:
+        """
+        Returns {"query", "results", "backends", "partial", "cached", "ms"}: the
+        fused top-k hits ({"id", "kind", "rrf", "ranks", ...}) and, per backend,
+        {"status": ok|timeout|error|busy, "ms", "hits": count, "cached", "error"?}.
+        `filters` ("cse pyq 2023+" or a MetadataFilter) restricts chunk hits to
+        matching sources; the response then also has "filters".
+        """
+        start = time.perf_counter()
+        filters = MetadataFilter.parse(filters) or None
+        generations = self._generations()  # also lets retrievers pick up newly published indexes
+        result_key = None
+        if self.cache is not None:
+            result_key = (normalize_query(query), k, with_text, str(filters or ""),
+                          tuple(sorted(generations.items())))
+            cached = self.cache.results.get(result_key)
+            if cached is not None:
+                response = copy.deepcopy(cached)
+                response.update(query=query, cached=True, ms=round((time.perf_counter() - start) * 1000, 2))
+                return response
+
+        report = self._fan_out(query, self.backend_k, generations, filters)
+        ranked = {name: r["hits"] for name, r in report.items() if r["status"] == "ok"}
+        results = reciprocal_rank_fusion(ranked, k, self.rrf_k, self.weights)
+        if with_text:
+            for hit in results:
+                if hit.get("kind") == "chunk" and "text" not in hit:
+                    hit["text"] = self.read_chunk(hit.get("file"), hit.get("offset", -1)).get("text", "")
+
+        backends = {}
+        for name, r in report.items():
+            backends[name] = {"status": r["status"], "ms": round(r["ms"], 2), "hits": len(r["hits"]),
+                              "cached": r.get("cached", False)}
+            if "error" in r:
+                backends[name]["error"] = r["error"]
+        response = {
+            "query": query,
+            "results": results,
+            "backends": backends,
+            "partial": any(r["status"] != "ok" for r in report.values()),
+            "cached": False,
+            "ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+        if filters:
+            response["filters"] = str(filters)
+        if result_key is not None and not response["partial"]:
+            self.cache.results.put(result_key, copy.deepcopy(response))
+        return response
+
+    def cache_stats(self) -> Dict[str, Dict[str, float]]:
+        """Hits, misses, hit ratio, entries and bytes of each cache layer."""
+        return self.cache.stats() if self.cache is not None else {}
+
+    def read_chunk(self, chunks_file: Optional[str], offset: int) -> Dict[str, Any]:
+        if not chunks_file or offset is None or offset < 0:
+            return {}
+        with open(self.processed_dir / chunks_file, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def build_orchestrator(backends: Sequence[str] = ("vector", "keyword", "graph"), **kwargs) -> QueryOrchestrator:
+    """
+    Builds an orchestrator over the saved indexes in data/artifacts and the
+    GRAPH_BACKEND graph store (the metadata-sharded indexes under
+    config.SHARD_INDEX_DIR with SHARDED_INDEXES; the graph snapshot instead of
+    the store with GRAPH_SNAPSHOT_ENABLED). A backend that cannot be opened (missing index, driver
+    or model) is left out with a warning, so the others still answer.
+    """
+    retrievers = []
+    if "vector" in backends:
+        try:
+            if config.SHARDED_INDEXES:
+                from src.orchestrator.shards import ShardedVectorStore
+                store = ShardedVectorStore.load(config.VECTOR_INDEX_TYPE)
+            else:
+                from src.vector_engine.store import VectorStore
+                store = VectorStore.load(config.VECTOR_INDEX_TYPE, config.VECTOR_DB_DIR)
+            retrievers.append(VectorRetriever(store))
+        except Exception as e:
+            logger.warning(f"Vector retriever unavailable: {e}")
+    if "keyword" in backends:
+        try:
+            if config.SHARDED_INDEXES:
+                from src.orchestrator.shards import ShardedKeywordIndex
+                index = ShardedKeywordIndex()
+            else:
+                from src.keyword_engine.bm25 import BM25Index
+                index = BM25Index(config.BM25_INDEX_DIR)
+            retrievers.append(KeywordRetriever(index))
+        except Exception as e:
+            logger.warning(f"Keyword retriever unavailable: {e}")
+    if "graph" in backends:
+        try:
+            retriever = None
+            if config.GRAPH_SNAPSHOT_ENABLED:
+                try:
+                    retriever = SnapshotGraphRetriever()
+                except Exception as e:
+                    logger.warning(f"Graph snapshot unavailable, querying the graph store: {e}")
+            retrievers.append(retriever or GraphRetriever())
+        except Exception as e:
+            logger.warning(f"Graph retriever unavailable: {e}")
+    if not retrievers:
+        raise RuntimeError("No retriever could be opened.")
+    if config.QUERY_CACHE_ENABLED:
+        kwargs.setdefault("cache", QueryCache())
+    return QueryOrchestrator(retrievers, **kwargs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("Tri-hybrid query")
+    parser.add_argument("query", nargs="+")
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=config.QUERY_BUDGET_MS)
+    parser.add_argument("--filter", default=None, help='metadata filter, e.g. "cse pyq 2023+"')
+    parser.add_argument("--backends", nargs="+", default=["vector", "keyword", "graph"],
+                        choices=["vector", "keyword", "graph"])
+    args = parser.parse_args()
+
+    orchestrator = build_orchestrator(args.backends, budget_ms=args.budget_ms)
+    response = orchestrator.query(" ".join(args.query), k=args.k, with_text=True, filters=args.filter)
+    for name, b in response["backends"].items():
+        print(f"{name:>8}: {b['status']:<7} {b['ms']:>8.1f} ms  {b['hits']} hits")
+    for hit in response["results"]:
+        ranks = ", ".join(f"{n}#{r}" for n, r in hit["ranks"].items())
+        print(f"\n{hit['rrf']:.4f} [{ranks}] {hit['id']}\n    {hit.get('text', '')[:200]}")
+    orchestrator.close()
@@ -0,0 +1,483 @@
+import os
+import sys
+import json
+import time
+import heapq
+import logging
+import argparse
+import threading
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from itertools import chain
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+try:
+    import config
+    from src.ingest.metadata import parse_source_name, shard_key
+    from src.keyword_engine.bm25 import BM25Index
+    from src.orchestrator.filters import MetadataFilter, duplicate_sources, file_metadata, filtered_search
+    from src.vector_engine.store import Embedder, VectorStore, _blocks, iter_chunk_file, iter_chunk_records
+except ImportError:
+    # Fallback for running script directly from subfolder
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+    import config
+    from src.ingest.metadata import parse_source_name, shard_key
+    from src.keyword_engine.bm25 import BM25Index
+    from src.orchestrator.filters import MetadataFilter, duplicate_sources, file_metadata, filtered_search
+    from src.vector_engine.store import Embedder, VectorStore, _blocks, iter_chunk_file, iter_chunk_records
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("IndexShards")
+
+SHARDS_MANIFEST = "shards.json"
+SHARDS_VERSION = 1
+
+
+# -------------------- Sharded indexes --------------------
+
+def _shard_files(processed_dir: Path) -> Dict[str, List[Path]]:
+    files = defaultdict(list)
+    for path in sorted(Path(processed_dir).glob("*.chunks.jsonl")):
+        files[shard_key(parse_source_name(path.name))].append(path)
+    return dict(files)
+
+
+def _workers(workers: int) -> int:
+    return max(1, workers or os.cpu_count() or 1)
+
+
+class _ShardedIndex:
+    """
+    One index per "<dept>_<type>" shard of the corpus, under index_dir/<shard>,
+    plus a shards.json manifest (shard list and a generation bumped on every
+    change). Chunks go to the shard of their chunks file, so routing needs no
+    lookups. Filtered searches open only the shards the filter selects, plus
+    those whose canonical chunks have near-duplicate copies it selects
+    (duplicate_sources.json in the processed dir, see src/ingest/dedup.py).
+    """
+
+    def __init__(self, index_dir: Path, processed_dir: Path, workers: int):
+        self.index_dir = Path(index_dir)
+        self.processed_dir = Path(processed_dir)
+        self.workers = _workers(workers)
+        self.shards: Dict[str, Any] = {}
+        self.generation = 0
+
+    def _new_shard(self, key: str):
+        raise NotImplementedError
+
+    def _shard(self, key: str):
+        if key not in self.shards:
+            self.shards[key] = self._new_shard(key)
+        return self.shards[key]
+
+    def _read_manifest(self) -> Optional[Dict[str, Any]]:
+        path = self.index_dir / SHARDS_MANIFEST
+        if not path.exists():
+            return None
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+        if manifest.get("version") != SHARDS_VERSION:
+            raise ValueError(f"Unsupported shard manifest version: {manifest.get('version')}")
+        return manifest
+
+    def _write_manifest(self, **extra):
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        manifest = {"version": SHARDS_VERSION, "generation": self.generation, "shards": sorted(self.shards), **extra}
+        tmp = self.index_dir / (SHARDS_MANIFEST + ".tmp")
+        tmp.write_text(json.dumps(manifest), encoding="utf-8")
+        os.replace(tmp, self.index_dir / SHARDS_MANIFEST)
+
+    def saved_generation(self) -> int:
+        """Generation in the saved shards.json (-1 if none)."""
+        manifest = self._read_manifest()
+        return manifest["generation"] if manifest else -1
+
+    @property
+    def duplicates(self):
+        return duplicate_sources(self.processed_dir)
+
+    def select(self, filters: Optional[MetadataFilter] = None) -> List[str]:
+        """Shards a search with `filters` has to touch."""
+        if not filters:
+            return sorted(self.shards)
+        keys = {key for key in self.shards if filters.matches_shard(key)}
+        for copy_file, canonical_files in self.duplicates.links.items():
+            if filters.matches_shard(self.shard_of(copy_file)):
+                keys.update(self.shard_of(f) for f in canonical_files)
+        return sorted(keys & set(self.shards))
+
+    def _check(self, key: str, filters: MetadataFilter) -> bool:
+        # hits need checking one by one unless the shard alone decides the filter
+        return filters.per_chunk or not filters.matches_shard(key)
+
+    def shard_of(self, chunks_file: str) -> str:
+        return shard_key(file_metadata(Path(chunks_file).name))
+
+    def delete_file(self, chunks_file: str) -> int:
+        shard = self.shards.get(self.shard_of(chunks_file))
+        if shard is None:
+            return 0
+        n = shard.delete_file(chunks_file)
+        if n:
+            self.generation += 1
+        return n
+
+    def add_records(self, records: Iterable[Dict[str, Any]]) -> int:
+        raise NotImplementedError
+
+    def apply_changes(self, changes_path: Optional[Path] = None) -> Dict[str, int]:
+        """Applies ingest_changes.json to the affected shards (see VectorStore.apply_changes)."""
+        changes_path = Path(changes_path or self.processed_dir / "ingest_changes.json")
+        changes = json.loads(changes_path.read_text(encoding="utf-8"))
+        stats = {"deleted": 0, "added": 0}
+        for entry in changes.get("removed", []):
+            stats["deleted"] += self.delete_file(f"{Path(entry['source']).stem}.chunks.jsonl")
+        for entry in changes.get("modified", []):
+            stats["deleted"] += self.delete_file(Path(entry["chunks"]).name)
+        stats["added"] = self.add_records(chain.from_iterable(
+            iter_chunk_file(self.processed_dir / Path(entry["chunks"]).name)
+            for entry in changes.get("added", []) + changes.get("modified", [])
+        ))
+        return stats
+
+    def read_chunk(self, chunks_file: Optional[str], offset: int) -> Dict[str, Any]:
+        if not chunks_file or offset < 0:
+            return {}
+        with open(self.processed_dir / chunks_file, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+
+class ShardedVectorStore(_ShardedIndex):
+    """
+    VectorStore per metadata shard, all with the same model. Chunks are
+    embedded once, in one stream with one embedding cache, and each block's
+    vectors are added to their shards on `workers` threads (FAISS releases
+    the GIL), so shard indexes are built in parallel with the embedding.
+    Cosine scores are comparable across shards, so hits merge by score.
+    """
+
+    sharded = True
+
+    def __init__(
+        self,
+        index_type: str = config.VECTOR_INDEX_TYPE,
+        index_dir: Path = config.SHARD_INDEX_DIR / "vector",
+        processed_dir: Path = config.PROCESSED_DATA_DIR,
+        embedder: Optional[Embedder] = None,
+        model_name: str = config.EMBEDDING_MODEL_NAME,
+        use_embedding_cache: bool = config.EMBEDDING_CACHE_ENABLED,
+        workers: int = config.SHARD_BUILD_WORKERS,
+    ):
+        super().__init__(index_dir, processed_dir, workers)
+        self.index_type = index_type
+        self.model_name = model_name
+        self._embedder = embedder
+        self.use_embedding_cache = use_embedding_cache
+        self._embedding_cache = None
+        self._locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+
+    @property
+    def embedder(self) -> Embedder:
+        if self._embedder is None:
+            self._embedder = Embedder(self.model_name)
+        return self._embedder
+
+    @property
+    def embedding_cache(self):
+        if self._embedding_cache is None and self.use_embedding_cache:
+            from src.vector_engine.cache import EmbeddingCache
+            self._embedding_cache = EmbeddingCache(self.model_name)
+            for shard in self.shards.values():
+                shard._embedding_cache = self._embedding_cache
+        return self._embedding_cache
+
+    def _new_shard(self, key: str) -> VectorStore:
+        return VectorStore(self.index_type, self.index_dir / key, self.processed_dir, embedder=self._embedder,
+                           model_name=self.model_name, embedding_cache=self._embedding_cache,
+                           use_embedding_cache=False)
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self.shards.values())
+
+    # ---------- add / build ----------
+
+    def _add_to_shard(self, key: str, rows: Dict[str, list], vectors: np.ndarray) -> int:
+        with self._locks[key]:
+            return self._shard(key).add_vectors(rows["ids"], vectors, rows["files"], rows["offsets"],
+                                                rows["keys"] or None)
+
+    def _route(self, pool, pending, chunk_ids, vectors, files, offsets, keys=None):
+        groups: Dict[str, Dict[str, list]] = {}
+        for i, name in enumerate(files):
+            rows = groups.setdefault(self.shard_of(name), {"idx": [], "ids": [], "files": [], "offsets": [],
+                                                           "keys": []})
+            rows["idx"].append(i)
+            rows["ids"].append(chunk_ids[i])
+            rows["files"].append(name)
+            rows["offsets"].append(offsets[i])
+            if keys is not None:
+                rows["keys"].append(keys[i])
+        for key, rows in groups.items():
+            self._shard(key)  # created here, on one thread
+            pending.append(pool.submit(self._add_to_shard, key, rows, vectors[rows["idx"]]))
+
+    def add_vectors(self, chunk_ids: Sequence[str], vectors: np.ndarray, files: Sequence[str],
+                    offsets: Sequence[int], keys: Optional[Sequence[bytes]] = None) -> int:
+        """Adds precomputed vectors, each to the shard of its chunks file (see VectorStore.add_vectors)."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        pending = []
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="vector-shard") as pool:
+            self._route(pool, pending, chunk_ids, vectors, files, offsets, keys)
+        n = sum(f.result() for f in pending)
+        self.generation += 1
+        return n
+
+    def add_records(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Embeds chunk records once and adds each block's vectors to their shards in parallel."""
+        cache = self.embedding_cache
+        pending = []
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="vector-shard") as pool:
+            blocks = _blocks(records, self.embedder.batch_size * 4)
+            for block, vectors in self.embedder.encode_stream(blocks, cache=cache):
+                self._route(
+                    pool, pending, [r["id"] for r in block], np.ascontiguousarray(vectors, dtype=np.float32),
+                    [r.get("_file", "") for r in block], [r.get("_offset", -1) for r in block],
+                    [cache.key(r["text"]) for r in block] if cache is not None else None,
+                )
+        n = sum(f.result() for f in pending)
+        self.generation += 1
+        return n
+
+    def _flush(self):
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="vector-shard") as pool:
+            for future in [pool.submit(shard._flush_pending) for shard in self.shards.values()]:
+                future.result()
+
+    def build(self, processed_dir: Optional[Path] = None) -> int:
+        """(Re)builds every shard from the *.chunks.jsonl under processed_dir."""
+        self.processed_dir = Path(processed_dir or self.processed_dir)
+        self.generation = max(self.generation, self.saved_generation())
+        self.shards = {}
+        start = time.perf_counter()
+        n = self.add_records(iter_chunk_records(self.processed_dir))
+        self._flush()
+        logger.info(f"Indexed {n} chunks into {len(self.shards)} {self.index_type} shards "
+                    f"in {time.perf_counter() - start:.1f}s")
+        return n
+
+    # ---------- search ----------
+
+    def search_vectors(self, vectors: np.ndarray, k: int = 10,
+                       filters: Union[str, MetadataFilter, None] = None) -> List[List[Dict[str, Any]]]:
+        """Top-k chunks per query vector over the shards `filters` selects."""
+        filters = MetadataFilter.parse(filters)
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        duplicates = self.duplicates if filters else None
+        per_shard = [
+            [filtered_search(lambda n, shard=self.shards[key], v=v: shard.search_vectors(v[None, :], n)[0],
+                             k, filters, self._check(key, filters), duplicates=duplicates) for v in vectors]
+            for key in self.select(filters)
+        ]
+        return [heapq.nlargest(k, chain.from_iterable(hits[q] for hits in per_shard), key=lambda h: h["score"])
+                for q in range(len(vectors))]
+
+    def search(self, queries: Sequence[str], k: int = 10, with_text: bool = False,
+               filters: Union[str, MetadataFilter, None] = None) -> List[List[Dict[str, Any]]]:
+        if not queries:
+            return []
+        results = self.search_vectors(self.embedder.encode(queries), k, filters)
+        if with_text:
+            for hits in results:
+                for hit in hits:
+                    hit["text"] = self.read_chunk(hit["file"], hit["offset"]).get("text", "")
+        return results
+
+    # ---------- persistence ----------
+
+    def save(self):
+        """Saves every non-empty shard (in parallel), then the manifest."""
+        self._flush()
+        self.shards = {key: shard for key, shard in self.shards.items() if len(shard)}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="vector-shard") as pool:
+            for future in [pool.submit(shard.save) for shard in self.shards.values()]:
+                future.result()
+        self.generation = max(self.generation, self.saved_generation() + 1)
+        self._write_manifest(index_type=self.index_type, model=self.model_name)
+
+    @classmethod
+    def load(
+        cls,
+        index_type: str = config.VECTOR_INDEX_TYPE,
+        index_dir: Path = config.SHARD_INDEX_DIR / "vector",
+        mmap: bool = True,
+        embedder: Optional[Embedder] = None,
+    ) -> "ShardedVectorStore":
+        store = cls(index_type, index_dir, embedder=embedder)
+        manifest = store._read_manifest()
+        if manifest is None:
+            raise FileNotFoundError(f"No sharded vector index in {store.index_dir}")
+        store.model_name = manifest.get("model", store.model_name)
+        store.generation = manifest["generation"]
+        for key in manifest["shards"]:
+            shard = VectorStore.load(index_type, store.index_dir / key, mmap=mmap, embedder=embedder)
+            store.processed_dir = shard.processed_dir
+            store.shards[key] = shard
+        return store
+
+
+def _build_keyword_shard(index_dir: str, processed_dir: str, files: List[str]) -> int:
+    # runs in a worker process: tokenizing is pure Python, so shards build in parallel there
+    index = BM25Index(Path(index_dir), processed_dir=Path(processed_dir), background_merge=False)
+    return index.build(records=chain.from_iterable(iter_chunk_file(Path(f)) for f in files))
+
+
+class ShardedKeywordIndex(_ShardedIndex):
+    """
+    BM25Index per metadata shard. build() indexes the shards in `workers`
+    processes at once. Each shard scores with its own idf and average length,
+    so merged scores are per-shard BM25 (as with independently scored shards
+    in search engines); filtered queries usually hit one shard anyway.
+    """
+
+    sharded = True
+
+    def __init__(
+        self,
+        index_dir: Path = config.SHARD_INDEX_DIR / "bm25",
+        processed_dir: Path = config.PROCESSED_DATA_DIR,
+        workers: int = config.SHARD_BUILD_WORKERS,
+        background_merge: bool = True,
+    ):
+        super().__init__(index_dir, processed_dir, workers)
+        self.background_merge = background_merge
+        self._open(self._read_manifest())
+
+    def _new_shard(self, key: str) -> BM25Index:
+        return BM25Index(self.index_dir / key, processed_dir=self.processed_dir,
+                         background_merge=self.background_merge)
+
+    def _open(self, manifest: Optional[Dict[str, Any]]):
+        if manifest is None:
+            return
+        for key in manifest["shards"]:
+            if key in self.shards:
+                self.shards[key].refresh()
+            else:
+                self.shards[key] = self._new_shard(key)
+        for key in set(self.shards) - set(manifest["shards"]):
+            del self.shards[key]
+        self.generation = manifest["generation"]
+
+    def refresh(self) -> bool:
+        """Picks up shards published by another process; True if anything changed."""
+        manifest = self._read_manifest()
+        if manifest is None or manifest["generation"] == self.generation:
+            return False
+        self._open(manifest)
+        return True
+
+    def _publish(self):
+        self.generation = max(self.generation, self.saved_generation()) + 1
+        self._write_manifest()
+
+    def build(self, processed_dir: Optional[Path] = None) -> int:
+        """Re-indexes every shard from scratch, `workers` shards at a time in separate processes."""
+        self.processed_dir = Path(processed_dir or self.processed_dir)
+        for shard in self.shards.values():
+            shard.wait_for_merges()
+        groups = _shard_files(self.processed_dir)
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=min(self.workers, max(1, len(groups)))) as pool:
+            futures = {key: pool.submit(_build_keyword_shard, str(self.index_dir / key), str(self.processed_dir),
+                                        [str(f) for f in files])
+                       for key, files in groups.items()}
+            wait(list(futures.values()))
+        n = sum(f.result() for f in futures.values())
+        self.shards = {key: self._new_shard(key) for key in groups}
+        self._publish()
+        logger.info(f"Indexed {n} chunks into {len(groups)} keyword shards in {time.perf_counter() - start:.1f}s")
+        return n
+
+    def add_records(self, records: Iterable[Dict[str, Any]]) -> int:
+        groups = defaultdict(list)
+        for record in records:
+            groups[self.shard_of(record.get("_file", ""))].append(record)
+        n = sum(self._shard(key).add_records(rows) for key, rows in groups.items())
+        self._publish()
+        return n
+
+    def delete_file(self, chunks_file: str) -> int:
+        n = super().delete_file(chunks_file)
+        if n:
+            self._publish()
+        return n
+
+    def wait_for_merges(self):
+        for shard in self.shards.values():
+            shard.wait_for_merges()
+
+    def search(self, queries: Sequence[str], k: int = 10,
+               filters: Union[str, MetadataFilter, None] = None) -> List[List[Dict[str, Any]]]:
+        """Top-k chunks per query over the shards `filters` selects."""
+        filters = MetadataFilter.parse(filters)
+        keys = self.select(filters)
+        duplicates = self.duplicates if filters else None
+        results = []
+        for query in queries:
+            hits = chain.from_iterable(
+                filtered_search(lambda n, shard=self.shards[key]: shard.search([query], n)[0], k, filters,
+                                self._check(key, filters), duplicates=duplicates)
+                for key in keys
+            )
+            results.append(heapq.nlargest(k, hits, key=lambda h: h["score"]))
+        return results
+
+
+# -------------------- CLI --------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("Metadata-sharded vector / keyword indexes")
+    parser.add_argument("command", choices=["build", "update", "search"])
+    parser.add_argument("--kind", choices=["vector", "keyword", "both"], default="both")
+    parser.add_argument("--index-type", default=config.VECTOR_INDEX_TYPE)
+    parser.add_argument("--processed-dir", default=str(config.PROCESSED_DATA_DIR))
+    parser.add_argument("--workers", type=int, default=config.SHARD_BUILD_WORKERS, help="0 = one per CPU core")
+    parser.add_argument("--query", action="append", default=[], help="query text (repeatable)")
+    parser.add_argument("--filter", default="", help='e.g. "cse pyq 2023+"')
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+
+    processed = Path(args.processed_dir)
+    if args.kind in ("keyword", "both"):
+        index = ShardedKeywordIndex(processed_dir=processed, workers=args.workers, background_merge=False)
+        if args.command == "build":
+            index.build()
+        elif args.command == "update":
+            index.apply_changes()
+        else:
+            for query, hits in zip(args.query, index.search(args.query, k=args.k, filters=args.filter)):
+                print(f"\n# keyword: {query} [{args.filter}]")
+                for hit in hits:
+                    print(f"{hit['score']:.3f}  {hit['chunk_id']}")
+    if args.kind in ("vector", "both"):
+        if args.command == "build":
+            store = ShardedVectorStore(args.index_type, processed_dir=processed, workers=args.workers)
+            store.build()
+            store.save()
+        elif args.command == "update":
+            store = ShardedVectorStore.load(args.index_type, mmap=False)
+            store.processed_dir = processed
+            store.workers = _workers(args.workers)
+            store.apply_changes()
+            store.save()
+        else:
+            store = ShardedVectorStore.load(args.index_type)
+            for query, hits in zip(args.query, store.search(args.query, k=args.k, with_text=True,
+                                                            filters=args.filter)):
+                print(f"\n# vector: {query} [{args.filter}]")
+                for hit in hits:
+                    print(f"{hit['score']:.3f}  {hit['chunk_id']}  {hit['text'][:120]!r}")
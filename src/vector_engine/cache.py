@@ -0,0 +1,282 @@
+import os
+import re
+import sys
+import json
+import fcntl
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+try:
+    import config
+except ImportError:
+    # Fallback for running script directly from subfolder
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+    import config
+
+logger = logging.getLogger("EmbeddingCache")
+
+KEY_BYTES = 16
+CACHE_VERSION = 1
+
+
+def _slug(model_name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+
+
+class EmbeddingCache:
+    """
+    Append-only on-disk cache of chunk embeddings for one embedding model.
+
+    Rows are float16 vectors in <model>.<gen>.f16, read through a NumPy memmap;
+    <model>.<gen>.keys holds one 16-byte key per row, sha256(model, text), and
+    is loaded into a key -> row dict. <model>.json names the live generation.
+
+    One writer, many readers: the writer holds an exclusive flock on
+    <model>.lock and always appends vectors before their keys, so a reader that
+    sees a key can read its row. Compaction writes a new generation and then
+    switches the pointer file atomically; readers pick it up on refresh() and
+    keep reading the old files (still open) until then.
+    """
+
+    # Compact when fewer than this fraction of rows are still used by a build.
+    COMPACT_BELOW_LIVE = 0.75
+
+    def __init__(
+        self,
+        model_name: str = config.EMBEDDING_MODEL_NAME,
+        cache_dir: Path = config.EMBEDDING_CACHE_DIR,
+        writable: bool = True,
+    ):
+        self.model_name = model_name
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.writable = writable
+        self.hits = 0
+        self.misses = 0
+        # keys looked up or stored since the last reset_touched(), i.e. still in use
+        self.touched: Set[bytes] = set()
+
+        self._lock_file = None
+        if writable:
+            self._lock_file = open(self._base(".lock"), "a+")
+            try:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self._lock_file.close()
+                raise RuntimeError(f"Embedding cache for {model_name} already has a writer ({self.cache_dir})")
+
+        self.generation = None
+        self.dim = None
+        self._rows: Dict[bytes, int] = {}
+        self._n_rows = 0
+        self._vectors = None
+        self.refresh()
+
+    # ---------- files ----------
+
+    def _base(self, suffix: str) -> Path:
+        return self.cache_dir / f"{_slug(self.model_name)}{suffix}"
+
+    def _gen_path(self, generation: int, ext: str) -> Path:
+        return self._base(f".{generation}.{ext}")
+
+    def _read_pointer(self) -> dict:
+        path = self._base(".json")
+        if path.exists():
+            pointer = json.loads(path.read_text(encoding="utf-8"))
+            if pointer.get("version") == CACHE_VERSION and pointer.get("model") == self.model_name:
+                return pointer
+            logger.warning(f"Ignoring embedding cache pointer with unknown version: {path}")
+        return {"version": CACHE_VERSION, "model": self.model_name, "generation": 0, "dim": None}
+
+    def _write_pointer(self, generation: int, dim: Optional[int]):
+        path = self._base(".json")
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps({
+            "version": CACHE_VERSION, "model": self.model_name, "generation": generation, "dim": dim,
+        }), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def _repair(self):
+        # writer only: a crash between the two appends leaves unmatched rows; cut both to the shorter
+        if self.dim is None:
+            return
+        keys_path, vec_path = self._gen_path(self.generation, "keys"), self._gen_path(self.generation, "f16")
+        n_keys = keys_path.stat().st_size // KEY_BYTES if keys_path.exists() else 0
+        n_vecs = vec_path.stat().st_size // (2 * self.dim) if vec_path.exists() else 0
+        n = min(n_keys, n_vecs)
+        for path, row_bytes in ((keys_path, KEY_BYTES), (vec_path, 2 * self.dim)):
+            if path.exists() and path.stat().st_size != n * row_bytes:
+                os.truncate(path, n * row_bytes)
+
+    # ---------- reading ----------
+
+    def refresh(self):
+        """Picks up rows appended (or a compaction done) by the writer since the last call."""
+        pointer = self._read_pointer()
+        if pointer["generation"] != self.generation:
+            self.generation = pointer["generation"]
+            self.dim = pointer["dim"]
+            self._rows = {}
+            self._n_rows = 0
+            self._vectors = None
+            if self.writable:
+                self._repair()
+        elif self.dim is None:
+            self.dim = pointer["dim"]  # first write happened since the last refresh
+
+        keys_path = self._gen_path(self.generation, "keys")
+        if self.dim is None or not keys_path.exists():
+            return
+        with open(keys_path, "rb") as f:
+            f.seek(self._n_rows * KEY_BYTES)
+            data = f.read()
+        new = len(data) // KEY_BYTES
+        for i in range(new):
+            self._rows[data[i * KEY_BYTES:(i + 1) * KEY_BYTES]] = self._n_rows + i
+        if new:
+            self._n_rows += new
+            self._vectors = None  # remapped lazily with the new length
+
+    def _matrix(self) -> np.ndarray:
+        if self._vectors is None and self._n_rows:
+            self._vectors = np.memmap(
+                self._gen_path(self.generation, "f16"), dtype=np.float16, mode="r",
+                shape=(self._n_rows, self.dim),
+            )
+        return self._vectors
+
+    def key(self, text: str) -> bytes:
+        h = hashlib.sha256()
+        for part in (self.model_name, text):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.digest()[:KEY_BYTES]
+
+    def get_many(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Bulk lookup. Returns (vectors, hit mask): float32 rows for the hits
+        (zeros elsewhere) and a boolean mask of which texts were cached.
+        """
+        keys = [self.key(t) for t in texts]
+        self.touched.update(keys)
+        return self.get_by_keys(keys)
+
+    def get_by_keys(self, keys: Sequence[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+        """get_many for precomputed keys (see key())."""
+        if self._n_rows and self._vectors is None:
+            try:
+                self._matrix()
+            except FileNotFoundError:
+                self.refresh()  # the writer compacted into a new generation
+        rows = np.array([self._rows.get(k, -1) for k in keys], dtype=np.int64)
+        hit = rows >= 0
+        self.hits += int(hit.sum())
+        self.misses += int(len(keys) - hit.sum())
+
+        out = np.zeros((len(keys), self.dim or 0), dtype=np.float32)
+        if hit.any():
+            # sorted row order keeps the memmap reads sequential
+            order = np.argsort(rows[hit])
+            idx = np.flatnonzero(hit)[order]
+            out[idx] = self._matrix()[rows[hit][order]]
+        return out, hit
+
+    # ---------- writing ----------
+
+    def put_many(self, texts: Sequence[str], vectors: np.ndarray) -> int:
+        """Appends vectors for texts not cached yet; returns how many rows were written."""
+        if not self.writable:
+            raise RuntimeError("Embedding cache was opened read-only")
+        vectors = np.asarray(vectors)
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+            self._write_pointer(self.generation, self.dim)
+
+        new_keys, new_rows, seen = [], [], set()
+        for i, text in enumerate(texts):
+            k = self.key(text)
+            self.touched.add(k)
+            if k not in self._rows and k not in seen:
+                seen.add(k)
+                new_keys.append(k)
+                new_rows.append(i)
+        if not new_keys:
+            return 0
+
+        with open(self._gen_path(self.generation, "f16"), "ab") as f:
+            f.write(np.ascontiguousarray(vectors[new_rows], dtype=np.float16).tobytes())
+        with open(self._gen_path(self.generation, "keys"), "ab") as f:
+            f.write(b"".join(new_keys))
+        for k in new_keys:
+            self._rows[k] = self._n_rows
+            self._n_rows += 1
+        self._vectors = None
+        return len(new_keys)
+
+    def reset_touched(self):
+        self.touched = set()
+
+    def compact(self, keep: Optional[Iterable[bytes]] = None) -> int:
+        """
+        Rewrites the cache with only the rows in `keep` (default: the keys
+        touched since reset_touched()) as a new generation. Returns rows dropped.
+        """
+        if not self.writable:
+            raise RuntimeError("Embedding cache was opened read-only")
+        keep = set(self.touched if keep is None else keep)
+        live = sorted(row for k, row in self._rows.items() if k in keep)
+        dropped = self._n_rows - len(live)
+        if dropped == 0:
+            return 0
+
+        old = self.generation
+        new = old + 1
+        keys_by_row = {row: k for k, row in self._rows.items()}
+        matrix = self._matrix()
+        with open(self._gen_path(new, "f16"), "wb") as f:
+            for s in range(0, len(live), 65536):
+                f.write(np.ascontiguousarray(matrix[live[s:s + 65536]]).tobytes())
+        with open(self._gen_path(new, "keys"), "wb") as f:
+            f.write(b"".join(keys_by_row[row] for row in live))
+        self._write_pointer(new, self.dim)
+
+        self._vectors = None
+        self.refresh()
+        for ext in ("f16", "keys"):
+            self._gen_path(old, ext).unlink(missing_ok=True)
+        logger.info(f"Compacted embedding cache: dropped {dropped} orphaned rows, kept {len(live)}")
+        return dropped
+
+    def maybe_compact(self) -> int:
+        """Compacts when the rows touched since reset_touched() are a small enough share of the cache."""
+        if self._n_rows == 0:
+            return 0
+        live = sum(1 for k in self.touched if k in self._rows)
+        if live >= self.COMPACT_BELOW_LIVE * self._n_rows:
+            return 0
+        return self.compact()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "rows": self._n_rows,
+            "bytes": self._n_rows * (2 * (self.dim or 0) + KEY_BYTES),
+        }
+
+    def __len__(self) -> int:
+        return self._n_rows
+
+    def close(self):
+        self._vectors = None
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
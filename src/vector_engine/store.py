@@ -0,0 +1,666 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import faiss
+
+try:
+    import config
+    from src.vector_engine.cache import KEY_BYTES, EmbeddingCache
+except ImportError:
+    # Fallback for running script directly from subfolder
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+    import config
+    from src.vector_engine.cache import KEY_BYTES, EmbeddingCache
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("VectorStore")
+
+INDEX_TYPES = ("flat", "ivf", "hnsw", "sq8", "pq")
+# index types that need training before the first add (vectors are buffered until then)
+TRAINED_TYPES = ("ivf", "sq8", "pq")
+# lossy index types whose candidates can be re-ranked with exact scores
+COMPRESSED_TYPES = ("sq8", "pq")
+META_VERSION = 1
+
+# Read flag for fast startup: flat codes are mapped straight from the file
+# (faiss >= 1.10); older builds fall back to IO_FLAG_MMAP (IVF lists only).
+MMAP_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+
+
+# -------------------- Chunk records --------------------
+
+def iter_chunk_file(path: Path, skip_duplicates: bool = True) -> Iterator[Dict[str, Any]]:
+    """
+    Streams one *.chunks.jsonl file; each record gets its file name and byte offset.
+    Records marked "duplicate_of" another chunk (src/ingest/dedup.py) are skipped
+    unless skip_duplicates is False.
+    """
+    path = Path(path)
+    with open(path, "rb") as f:
+        offset = 0
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                if not (skip_duplicates and record.get("duplicate_of")):
+                    record["_file"] = path.name
+                    record["_offset"] = offset
+                    yield record
+            offset += len(line)
+
+
+def iter_chunk_records(processed_dir: Path, skip_duplicates: bool = True) -> Iterator[Dict[str, Any]]:
+    """Streams every chunk under processed_dir, file by file, without loading them all."""
+    for path in sorted(Path(processed_dir).glob("*.chunks.jsonl")):
+        yield from iter_chunk_file(path, skip_duplicates)
+
+
+def _blocks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    block = []
+    for item in items:
+        block.append(item)
+        if len(block) >= size:
+            yield block
+            block = []
+    if block:
+        yield block
+
+
+# -------------------- Embedding --------------------
+
+class Embedder:
+    """
+    CPU sentence-transformers encoder. Blocks of `batch_size` texts are encoded
+    on `threads` threads at once (torch releases the GIL inside its kernels);
+    torch's own thread pool is shrunk so the two don't oversubscribe the cores.
+    Vectors are L2-normalized float32, so inner product == cosine similarity.
+    """
+
+    def __init__(
+        self,
+        model_name: str = config.EMBEDDING_MODEL_NAME,
+        batch_size: int = config.VECTOR_EMBED_BATCH_SIZE,
+        threads: int = config.VECTOR_EMBED_THREADS,
+    ):
+        from sentence_transformers import SentenceTransformer
+        import torch
+
+        self.threads = max(1, threads)
+        torch.set_num_threads(max(1, (os.cpu_count() or 1) // self.threads))
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self.model.encode(
+            list(texts),
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+
+    def encode_stream(
+        self,
+        blocks: Iterable[List[Dict[str, Any]]],
+        cache: Optional[EmbeddingCache] = None,
+    ) -> Iterator[Tuple[List[Dict[str, Any]], np.ndarray]]:
+        """
+        Encodes blocks of chunk records in parallel, yielding (block, vectors) in
+        input order. With a cache, each block is looked up in bulk first and only
+        the misses are encoded (and then appended to the cache, from this thread).
+        """
+
+        def finish(block, cached, hit, fut):
+            if fut is None:
+                return block, cached
+            vectors = fut.result()
+            if cache is None:
+                return block, vectors
+            miss = ~hit
+            cache.put_many([r["text"] for r, m in zip(block, miss) if m], vectors)
+            if not hit.any():
+                return block, vectors
+            cached[miss] = vectors
+            return block, cached
+
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            pending = deque()
+            for block in blocks:
+                texts = [r["text"] for r in block]
+                cached, hit = cache.get_many(texts) if cache is not None else (None, np.zeros(len(texts), bool))
+                misses = [t for t, h in zip(texts, hit) if not h]
+                fut = pool.submit(self.encode, misses) if misses else None
+                pending.append((block, cached, hit, fut))
+                # at most two blocks queued per thread, so reading stays ahead but bounded
+                if len(pending) >= 2 * self.threads:
+                    yield finish(*pending.popleft())
+            while pending:
+                yield finish(*pending.popleft())
+
+
+# -------------------- Vector store --------------------
+
+class VectorStore:
+    """
+    FAISS index over chunk embeddings, with a compact int64 id -> chunk map.
+
+    index_type:
+      flat: exact inner-product search (IndexIDMap2 over IndexFlatIP).
+      ivf:  IndexIVFFlat; trained on the first vectors added (see IVF_TRAIN_PER_LIST),
+            searched with `nprobe` lists.
+      hnsw: IndexHNSWFlat graph; it cannot remove vectors, so deletes are
+            tombstoned and filtered at search time until the index is compacted.
+      sq8:  compact mode, int8 scalar quantization (1 byte per dimension, exhaustive scan).
+      pq:   most compact mode, IndexIVFPQ (`pq_m` bytes per vector), searched with `nprobe` lists.
+
+    The compact modes can re-rank their top `rerank` candidates with exact
+    scores from the float16 rows of the memory-mapped embedding cache (the
+    store keeps each vector's cache key for that); 0 turns re-ranking off.
+
+    The map keeps, per vector, the chunk id and where its record lives
+    (chunks file + byte offset), not the text. Files are saved in index_dir as
+    vectors_<type>.faiss / .meta.json / .rows.npz. A store loaded with mmap=True
+    is read-only until the first add/delete, which reloads it into memory.
+    """
+
+    # IVF wants ~39 training points per list; train once this many vectors are buffered.
+    IVF_TRAIN_PER_LIST = 39
+    # Rebuild an HNSW index when tombstones exceed this fraction of its vectors.
+    HNSW_COMPACT_RATIO = 0.2
+
+    def __init__(
+        self,
+        index_type: str = config.VECTOR_INDEX_TYPE,
+        index_dir: Path = config.VECTOR_DB_DIR,
+        processed_dir: Path = config.PROCESSED_DATA_DIR,
+        embedder: Optional[Embedder] = None,
+        model_name: str = config.EMBEDDING_MODEL_NAME,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        use_embedding_cache: bool = config.EMBEDDING_CACHE_ENABLED,
+    ):
+        """
+        embedding_cache: consulted before embedding any chunk; when omitted and
+        use_embedding_cache is set, the on-disk cache under
+        config.EMBEDDING_CACHE_DIR is opened (as its writer) on the first add.
+        """
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"index_type must be one of {INDEX_TYPES}, got {index_type!r}")
+        self.index_type = index_type
+        self.index_dir = Path(index_dir)
+        self.processed_dir = Path(processed_dir)
+        self.model_name = model_name
+        self._embedder = embedder
+        self._embedding_cache = embedding_cache
+        self.use_embedding_cache = use_embedding_cache or embedding_cache is not None
+
+        self.dim = embedder.dim if embedder is not None else None
+        self.nlist = config.VECTOR_IVF_NLIST
+        self.nprobe = config.VECTOR_IVF_NPROBE
+        self.hnsw_m = config.VECTOR_HNSW_M
+        self.ef_construction = config.VECTOR_HNSW_EF_CONSTRUCTION
+        self.ef_search = config.VECTOR_HNSW_EF_SEARCH
+        self.pq_m = config.VECTOR_PQ_M
+        self.rerank = config.VECTOR_RERANK_CANDIDATES
+        self._rerank_cache = None
+        # bumped on every add / delete and saved with the index, so query caches
+        # can tell which contents a result was computed against
+        self.generation = 0
+
+        self._reset()
+
+    def _reset(self):
+        self.index = None
+        self.next_id = 0
+        self.files: List[str] = []
+        self._file_idx: Dict[str, int] = {}
+        self._chunk_of: Dict[int, str] = {}  # vector id -> chunk id
+        self._id_of: Dict[str, int] = {}  # chunk id -> vector id
+        self._loc: Dict[int, Tuple[int, int]] = {}  # vector id -> (file index, byte offset)
+        self._key_of: Dict[int, bytes] = {}  # vector id -> embedding cache key (re-ranking)
+        self._tombstones: set = set()  # hnsw only
+        self._pending: List[Tuple[np.ndarray, np.ndarray]] = []  # vectors waiting for training
+        self._mmapped = False
+
+    # ---------- paths / embedder ----------
+
+    def _path(self, suffix: str) -> Path:
+        return self.index_dir / f"vectors_{self.index_type}{suffix}"
+
+    @property
+    def embedder(self) -> Embedder:
+        if self._embedder is None:
+            self._embedder = Embedder(self.model_name)
+            self.dim = self._embedder.dim
+        return self._embedder
+
+    @property
+    def embedding_cache(self) -> Optional[EmbeddingCache]:
+        if self._embedding_cache is None and self.use_embedding_cache:
+            self._embedding_cache = EmbeddingCache(self.model_name)
+        return self._embedding_cache
+
+    def __len__(self) -> int:
+        return len(self._chunk_of)
+
+    # ---------- index construction ----------
+
+    def _new_index(self, dim: int, train: Optional[np.ndarray] = None):
+        if self.index_type == "flat":
+            return faiss.IndexIDMap2(faiss.IndexFlatIP(dim))
+        if self.index_type == "hnsw":
+            hnsw = faiss.IndexHNSWFlat(dim, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            hnsw.hnsw.efConstruction = self.ef_construction
+            hnsw.hnsw.efSearch = self.ef_search
+            return faiss.IndexIDMap2(hnsw)
+        if self.index_type == "sq8":
+            sq = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+            sq.train(train)
+            return faiss.IndexIDMap2(sq)
+        # ivf / pq: fewer lists for small corpora, so every list gets enough training points
+        nlist = max(1, min(self.nlist, len(train) // self.IVF_TRAIN_PER_LIST))
+        if self.index_type == "pq":
+            # m must divide the dimension; 2**nbits centroids per sub-quantizer
+            # want IVF_TRAIN_PER_LIST points each, so small corpora use fewer bits
+            m = max(d for d in range(1, min(self.pq_m, dim) + 1) if dim % d == 0)
+            nbits = min(8, max(1, int(np.log2(max(2, len(train) // self.IVF_TRAIN_PER_LIST)))))
+            index = faiss.IndexIVFPQ(faiss.IndexFlatIP(dim), dim, nlist, m, nbits, faiss.METRIC_INNER_PRODUCT)
+        else:
+            index = faiss.IndexIVFFlat(faiss.IndexFlatIP(dim), dim, nlist, faiss.METRIC_INNER_PRODUCT)
+        index.train(train)
+        index.nprobe = self.nprobe
+        return index
+
+    def _train_size(self) -> int:
+        if self.index_type == "sq8":
+            return 65536  # per-dimension ranges settle long before this
+        return self.nlist * self.IVF_TRAIN_PER_LIST
+
+    def _ensure_writable(self):
+        if self._mmapped:
+            self.index = faiss.read_index(str(self._path(".faiss")))
+            self._mmapped = False
+
+    def _flush_pending(self):
+        # trains the index on whatever has been buffered so far
+        if self.index is not None or not self._pending:
+            return
+        vectors = np.concatenate([v for v, _ in self._pending])
+        ids = np.concatenate([i for _, i in self._pending])
+        self._pending = []
+        self.index = self._new_index(vectors.shape[1], train=vectors)
+        self.index.add_with_ids(vectors, ids)
+
+    # ---------- add / delete ----------
+
+    def add_vectors(
+        self,
+        chunk_ids: Sequence[str],
+        vectors: np.ndarray,
+        files: Optional[Sequence[str]] = None,
+        offsets: Optional[Sequence[int]] = None,
+        keys: Optional[Sequence[bytes]] = None,
+    ) -> int:
+        """
+        Adds (or replaces) chunks with precomputed, L2-normalized vectors.
+        `files` / `offsets` locate each chunk record so its text can be read back;
+        `keys` are the chunks' embedding cache keys, used for re-ranking.
+        """
+        if len(chunk_ids) == 0:
+            return 0
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.dim = vectors.shape[1]
+        self._ensure_writable()
+
+        replaced = [c for c in chunk_ids if c in self._id_of]
+        if replaced:
+            self.delete(replaced)
+        self.generation += 1
+
+        ids = np.arange(self.next_id, self.next_id + len(chunk_ids), dtype=np.int64)
+        self.next_id += len(chunk_ids)
+        for k, (vid, chunk_id) in enumerate(zip(ids.tolist(), chunk_ids)):
+            self._chunk_of[vid] = chunk_id
+            self._id_of[chunk_id] = vid
+            if files is not None:
+                name = files[k]
+                if name not in self._file_idx:
+                    self._file_idx[name] = len(self.files)
+                    self.files.append(name)
+                self._loc[vid] = (self._file_idx[name], int(offsets[k]))
+            if keys is not None:
+                self._key_of[vid] = keys[k]
+
+        if self.index is None and self.index_type not in TRAINED_TYPES:
+            self.index = self._new_index(self.dim)
+        if self.index is None:
+            self._pending.append((vectors, ids))
+            if sum(len(v) for v, _ in self._pending) >= self._train_size():
+                self._flush_pending()
+        else:
+            self.index.add_with_ids(vectors, ids)
+        return len(chunk_ids)
+
+    def add_records(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Embeds chunk records (dicts with "id" and "text") in batches and adds them."""
+        added = 0
+        cache = self.embedding_cache
+        blocks = _blocks(records, self.embedder.batch_size * 4)
+        for block, vectors in self.embedder.encode_stream(blocks, cache=cache):
+            added += self.add_vectors(
+                [r["id"] for r in block],
+                vectors,
+                files=[r.get("_file", "") for r in block],
+                offsets=[r.get("_offset", -1) for r in block],
+                keys=[cache.key(r["text"]) for r in block] if cache is not None else None,
+            )
+        return added
+
+    def delete(self, chunk_ids: Iterable[str]) -> int:
+        ids = [self._id_of.pop(c) for c in chunk_ids if c in self._id_of]
+        if not ids:
+            return 0
+        self._ensure_writable()
+        self.generation += 1
+        for vid in ids:
+            del self._chunk_of[vid]
+            self._loc.pop(vid, None)
+            self._key_of.pop(vid, None)
+
+        arr = np.array(ids, dtype=np.int64)
+        if self._pending:
+            kept = [(v, i, ~np.isin(i, arr)) for v, i in self._pending]
+            self._pending = [(v[keep], i[keep]) for v, i, keep in kept]
+        if self.index is None:
+            return len(ids)
+        if self.index_type == "hnsw":
+            self._tombstones.update(ids)
+        else:
+            self.index.remove_ids(arr)
+        return len(ids)
+
+    def delete_file(self, chunks_file: str) -> int:
+        """Removes every chunk that was read from one *.chunks.jsonl file."""
+        idx = self._file_idx.get(chunks_file)
+        if idx is None:
+            return 0
+        return self.delete([self._chunk_of[vid] for vid, (f, _) in list(self._loc.items()) if f == idx])
+
+    # ---------- build / incremental update ----------
+
+    def build(self, processed_dir: Optional[Path] = None) -> int:
+        """(Re)builds the index from every *.chunks.jsonl under processed_dir."""
+        self.processed_dir = Path(processed_dir or self.processed_dir)
+        self._reset()
+        # continue after the saved index so a rebuilt one never reuses its generation
+        self.generation = max(self.generation, self.saved_generation())
+        cache = self.embedding_cache
+        if cache is not None:
+            cache.reset_touched()
+        start = time.perf_counter()
+        n = self.add_records(iter_chunk_records(self.processed_dir))
+        self._flush_pending()
+        logger.info(f"Indexed {n} chunks ({self.index_type}) in {time.perf_counter() - start:.1f}s")
+        if cache is not None:
+            # every live chunk was looked up, so untouched rows belong to deleted / changed chunks
+            stats = cache.stats()
+            logger.info(f"Embedding cache: {stats['hits']} hits, {stats['misses']} embedded, {stats['rows']} rows")
+            cache.maybe_compact()
+        return n
+
+    def apply_changes(self, changes_path: Optional[Path] = None) -> Dict[str, int]:
+        """
+        Applies ingest_changes.json (written by src/ingest/processor.py): chunks
+        of removed and modified sources are dropped, those of added and modified
+        sources are re-embedded from their chunks file.
+        """
+        changes_path = Path(changes_path or self.processed_dir / "ingest_changes.json")
+        changes = json.loads(changes_path.read_text(encoding="utf-8"))
+        stats = {"deleted": 0, "added": 0}
+
+        for entry in changes.get("removed", []):
+            stats["deleted"] += self.delete_file(f"{Path(entry['source']).stem}.chunks.jsonl")
+        for entry in changes.get("modified", []):
+            stats["deleted"] += self.delete_file(Path(entry["chunks"]).name)
+        for entry in changes.get("added", []) + changes.get("modified", []):
+            chunks_file = self.processed_dir / Path(entry["chunks"]).name
+            stats["added"] += self.add_records(iter_chunk_file(chunks_file))
+
+        self._flush_pending()
+        logger.info(f"Applied {changes_path.name}: {stats['added']} chunks added, {stats['deleted']} deleted")
+        return stats
+
+    # ---------- search ----------
+
+    def _set_search_params(self):
+        ivf = self.index_type in ("ivf", "pq")
+        inner = faiss.downcast_index(self.index if ivf else self.index.index)
+        if ivf:
+            inner.nprobe = self.nprobe
+        elif self.index_type == "hnsw":
+            inner.hnsw.efSearch = self.ef_search
+
+    def search_vectors(self, vectors: np.ndarray, k: int = 10) -> List[List[Dict[str, Any]]]:
+        """Top-k chunks per query vector: [{"chunk_id", "score", "file", "offset"}, ...] per query."""
+        self._flush_pending()
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if self.index is None or self.index.ntotal == 0:
+            return [[] for _ in range(len(vectors))]
+        self._set_search_params()
+
+        # over-fetch so that tombstoned hnsw hits can be dropped without losing k results
+        rerank = self.rerank if self.index_type in COMPRESSED_TYPES and self._key_of else 0
+        fetch = min(self.index.ntotal, max(k, rerank) + len(self._tombstones))
+        scores, ids = self.index.search(vectors, fetch)
+        if rerank:
+            scores, ids = self._rerank(vectors, scores, ids)
+
+        results = []
+        for row_scores, row_ids in zip(scores, ids):
+            hits = []
+            for score, vid in zip(row_scores.tolist(), row_ids.tolist()):
+                if vid < 0 or vid in self._tombstones or vid not in self._chunk_of:
+                    continue
+                file_idx, offset = self._loc.get(vid, (-1, -1))
+                hits.append({
+                    "chunk_id": self._chunk_of[vid],
+                    "score": score,
+                    "file": self.files[file_idx] if file_idx >= 0 else None,
+                    "offset": offset,
+                })
+                if len(hits) == k:
+                    break
+            results.append(hits)
+        return results
+
+    def _rerank(self, queries: np.ndarray, scores: np.ndarray, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Replaces approximate scores with exact inner products against the
+        float16 cache rows, then re-sorts. Candidates without a cached row keep
+        their approximate score.
+        """
+        cache = self._embedding_cache if self._embedding_cache is not None else self._rerank_cache
+        if cache is None:
+            self._rerank_cache = cache = EmbeddingCache(self.model_name, writable=False)
+        keys = [self._key_of.get(vid, b"") for vid in ids.ravel().tolist()]
+        vectors, hit = cache.get_by_keys(keys)
+        if not hit.all() and cache is self._rerank_cache:
+            cache.refresh()  # the writer may have appended rows since
+            vectors, hit = cache.get_by_keys(keys)
+        if not hit.any():
+            return scores, ids
+
+        exact = np.einsum("qkd,qd->qk", vectors.reshape(*ids.shape, -1), queries)
+        scores = np.where(hit.reshape(ids.shape), exact, scores).astype(np.float32)
+        scores[ids < 0] = -np.inf
+        order = np.argsort(-scores, axis=1, kind="stable")
+        return np.take_along_axis(scores, order, 1), np.take_along_axis(ids, order, 1)
+
+    def search(self, queries: Sequence[str], k: int = 10, with_text: bool = False) -> List[List[Dict[str, Any]]]:
+        """Embeds all queries in one batch and returns the top-k chunks for each."""
+        if not queries:
+            return []
+        results = self.search_vectors(self.embedder.encode(queries), k)
+        if with_text:
+            for hits in results:
+                for hit in hits:
+                    hit["text"] = self.read_chunk(hit["file"], hit["offset"]).get("text", "")
+        return results
+
+    def read_chunk(self, chunks_file: Optional[str], offset: int) -> Dict[str, Any]:
+        """Reads one chunk record back from its *.chunks.jsonl file."""
+        if not chunks_file or offset < 0:
+            return {}
+        with open(self.processed_dir / chunks_file, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    # ---------- persistence ----------
+
+    def saved_generation(self) -> int:
+        """Generation of the index last saved to index_dir (-1 if none)."""
+        try:
+            return json.loads(self._path(".meta.json").read_text(encoding="utf-8")).get("generation", 0)
+        except FileNotFoundError:
+            return -1
+
+    def _compact(self):
+        # hnsw only: rebuild without the tombstoned vectors
+        inner = faiss.downcast_index(self.index.index)
+        vectors = inner.reconstruct_n(0, inner.ntotal)
+        ids = faiss.vector_to_array(self.index.id_map)
+        keep = ~np.isin(ids, np.fromiter(self._tombstones, dtype=np.int64))
+        self.index = self._new_index(self.dim)
+        self.index.add_with_ids(vectors[keep], ids[keep])
+        self._tombstones = set()
+
+    def save(self):
+        self._flush_pending()
+        if self.index is None:
+            raise RuntimeError("Nothing to save: the vector store is empty.")
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        if self._tombstones and len(self._tombstones) > self.HNSW_COMPACT_RATIO * self.index.ntotal:
+            self._compact()
+
+        vids = np.fromiter(self._chunk_of.keys(), dtype=np.int64, count=len(self._chunk_of))
+        locs = [self._loc.get(v, (-1, -1)) for v in vids.tolist()]
+        chunk_ids = "\n".join(self._chunk_of[v] for v in vids.tolist()).encode("utf-8")
+        meta = {
+            "version": META_VERSION,
+            "index_type": self.index_type,
+            "model": self.model_name,
+            "dim": self.dim,
+            "next_id": self.next_id,
+            "generation": self.generation,
+            "processed_dir": str(self.processed_dir),
+            "files": self.files,
+            "tombstones": sorted(self._tombstones),
+            "nprobe": self.nprobe,
+            "ef_search": self.ef_search,
+            "rerank": self.rerank,
+        }
+
+        # write everything to temp names first, so a crash never leaves a mismatched set
+        index_tmp = self._path(".faiss.tmp")
+        faiss.write_index(self.index, str(index_tmp))
+        rows_tmp = self._path(".rows.tmp.npz")
+        np.savez(
+            rows_tmp,
+            ids=vids,
+            file_idx=np.array([f for f, _ in locs], dtype=np.int32),
+            offsets=np.array([o for _, o in locs], dtype=np.int64),
+            chunk_ids=np.frombuffer(chunk_ids, dtype=np.uint8),
+            keys=np.frombuffer(b"".join(self._key_of.get(v, bytes(KEY_BYTES)) for v in vids.tolist()),
+                               dtype=np.uint8) if self._key_of else np.zeros(0, dtype=np.uint8),
+        )
+        meta_tmp = self._path(".meta.json.tmp")
+        meta_tmp.write_text(json.dumps(meta), encoding="utf-8")
+
+        os.replace(index_tmp, self._path(".faiss"))
+        os.replace(rows_tmp, self._path(".rows.npz"))
+        os.replace(meta_tmp, self._path(".meta.json"))
+        logger.info(f"Saved {len(self)} vectors to {self._path('.faiss')}")
+
+    @classmethod
+    def load(
+        cls,
+        index_type: str = config.VECTOR_INDEX_TYPE,
+        index_dir: Path = config.VECTOR_DB_DIR,
+        mmap: bool = True,
+        embedder: Optional[Embedder] = None,
+    ) -> "VectorStore":
+        """Loads a saved store; with mmap the vectors are paged in from disk on demand."""
+        store = cls(index_type, index_dir, embedder=embedder)
+        meta = json.loads(store._path(".meta.json").read_text(encoding="utf-8"))
+        if meta.get("version") != META_VERSION:
+            raise ValueError(f"Unsupported vector store version: {meta.get('version')}")
+
+        store.model_name = meta["model"]
+        store.dim = meta["dim"]
+        store.next_id = meta["next_id"]
+        store.generation = meta.get("generation", 0)
+        store.processed_dir = Path(meta["processed_dir"])
+        store.files = meta["files"]
+        store._file_idx = {name: i for i, name in enumerate(store.files)}
+        store._tombstones = set(meta["tombstones"])
+        store.nprobe = meta.get("nprobe", store.nprobe)
+        store.ef_search = meta.get("ef_search", store.ef_search)
+        store.rerank = meta.get("rerank", store.rerank)
+
+        rows = np.load(store._path(".rows.npz"))
+        vids = rows["ids"].tolist()
+        chunk_ids = rows["chunk_ids"].tobytes().decode("utf-8").split("\n") if vids else []
+        store._chunk_of = dict(zip(vids, chunk_ids))
+        store._id_of = dict(zip(chunk_ids, vids))
+        store._loc = {
+            vid: (f, o)
+            for vid, f, o in zip(vids, rows["file_idx"].tolist(), rows["offsets"].tolist())
+            if f >= 0
+        }
+        keys = rows["keys"].tobytes() if "keys" in rows.files else b""
+        if keys:
+            store._key_of = {vid: keys[i * KEY_BYTES:(i + 1) * KEY_BYTES] for i, vid in enumerate(vids)}
+
+        flags = MMAP_FLAGS if mmap else 0
+        store.index = faiss.read_index(str(store._path(".faiss")), flags)
+        store._mmapped = mmap
+        return store
+
+
+# -------------------- CLI --------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("FAISS vector store")
+    parser.add_argument("command", choices=["build", "update", "search"])
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default=config.VECTOR_INDEX_TYPE)
+    parser.add_argument("--processed-dir", default=str(config.PROCESSED_DATA_DIR))
+    parser.add_argument("--index-dir", default=str(config.VECTOR_DB_DIR))
+    parser.add_argument("--query", action="append", default=[], help="query text (repeatable)")
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        store = VectorStore(args.index_type, Path(args.index_dir), Path(args.processed_dir))
+        store.build()
+        store.save()
+    elif args.command == "update":
+        store = VectorStore.load(args.index_type, Path(args.index_dir), mmap=False)
+        store.processed_dir = Path(args.processed_dir)
+        store.apply_changes()
+        store.save()
+    else:
+        store = VectorStore.load(args.index_type, Path(args.index_dir))
+        for query, hits in zip(args.query, store.search(args.query, k=args.k, with_text=True)):
+            print(f"\n# {query}")
+            for hit in hits:
+                print(f"{hit['score']:.3f}  {hit['chunk_id']}  {hit['text'][:120]!r}")
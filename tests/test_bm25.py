@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+pytest.importorskip("rank_bm25")
+
+from benchmarks.bench_bm25 import check, synthetic_chunks
+from src.keyword_engine.bm25 import BM25Index
+
+DOCS = 1200
+
+
+@pytest.fixture
+def corpus():
+    rng = random.Random(0)
+    texts, terms = synthetic_chunks(DOCS, 400, rng)
+    chunk_ids = [f"cse_dsa_chunk_{i}" for i in range(DOCS)]
+    queries = [" ".join(rng.choices(terms, k=rng.randint(1, 6))) for _ in range(40)]
+    return chunk_ids, texts, queries
+
+
+def index_in_flushes(index_dir, chunk_ids, texts, flushes=8, **kwargs):
+    index = BM25Index(index_dir, flush_docs=10 ** 9, background_merge=False, processed_dir=index_dir, **kwargs)
+    step = -(-len(chunk_ids) // flushes)
+    for s in range(0, len(chunk_ids), step):
+        index.add_documents(chunk_ids[s:s + step], texts[s:s + step])
+        index.flush()
+    return index
+
+
+def test_segmented_index_matches_rank_bm25(tmp_path, corpus):
+    chunk_ids, texts, queries = corpus
+    index = index_in_flushes(tmp_path, chunk_ids, texts, max_segments=4)
+    assert 1 < len(index._snapshot.segments) <= 4  # merged along the way
+    check(index, chunk_ids, texts, queries, k=10)
+
+    reopened = BM25Index(tmp_path, processed_dir=tmp_path)
+    assert reopened.search(queries, k=10) == index.search(queries, k=10)
+
+
+def test_deleted_chunks_are_never_returned(tmp_path, corpus):
+    chunk_ids, texts, queries = corpus
+    index = index_in_flushes(tmp_path, chunk_ids, texts, max_segments=100)
+    doomed = set(random.Random(1).sample(chunk_ids, DOCS // 5))
+    assert index.delete(doomed) == len(doomed)
+    assert len(index) == DOCS - len(doomed)
+    for hits in index.search(queries, k=DOCS):
+        assert hits and not {h["chunk_id"] for h in hits} & doomed
+
+
+def test_matches_rank_bm25_after_delete_and_merge(tmp_path, corpus):
+    chunk_ids, texts, queries = corpus
+    index = index_in_flushes(tmp_path, chunk_ids, texts, max_segments=100)
+    doomed = set(random.Random(1).sample(chunk_ids, DOCS // 5))
+    index.delete(doomed)
+    index.merge(list(index._snapshot.segments))
+    assert len(index._snapshot.segments) == 1
+
+    keep = [i for i, c in enumerate(chunk_ids) if c not in doomed]
+    check(index, [chunk_ids[i] for i in keep], [texts[i] for i in keep], queries, k=10)
+
+
+def test_replaced_chunks_match_rank_bm25_after_merge(tmp_path, corpus):
+    chunk_ids, texts, queries = corpus
+    index = index_in_flushes(tmp_path, chunk_ids, texts, max_segments=100)
+    rng = random.Random(2)
+    replaced = rng.sample(range(DOCS), 100)
+    texts = list(texts)
+    for i in replaced:
+        texts[i] = texts[rng.randrange(DOCS)]
+    index.add_documents([chunk_ids[i] for i in replaced], [texts[i] for i in replaced])
+    index.flush()
+    index.merge(list(index._snapshot.segments))
+
+    assert len(index) == DOCS
+    check(index, chunk_ids, texts, queries, k=10)
@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+from src.ingest import cleaner
+
+WORDS = "graph heap stack queue kernel mutex vector tensor entropy compiler".split()
+
+
+def baseline_chunk_text_by_sentences(text, max_tokens=500, overlap=100):
+    # chunk_text_by_sentences before the prefix-sum engine
+    sentences = cleaner.split_sentences_fast(text)
+
+    chunks = []
+    current = []
+    token_count = 0
+    start = 0
+
+    for i, sent in enumerate(sentences):
+        words = sent.split()
+        if token_count + len(words) > max_tokens:
+            chunks.append((start, i, " ".join(current)))
+
+            if overlap > 0:
+                overlap_words = []
+                count = 0
+                for s in reversed(current):
+                    count += len(s.split())
+                    overlap_words.insert(0, s)
+                    if count >= overlap:
+                        break
+                current = overlap_words
+                token_count = sum(len(s.split()) for s in current)
+                start = i - len(current)
+            else:
+                current = []
+                token_count = 0
+                start = i
+
+        current.append(sent)
+        token_count += len(words)
+
+    if current:
+        chunks.append((start, len(sentences), " ".join(current)))
+
+    return chunks
+
+
+def random_text(rng):
+    sentences = []
+    for _ in range(rng.randint(1, 40)):
+        # mostly short sentences, some longer than the whole budget
+        n = rng.randint(1, 8) if rng.random() < 0.7 else rng.randint(10, 60)
+        sentences.append(" ".join(rng.choice(WORDS) for _ in range(n)) + rng.choice(".?!"))
+    return " ".join(sentences)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_chunker_matches_the_baseline(seed):
+    rng = random.Random(seed)
+    for _ in range(600):
+        text = random_text(rng)
+        max_tokens = rng.randint(3, 40)
+        overlap = rng.randint(0, 50)  # up to larger than max_tokens
+        expected = baseline_chunk_text_by_sentences(text, max_tokens, overlap)
+        assert cleaner.chunk_text_by_sentences(text, max_tokens, overlap) == expected
+        sentences = cleaner.split_sentences_fast(text)
+        assert list(cleaner.iter_chunks(sentences, max_tokens, overlap)) == expected
+
+
+def test_fit_drops_the_overlap_only_when_needed():
+    rng = random.Random(7)
+    for _ in range(2000):
+        sentences = cleaner.split_sentences_fast(random_text(rng))
+        max_tokens, overlap = rng.randint(3, 40), rng.randint(0, 50)
+        counts = cleaner.sentence_token_counts(sentences)
+        chunks = cleaner.chunk_sentences(sentences, max_tokens, overlap, fit=True)
+        assert chunks == list(cleaner.iter_chunks(sentences, max_tokens, overlap, fit=True))
+        assert chunks[0][0] == 0 and chunks[-1][1] == len(sentences)
+        for (s, e, _), (s2, _, _) in zip(chunks, chunks[1:]):
+            assert s2 <= e  # contiguous, at most overlapping
+        for s, e, _ in chunks:
+            assert e - s == 1 or sum(counts[s:e]) <= max_tokens
@@ -0,0 +1,107 @@
+import json
+import random
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic_corpus import WORDS
+from src.ingest.dedup import MinHasher, NearDupIndex, dedup_chunk_file, dedup_outputs, shingle_hashes
+from src.keyword_engine.bm25 import BM25Index
+from src.vector_engine.store import iter_chunk_records
+
+HEAP = ("A binary heap keeps the smallest key at the root. Insertion appends the new key at the end "
+        "of the array and sifts it up while it is smaller than its parent, so it costs logarithmic time.")
+PAGING = ("Demand paging loads a page only when a process touches it; a page fault traps into the kernel, "
+          "which reads the page from disk and restarts the faulting instruction.")
+
+
+def write_chunks(processed, stem, texts):
+    path = processed / f"{stem}.chunks.jsonl"
+    with open(path, "w", encoding="utf-8") as f:
+        for i, text in enumerate(texts):
+            f.write(json.dumps({"id": f"{stem}_chunk_{i}", "source": f"{stem}.pdf", "text": text}) + "\n")
+    return path
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = NearDupIndex(tmp_path / "dedup.sqlite")
+    yield index
+    index.close()
+
+
+def test_minhash_estimates_shingle_jaccard():
+    rng = random.Random(0)
+    hasher = MinHasher(num_perm=256)
+    base = [rng.choice(WORDS) for _ in range(200)]
+    for changed in (0, 10, 40, 100):
+        other = list(base)
+        for i in rng.sample(range(len(base)), changed):
+            other[i] = f"edit{i}"
+        a, b = " ".join(base), " ".join(other)
+        sa, sb = set(shingle_hashes(a, 3).tolist()), set(shingle_hashes(b, 3).tolist())
+        exact = len(sa & sb) / len(sa | sb)
+        sigs = hasher.signatures([a, b])
+        assert abs(float(np.mean(sigs[0] == sigs[1])) - exact) < 0.1
+
+
+def test_add_marks_copies_within_and_across_calls(index):
+    first = index.add("a.chunks.jsonl", ["a_0", "a_1", "a_2"], [HEAP, PAGING, HEAP])
+    assert first == [None, None, "a_0"]
+
+    second = index.add("b.chunks.jsonl", ["b_0", "b_1", "b_2", "b_3"],
+                       [PAGING, HEAP + " Explain with an example.", "Binary search halves the range.", "  "])
+    assert second == ["a_1", "a_0", None, None]
+    assert index.stats() == {"chunks": 7, "duplicates": 3, "canonical": 4}
+
+    # blank chunks are never canonical, so they never absorb other blank chunks
+    assert index.add("c.chunks.jsonl", ["c_0"], ["\n"]) == [None]
+
+
+def test_changed_settings_clear_the_index(tmp_path, index):
+    index.add("a.chunks.jsonl", ["a_0"], [HEAP])
+    other = NearDupIndex(tmp_path / "dedup.sqlite", num_perm=64, bands=8)
+    assert other.stats()["chunks"] == 0
+    assert other.add("b.chunks.jsonl", ["b_0"], [HEAP]) == [None]
+    other.close()
+
+
+def test_chunk_file_is_marked_in_place_and_rededup_is_stable(tmp_path, index):
+    processed = tmp_path / "processed"
+    processed.mkdir()
+    path = write_chunks(processed, "cse_dsa_notes_2024", [HEAP, PAGING, HEAP + " Explain with an example."])
+
+    counts = dedup_chunk_file(index, path)
+    assert (counts["chunks"], counts["duplicates"]) == (3, 1)
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [r.get("duplicate_of") for r in records] == [None, None, "cse_dsa_notes_2024_chunk_0"]
+    chunk_id, offset, canonical = counts["copies"][0]
+    with open(path, "rb") as f:
+        f.seek(offset)
+        assert json.loads(f.readline())["id"] == chunk_id == "cse_dsa_notes_2024_chunk_2"
+
+    before = path.read_bytes()
+    again = dedup_chunk_file(index, path)
+    assert again["copies"] == counts["copies"] and path.read_bytes() == before
+    assert index.stats()["chunks"] == 3
+
+
+def test_duplicates_are_skipped_downstream(tmp_path, index):
+    processed = tmp_path / "processed"
+    processed.mkdir()
+    paths = [
+        write_chunks(processed, "cse_dsa_pyq_2023", [HEAP, PAGING]),
+        write_chunks(processed, "it_dsa_pyq_2024", [PAGING, HEAP + " Explain with an example.", "Tries store keys."]),
+    ]
+    report, redone = dedup_outputs(index, processed, paths)
+    assert (report["duplicates"], report["embeddings_avoided"], report["llm_calls_avoided"]) == (2, 2, 2)
+    assert redone == []
+
+    kept = [r["id"] for r in iter_chunk_records(processed)]
+    assert kept == ["cse_dsa_pyq_2023_chunk_0", "cse_dsa_pyq_2023_chunk_1", "it_dsa_pyq_2024_chunk_2"]
+    assert len(list(iter_chunk_records(processed, skip_duplicates=False))) == 5
+
+    bm25 = BM25Index(tmp_path / "bm25", processed_dir=processed, background_merge=False)
+    assert bm25.build() == 3
+    hits = bm25.search(["demand paging page fault"], k=5)[0]
+    assert [h["chunk_id"] for h in hits] == ["cse_dsa_pyq_2023_chunk_1"]
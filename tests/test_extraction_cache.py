@@ -0,0 +1,88 @@
+import pytest
+from groq import Groq
+
+from benchmarks.fake_llm_server import start_fake_server
+from src.graph_engine.cache import ExtractionCache, prompt_version
+from src.graph_engine.extractor import GraphExtractor
+
+DATA = {"nodes": [{"id": "DBMS", "label": "Course", "properties": {}}], "relationships": []}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ExtractionCache(tmp_path / "extractions.sqlite")
+    yield cache
+    cache.close()
+
+
+def test_hit_only_for_same_text_model_and_prompt(cache):
+    assert cache.get("DBMS is taught in semester 5.", "model-a", "prompt v1") is None
+    cache.put("DBMS is taught in semester 5.", "model-a", "prompt v1", DATA)
+
+    assert cache.get("DBMS is taught in semester 5.", "model-a", "prompt v1") == DATA
+    assert cache.get("DBMS is taught in semester 6.", "model-a", "prompt v1") is None
+    assert cache.get("DBMS is taught in semester 5.", "model-b", "prompt v1") is None
+    assert cache.get("DBMS is taught in semester 5.", "model-a", "prompt v2") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 4, 1)
+    assert stats["hit_ratio"] == 0.2
+
+
+def test_cache_persists_across_instances(tmp_path, cache):
+    cache.put("chunk", "model-a", "prompt v1", DATA)
+    reopened = ExtractionCache(tmp_path / "extractions.sqlite")
+    assert reopened.get("chunk", "model-a", "prompt v1") == DATA
+    reopened.close()
+
+
+def test_invalidate_by_model_or_prompt(cache):
+    for model in ("model-a", "model-b"):
+        for prompt in ("prompt v1", "prompt v2"):
+            cache.put("chunk", model, prompt, DATA)
+
+    assert cache.invalidate(model="model-a", prompt="prompt v1") == 1
+    assert cache.invalidate(version=prompt_version("prompt v2")) == 2
+    assert cache.get("chunk", "model-b", "prompt v1") == DATA
+    assert cache.invalidate() == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ExtractionCache(tmp_path / "extractions.sqlite", max_bytes=1000)
+    cache.EVICT_EVERY = 1
+    for i in range(30):
+        cache.put(f"chunk {i}", "model-a", "prompt v1", DATA)
+        cache.get("chunk 0", "model-a", "prompt v1")
+    assert cache.stats()["bytes"] <= 1000
+    assert cache.get("chunk 0", "model-a", "prompt v1") == DATA
+    assert cache.get("chunk 1", "model-a", "prompt v1") is None
+    cache.close()
+
+
+def test_extractor_skips_requests_for_cached_chunks(cache):
+    chunks = [f"Professor Name{i} teaches Course Number{i}." for i in range(4)]
+    srv = start_fake_server(seed=0)
+    try:
+        extractor = GraphExtractor(client=Groq(api_key="fake", base_url=srv.base_url, max_retries=0), cache=cache)
+        first = extractor.extract_many(chunks[:3])
+        assert srv.stats["requests"] == 3
+        assert not any(r["cached"] for r in first)
+
+        second = extractor.extract_many(chunks)
+        assert srv.stats["requests"] == 4
+        assert [r["cached"] for r in second] == [True, True, True, False]
+        assert [r["data"] for r in second[:3]] == [r["data"] for r in first]
+    finally:
+        srv.shutdown()
+
+
+def test_failed_extractions_are_not_cached(cache):
+    srv = start_fake_server(seed=0, server_error=1.0)
+    try:
+        extractor = GraphExtractor(client=Groq(api_key="fake", base_url=srv.base_url, max_retries=0), cache=cache)
+        results = extractor.extract_many(["Professor Name0 teaches Course Number0."], max_retries=0)
+        assert results[0]["status"] == "error"
+        assert cache.stats()["entries"] == 0
+    finally:
+        srv.shutdown()
@@ -0,0 +1,52 @@
+import pytest
+from groq import Groq
+
+from benchmarks.fake_llm_server import start_fake_server
+from src.graph_engine.extractor import GraphExtractor
+
+
+def records(n):
+    return [{"id": f"cse_dsa_chunk_{i}", "text": f"Professor Name{i} teaches Course Number{i}."} for i in range(n)]
+
+
+@pytest.fixture
+def server():
+    servers = []
+
+    def start(**kwargs):
+        servers.append(start_fake_server(seed=0, **kwargs))
+        return servers[-1]
+
+    yield start
+    for srv in servers:
+        srv.shutdown()
+
+
+def extractor_for(srv):
+    return GraphExtractor(client=Groq(api_key="fake", base_url=srv.base_url, max_retries=0), use_cache=False)
+
+
+def test_packed_answer_is_split_per_chunk(server):
+    srv = server()
+    results, report = extractor_for(srv).extract_packed(records(4), max_chunks=4)
+    assert [r["status"] for r in results] == ["ok"] * 4
+    assert [r["chunk_id"] for r in results] == [f"cse_dsa_chunk_{i}" for i in range(4)]
+    assert {n["id"] for n in results[2]["data"]["nodes"]} == {"Professor Name", "Course Number"}
+    assert srv.stats["requests"] == 1
+    assert report["requests"] == 1 and report["fallback_chunks"] == 0 and report["failed_chunks"] == 0
+
+
+def test_unparseable_pack_falls_back_to_single_chunks(server):
+    srv = server(malformed=1.0)
+    results, report = extractor_for(srv).extract_packed(records(4), max_chunks=4)
+    assert [r["status"] for r in results] == ["ok"] * 4
+    assert srv.stats["requests"] == 5  # the pack, then one request per chunk
+    assert report["fallback_chunks"] == 4
+
+
+def test_failed_pack_request_is_not_multiplied_by_the_pack_size(server):
+    srv = server(server_error=1.0)
+    results, report = extractor_for(srv).extract_packed(records(4), max_chunks=4, max_retries=0)
+    assert [r["status"] for r in results] == ["error"] * 4
+    assert srv.stats["requests"] == 1
+    assert report["fallback_chunks"] == 0 and report["failed_chunks"] == 4
@@ -0,0 +1,99 @@
+import json
+
+import pytest
+
+from src.ingest.dedup import DuplicateSources, NearDupIndex, dedup_outputs
+from src.keyword_engine.bm25 import BM25Index
+from src.orchestrator.filters import MetadataFilter, duplicate_sources, filtered_search
+from src.orchestrator.shards import ShardedKeywordIndex
+
+HEAP = ("A binary heap keeps the smallest key at the root. Insertion appends the new key at the end "
+        "of the array and sifts it up while it is smaller than its parent, so it costs logarithmic time.")
+GRAPHS = ("Dijkstra's algorithm finds shortest paths from one source in a graph with non-negative edge "
+          "weights by repeatedly settling the closest unsettled vertex from a priority queue.")
+PAGING = ("Demand paging loads a page only when a process touches it; a page fault traps into the kernel, "
+          "which reads the page from disk and restarts the faulting instruction.")
+
+
+def write_chunks(processed, stem, texts):
+    path = processed / f"{stem}.chunks.jsonl"
+    with open(path, "w", encoding="utf-8") as f:
+        for i, text in enumerate(texts):
+            f.write(json.dumps({"id": f"{stem}_chunk_{i}", "source": f"{stem}.pdf", "text": text}) + "\n")
+    return path
+
+
+@pytest.fixture
+def processed(tmp_path):
+    processed = tmp_path / "processed"
+    processed.mkdir()
+    paths = [
+        write_chunks(processed, "cse_dsa_pyq_2023", [HEAP, GRAPHS]),
+        # near-copies of the 2023 paper, one in the same shard and one in another
+        write_chunks(processed, "cse_dsa_pyq_2024", [HEAP + " Explain with an example.", GRAPHS]),
+        write_chunks(processed, "it_dsa_pyq_2024", [HEAP]),
+        write_chunks(processed, "cse_os_pyq_2024", [PAGING]),
+    ]
+    index = NearDupIndex(tmp_path / "dedup.sqlite")
+    report, _ = dedup_outputs(index, processed, paths, sources=DuplicateSources(processed))
+    index.close()
+    assert report["duplicates"] == 3
+    return processed
+
+
+def ids(hits):
+    return [hit["chunk_id"] for hit in hits]
+
+
+def test_duplicate_sources_point_at_the_copies(processed):
+    sources = DuplicateSources(processed)
+    copies = {c["chunk_id"]: c for c in sources.copies("cse_dsa_pyq_2023_chunk_0")}
+    assert set(copies) == {"cse_dsa_pyq_2024_chunk_0", "it_dsa_pyq_2024_chunk_0"}
+    copy = copies["it_dsa_pyq_2024_chunk_0"]
+    with open(processed / copy["file"], "rb") as f:
+        f.seek(copy["offset"])
+        assert json.loads(f.readline())["id"] == "it_dsa_pyq_2024_chunk_0"
+    assert sources.links["it_dsa_pyq_2024.chunks.jsonl"] == {"cse_dsa_pyq_2023.chunks.jsonl"}
+
+
+def test_sharded_search_reaches_near_duplicates(processed, tmp_path):
+    index = ShardedKeywordIndex(tmp_path / "bm25", processed_dir=processed, workers=1, background_merge=False)
+    index.build()
+    query = ["binary heap insertion"]
+
+    hits = index.search(query, k=5, filters="cse pyq 2024")[0]
+    assert ids(hits)[0] == "cse_dsa_pyq_2024_chunk_0"
+    assert hits[0]["file"] == "cse_dsa_pyq_2024.chunks.jsonl"
+    assert hits[0]["duplicate_of"] == "cse_dsa_pyq_2023_chunk_0"
+    assert index.read_chunk(hits[0]["file"], hits[0]["offset"])["id"] == "cse_dsa_pyq_2024_chunk_0"
+
+    # the copy lives in the it_pyq shard, its canonical chunk in cse_pyq
+    assert "cse_pyq" in index.select(MetadataFilter.parse("it pyq"))
+    assert ids(index.search(query, k=5, filters="it pyq")[0]) == ["it_dsa_pyq_2024_chunk_0"]
+
+    assert ids(index.search(query, k=5, filters="cse pyq 2023")[0])[0] == "cse_dsa_pyq_2023_chunk_0"
+    unfiltered = ids(index.search(query, k=5)[0])
+    assert "cse_dsa_pyq_2023_chunk_0" in unfiltered
+    assert not {"cse_dsa_pyq_2024_chunk_0", "it_dsa_pyq_2024_chunk_0"} & set(unfiltered)
+
+
+def test_single_index_filter_reaches_near_duplicates(processed, tmp_path):
+    index = BM25Index(tmp_path / "single", processed_dir=processed, background_merge=False)
+    index.build()
+    filters = MetadataFilter.parse("cse pyq 2024")
+    hits = filtered_search(lambda n: index.search(["binary heap insertion"], k=n)[0], 5, filters,
+                           duplicates=duplicate_sources(processed))
+    assert ids(hits)[0] == "cse_dsa_pyq_2024_chunk_0"
+    assert "cse_dsa_pyq_2023_chunk_0" not in ids(hits)
+
+
+def test_rededup_after_removing_the_canonical_file(processed, tmp_path):
+    (processed / "cse_dsa_pyq_2023.chunks.jsonl").unlink()
+    index = NearDupIndex(tmp_path / "dedup.sqlite")
+    _, redone = dedup_outputs(index, processed, [], ["cse_dsa_pyq_2023.chunks.jsonl"], DuplicateSources(processed))
+    index.close()
+
+    sources = DuplicateSources(processed)
+    assert {p.name for p in redone} == {"cse_dsa_pyq_2024.chunks.jsonl", "it_dsa_pyq_2024.chunks.jsonl"}
+    assert not sources.copies("cse_dsa_pyq_2023_chunk_0")
+    assert [c["chunk_id"] for c in sources.copies("cse_dsa_pyq_2024_chunk_0")] == ["it_dsa_pyq_2024_chunk_0"]
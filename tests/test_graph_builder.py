@@ -0,0 +1,93 @@
+import random
+
+import pytest
+
+from src.graph_engine.builder import GraphBuilder
+from src.graph_engine.snapshot import GraphChangeLog
+from src.graph_engine.store import SQLiteGraphStore
+
+LABELS = ["Professor", "Course", "Topic", "teaching assistant", "Department"]
+REL_TYPES = ["TEACHES", "covers", "part of", "PREREQUISITE_OF"]
+
+
+class StaticExtractor:
+    def __init__(self, extractions):
+        self.extractions = iter(extractions)
+
+    def extract(self, text_chunk: str) -> dict:
+        return next(self.extractions)
+
+
+def extraction(rng: random.Random, entities: int = 40) -> dict:
+    names = [f"Entity {i}" for i in range(entities)]
+    nodes = [
+        {"id": rng.choice(names), "label": rng.choice(LABELS), "properties": {"rank": rng.randrange(5)}}
+        for _ in range(entities)
+    ]
+    nodes.append({"id": "", "label": "Course"})
+    relationships = [
+        {
+            # some endpoints are not extracted as nodes in this chunk
+            "source": rng.choice(names),
+            "target": rng.choice(names + ["Unknown"]),
+            "type": rng.choice(REL_TYPES),
+            "properties": {"weight": rng.randrange(3)},
+        }
+        for _ in range(entities)
+    ]
+    relationships.append({"source": "Entity 0", "target": None, "type": "TEACHES"})
+    return {"nodes": nodes, "relationships": relationships}
+
+
+def dump(store: SQLiteGraphStore):
+    conn = store._conn()
+    nodes = conn.execute("SELECT label, name, props FROM nodes ORDER BY label, name").fetchall()
+    edges = conn.execute(
+        "SELECT a.label, a.name, e.type, b.label, b.name, e.props FROM edges e "
+        "JOIN nodes a ON a.id = e.source JOIN nodes b ON b.id = e.target "
+        "ORDER BY 1, 2, 3, 4, 5"
+    ).fetchall()
+    return nodes, edges
+
+
+def build(tmp_path, batched: bool, extractions):
+    store = SQLiteGraphStore(tmp_path / f"graph_{batched}.sqlite")
+    log = GraphChangeLog(tmp_path / f"changes_{batched}.jsonl")
+    builder = GraphBuilder(batched=batched, batch_size=7, extractor=StaticExtractor(extractions),
+                           store=store, change_log=log)
+    for i in range(len(extractions)):
+        builder.process_text(f"chunk {i}")
+    graph = dump(store)
+    store.close()
+    changes = [(entry["nodes"], entry["edges"]) for entry in log.read()[0]]
+    return graph, changes
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_batched_writes_match_per_item(tmp_path, seed):
+    rng = random.Random(seed)
+    extractions = [extraction(rng) for _ in range(5)]
+
+    batched = build(tmp_path, True, extractions)
+    per_item = build(tmp_path, False, extractions)
+
+    (nodes, edges), changes = batched
+    assert nodes and edges and len(changes) == len(extractions)
+    assert batched == per_item
+
+
+def test_failed_batch_falls_back_to_per_item(tmp_path):
+    class FailingBatchStore(SQLiteGraphStore):
+        def upsert(self, nodes, rels, batch_size=None):
+            raise RuntimeError("transaction rolled back")
+
+    data = extraction(random.Random(0))
+    store = FailingBatchStore(tmp_path / "graph.sqlite")
+    builder = GraphBuilder(batched=True, extractor=StaticExtractor([]), store=store,
+                           change_log=GraphChangeLog(tmp_path / "changes.jsonl"))
+    nodes_created, rels_created = builder.write_graph(data["nodes"], data["relationships"])
+    graph = dump(store)
+    store.close()
+
+    assert (nodes_created, rels_created) == (len(data["nodes"]) - 1, len(data["relationships"]) - 1)
+    assert graph == build(tmp_path, False, [data])[0]
@@ -0,0 +1,116 @@
+import pytest
+
+from src.graph_engine.schema import ENTITY_LABEL
+from src.graph_engine.store import SQLiteGraphStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteGraphStore(tmp_path / "graph.sqlite")
+    yield store
+    store.close()
+
+
+def edge(source, target, source_label=None, target_label=None, **props):
+    return {"source": source, "target": target, "source_label": source_label, "target_label": target_label,
+            "props": props}
+
+
+def test_repeated_upserts_merge_properties(store):
+    store.upsert({"Course": [{"name": "DBMS", "props": {"name": "DBMS", "credits": 3}}]}, {})
+    store.upsert({"Course": [{"name": "DBMS", "props": {"semester": 5, "credits": 4}}]}, {})
+    store.upsert_node("Course", "DBMS", {"code": "CS301"})
+    assert store.get_nodes(["DBMS"]) == [{
+        "name": "DBMS", "labels": ["Course", ENTITY_LABEL],
+        "properties": {"name": "DBMS", "credits": 4, "semester": 5, "code": "CS301"},
+    }]
+
+    store.upsert_node("Professor", "Sarvesh", {})
+    store.upsert({}, {"TEACHES": [edge("Sarvesh", "DBMS", weight=1)]})
+    store.upsert({}, {"TEACHES": [edge("Sarvesh", "DBMS", year=2024)]})
+    store.upsert_edge("TEACHES", "Sarvesh", "DBMS", props={"weight": 2})
+    assert store.stats() == {"nodes": 2, "edges": 1}
+    props = store._conn().execute("SELECT props FROM edges").fetchone()[0]
+    assert props == '{"weight":2,"year":2024}'
+
+
+def test_edge_endpoints_narrowed_by_label(store):
+    # "Python" is both a course and a language
+    store.upsert({"Course": [{"name": "Python", "props": {}}], "Language": [{"name": "Python", "props": {}}],
+                  "Professor": [{"name": "Sarvesh", "props": {}}]}, {})
+    store.upsert({}, {"TEACHES": [edge("Sarvesh", "Python", "Professor", "Course")]})
+    rows = store._conn().execute(
+        "SELECT t.label FROM edges e JOIN nodes t ON t.id = e.target WHERE e.type = 'TEACHES'").fetchall()
+    assert rows == [("Course",)]
+
+    # no label: every node with the name (the :Entity lookup)
+    store.upsert({}, {"MENTIONS": [edge("Sarvesh", "Python")]})
+    store.upsert_edge("USES", "Sarvesh", "Python", ENTITY_LABEL, "Language")
+    labels = dict(store._conn().execute(
+        "SELECT e.type, group_concat(t.label) FROM edges e JOIN nodes t ON t.id = e.target GROUP BY e.type"))
+    assert sorted(labels["MENTIONS"].split(",")) == ["Course", "Language"]
+    assert labels["USES"] == "Language"
+
+    # a label that doesn't match writes nothing
+    store.upsert({}, {"TEACHES": [edge("Sarvesh", "Python", "Student", None)]})
+    assert store.stats()["edges"] == 4
+
+
+def test_neighbors_both_directions_longest_name_first(store):
+    store.upsert(
+        {"Course": [{"name": n, "props": {}} for n in ("DBMS", "Operating Systems", "Advanced DBMS")],
+         "Professor": [{"name": "Sarvesh", "props": {}}]},
+        {"TEACHES": [edge("Sarvesh", "DBMS"), edge("Sarvesh", "Operating Systems")],
+         "PREREQUISITE_OF": [edge("DBMS", "Advanced DBMS"), edge("Operating Systems", "Advanced DBMS")]},
+    )
+    rows = store.neighbors(["DBMS", "Operating Systems", "Nobody"])
+    assert [r["matched"] for r in rows] == ["Operating Systems"] * 2 + ["DBMS"] * 2
+    assert {(r["source"], r["type"], r["target"]) for r in rows[:2]} == {
+        ("Sarvesh", "TEACHES", "Operating Systems"),  # incoming
+        ("Operating Systems", "PREREQUISITE_OF", "Advanced DBMS"),  # outgoing
+    }
+    assert len(store.neighbors(["DBMS", "Operating Systems"], limit=3)) == 3
+    assert store.neighbors([]) == []
+
+
+def test_get_nodes_labels(store):
+    store.upsert_node(ENTITY_LABEL, "Thing", {})
+    store.upsert_node("Course", "DBMS", {})
+    store.upsert_node("Subject", "DBMS", {})
+    nodes = sorted(store.get_nodes(["DBMS", "Thing", "DBMS"]), key=lambda n: n["labels"])
+    assert [(n["name"], n["labels"]) for n in nodes] == [
+        ("DBMS", ["Course", ENTITY_LABEL]), ("Thing", [ENTITY_LABEL]),
+        ("DBMS", ["Subject", ENTITY_LABEL]),
+    ]
+    assert store.get_nodes([]) == []
+
+
+def test_per_item_writes_match_the_batched_upsert(tmp_path):
+    nodes = {"Professor": [{"name": "Sarvesh", "props": {"name": "Sarvesh", "dept": "CSE"}}],
+             "Course": [{"name": "Python", "props": {"name": "Python"}}, {"name": "DBMS", "props": {"name": "DBMS"}}],
+             "Language": [{"name": "Python", "props": {"name": "Python"}}]}
+    rels = {"TEACHES": [edge("Sarvesh", "Python", "Professor", "Course", since=2020), edge("Sarvesh", "DBMS")],
+            "RELATED_TO": [edge("DBMS", "Python", "Course", None)]}
+
+    batched = SQLiteGraphStore(tmp_path / "batched.sqlite")
+    batched.upsert(nodes, rels)
+    per_item = SQLiteGraphStore(tmp_path / "per_item.sqlite")
+    for label, rows in nodes.items():
+        for row in rows:
+            per_item.upsert_node(label, row["name"], row["props"])
+    for rel_type, rows in rels.items():
+        for row in rows:
+            # the builder passes ENTITY_LABEL for endpoints it has no label for
+            per_item.upsert_edge(rel_type, row["source"], row["target"], row["source_label"] or ENTITY_LABEL,
+                                 row["target_label"] or ENTITY_LABEL, row["props"])
+
+    def dump(store):
+        conn = store._conn()
+        return (sorted(conn.execute("SELECT label, name, props FROM nodes")),
+                sorted(conn.execute("SELECT s.label, s.name, e.type, t.label, t.name, e.props FROM edges e "
+                                    "JOIN nodes s ON s.id = e.source JOIN nodes t ON t.id = e.target")))
+
+    assert dump(batched) == dump(per_item)
+    assert len(dump(batched)[1]) == 4  # DBMS -> both Pythons
+    batched.close()
+    per_item.close()
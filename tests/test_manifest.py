@@ -0,0 +1,107 @@
+import json
+import os
+
+import pytest
+
+from src.ingest.processor import (CHANGES_NAME, MANIFEST_NAME, discover_files, ingest_params, load_manifest,
+                                  main, plan_changes)
+
+TEXT = "Unit {i} covers binary search trees. Heaps are covered in the lab. Revision {rev} of the notes."
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    raw, out = tmp_path / "raw", tmp_path / "processed"
+    (raw / "cse").mkdir(parents=True)
+    for i in range(3):
+        (raw / "cse" / f"cse_dsa{i}_notes_2024.txt").write_text(TEXT.format(i=i, rev=0), encoding="utf-8")
+    return raw, out
+
+
+def run(raw, out, **kwargs):
+    kwargs = {"use_ocr": False, "max_tokens": 50, "overlap": 10, "dedup": False, **kwargs}
+    results = main(str(raw), str(out), **kwargs)
+    changes = json.loads((out / CHANGES_NAME).read_text(encoding="utf-8"))
+    return results, changes
+
+
+def sources(changes, kind):
+    return sorted(c["source"] for c in changes[kind])
+
+
+def test_first_run_adds_every_file_and_second_run_skips_them(dirs):
+    raw, out = dirs
+    results, changes = run(raw, out)
+    assert len(results) == 3
+    assert sources(changes, "added") == [f"cse/cse_dsa{i}_notes_2024.txt" for i in range(3)]
+    assert set(load_manifest(out)["files"]) == set(sources(changes, "added"))
+
+    results, changes = run(raw, out)
+    assert results == []
+    assert changes["added"] == changes["modified"] == changes["removed"] == []
+    assert changes["unchanged"] == 3
+
+
+def test_touched_file_is_unchanged_and_edited_file_is_modified(dirs):
+    raw, out = dirs
+    run(raw, out)
+    touched, edited = raw / "cse" / "cse_dsa0_notes_2024.txt", raw / "cse" / "cse_dsa1_notes_2024.txt"
+    st = touched.stat()
+    os.utime(touched, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    edited.write_text(TEXT.format(i=1, rev=1) + " A new sentence about graphs.", encoding="utf-8")
+
+    results, changes = run(raw, out)
+    assert [r["file"] for r in results] == [str(edited)]
+    assert sources(changes, "modified") == ["cse/cse_dsa1_notes_2024.txt"]
+    assert changes["modified"][0]["previous_chunks_count"] == 1
+    assert changes["unchanged"] == 2
+    assert "Revision 1" in (out / "cse_dsa1_notes_2024.cleaned.txt").read_text(encoding="utf-8")
+
+    # the touched file's new mtime is recorded, so it is not hashed again
+    manifest = load_manifest(out)
+    assert manifest["files"]["cse/cse_dsa0_notes_2024.txt"]["mtime_ns"] == touched.stat().st_mtime_ns
+
+
+def test_deleted_source_removes_its_outputs(dirs):
+    raw, out = dirs
+    run(raw, out)
+    (raw / "cse" / "cse_dsa2_notes_2024.txt").unlink()
+
+    results, changes = run(raw, out)
+    assert results == []
+    assert sources(changes, "removed") == ["cse/cse_dsa2_notes_2024.txt"]
+    assert sorted(changes["removed"][0]["deleted"]) == sorted(
+        str(out / name) for name in ("cse_dsa2_notes_2024.cleaned.txt", "cse_dsa2_notes_2024.chunks.jsonl")
+    )
+    assert not (out / "cse_dsa2_notes_2024.chunks.jsonl").exists()
+    assert "cse/cse_dsa2_notes_2024.txt" not in load_manifest(out)["files"]
+
+
+def test_new_params_missing_outputs_and_force_reprocess(dirs):
+    raw, out = dirs
+    run(raw, out)
+    files = discover_files(raw)
+    params = ingest_params(False, 50, 10)
+
+    plan = plan_changes(raw, files, out, load_manifest(out), params)
+    assert len(plan["unchanged"]) == 3
+
+    plan = plan_changes(raw, files, out, load_manifest(out), ingest_params(False, 60, 10))
+    assert len(plan["modified"]) == 3
+
+    (out / "cse_dsa0_notes_2024.chunks.jsonl").unlink()
+    plan = plan_changes(raw, files, out, load_manifest(out), params)
+    assert [key for key, _, _, _ in plan["modified"]] == ["cse/cse_dsa0_notes_2024.txt"]
+
+    plan = plan_changes(raw, files, out, load_manifest(out), params, force=True)
+    assert len(plan["modified"]) == 3
+
+
+def test_unreadable_manifest_starts_over(dirs):
+    raw, out = dirs
+    run(raw, out)
+    (out / MANIFEST_NAME).write_text("{not json", encoding="utf-8")
+
+    results, changes = run(raw, out)
+    assert len(results) == 3
+    assert len(changes["added"]) == 3
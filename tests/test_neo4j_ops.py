@@ -0,0 +1,72 @@
+import threading
+
+import pytest
+from neo4j.exceptions import ServiceUnavailable, TransientError
+
+from benchmarks.fake_neo4j import FakeNeo4jDriver, FakeSession
+from src.graph_engine import neo4j_ops
+from src.graph_engine.neo4j_ops import Neo4jConnector
+
+
+class FlakySession(FakeSession):
+    """Fails the first `failures` calls of every kind, like a cluster mid leader switch."""
+
+    def run(self, query, params=None, **kwargs):
+        self._driver.stats["run_calls"] += 1
+        if self._driver.failures > 0:
+            self._driver.failures -= 1
+            raise ServiceUnavailable("leader switch")
+        return super().run(query, params, **kwargs)
+
+    def execute_write(self, work, *args, **kwargs):
+        self._driver.stats["execute_calls"] += 1
+        if self._driver.failures > 0:
+            self._driver.failures -= 1
+            raise TransientError("retry window exhausted")
+        return super().execute_write(work, *args, **kwargs)
+
+
+class FlakyDriver(FakeNeo4jDriver):
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    def session(self, **kwargs):
+        return FlakySession(self)
+
+
+@pytest.fixture
+def connector(monkeypatch):
+    connector = Neo4jConnector()
+    monkeypatch.setattr(connector, "_sessions", [])
+    monkeypatch.setattr(neo4j_ops.random, "uniform", lambda a, b: 0.0)
+
+    def use(driver):
+        monkeypatch.setattr(connector, "_driver", driver)
+        monkeypatch.setattr(connector, "_local", threading.local())  # no session of the previous driver
+        return driver
+
+    connector.use = use
+    return connector
+
+
+def test_managed_transactions_are_left_to_the_driver_retries(connector):
+    driver = connector.use(FlakyDriver(failures=1))
+    with pytest.raises(TransientError):
+        connector.write_batch([("MERGE (n:Course {name: $name})", {"name": "DBMS"})])
+    assert driver.stats["execute_calls"] == 1
+
+    connector.write_batch([("MERGE (n:Course {name: $name})", {"name": "DBMS"})])
+    assert driver.stats["execute_calls"] == 2 and driver.stats["transactions"] == 1
+
+
+def test_auto_commit_queries_are_replayed_on_a_fresh_session(connector, monkeypatch):
+    monkeypatch.setattr(neo4j_ops.config, "NEO4J_MAX_RETRIES", 3)
+    driver = connector.use(FlakyDriver(failures=2))
+    assert connector.run_cypher("MERGE (n:Course {name: 'DBMS'})") == []
+    assert driver.stats["run_calls"] == 3 and driver.stats["auto_commit"] == 1
+
+    driver = connector.use(FlakyDriver(failures=10))
+    with pytest.raises(ServiceUnavailable):
+        connector.run_cypher("MERGE (n:Course {name: 'DBMS'})")
+    assert driver.stats["run_calls"] == 4
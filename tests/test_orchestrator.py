@@ -0,0 +1,157 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.orchestrator.manager import QueryOrchestrator, VectorRetriever, reciprocal_rank_fusion
+
+
+class FakeRetriever:
+    """In-process backend: returns `ids` after `delay_s`, or once `gate` is set."""
+
+    def __init__(self, name, ids, delay_s=0.0, gate=None):
+        self.name = name
+        self.ids = ids
+        self.delay_s = delay_s
+        self.gate = gate
+        self.calls = 0
+
+    def search(self, query, k):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait()
+        time.sleep(self.delay_s)
+        return [{"id": i, "kind": "chunk", "score": 1.0} for i in self.ids[:k]]
+
+
+@pytest.fixture
+def make_orchestrator():
+    created = []
+
+    def make(retrievers, **kwargs):
+        kwargs.setdefault("timeouts_ms", {r.name: 1000 for r in retrievers})
+        kwargs.setdefault("budget_ms", 1000)
+        orchestrator = QueryOrchestrator(retrievers, **kwargs)
+        created.append(orchestrator)
+        return orchestrator
+
+    yield make
+    for orchestrator in created:
+        orchestrator.close()
+
+
+def test_rrf_sums_reciprocal_ranks():
+    ranked = {
+        "vector": [{"id": "a", "score": 0.9}, {"id": "b"}, {"id": "c"}],
+        "keyword": [{"id": "c"}, {"id": "a"}, {"id": "a"}],
+    }
+    fused = reciprocal_rank_fusion(ranked, k=10, rrf_k=60)
+
+    assert [hit["id"] for hit in fused] == ["a", "c", "b"]
+    assert fused[0]["rrf"] == pytest.approx(1 / 61 + 1 / 62)  # the repeated "a" counts once
+    assert fused[0]["ranks"] == {"vector": 1, "keyword": 2}
+    assert "score" not in fused[0]
+    assert len(reciprocal_rank_fusion(ranked, k=2)) == 2
+
+
+def test_rrf_weights():
+    ranked = {"vector": [{"id": "a"}], "keyword": [{"id": "b"}]}
+    fused = reciprocal_rank_fusion(ranked, k=10, weights={"keyword": 2.0})
+    assert [hit["id"] for hit in fused] == ["b", "a"]
+
+
+def test_slow_backend_times_out_and_answer_is_partial(make_orchestrator):
+    orchestrator = make_orchestrator(
+        [FakeRetriever("vector", ["a", "b"]), FakeRetriever("graph", ["g"], delay_s=0.5)],
+        timeouts_ms={"vector": 500, "graph": 50},
+    )
+    response = orchestrator.query("q")
+
+    assert response["partial"]
+    assert response["backends"]["graph"]["status"] == "timeout"
+    assert response["backends"]["vector"]["status"] == "ok"
+    assert [hit["id"] for hit in response["results"]] == ["a", "b"]
+    assert response["ms"] < 400
+
+
+def test_failing_backend_is_reported(make_orchestrator):
+    class Broken(FakeRetriever):
+        def search(self, query, k):
+            raise RuntimeError("index missing")
+
+    orchestrator = make_orchestrator([FakeRetriever("vector", ["a"]), Broken("keyword", [])])
+    response = orchestrator.query("q")
+
+    assert response["partial"]
+    assert response["backends"]["keyword"]["status"] == "error"
+    assert response["backends"]["keyword"]["error"] == "index missing"
+    assert [hit["id"] for hit in response["results"]] == ["a"]
+
+
+def test_backend_is_busy_only_while_abandoned_calls_run(make_orchestrator):
+    gate = threading.Event()
+    hanging = FakeRetriever("graph", ["g"], gate=gate)
+    orchestrator = make_orchestrator(
+        [FakeRetriever("vector", ["a"]), hanging], timeouts_ms={"vector": 500, "graph": 30}, max_abandoned=1,
+    )
+
+    assert orchestrator.query("q1")["backends"]["graph"]["status"] == "timeout"
+    second = orchestrator.query("q2")
+    assert second["backends"]["graph"]["status"] == "busy"
+    assert second["backends"]["vector"]["status"] == "ok"
+    assert hanging.calls == 1  # no new work piled onto the hung backend
+
+    gate.set()
+    deadline = time.monotonic() + 2
+    while orchestrator._abandoned["graph"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    third = orchestrator.query("q3")
+    assert third["backends"]["graph"]["status"] == "ok"
+    assert not third["partial"]
+
+
+def test_concurrent_queries_on_healthy_backends_are_not_busy(make_orchestrator):
+    retrievers = [FakeRetriever(name, [f"{name}_{i}" for i in range(5)], delay_s=0.05)
+                  for name in ("vector", "keyword", "graph")]
+    orchestrator = make_orchestrator(retrievers, concurrency=8)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        responses = list(pool.map(lambda i: orchestrator.query(f"query {i}"), range(8)))
+
+    for response in responses:
+        assert not response["partial"], response["backends"]
+        assert len(response["results"]) == 10
+
+
+class FakeVectorStore:
+    """VectorStore stand-in: `saved` is the generation on disk, load() takes `load_s`."""
+
+    index_type = "flat"
+    index_dir = "unused"
+    embedder = None
+    saved = 1
+    load_s = 0.3
+
+    def __init__(self, generation):
+        self.generation = generation
+
+    def saved_generation(self):
+        return type(self).saved
+
+    @classmethod
+    def load(cls, index_type, index_dir, embedder=None):
+        time.sleep(cls.load_s)
+        return cls(cls.saved)
+
+
+def test_vector_index_reloads_in_the_background(monkeypatch):
+    retriever = VectorRetriever(FakeVectorStore(1), refresh_s=0)
+    assert retriever.generation() == 1
+
+    monkeypatch.setattr(FakeVectorStore, "saved", 2)
+    start = time.perf_counter()
+    assert retriever.generation() == 1  # the old index keeps serving while the new one loads
+    assert time.perf_counter() - start < 0.1
+    retriever._reload.join()
+    assert retriever.generation() == 2
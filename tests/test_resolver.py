@@ -0,0 +1,58 @@
+import pytest
+
+from src.graph_engine.resolver import EntityResolver, normalize_name
+
+
+def resolve(*extractions):
+    return EntityResolver().resolve(list(extractions))
+
+
+def pair(a, b, label, rel_type="RELATED_TO"):
+    return {"nodes": [{"id": a, "label": label}, {"id": b, "label": label}],
+            "relationships": [{"source": a, "target": b, "type": rel_type}]}
+
+
+def test_normalize_name_drops_case_punctuation_and_honorifics():
+    assert normalize_name("Prof. Sarvesh") == normalize_name("sarvesh") == "sarvesh"
+    assert normalize_name("Dr.  A.P.J. Kalam") == "a p j kalam"
+
+
+@pytest.mark.parametrize("a, b, label", [
+    ("Prof. Sarvesh Kumar", "Sarvesh Kumar", "Professor"),                     # honorific
+    ("DBMS", "dbms", "Subject"),                                               # case
+    ("Dijkstra's Algorithm", "dijkstras algorithm", "Concept"),                # punctuation
+    ("Object Oriented Programming Concepts", "Object Oriented Programing Concepts", "Subject"),  # spelling
+])
+def test_aliases_merge(a, b, label):
+    graph, report = resolve({"nodes": [{"id": a, "label": label}]}, {"nodes": [{"id": b, "label": label}]})
+    assert len(graph["nodes"]) == 1
+    assert report["aliases_merged"] == 1
+
+
+def test_single_token_person_merges_into_the_only_longer_name():
+    graph, _ = resolve({"nodes": [{"id": "Sarvesh", "label": "Professor"},
+                                  {"id": "Sarvesh Kumar", "label": "Professor"}]},
+                       {"nodes": [{"id": "Sarvesh Kumar", "label": "Professor"}]})
+    assert [n["id"] for n in graph["nodes"]] == ["Sarvesh Kumar"]
+    assert graph["nodes"][0]["properties"]["aliases"] == ["Sarvesh"]
+
+
+@pytest.mark.parametrize("a, b, label", [
+    ("Engineering Mathematics I", "Engineering Mathematics II", "Course"),        # roman numerals
+    ("Data Structures and Algorithms CS201", "Data Structures and Algorithms CS202", "Course"),  # course codes
+    ("Question Paper 2023 Computer Engineering", "Question Paper 2024 Computer Engineering", "Document"),  # years
+    ("Design and Analysis of Algorithms", "Design and Analysis of Algorithms Lab", "Course"),  # added word
+])
+def test_distinct_entities_stay_apart(a, b, label):
+    graph, report = resolve(pair(a, b, label, "PREREQUISITE_OF"))
+    assert sorted(n["id"] for n in graph["nodes"]) == sorted([a, b])
+    assert [(r["source"], r["type"], r["target"]) for r in graph["relationships"]] == [(a, "PREREQUISITE_OF", b)]
+    assert report["aliases_merged"] == 0
+
+
+def test_spelling_variant_of_a_numbered_name_still_merges():
+    graph, _ = resolve(pair("Engineering Mathematics II", "Enginering Mathematics II", "Course"),
+                       {"nodes": [{"id": "Engineering Mathematics II", "label": "Course"},
+                                  {"id": "Engineering Mathematics I", "label": "Course"}]})
+    assert sorted(n["id"] for n in graph["nodes"]) == ["Engineering Mathematics I", "Engineering Mathematics II"]
+    assert graph["relationships"] == []  # the two spellings were linked to each other
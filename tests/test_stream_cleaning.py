@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+from benchmarks.synthetic_corpus import page_lines, write_pdf
+from src.ingest import cleaner
+
+EXTRA_LINES = ["", "", "Page 3", "12", "Is it   sorted?", "Yes!", "multi-", "level   indexing", "  indented line",
+               "ends with a dash -", "Q.", "e.g. a heap"]
+
+
+def pages_for(seed: int, n_pages: int):
+    rng = random.Random(seed)
+    pages = []
+    for p in range(n_pages):
+        lines = page_lines(rng, p + 1, rng.randint(0, 12), "CSE Book")
+        for _ in range(rng.randint(0, 6)):
+            lines.insert(rng.randrange(len(lines) + 1), rng.choice(EXTRA_LINES))
+        pages.append("" if rng.random() < 0.1 else "\n".join(lines))
+    return pages
+
+
+def streamed(pages):
+    repeated = cleaner.detect_repeated_lines(pages) if len(pages) >= 5 else set()
+    return list(cleaner.iter_clean_paragraphs(iter(pages), repeated))
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_streamed_paragraphs_match_clean_pages(seed):
+    pages = pages_for(seed, 1 + seed % 9)
+    paragraphs = streamed(pages)
+    text = cleaner.clean_pages(pages)
+    assert "\n\n".join(paragraphs) == text
+    assert list(cleaner.iter_sentences(iter(paragraphs))) == cleaner.split_sentences_fast(text)
+
+
+def test_hyphenated_word_across_pages_is_joined():
+    pages = ["Header line", "Header line\nthe binary search-", "tree is balanced.", "", "Header line"]
+    assert "\n\n".join(streamed(pages)) == cleaner.clean_pages(pages) == "the binary searchtree is balanced."
+
+
+def test_empty_input():
+    assert "\n\n".join(streamed([])) == cleaner.clean_pages([]) == ""
+    assert list(cleaner.iter_sentences(iter([]))) == cleaner.split_sentences_fast("")
+
+
+@pytest.mark.parametrize("max_tokens,overlap", [(500, 100), (40, 10), (12, 12)])
+def test_streamed_pdf_outputs_match_in_memory_outputs(tmp_path, max_tokens, overlap):
+    rng = random.Random(max_tokens)
+    pdf = tmp_path / "cse_book1_notes_2024.pdf"
+    write_pdf(pdf, [page_lines(rng, p + 1, 30, "CSE Book") for p in range(6)])
+
+    legacy, stream = tmp_path / "legacy", tmp_path / "stream"
+    text = cleaner.clean_pages(cleaner.extract_text_from_pdf(pdf))
+    cleaner.write_cleaned_text(legacy, pdf.stem, text)
+    cleaner.write_chunks_jsonl(legacy, pdf.stem, pdf,
+                               cleaner.chunk_text_by_sentences(text, max_tokens=max_tokens, overlap=overlap))
+    _, _, n_chunks = cleaner.stream_pdf_to_outputs(pdf, stream, max_tokens=max_tokens, overlap=overlap)
+
+    names = sorted(p.name for p in legacy.iterdir())
+    assert names == sorted(p.name for p in stream.iterdir())
+    for name in names:
+        assert (legacy / name).read_bytes() == (stream / name).read_bytes(), name
+    assert n_chunks == len((legacy / f"{pdf.stem}.chunks.jsonl").read_text(encoding="utf-8").splitlines())
@@ -0,0 +1,46 @@
+import os
+import socket
+import subprocess
+import sys
+
+from src.graph_engine.work_queue import EXTRACTED, PENDING, ExtractionQueue, owner_gone
+
+
+def exited_pid() -> int:
+    child = subprocess.Popen([sys.executable, "-c", "pass"])
+    child.wait()
+    return child.pid
+
+
+def test_resume_reclaims_leases_of_an_exited_run(tmp_path):
+    path = tmp_path / "queue.sqlite"
+    crashed = ExtractionQueue(path, lease_s=900, owner=f"{socket.gethostname()}:{exited_pid()}:dead")
+    crashed.enqueue({"id": f"c{i}", "text": f"chunk {i}"} for i in range(4))
+    leased = crashed.lease(PENDING, 3)
+    assert crashed.mark_extracted(leased[0]["id"], {"nodes": [], "relationships": []})
+
+    resumed = ExtractionQueue(path, lease_s=900)
+    assert resumed.leased_elsewhere() == 3
+    assert [item["id"] for item in resumed.lease(PENDING, 10)] == ["c3"]
+    assert resumed.reclaim_orphaned() == 3
+    assert resumed.leased_elsewhere() == 0
+    assert [item["id"] for item in resumed.lease(EXTRACTED, 10)] == ["c0"]
+    assert [item["id"] for item in resumed.lease(PENDING, 10)] == ["c1", "c2"]
+    crashed.close()
+    resumed.close()
+
+
+def test_live_and_remote_owners_keep_their_leases(tmp_path):
+    path = tmp_path / "queue.sqlite"
+    live = ExtractionQueue(path, lease_s=900, owner=f"{socket.gethostname()}:{os.getpid()}:live")
+    remote = ExtractionQueue(path, lease_s=900, owner=f"some-other-host:{exited_pid()}:run")
+    live.enqueue({"id": f"c{i}", "text": f"chunk {i}"} for i in range(2))
+    live.lease(PENDING, 1)
+    remote.lease(PENDING, 1)
+
+    resumed = ExtractionQueue(path, lease_s=900)
+    assert resumed.reclaim_orphaned() == 0
+    assert resumed.leased_elsewhere() == 2
+    assert not owner_gone(live.owner) and not owner_gone(remote.owner) and not owner_gone("not-an-owner")
+    for work_queue in (live, remote, resumed):
+        work_queue.close()